@@ -11,7 +11,10 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from spiderfoot import SpiderFootPlugin
+import threading
+import time
+
+from spiderfoot import SpiderFootDb, SpiderFootPlugin
 
 
 class sfp__stor_db(SpiderFootPlugin):
@@ -26,16 +29,30 @@ class sfp__stor_db(SpiderFootPlugin):
     # Default options
     opts = {
         'maxstorage': 1024,  # max bytes for any piece of info stored (0 = unlimited)
+        'batchsize': 500,
+        'batchlatency': 1,
         '_store': True
     }
 
     # Option descriptions
     optdescs = {
-        'maxstorage': "Maximum bytes to store for any piece of information retrieved (0 = unlimited.)"
+        'maxstorage': "Maximum bytes to store for any piece of information retrieved (0 = unlimited.)",
+        'batchsize': "Maximum number of events to write to the database in a single transaction.",
+        'batchlatency': "Maximum number of seconds to hold events in memory before writing them to the database."
     }
 
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
+        # When running as a thread in a scan, events are handed to a
+        # write-behind thread which stores them in batches.
+        self.writer = None
+        self.writerStopped = False
+        self.writerLost = False
+        self.writing = False
+        self.flushRequested = False
+        self.batch = list()
+        self.batchStarted = 0
+        self.batchCondition = threading.Condition()
 
         for opt in list(userOpts.keys()):
             self.opts[opt] = userOpts[opt]
@@ -51,12 +68,140 @@ class sfp__stor_db(SpiderFootPlugin):
         if not self.opts['_store']:
             return
 
-        if self.opts['maxstorage'] != 0 and len(sfEvent.data) > self.opts['maxstorage']:
-            self.debug("Storing an event: " + sfEvent.eventType)
-            self.__sfdb__.scanEventStore(self.getScanId(), sfEvent, self.opts['maxstorage'])
+        self.debug("Storing an event: " + sfEvent.eventType)
+
+        if self.writer is None:
+            self.storeEvents(self.__sfdb__, [sfEvent])
             return
 
-        self.debug("Storing an event: " + sfEvent.eventType)
-        self.__sfdb__.scanEventStore(self.getScanId(), sfEvent)
+        with self.batchCondition:
+            # don't let the batch grow unbounded if the database can't keep up
+            while len(self.batch) >= self.opts['batchsize'] and self.writer.is_alive():
+                self.batchCondition.wait()
+
+            if self.writer.is_alive():
+                if not self.batch:
+                    self.batchStarted = time.monotonic()
+                self.batch.append(sfEvent)
+                if len(self.batch) >= self.opts['batchsize']:
+                    self.batchCondition.notify_all()
+                return
+
+            # nothing will write the batch if the write-behind thread has died,
+            # so store whatever it left behind and this event here instead
+            batch = self.batch + [sfEvent]
+            self.batch = list()
+            writerLost = not self.writerLost
+            self.writerLost = True
+
+        if writerLost:
+            self.error("Write-behind thread has stopped, storing events directly")
+        self.writeBatch(self.__sfdb__, batch)
+
+    def storeEvents(self, dbh, sfEvents):
+        self.debug(f"Storing {len(sfEvents)} events")
+        dbh.scanEventStoreBatch(self.getScanId(), sfEvents, self.opts['maxstorage'])
+
+    def writeBatch(self, dbh, sfEvents):
+        """Store a batch of events, retrying once if that fails. If the retry
+        also fails, store the events one at a time so that only the events
+        which can't be stored are lost.
+
+        Args:
+            dbh (SpiderFootDb): database handle
+            sfEvents (list): events to store
+        """
+        try:
+            self.storeEvents(dbh, sfEvents)
+            return
+        except Exception as e:
+            self.debug(f"Failed to store {len(sfEvents)} events, retrying: {e}")
+
+        try:
+            self.storeEvents(dbh, sfEvents)
+            return
+        except Exception as e:
+            self.error(f"Failed to store {len(sfEvents)} events, storing them one at a time: {e}")
+
+        for sfEvent in sfEvents:
+            try:
+                self.storeEvents(dbh, [sfEvent])
+            except Exception as e:
+                self.error(f"Failed to store {sfEvent.eventType} event: {e}")
+
+    def batchReady(self):
+        """Whether the write-behind thread should write the pending batch now,
+        or exit. Must be called with batchCondition held.
+
+        Returns:
+            bool: True if the batch should be written (or the thread should exit)
+        """
+        if not self.batch:
+            return self.writerStopped
+        if self.writerStopped or self.flushRequested or len(self.batch) >= self.opts['batchsize']:
+            return True
+        return time.monotonic() - self.batchStarted >= self.opts['batchlatency']
+
+    def writeBatches(self):
+        """Write-behind thread: store pending events once the batch is full,
+        has been held for longer than the maximum latency, or a flush was requested."""
+        dbh = SpiderFootDb(self.opts)
+
+        while True:
+            with self.batchCondition:
+                while not self.batchReady():
+                    timeout = None
+                    if self.batch:
+                        timeout = max(0, self.batchStarted + self.opts['batchlatency'] - time.monotonic())
+                    self.batchCondition.wait(timeout)
+
+                if not self.batch:
+                    break
+
+                batch = self.batch
+                self.batch = list()
+                self.writing = True
+                self.batchCondition.notify_all()
+
+            try:
+                self.writeBatch(dbh, batch)
+            finally:
+                with self.batchCondition:
+                    self.writing = False
+                    self.batchCondition.notify_all()
+
+        dbh.close()
+
+    def flush(self):
+        """Wait until all pending events have been written to the database."""
+        if self.writer is None:
+            return
+
+        with self.batchCondition:
+            self.flushRequested = True
+            self.batchCondition.notify_all()
+            while (self.batch or self.writing) and self.writer.is_alive():
+                self.batchCondition.wait()
+            self.flushRequested = False
+
+    def finish(self):
+        self.flush()
+
+    def threadWorker(self):
+        self.writer = threading.Thread(target=self.writeBatches, name=f"{self.__name__}_writer")
+        self.writer.start()
+        try:
+            super().threadWorker()
+        finally:
+            # always write out whatever is left, including when the scan is aborted
+            with self.batchCondition:
+                self.writerStopped = True
+                self.batchCondition.notify_all()
+            self.writer.join()
+            # left behind if the write-behind thread died
+            if self.batch:
+                batch = self.batch
+                self.batch = list()
+                self.writeBatch(self.__sfdb__, batch)
 
 # End of sfp__stor_db class
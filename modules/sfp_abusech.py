@@ -11,8 +11,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -112,30 +110,23 @@ class sfp_abusech(SpiderFootPlugin):
         ]
 
     def queryFeodoTrackerBlacklist(self, target, targetType):
-        blacklist = self.retrieveFeodoTrackerBlacklist()
+        blacklist = self.sf.feedIndex('abusech_feodo', 24, self.retrieveFeodoTrackerBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in Abuse.ch Feodo Tracker.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in Abuse.ch Feodo Tracker.")
-                    return True
+            for ip in blacklist.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in Abuse.ch Feodo Tracker.")
+                return True
 
         return False
 
     def retrieveFeodoTrackerBlacklist(self):
-        blacklist = self.sf.cacheGet('abusech_feodo', 24)
-
-        if blacklist is not None:
-            return self.parseFeodoTrackerBlacklist(blacklist)
-
         res = self.sf.fetchUrl(
             "https://feodotracker.abuse.ch/downloads/ipblocklist.txt",
             timeout=self.opts['_fetchtimeout'],
@@ -152,8 +143,6 @@ class sfp_abusech(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("abusech_feodo", res['content'])
-
         return self.parseFeodoTrackerBlacklist(res['content'])
 
     def parseFeodoTrackerBlacklist(self, blacklist):
@@ -183,30 +172,23 @@ class sfp_abusech(SpiderFootPlugin):
         return ips
 
     def querySslBlacklist(self, target, targetType):
-        blacklist = self.retrieveSslBlacklist()
+        blacklist = self.sf.feedIndex('abusech_ssl', 24, self.retrieveSslBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in Abuse.ch SSL Blacklist.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in Abuse.ch SSL Blacklist.")
-                    return True
+            for ip in blacklist.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in Abuse.ch SSL Blacklist.")
+                return True
 
         return False
 
     def retrieveSslBlacklist(self):
-        blacklist = self.sf.cacheGet('abusech_ssl', 24)
-
-        if blacklist is not None:
-            return self.parseSslBlacklist(blacklist)
-
         res = self.sf.fetchUrl(
             "https://sslbl.abuse.ch/blacklist/sslipblacklist.csv",
             timeout=self.opts['_fetchtimeout'],
@@ -223,8 +205,6 @@ class sfp_abusech(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("abusech_ssl", res['content'])
-
         return self.parseSslBlacklist(res['content'])
 
     def parseSslBlacklist(self, blacklist):
@@ -258,34 +238,27 @@ class sfp_abusech(SpiderFootPlugin):
         return ips
 
     def queryUrlHausBlacklist(self, target, targetType):
-        blacklist = self.retrieveUrlHausBlacklist()
+        blacklist = self.sf.feedIndex('abusech_urlhaus', 24, self.retrieveUrlHausBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in Abuse.ch URL Haus Blacklist.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in Abuse.ch URL Haus Blacklist.")
-                    return True
+            for ip in blacklist.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in Abuse.ch URL Haus Blacklist.")
+                return True
         elif targetType == "domain":
-            if target.lower() in blacklist:
+            if blacklist.containsDomain(target):
                 self.debug(f"Host name {target} found in Abuse.ch URL Haus Blacklist.")
                 return True
 
         return False
 
     def retrieveUrlHausBlacklist(self):
-        blacklist = self.sf.cacheGet('abusech_urlhaus', 24)
-
-        if blacklist is not None:
-            return self.parseUrlHausBlacklist(blacklist)
-
         res = self.sf.fetchUrl(
             "https://urlhaus.abuse.ch/downloads/csv_recent/",
             timeout=self.opts['_fetchtimeout'],
@@ -302,8 +275,6 @@ class sfp_abusech(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("abusech_urlhaus", res['content'])
-
         return self.parseUrlHausBlacklist(res['content'])
 
     def parseUrlHausBlacklist(self, blacklist):
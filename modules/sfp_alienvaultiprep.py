@@ -11,8 +11,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -88,30 +86,23 @@ class sfp_alienvaultiprep(SpiderFootPlugin):
         ]
 
     def queryBlacklist(self, target, targetType):
-        blacklist = self.retrieveBlacklist()
+        blacklist = self.sf.feedIndex('alienvaultiprep', 24, self.retrieveBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in AlienVault IP Reputation Database blacklist.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in AlienVault IP Reputation Database blacklist.")
-                    return True
+            for ip in blacklist.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in AlienVault IP Reputation Database blacklist.")
+                return True
 
         return False
 
     def retrieveBlacklist(self):
-        blacklist = self.sf.cacheGet('alienvaultiprep', 24)
-
-        if blacklist is not None:
-            return self.parseBlacklist(blacklist)
-
         res = self.sf.fetchUrl(
             "https://reputation.alienvault.com/reputation.generic",
             timeout=self.opts['_fetchtimeout'],
@@ -128,8 +119,6 @@ class sfp_alienvaultiprep(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("alienvaultiprep", res['content'])
-
         return self.parseBlacklist(res['content'])
 
     def parseBlacklist(self, blacklist):
@@ -10,8 +10,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -92,30 +90,23 @@ class sfp_blocklistde(SpiderFootPlugin):
         ]
 
     def queryBlacklist(self, target, targetType):
-        blacklist = self.retrieveBlacklist()
+        blacklist = self.sf.feedIndex('blocklistde', 24, self.retrieveBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in blocklist.de blacklist.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in blocklist.de blacklist.")
-                    return True
+            for ip in blacklist.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in blocklist.de blacklist.")
+                return True
 
         return False
 
     def retrieveBlacklist(self):
-        blacklist = self.sf.cacheGet('blocklistde', 24)
-
-        if blacklist is not None:
-            return self.parseBlacklist(blacklist)
-
         res = self.sf.fetchUrl(
             "https://lists.blocklist.de/lists/all.txt",
             timeout=self.opts['_fetchtimeout'],
@@ -132,8 +123,6 @@ class sfp_blocklistde(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("blocklistde", res['content'])
-
         return self.parseBlacklist(res['content'])
 
     def parseBlacklist(self, blacklist):
@@ -10,8 +10,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -81,44 +79,40 @@ class sfp_cinsscore(SpiderFootPlugin):
             "MALICIOUS_NETBLOCK",
         ]
 
-    def query(self, qry, targetType):
-        cid = "_cinsscore"
+    def retrieveFeed(self):
         url = "https://cinsscore.com/list/ci-badguys.txt"
 
-        data = dict()
-        data["content"] = self.sf.cacheGet("sfmal_" + cid, self.opts.get('cacheperiod', 0))
+        data = self.sf.fetchUrl(url, timeout=self.opts['_fetchtimeout'], useragent=self.opts['_useragent'])
+
+        if data["code"] != "200":
+            self.error(f"Unable to fetch {url}")
+            self.errorState = True
+            return None
 
         if data["content"] is None:
-            data = self.sf.fetchUrl(url, timeout=self.opts['_fetchtimeout'], useragent=self.opts['_useragent'])
-
-            if data["code"] != "200":
-                self.error(f"Unable to fetch {url}")
-                self.errorState = True
-                return None
-
-            if data["content"] is None:
-                self.error(f"Unable to fetch {url}")
-                self.errorState = True
-                return None
-
-            self.sf.cachePut("sfmal_" + cid, data['content'])
-
-        for line in data["content"].split('\n'):
-            ip = line.strip().lower()
-
-            if targetType == "netblock":
-                try:
-                    if IPAddress(ip) in IPNetwork(qry):
-                        self.debug(f"{ip} found within netblock/subnet {qry} in cinsscore.com list.")
-                        return url
-                except Exception as e:
-                    self.debug(f"Error encountered parsing: {e}")
-                    continue
-
-            if targetType == "ip":
-                if qry.lower() == ip:
-                    self.debug(f"{qry} found in cinsscore.com list.")
-                    return url
+            self.error(f"Unable to fetch {url}")
+            self.errorState = True
+            return None
+
+        return [line.strip() for line in data["content"].split('\n') if not line.startswith('#')]
+
+    def query(self, qry, targetType):
+        url = "https://cinsscore.com/list/ci-badguys.txt"
+
+        feed = self.sf.feedIndex("cinsscore", self.opts.get('cacheperiod', 0), self.retrieveFeed)
+
+        if not feed:
+            return None
+
+        if targetType == "netblock":
+            for ip in feed.ipsInNetblock(qry):
+                self.debug(f"{ip} found within netblock/subnet {qry} in cinsscore.com list.")
+                return url
+
+        if targetType == "ip":
+            if feed.containsIp(qry):
+                self.debug(f"{qry} found in cinsscore.com list.")
+                return url
 
         return None
 
@@ -79,23 +79,18 @@ class sfp_coinblocker(SpiderFootPlugin):
         ]
 
     def queryBlocklist(self, target):
-        blocklist = self.retrieveBlocklist()
+        blocklist = self.sf.feedIndex('coinblocker', self.opts.get('cacheperiod', 24), self.retrieveBlocklist)
 
         if not blocklist:
             return False
 
-        if target.lower() in blocklist:
+        if blocklist.containsDomain(target):
             self.debug(f"Host name {target} found in CoinBlocker list.")
             return True
 
         return False
 
     def retrieveBlocklist(self):
-        blocklist = self.sf.cacheGet('coinblocker', self.opts.get('cacheperiod', 24))
-
-        if blocklist is not None:
-            return self.parseBlocklist(blocklist)
-
         url = "https://zerodot1.gitlab.io/CoinBlockerLists/list.txt"
         res = self.sf.fetchUrl(
             url,
@@ -113,8 +108,6 @@ class sfp_coinblocker(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("coinblocker", res['content'])
-
         return self.parseBlocklist(res['content'])
 
     def parseBlocklist(self, blocklist):
@@ -153,8 +153,7 @@ class sfp_crossref(SpiderFootPlugin):
         if not matched:
             return
 
-        if not event.moduleDataSource:
-            event.moduleDataSource = "Unknown"
+        moduleDataSource = event.moduleDataSource or "Unknown"
 
         self.info(f"Found link to target from affiliate: {url}")
 
@@ -164,7 +163,7 @@ class sfp_crossref(SpiderFootPlugin):
             self.__name__,
             event
         )
-        evt1.moduleDataSource = event.moduleDataSource
+        evt1.moduleDataSource = moduleDataSource
         self.notifyListeners(evt1)
 
         evt2 = SpiderFootEvent(
@@ -173,7 +172,7 @@ class sfp_crossref(SpiderFootPlugin):
             self.__name__,
             evt1
         )
-        evt2.moduleDataSource = event.moduleDataSource
+        evt2.moduleDataSource = moduleDataSource
         self.notifyListeners(evt2)
 
 # End of sfp_crossref class
@@ -12,9 +12,6 @@
 # -------------------------------------------------------------------------------
 
 import importlib
-import random
-import threading
-import time
 
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
@@ -48,19 +45,17 @@ class sfp_dnsbrute(SpiderFootPlugin):
         'top10000': "Try a further 10,000 common hostnames/sub-domains. Will make the scan much slower.",
         'numbersuffix': "For any host found, try appending 1, 01, 001, -1, -01, -001, 2, 02, etc. (up to 10)",
         'numbersuffixlimit': "Limit using the number suffixes for hosts that have already been resolved? If disabled this will significantly extend the duration of scans.",
-        "_maxthreads": "Maximum threads"
+        "_maxthreads": "Maximum number of DNS lookups in flight at once"
     }
 
     events = None
     sublist = None
-    lock = None
 
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.sublist = self.tempStorage()
         self.events = self.tempStorage()
         self.__dataSource__ = "DNS"
-        self.lock = threading.Lock()
 
         for opt in list(userOpts.keys()):
             self.opts[opt] = userOpts[opt]
@@ -90,44 +85,15 @@ class sfp_dnsbrute(SpiderFootPlugin):
     def producedEvents(self):
         return ["INTERNET_NAME"]
 
-    def tryHost(self, name):
-        try:
-            if self.sf.resolveHost(name) or self.sf.resolveHost6(name):
-                with self.lock:
-                    self.hostResults[name] = True
-        except Exception:
-            with self.lock:
-                self.hostResults[name] = False
-
     def tryHostWrapper(self, hostList, sourceEvent):
-        self.hostResults = dict()
-        running = True
-        i = 0
-        t = []
-
-        # Spawn threads for scanning
-        self.info("Spawning threads to check hosts: " + str(hostList))
-        for name in hostList:
-            tn = 'thread_sfp_dnsbrute_' + str(random.SystemRandom().randint(1, 999999999))
-            t.append(threading.Thread(name=tn, target=self.tryHost, args=(name,)))
-            t[i].start()
-            i += 1
-
-        # Block until all threads are finished
-        while running:
-            found = False
-            for rt in threading.enumerate():
-                if rt.name.startswith("thread_sfp_dnsbrute_"):
-                    found = True
-
-            if not found:
-                running = False
-
-            time.sleep(0.05)
-
-        for res in self.hostResults:
-            if self.hostResults.get(res, False):
-                self.sendEvent(sourceEvent, res)
+        self.info(f"Resolving {len(hostList)} possible hosts")
+
+        for host, addrs in self.sf.resolveHostsBulk(hostList, window=self.opts['_maxthreads']):
+            if self.checkForStop():
+                return
+
+            if addrs:
+                self.sendEvent(sourceEvent, host)
 
     # Store the result internally and notify listening modules
     def sendEvent(self, source, result):
@@ -193,22 +159,7 @@ class sfp_dnsbrute(SpiderFootPlugin):
             self.debug("Wildcard DNS detected.")
             return
 
-        targetList = list()
-        for sub in self.sublist:
-            if self.checkForStop():
-                return
-
-            name = f"{sub}.{eventData}"
-
-            if len(targetList) <= self.opts['_maxthreads']:
-                targetList.append(name)
-            else:
-                self.tryHostWrapper(targetList, event)
-                targetList = list()
-
-        # Scan whatever may be left over.
-        if len(targetList) > 0:
-            self.tryHostWrapper(targetList, event)
+        self.tryHostWrapper([f"{sub}.{eventData}" for sub in self.sublist], event)
 
         if self.opts['numbersuffix'] and not self.opts['numbersuffixlimit']:
             nextsubs = dict()
@@ -225,13 +176,7 @@ class sfp_dnsbrute(SpiderFootPlugin):
                     nextsubs[s + "-0" + str(i) + dom] = True
                     nextsubs[s + "-00" + str(i) + dom] = True
 
-                if len(list(nextsubs.keys())) >= self.opts['_maxthreads']:
-                    self.tryHostWrapper(list(nextsubs.keys()), event)
-                    nextsubs = dict()
-
-            # Scan whatever may be left over.
-            if len(nextsubs) > 0:
-                self.tryHostWrapper(list(nextsubs.keys()), event)
+            self.tryHostWrapper(list(nextsubs.keys()), event)
 
 
 # End of sfp_dnsbrute class
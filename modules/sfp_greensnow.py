@@ -10,8 +10,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -84,44 +82,38 @@ class sfp_greensnow(SpiderFootPlugin):
             "MALICIOUS_SUBNET",
         ]
 
-    def query(self, qry, targetType):
-        cid = "_greensnow"
+    def retrieveFeed(self):
         url = "https://blocklist.greensnow.co/greensnow.txt"
 
-        data = dict()
-        data["content"] = self.sf.cacheGet("sfmal_" + cid, self.opts.get('cacheperiod', 0))
+        data = self.sf.fetchUrl(url, timeout=self.opts['_fetchtimeout'], useragent=self.opts['_useragent'])
+
+        if data["code"] != "200":
+            self.error(f"Unable to fetch {url}")
+            self.errorState = True
+            return None
 
         if data["content"] is None:
-            data = self.sf.fetchUrl(url, timeout=self.opts['_fetchtimeout'], useragent=self.opts['_useragent'])
-
-            if data["code"] != "200":
-                self.error(f"Unable to fetch {url}")
-                self.errorState = True
-                return None
-
-            if data["content"] is None:
-                self.error(f"Unable to fetch {url}")
-                self.errorState = True
-                return None
-
-            self.sf.cachePut("sfmal_" + cid, data['content'])
-
-        for line in data["content"].split('\n'):
-            ip = line.strip().lower()
-
-            if targetType == "netblock":
-                try:
-                    if IPAddress(ip) in IPNetwork(qry):
-                        self.debug(f"{ip} found within netblock/subnet {qry} in greensnow.co list.")
-                        return f"https://greensnow.co/view/{ip}"
-                except Exception as e:
-                    self.debug(f"Error encountered parsing: {e}")
-                    continue
-
-            if targetType == "ip":
-                if qry.lower() == ip:
-                    self.debug(f"{qry} found in greensnow.co list.")
-                    return f"https://greensnow.co/view/{ip}"
+            self.error(f"Unable to fetch {url}")
+            self.errorState = True
+            return None
+
+        return [line.strip() for line in data["content"].split('\n') if not line.startswith('#')]
+
+    def query(self, qry, targetType):
+        feed = self.sf.feedIndex("greensnow", self.opts.get('cacheperiod', 0), self.retrieveFeed)
+
+        if not feed:
+            return None
+
+        if targetType == "netblock":
+            for ip in feed.ipsInNetblock(qry):
+                self.debug(f"{ip} found within netblock/subnet {qry} in greensnow.co list.")
+                return f"https://greensnow.co/view/{ip}"
+
+        if targetType == "ip":
+            if feed.containsIp(qry):
+                self.debug(f"{qry} found in greensnow.co list.")
+                return f"https://greensnow.co/view/{qry}"
 
         return None
 
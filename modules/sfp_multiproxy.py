@@ -11,8 +11,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -86,31 +84,24 @@ class sfp_multiproxy(SpiderFootPlugin):
         ]
 
     def queryProxyList(self, target, targetType):
-        proxy_list = self.retrieveProxyList()
+        proxy_list = self.sf.feedIndex('multiproxyopenproxies', 24, self.retrieveProxyList)
 
         if not proxy_list:
             self.errorState = True
             return False
 
         if targetType == "ip":
-            if target in proxy_list:
+            if proxy_list.containsIp(target):
                 self.debug(f"IP address {target} found in multiproxy.org open proxy list.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in proxy_list:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in multiproxy.org open proxy list.")
-                    return True
+            for ip in proxy_list.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in multiproxy.org open proxy list.")
+                return True
 
         return False
 
     def retrieveProxyList(self):
-        proxy_list = self.sf.cacheGet('multiproxyopenproxies', 24)
-
-        if proxy_list is not None:
-            return self.parseProxyList(proxy_list)
-
         res = self.sf.fetchUrl(
             "http://multiproxy.org/txt_all/proxy.txt",
             timeout=self.opts['_fetchtimeout'],
@@ -127,8 +118,6 @@ class sfp_multiproxy(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("multiproxyopenproxies", res['content'])
-
         return self.parseProxyList(res['content'])
 
     def parseProxyList(self, proxy_list):
@@ -12,12 +12,10 @@
 # -------------------------------------------------------------------------------
 
 import random
-import threading
-import time
 
 from netaddr import IPNetwork
 
-from spiderfoot import SpiderFootEvent, SpiderFootPlugin
+from spiderfoot import SpiderFootEvent, SpiderFootPlugin, SpiderFootPortScanner
 
 
 class sfp_portscan_tcp(SpiderFootPlugin):
@@ -40,7 +38,8 @@ class sfp_portscan_tcp(SpiderFootPlugin):
                   '5903', '5631', '631', '636',
                   '990', '992', '993', '995', '1080', '8080', '8888', '9000'],
         'timeout': 15,
-        'maxthreads': 10,
+        'maxthreads': 100,
+        'hostrate': 0,
         'randomize': True,
         'netblockscan': True,
         'netblockscanmax': 24
@@ -48,7 +47,8 @@ class sfp_portscan_tcp(SpiderFootPlugin):
 
     # Option descriptions
     optdescs = {
-        'maxthreads': "Number of ports to try to open simultaneously (number of threads to spawn at once.)",
+        'maxthreads': "Number of ports to try to open simultaneously.",
+        'hostrate': "Maximum number of ports to try per second on each IP address (0 = unlimited).",
         'ports': r"The TCP ports to scan. Prefix with an '@' to iterate through a file containing ports to try (one per line), e.g. @C:\ports.txt or @/home/bob/ports.txt. Or supply a URL to load the list from there.",
         'timeout': "Seconds before giving up on a port.",
         'randomize': "Randomize the order of ports scanned.",
@@ -58,15 +58,12 @@ class sfp_portscan_tcp(SpiderFootPlugin):
 
     results = None
     portlist = list()
-    portResults = dict()
-    lock = None
     errorState = False
 
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = self.tempStorage()
         self.__dataSource__ = "Target Network"
-        self.lock = threading.Lock()
 
         for opt in list(userOpts.keys()):
             self.opts[opt] = userOpts[opt]
@@ -101,73 +98,40 @@ class sfp_portscan_tcp(SpiderFootPlugin):
     def producedEvents(self):
         return ["TCP_PORT_OPEN", "TCP_PORT_OPEN_BANNER"]
 
-    def tryPort(self, ip, port):
-        peer = f"{ip}:{port}"
-
-        try:
-            sock = self.sf.safeSocket(ip, port, self.opts['timeout'])
-            with self.lock:
-                self.portResults[peer] = True
-        except Exception:
-            with self.lock:
-                self.portResults[peer] = False
-            return
+    # Scan every port in the port list on each IP address. Each port is
+    # tried across all the IP addresses before moving on to the next, so
+    # that no single host receives a burst of connections.
+    def tryPorts(self, ipList, srcEvent):
+        def targets():
+            for port in self.portlist:
+                for ip in ipList:
+                    if self.checkForStop():
+                        return
+                    yield ip, port
+
+        scanner = SpiderFootPortScanner(
+            concurrency=int(self.opts['maxthreads']),
+            timeout=float(self.opts['timeout']),
+            hostRate=float(self.opts['hostrate'])
+        )
+
+        for ip, port, banner in scanner.scan(targets()):
+            if self.checkForStop():
+                return
+            self.sendEvent(f"{ip}:{port}", banner, srcEvent)
 
-        # If the port was open, see what we can read
-        try:
-            with self.lock:
-                self.portResults[peer] = sock.recv(4096)
-        except Exception:
-            sock.close()
-            return
-        else:
-            if not self.portResults[peer]:
-                # No banner, but port is open
-                self.portResults[peer] = True
-
-        sock.close()
-
-    def tryPortWrapper(self, ip, portList):
-        self.portResults = dict()
-        running = True
-        i = 0
-        t = []
-
-        # Spawn threads for scanning
-        while i < len(portList):
-            port = portList[i]
-            self.info(f"Spawning thread to check port: {port} on {ip}")
-            t.append(threading.Thread(name=f"sfp_portscan_tcp_{port}", target=self.tryPort, args=(ip, port)))
-            t[i].start()
-            i += 1
-
-        # Block until all threads are finished
-        while running:
-            found = False
-            for rt in threading.enumerate():
-                if rt.name.startswith("sfp_portscan_tcp_"):
-                    found = True
-
-            if not found:
-                running = False
-            time.sleep(0.25)
-
-        return self.portResults
-
-    # Generate TCP_PORT_OPEN_BANNER event
-    def sendEvent(self, resArray, srcEvent):
-        for cp in resArray:
-            if not resArray[cp]:
-                continue
+        self.debug(f"Found {scanner.open} open ports in {scanner.attempts} attempts")
 
-            self.info(f"TCP port {cp} found to be OPEN.")
-            evt = SpiderFootEvent("TCP_PORT_OPEN", cp, self.__name__, srcEvent)
-            self.notifyListeners(evt)
+    # Generate TCP_PORT_OPEN and TCP_PORT_OPEN_BANNER events
+    def sendEvent(self, peer, banner, srcEvent):
+        self.info(f"TCP port {peer} found to be OPEN.")
+        evt = SpiderFootEvent("TCP_PORT_OPEN", peer, self.__name__, srcEvent)
+        self.notifyListeners(evt)
 
-            if resArray[cp] is not True:
-                banner = str(resArray[cp], 'utf-8', errors='replace')
-                bevt = SpiderFootEvent("TCP_PORT_OPEN_BANNER", banner, self.__name__, evt)
-                self.notifyListeners(bevt)
+        if banner:
+            banner = str(banner, 'utf-8', errors='replace')
+            bevt = SpiderFootEvent("TCP_PORT_OPEN_BANNER", banner, self.__name__, evt)
+            self.notifyListeners(bevt)
 
     # Handle events sent to this module
     def handleEvent(self, event):
@@ -211,31 +175,19 @@ class sfp_portscan_tcp(SpiderFootPlugin):
         else:
             scanIps.append(eventData)
 
+        ipList = list()
         for ipAddr in set(scanIps):
             if ipAddr in self.results:
                 self.debug(f"Skipping {ipAddr} as already scanned.")
-                return
+                continue
 
             self.results[ipAddr] = True
+            ipList.append(ipAddr)
 
-            self.info(f"Scanning {len(set(self.portlist))} ports on {ipAddr}")
-
-            i = 0
-            portArr = []
-            for port in self.portlist:
-                if self.checkForStop():
-                    return
-
-                if i < self.opts['maxthreads']:
-                    portArr.append(port)
-                else:
-                    self.sendEvent(self.tryPortWrapper(ipAddr, portArr), event)
-                    i = 0
-                    portArr = [port]
-
-                i += 1
+        if not ipList:
+            return
 
-            # Scan whatever is remaining
-            self.sendEvent(self.tryPortWrapper(ipAddr, portArr), event)
+        self.info(f"Scanning {len(self.portlist)} ports on {len(ipList)} IP addresses")
+        self.tryPorts(ipList, event)
 
 # End of sfp_portscan_tcp class
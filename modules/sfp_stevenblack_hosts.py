@@ -71,23 +71,18 @@ class sfp_stevenblack_hosts(SpiderFootPlugin):
         ]
 
     def queryBlocklist(self, target):
-        blocklist = self.retrieveBlocklist()
+        blocklist = self.sf.feedIndex('stevenblack_hosts', 24, self.retrieveBlocklist)
 
         if not blocklist:
             return False
 
-        if target.lower() in blocklist:
+        if blocklist.containsDomain(target):
             self.debug(f"Host name {target} found in Steven Black Hosts block list.")
             return True
 
         return False
 
     def retrieveBlocklist(self):
-        blocklist = self.sf.cacheGet('stevenblack_hosts', 24)
-
-        if blocklist is not None:
-            return self.parseBlocklist(blocklist)
-
         url = "https://raw.githubusercontent.com/StevenBlack/hosts/master/hosts"
         res = self.sf.fetchUrl(
             url,
@@ -105,8 +100,6 @@ class sfp_stevenblack_hosts(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("stevenblack_hosts", res['content'])
-
         return self.parseBlocklist(res['content'])
 
     def parseBlocklist(self, blocklist):
@@ -11,8 +11,6 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
-
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
 
@@ -91,30 +89,23 @@ class sfp_talosintel(SpiderFootPlugin):
         ]
 
     def queryBlacklist(self, target, targetType):
-        blacklist = self.retrieveBlacklist()
+        blacklist = self.sf.feedIndex('talosintel', 24, self.retrieveBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in Talos Intelligence blacklist.")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in Talos Intelligence blacklist.")
-                    return True
+            for ip in blacklist.ipsInNetblock(target):
+                self.debug(f"IP address {ip} found within netblock/subnet {target} in Talos Intelligence blacklist.")
+                return True
 
         return False
 
     def retrieveBlacklist(self):
-        blacklist = self.sf.cacheGet('talosintel', 24)
-
-        if blacklist is not None:
-            return self.parseBlacklist(blacklist)
-
         # https://talosintelligence.com/documents/ip-blacklist redirects to:
         # https://snort.org/downloads/ip-block-list
         res = self.sf.fetchUrl(
@@ -133,8 +124,6 @@ class sfp_talosintel(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("talosintel", res['content'])
-
         return self.parseBlacklist(res['content'])
 
     def parseBlacklist(self, blacklist):
@@ -12,10 +12,6 @@
 # -------------------------------------------------------------------------------
 
 import random
-import threading
-import time
-
-import dns.resolver
 
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
@@ -41,21 +37,16 @@ class sfp_tldsearch(SpiderFootPlugin):
     optdescs = {
         'activeonly': "Only report domains that have content (try to fetch the page)?",
         "skipwildcards": "Skip TLDs and sub-TLDs that have wildcard DNS.",
-        "_maxthreads": "Maximum threads"
+        "_maxthreads": "Maximum number of DNS lookups in flight at once"
     }
 
     # Internal results tracking
     results = None
 
-    # Track TLD search results between threads
-    tldResults = dict()
-    lock = None
-
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = self.tempStorage()
         self.__dataSource__ = "DNS"
-        self.lock = threading.Lock()
 
         for opt in list(userOpts.keys()):
             self.opts[opt] = userOpts[opt]
@@ -70,57 +61,38 @@ class sfp_tldsearch(SpiderFootPlugin):
     def producedEvents(self):
         return ["SIMILARDOMAIN"]
 
-    def tryTld(self, target, tld):
-        resolver = dns.resolver.Resolver()
-        resolver.timeout = 1
-        resolver.lifetime = 1
-        resolver.search = list()
-        if self.opts.get('_dnsserver', "") != "":
-            resolver.nameservers = [self.opts['_dnsserver']]
+    def tryTldWrapper(self, tldList, sourceEvent):
+        self.info(f"Resolving {len(tldList)} possible domains")
 
-        if self.opts['skipwildcards'] and self.sf.checkDnsWildcard(tld):
-            return
+        window = self.opts['_maxthreads']
 
-        try:
-            if not self.sf.resolveHost(target) and not self.sf.resolveHost6(target):
-                with self.lock:
-                    self.tldResults[target] = False
-            else:
-                with self.lock:
-                    self.tldResults[target] = True
-        except Exception:
-            with self.lock:
-                self.tldResults[target] = False
+        if self.opts['skipwildcards']:
+            # A TLD has wildcard DNS if a random name under it resolves
+            randpool = 'bcdfghjklmnpqrstvwxyz3456789'
+            probes = dict()
+            for domain, tld in tldList:
+                randhost = ''.join([random.SystemRandom().choice(randpool) for x in range(10)])
+                probes[f"{randhost}.{tld}"] = tld
 
-    def tryTldWrapper(self, tldList, sourceEvent):
-        self.tldResults = dict()
-        running = True
-        t = []
-
-        # Spawn threads for scanning
-        self.info(f"Spawning threads to check TLDs: {tldList}")
-        for i, pair in enumerate(tldList):
-            (domain, tld) = pair
-            tn = 'thread_sfp_tldsearch_' + str(random.SystemRandom().randint(0, 999999999))
-            t.append(threading.Thread(name=tn, target=self.tryTld, args=(domain, tld,)))
-            t[i].start()
-
-        # Block until all threads are finished
-        while running:
-            found = False
-            for rt in threading.enumerate():
-                if rt.name.startswith("thread_sfp_tldsearch_"):
-                    found = True
-
-            if not found:
-                running = False
-
-            time.sleep(0.1)
-
-        for res in self.tldResults:
+            wildcards = set()
+            for host, addrs in self.sf.resolveHostsBulk(list(probes.keys()), window=window):
+                if addrs:
+                    wildcards.add(probes[host])
+
+            if self.checkForStop():
+                return
+
+            tldList = [pair for pair in tldList if pair[1] not in wildcards]
+
+        for res, addrs in self.sf.resolveHostsBulk([domain for domain, tld in tldList], window=window):
+            if self.checkForStop():
+                return
+
+            if not addrs:
+                continue
             if self.getTarget().matches(res, includeParents=True, includeChildren=True):
                 continue
-            if self.tldResults[res] and res not in self.results:
+            if res not in self.results:
                 self.sendEvent(sourceEvent, res)
 
     # Store the result internally and notify listening modules
@@ -184,19 +156,11 @@ class sfp_tldsearch(SpiderFootPlugin):
             if tld.endswith(".arpa"):
                 continue
 
-            tryDomain = keyword + "." + tld
+            targetList.append([keyword + "." + tld, tld])
 
-            if self.checkForStop():
-                return
-
-            if len(targetList) <= self.opts['_maxthreads']:
-                targetList.append([tryDomain, tld])
-            else:
-                self.tryTldWrapper(targetList, event)
-                targetList = list()
+        if self.checkForStop():
+            return
 
-        # Scan whatever may be left over.
-        if len(targetList) > 0:
-            self.tryTldWrapper(targetList, event)
+        self.tryTldWrapper(targetList, event)
 
 # End of sfp_tldsearch class
@@ -16,7 +16,7 @@ import os.path
 from netaddr import IPNetwork
 from subprocess import PIPE, Popen, TimeoutExpired
 
-from spiderfoot import SpiderFootEvent, SpiderFootPlugin, SpiderFootHelpers
+from spiderfoot import SpiderFootEvent, SpiderFootPlugin, SpiderFootHelpers, SpiderFootIpRangeIndex
 
 
 class sfp_tool_nbtscan(SpiderFootPlugin):
@@ -57,6 +57,7 @@ class sfp_tool_nbtscan(SpiderFootPlugin):
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = dict()
+        self.scannedRanges = SpiderFootIpRangeIndex()
         self.errorState = False
         self.__dataSource__ = "Target Website"
 
@@ -119,12 +120,15 @@ class sfp_tool_nbtscan(SpiderFootPlugin):
             return
 
         # Might be a subnet within a subnet or IP within a subnet
-        for addr in self.results:
-            if IPNetwork(eventData) in IPNetwork(addr):
-                self.debug(f"Skipping {eventData} as already within a scanned range.")
-                return
+        if self.scannedRanges.contains(eventData):
+            self.debug(f"Skipping {eventData} as already within a scanned range.")
+            return
 
         self.results[eventData] = True
+        try:
+            self.scannedRanges.add(eventData)
+        except ValueError:
+            self.debug(f"{eventData} is not an IP address or netblock")
 
         args = [
             exe,
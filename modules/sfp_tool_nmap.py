@@ -15,7 +15,7 @@ from subprocess import PIPE, Popen
 
 from netaddr import IPNetwork
 
-from spiderfoot import SpiderFootEvent, SpiderFootPlugin
+from spiderfoot import SpiderFootEvent, SpiderFootIpRangeIndex, SpiderFootPlugin
 
 
 class sfp_tool_nmap(SpiderFootPlugin):
@@ -58,6 +58,7 @@ class sfp_tool_nmap(SpiderFootPlugin):
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = self.tempStorage()
+        self.scannedRanges = SpiderFootIpRangeIndex()
         self.errorState = False
         self.__dataSource__ = "Target Network"
 
@@ -106,12 +107,15 @@ class sfp_tool_nmap(SpiderFootPlugin):
             return
 
         # Might be a subnet within a subnet or IP within a subnet
-        for addr in self.results:
-            if IPNetwork(eventData) in IPNetwork(addr):
-                self.debug(f"Skipping {eventData} as already within a scanned range.")
-                return
+        if self.scannedRanges.contains(eventData):
+            self.debug(f"Skipping {eventData} as already within a scanned range.")
+            return
 
         self.results[eventData] = True
+        try:
+            self.scannedRanges.add(eventData)
+        except ValueError:
+            self.debug(f"{eventData} is not an IP address or netblock")
 
         if not self.opts['nmappath']:
             self.error("You enabled sfp_tool_nmap but did not set a path to the tool!")
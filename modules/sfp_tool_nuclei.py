@@ -18,7 +18,7 @@ import json
 from netaddr import IPNetwork
 from subprocess import Popen, PIPE, TimeoutExpired
 
-from spiderfoot import SpiderFootPlugin, SpiderFootEvent, SpiderFootHelpers
+from spiderfoot import SpiderFootPlugin, SpiderFootEvent, SpiderFootHelpers, SpiderFootIpRangeIndex
 
 
 class sfp_tool_nuclei(SpiderFootPlugin):
@@ -64,6 +64,7 @@ class sfp_tool_nuclei(SpiderFootPlugin):
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = self.tempStorage()
+        self.scannedRanges = SpiderFootIpRangeIndex()
 
         for opt in userOpts.keys():
             self.opts[opt] = userOpts[opt]
@@ -119,18 +120,17 @@ class sfp_tool_nuclei(SpiderFootPlugin):
             self.debug(f"Skipping {eventData} as already scanned.")
             return
 
-        if eventName != "INTERNET_NAME":
-            # Might be a subnet within a subnet or IP within a subnet
-            for addr in self.results:
-                try:
-                    if IPNetwork(eventData) in IPNetwork(addr):
-                        self.debug(f"Skipping {eventData} as already within a scanned range.")
-                        return
-                except BaseException:
-                    # self.results will also contain hostnames
-                    continue
+        # Might be a subnet within a subnet or IP within a subnet
+        if self.scannedRanges.contains(eventData):
+            self.debug(f"Skipping {eventData} as already within a scanned range.")
+            return
 
         self.results[eventData] = True
+        if eventName != "INTERNET_NAME":
+            try:
+                self.scannedRanges.add(eventData)
+            except ValueError:
+                self.debug(f"{eventData} is not an IP address or netblock")
 
         timeout = 240
         try:
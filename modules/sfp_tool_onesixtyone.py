@@ -17,7 +17,7 @@ import tempfile
 from netaddr import IPNetwork
 from subprocess import PIPE, Popen, TimeoutExpired
 
-from spiderfoot import SpiderFootPlugin, SpiderFootEvent, SpiderFootHelpers
+from spiderfoot import SpiderFootPlugin, SpiderFootEvent, SpiderFootHelpers, SpiderFootIpRangeIndex
 
 
 class sfp_tool_onesixtyone(SpiderFootPlugin):
@@ -57,6 +57,7 @@ class sfp_tool_onesixtyone(SpiderFootPlugin):
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = dict()
+        self.scannedRanges = SpiderFootIpRangeIndex()
         self.errorState = False
         self.__dataSource__ = "Target Website"
 
@@ -134,12 +135,15 @@ class sfp_tool_onesixtyone(SpiderFootPlugin):
             return
 
         # Might be a subnet within a subnet or IP within a subnet
-        for addr in self.results:
-            if IPNetwork(eventData) in IPNetwork(addr):
-                self.debug(f"Skipping {eventData} as already within a scanned range.")
-                return
+        if self.scannedRanges.contains(eventData):
+            self.debug(f"Skipping {eventData} as already within a scanned range.")
+            return
 
         self.results[eventData] = True
+        try:
+            self.scannedRanges.add(eventData)
+        except ValueError:
+            self.debug(f"{eventData} is not an IP address or netblock")
 
         # If we weren't passed a netblock, this will be empty
         if not targets:
@@ -18,7 +18,7 @@ import tempfile
 from netaddr import IPNetwork
 from subprocess import PIPE, Popen, TimeoutExpired
 
-from spiderfoot import SpiderFootPlugin, SpiderFootEvent, SpiderFootHelpers
+from spiderfoot import SpiderFootPlugin, SpiderFootEvent, SpiderFootHelpers, SpiderFootIpRangeIndex
 
 
 class sfp_tool_testsslsh(SpiderFootPlugin):
@@ -60,6 +60,7 @@ class sfp_tool_testsslsh(SpiderFootPlugin):
     def setup(self, sfc, userOpts=dict()):
         self.sf = sfc
         self.results = dict()
+        self.scannedRanges = SpiderFootIpRangeIndex()
         self.errorState = False
         self.__dataSource__ = "Target Website"
 
@@ -134,16 +135,10 @@ class sfp_tool_testsslsh(SpiderFootPlugin):
             self.debug(f"Skipping {eventData} as already scanned.")
             return
 
-        if eventName != "INTERNET_NAME":
-            # Might be a subnet within a subnet or IP within a subnet
-            for addr in self.results:
-                try:
-                    if IPNetwork(eventData) in IPNetwork(addr):
-                        self.debug(f"Skipping {eventData} as already within a scanned range.")
-                        return
-                except BaseException:
-                    # self.results will also contain hostnames
-                    continue
+        # Might be a subnet within a subnet or IP within a subnet
+        if self.scannedRanges.contains(eventData):
+            self.debug(f"Skipping {eventData} as already within a scanned range.")
+            return
 
         # If we weren't passed a netblock, this will be empty
         if not targets:
@@ -151,6 +146,11 @@ class sfp_tool_testsslsh(SpiderFootPlugin):
 
         for target in targets:
             self.results[target] = True
+            if eventName != "INTERNET_NAME":
+                try:
+                    self.scannedRanges.add(target)
+                except ValueError:
+                    self.debug(f"{target} is not an IP address or netblock")
 
             # Create a temporary output file
             _, fname = tempfile.mkstemp("testssl.json")
@@ -11,7 +11,7 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
-from netaddr import IPAddress, IPNetwork
+from netaddr import IPNetwork
 
 from spiderfoot import SpiderFootEvent, SpiderFootPlugin
 
@@ -84,30 +84,23 @@ class sfp_voipbl(SpiderFootPlugin):
         ]
 
     def queryBlacklist(self, target, targetType):
-        blacklist = self.retrieveBlacklist()
+        blacklist = self.sf.feedIndex('voipbl', 24, self.retrieveBlacklist)
 
         if not blacklist:
             return False
 
         if targetType == "ip":
-            if target in blacklist:
+            if blacklist.containsIp(target):
                 self.debug(f"IP address {target} found in VoIP Blacklist (VoIPBL).")
                 return True
         elif targetType == "netblock":
-            netblock = IPNetwork(target)
-            for ip in blacklist:
-                if IPAddress(ip) in netblock:
-                    self.debug(f"IP address {ip} found within netblock/subnet {target} in VoIP Blacklist (VoIPBL).")
-                    return True
+            if blacklist.intersects(target):
+                self.debug(f"Netblock/subnet {target} overlaps a netblock in VoIP Blacklist (VoIPBL).")
+                return True
 
         return False
 
     def retrieveBlacklist(self):
-        blacklist = self.sf.cacheGet('voipbl', 24)
-
-        if blacklist is not None:
-            return self.parseBlacklist(blacklist)
-
         res = self.sf.fetchUrl(
             "https://voipbl.org/update",
             timeout=self.opts['_fetchtimeout'],
@@ -124,8 +117,6 @@ class sfp_voipbl(SpiderFootPlugin):
             self.errorState = True
             return None
 
-        self.sf.cachePut("voipbl", res['content'])
-
         return self.parseBlacklist(res['content'])
 
     def parseBlacklist(self, blacklist):
@@ -135,12 +126,12 @@ class sfp_voipbl(SpiderFootPlugin):
             blacklist (str): plaintext blacklist from VoIP Blacklist (VoIPBL)
 
         Returns:
-            list: list of blacklisted IP addresses
+            list: list of blacklisted netblocks
         """
-        ips = list()
+        netblocks = list()
 
         if not blacklist:
-            return ips
+            return netblocks
 
         for cidr in blacklist.split('\n'):
             cidr = cidr.strip()
@@ -150,12 +141,11 @@ class sfp_voipbl(SpiderFootPlugin):
                 continue
 
             try:
-                for ip in IPNetwork(cidr):
-                    ips.append(str(ip))
+                netblocks.append(str(IPNetwork(cidr)))
             except Exception:
                 continue
 
-        return ips
+        return netblocks
 
     def handleEvent(self, event):
         eventName = event.eventType
@@ -54,15 +54,28 @@ def main() -> None:
     sfConfig = {
         '_debug': False,  # Debug
         '_maxthreads': 3,  # Number of modules to run concurrently
+        '_correlationworkers': 0,  # Number of processes to run correlation rules in, 0 for one per CPU
+        '_correlationinterval': 300,  # Number of seconds between updates of correlations while a scan runs, 0 to disable
+        '_maxfinishpasses': 3,  # Maximum number of times modules are asked to finish their work at the end of a scan
         '__logging': True,  # Logging in general
         '__outputfilter': None,  # Event types to filter from modules' output
         '_useragent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:62.0) Gecko/20100101 Firefox/62.0',  # User-Agent to use for HTTP requests
         '_dnsserver': '',  # Override the default resolver
+        '_dnscachettl': 300,  # number of seconds to cache DNS resolutions for
+        '_dnscachenegttl': 60,  # number of seconds to cache failed DNS resolutions for
+        '_dnscachesize': 10000,  # maximum number of DNS resolutions to cache
+        '_dnstimeout': 2,  # number of seconds before giving up on a DNS query in bulk lookups
+        '_dnsratelimit': 0,  # maximum DNS queries per second to each nameserver in bulk lookups
         '_fetchtimeout': 5,  # number of seconds before giving up on a fetch
+        '_httpcache': False,  # cache HTTP responses in memory and on disk
+        '_httpcachettl': 3600,  # number of seconds a cached HTTP response is fresh for
+        '_httpcachesize': 100,  # maximum size of the on-disk HTTP cache, in MB
         '_internettlds': 'https://publicsuffix.org/list/effective_tld_names.dat',
         '_internettlds_cache': 72,
+        '_cachesize': 512,  # maximum size of the cache of downloaded data, in MB
         '_genericusers': ",".join(SpiderFootHelpers.usernamesFromWordlists(['generic-usernames'])),
         '__database': f"{SpiderFootHelpers.dataPath()}/spiderfoot.db",
+        '__dbprofile': 'default',  # SQLite tuning profile (default, durable or legacy)
         '__modules__': None,  # List of modules. Will be set after start-up.
         '__correlationrules__': None,  # List of correlation rules. Will be set after start-up.
         '_socks1type': '',
@@ -75,11 +88,23 @@ def main() -> None:
     sfOptdescs = {
         '_debug': "Enable debugging?",
         '_maxthreads': "Max number of modules to run concurrently",
+        '_correlationworkers': "Number of processes to run correlation rules in when correlating a scan with -C. Set to 0 for one per CPU, or 1 to run them one at a time. Correlations at the end of a scan always run in the scan's own process.",
+        '_correlationinterval': "Number of seconds between updates of correlation results while a scan is running. Updates of large scans happen less often, so they take up at most a tenth of the scan's time. Set to 0 to only run correlations once the scan has finished.",
+        '_maxfinishpasses': "Maximum number of times modules are asked to finish any remaining work at the end of a scan. Modules are asked again while finishing produces new results.",
         '_useragent': "User-Agent string to use for HTTP requests. Prefix with an '@' to randomly select the User Agent from a file containing user agent strings for each request, e.g. @C:\\useragents.txt or @/home/bob/useragents.txt. Or supply a URL to load the list from there.",
         '_dnsserver': "Override the default resolver with another DNS server. For example, 8.8.8.8 is Google's open DNS server.",
+        '_dnscachettl': "Number of seconds to cache DNS resolutions for during a scan. Set to 0 to disable the cache.",
+        '_dnscachenegttl': "Number of seconds to cache failed DNS resolutions for during a scan.",
+        '_dnscachesize': "Maximum number of DNS resolutions to cache during a scan. Set to 0 to disable DNS caching.",
+        '_dnstimeout': "Number of seconds before giving up on a DNS query when resolving many hostnames at once.",
+        '_dnsratelimit': "Maximum number of DNS queries per second to send to each nameserver when resolving many hostnames at once. Set to 0 for no limit.",
         '_fetchtimeout': "Number of seconds before giving up on a HTTP request.",
+        '_httpcache': "Cache HTTP responses, so that URLs fetched more than once, within a scan or across scans, are served locally?",
+        '_httpcachettl': "Number of seconds a cached HTTP response can be used for before checking whether it has changed.",
+        '_httpcachesize': "Maximum size of the on-disk HTTP response cache, in MB.",
         '_internettlds': "List of Internet TLDs.",
         '_internettlds_cache': "Hours to cache the Internet TLD list. This can safely be quite a long time given that the list doesn't change too often.",
+        '_cachesize': "Maximum size of the cache of downloaded data (such as blocklists) shared by all scans, in MB.",
         '_genericusers': "List of usernames that if found as usernames or as part of e-mail addresses, should be treated differently to non-generics.",
         '_socks1type': "SOCKS Server Type. Can be '4', '5', 'HTTP' or 'TOR'",
         '_socks2addr': 'SOCKS Server IP Address.',
@@ -189,7 +214,7 @@ def main() -> None:
 
         try:
             log.info(f"Running {len(correlationRulesRaw)} correlation rules against scan, {args.correlate}.")
-            corr = SpiderFootCorrelator(dbh, correlationRulesRaw, args.correlate)
+            corr = SpiderFootCorrelator(dbh, correlationRulesRaw, args.correlate, sfConfig['_correlationworkers'])
             corr.run_correlations()
         except Exception as e:
             log.critical(f"Unable to run correlation rules: {e}", exc_info=True)
@@ -12,7 +12,6 @@
 
 import hashlib
 import inspect
-import io
 import json
 import logging
 import os
@@ -35,7 +34,7 @@ import OpenSSL
 import requests
 import urllib3
 from publicsuffixlist import PublicSuffixList
-from spiderfoot import SpiderFootHelpers
+from spiderfoot import SpiderFootCacheStore, SpiderFootFeedIndex, SpiderFootHelpers, SpiderFootHttpCache, SpiderFootMemoryCache, SpiderFootResolver, SpiderFootSessionPool
 
 # For hiding the SSL warnings coming from the requests lib
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)  # noqa: DUO131
@@ -49,6 +48,7 @@ class SpiderFoot:
         scanId (str): scan ID this instance of SpiderFoot is being used in
         socksProxy (str): SOCKS proxy
         opts (dict): configuration options
+        dnsCache (SpiderFootMemoryCache): DNS resolutions, shared by all modules in a scan (None if disabled)
     """
     _dbh = None
     _scanId = None
@@ -69,6 +69,19 @@ class SpiderFoot:
 
         self.opts = deepcopy(options)
         self.log = logging.getLogger(f"spiderfoot.{__name__}")
+        self.dnsCache = None
+        dnsCacheSize = int(self.opts.get('_dnscachesize', 10000))
+        if dnsCacheSize > 0:
+            self.dnsCache = SpiderFootMemoryCache(dnsCacheSize)
+        self.sessionPool = SpiderFootSessionPool()
+        self._cacheStore = None
+        self.httpCache = None
+        if self.opts.get('_httpcache', False):
+            self.httpCache = SpiderFootHttpCache(
+                f"{SpiderFootHelpers.cachePath()}/http",
+                ttl=int(self.opts.get('_httpcachettl', 3600)),
+                maxDiskSize=int(self.opts.get('_httpcachesize', 100)) * 1024 * 1024
+            )
 
         # This is ugly but we don't want any fetches to fail - we expect
         # to encounter unverified SSL certs!
@@ -213,6 +226,17 @@ class SpiderFoot:
 
         self.log.info(message, extra={'scanId': self._scanId})
 
+    def warning(self, message: str) -> None:
+        """Log and print a warning message.
+
+        Args:
+            message (str): warning message
+        """
+        if not self.opts['__logging']:
+            return
+
+        self.log.warning(message, extra={'scanId': self._scanId})
+
     def info(self, message: str) -> None:
         """Log and print an info message.
 
@@ -251,6 +275,20 @@ class SpiderFoot:
             s = str(string)
         return hashlib.sha256(s.encode('raw_unicode_escape')).hexdigest()
 
+    @property
+    def cacheStore(self) -> SpiderFootCacheStore:
+        """Cache of downloaded data, shared by all scans.
+
+        Returns:
+            SpiderFootCacheStore: cache store
+        """
+        if self._cacheStore is None:
+            self._cacheStore = SpiderFootCacheStore(
+                f"{SpiderFootHelpers.cachePath()}/cache.db",
+                maxSize=int(self.opts.get('_cachesize', 512)) * 1024 * 1024
+            )
+        return self._cacheStore
+
     def cachePut(self, label: str, data: str) -> None:
         """Store data to the cache.
 
@@ -258,20 +296,21 @@ class SpiderFoot:
             label (str): Name of the cached data to be used when retrieving the cached data.
             data (str): Data to cache
         """
-        pathLabel = hashlib.sha224(label.encode('utf-8')).hexdigest()
-        cacheFile = SpiderFootHelpers.cachePath() + "/" + pathLabel
-        with io.open(cacheFile, "w", encoding="utf-8", errors="ignore") as fp:
-            if isinstance(data, list):
-                for line in data:
-                    if isinstance(line, str):
-                        fp.write(line)
-                        fp.write("\n")
-                    else:
-                        fp.write(line.decode('utf-8') + '\n')
-            elif isinstance(data, bytes):
-                fp.write(data.decode('utf-8'))
-            else:
-                fp.write(data)
+        if isinstance(data, list):
+            lines = list()
+            for line in data:
+                if isinstance(line, str):
+                    lines.append(line + "\n")
+                else:
+                    lines.append(line.decode('utf-8') + "\n")
+            data = "".join(lines)
+        elif isinstance(data, bytes):
+            data = data.decode('utf-8', errors='ignore')
+
+        try:
+            self.cacheStore.put(label, data)
+        except IOError as e:
+            self.error(f"Unable to cache {label}: {e}")
 
     def cacheGet(self, label: str, timeoutHrs: int) -> str:
         """Retreive data from the cache.
@@ -287,21 +326,58 @@ class SpiderFoot:
         if not label:
             return None
 
-        pathLabel = hashlib.sha224(label.encode('utf-8')).hexdigest()
-        cacheFile = SpiderFootHelpers.cachePath() + "/" + pathLabel
+        data = self.cacheStore.get(label, timeoutHrs * 3600)
+        if data is not None:
+            return data
+
+        # Move data cached by earlier versions, one file per label, into the cache store
+        legacyFile = f"{SpiderFootHelpers.cachePath()}/{hashlib.sha224(label.encode('utf-8')).hexdigest()}"
         try:
-            cache_stat = os.stat(cacheFile)
+            legacyStat = os.stat(legacyFile)
         except OSError:
             return None
 
-        if cache_stat.st_size == 0:
+        try:
+            if legacyStat.st_size and (timeoutHrs == 0 or legacyStat.st_mtime > time.time() - timeoutHrs * 3600):
+                with open(legacyFile, "r", encoding='utf-8') as fp:
+                    data = fp.read()
+                self.cachePut(label, data)
+            os.unlink(legacyFile)
+        except (OSError, UnicodeDecodeError) as e:
+            self.debug(f"Unable to read legacy cache file {legacyFile}: {e}")
             return None
 
-        if cache_stat.st_mtime > time.time() - timeoutHrs * 3600 or timeoutHrs == 0:
-            with open(cacheFile, "r", encoding='utf-8') as fp:
-                return fp.read()
+        return data
 
-        return None
+    def feedIndex(self, label: str, timeoutHrs: int, loader) -> SpiderFootFeedIndex:
+        """Retrieve the pre-parsed index of a threat feed or block list.
+
+        The index is shared by all scans. If it is missing or too old,
+        loader is called to fetch and parse the feed, and the index is rebuilt.
+
+        Args:
+            label (str): Name of the feed
+            timeoutHrs (int): Age of the index (in hours) for which it is considered to be too old and rebuilt (0 = never).
+            loader (callable): Returns the IP addresses and host names in the feed, or None if the feed could not be retrieved.
+
+        Returns:
+            SpiderFootFeedIndex: feed index, or None if the feed could not be retrieved
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if not isinstance(label, str):
+            raise TypeError(f"label is {type(label)}; expected str()")
+
+        if not re.match(r"^[a-zA-Z0-9_.-]+$", label):
+            raise ValueError(f"label is {label}; expected letters, digits, '_', '.' or '-'")
+
+        return SpiderFootFeedIndex.shared(
+            f"{SpiderFootHelpers.cachePath()}/feeds/{label}.idx",
+            timeoutHrs * 3600,
+            loader
+        )
 
     def configSerialize(self, opts: dict, filterSystem: bool = True):
         """Convert a Python dictionary to something storable in the database.
@@ -824,6 +900,44 @@ class SpiderFoot:
                     ret.append(host)
         return ret
 
+    def dnsCacheGet(self, recordType: str, name: str) -> list:
+        """Look up a previous DNS resolution.
+
+        Args:
+            recordType (str): type of lookup (A, AAAA or PTR)
+            name (str): hostname or IP address which was resolved
+
+        Returns:
+            list: cached resolution (empty if the name didn't resolve), or None if not cached
+        """
+        if self.dnsCache is None or not self.opts.get('_dnscachettl', 300):
+            return None
+
+        addrs = self.dnsCache.get((recordType, name.lower()))
+        if addrs is None:
+            return None
+
+        return list(addrs)
+
+    def dnsCachePut(self, recordType: str, name: str, addrs: list) -> None:
+        """Remember a DNS resolution, or the failure to resolve.
+
+        Args:
+            recordType (str): type of lookup (A, AAAA or PTR)
+            name (str): hostname or IP address which was resolved
+            addrs (list): resolution (empty if the name didn't resolve)
+        """
+        ttl = self.opts.get('_dnscachettl', 300)
+        if self.dnsCache is None or not ttl:
+            return
+
+        if not addrs:
+            ttl = min(ttl, self.opts.get('_dnscachenegttl', 60))
+            if not ttl:
+                return
+
+        self.dnsCache.put((recordType, name.lower()), tuple(addrs), ttl)
+
     def resolveHost(self, host: str) -> list:
         """Return a normalised IPv4 resolution of a hostname.
 
@@ -837,20 +951,28 @@ class SpiderFoot:
             self.error(f"Unable to resolve host: {host} (Invalid host)")
             return list()
 
+        addrs = self.dnsCacheGet('A', host)
+        if addrs is not None:
+            return addrs
+
         addrs = list()
         try:
             addrs = self.normalizeDNS(socket.gethostbyname_ex(host))
         except BaseException as e:
             self.debug(f"Unable to resolve host: {host} ({e})")
+            self.dnsCachePut('A', host, addrs)
             return addrs
 
         if not addrs:
             self.debug(f"Unable to resolve host: {host}")
+            self.dnsCachePut('A', host, addrs)
             return addrs
 
         self.debug(f"Resolved {host} to IPv4: {addrs}")
 
-        return list(set(addrs))
+        addrs = list(set(addrs))
+        self.dnsCachePut('A', host, addrs)
+        return addrs
 
     def resolveIP(self, ipaddr: str) -> list:
         """Return a normalised resolution of an IPv4 or IPv6 address.
@@ -866,21 +988,29 @@ class SpiderFoot:
             self.error(f"Unable to reverse resolve {ipaddr} (Invalid IP address)")
             return list()
 
+        addrs = self.dnsCacheGet('PTR', ipaddr)
+        if addrs is not None:
+            return addrs
+
         self.debug(f"Performing reverse resolve of {ipaddr}")
 
         try:
             addrs = self.normalizeDNS(socket.gethostbyaddr(ipaddr))
         except BaseException as e:
             self.debug(f"Unable to reverse resolve IP address: {ipaddr} ({e})")
+            self.dnsCachePut('PTR', ipaddr, list())
             return list()
 
         if not addrs:
             self.debug(f"Unable to reverse resolve IP address: {ipaddr}")
+            self.dnsCachePut('PTR', ipaddr, list())
             return list()
 
         self.debug(f"Reverse resolved {ipaddr} to: {addrs}")
 
-        return list(set(addrs))
+        addrs = list(set(addrs))
+        self.dnsCachePut('PTR', ipaddr, addrs)
+        return addrs
 
     def resolveHost6(self, hostname: str) -> list:
         """Return a normalised IPv6 resolution of a hostname.
@@ -895,6 +1025,10 @@ class SpiderFoot:
             self.error(f"Unable to resolve host: {hostname} (Invalid host)")
             return list()
 
+        addrs = self.dnsCacheGet('AAAA', hostname)
+        if addrs is not None:
+            return addrs
+
         addrs = list()
         try:
             res = socket.getaddrinfo(hostname, None, socket.AF_INET6)
@@ -903,15 +1037,82 @@ class SpiderFoot:
                     addrs.append(addr[4][0])
         except BaseException as e:
             self.debug(f"Unable to resolve host: {hostname} ({e})")
+            self.dnsCachePut('AAAA', hostname, addrs)
             return addrs
 
         if not addrs:
             self.debug(f"Unable to resolve host: {hostname}")
+            self.dnsCachePut('AAAA', hostname, addrs)
             return addrs
 
         self.debug(f"Resolved {hostname} to IPv6: {addrs}")
 
-        return list(set(addrs))
+        addrs = list(set(addrs))
+        self.dnsCachePut('AAAA', hostname, addrs)
+        return addrs
+
+    def resolveHostsBulk(self, hosts: list, window: int = 100):
+        """Resolve many hostnames concurrently, yielding each result as soon as it is available.
+
+        Hostnames are resolved to IPv4 addresses, or to IPv6 addresses
+        if they have no IPv4 addresses. Results are not yielded in the
+        order hostnames were supplied.
+
+        Args:
+            hosts (list): hostnames to resolve
+            window (int): maximum number of lookups in flight at once
+
+        Yields:
+            tuple: (hostname, list of IP addresses), the list being empty if the hostname didn't resolve
+
+        Raises:
+            TypeError: arg type was invalid
+        """
+        if not isinstance(hosts, list):
+            raise TypeError(f"hosts is {type(hosts)}; expected list()")
+
+        uncached = list()
+        for host in hosts:
+            if not host:
+                continue
+
+            addrs = self.dnsCacheGet('A', host)
+            if not addrs and addrs is not None:
+                addrs = self.dnsCacheGet('AAAA', host)
+
+            if addrs is None:
+                uncached.append(host)
+            else:
+                yield host, addrs
+
+        if not uncached:
+            return
+
+        nameservers = None
+        if self.opts.get('_dnsserver', "") != "":
+            nameservers = [self.opts['_dnsserver']]
+
+        try:
+            resolver = SpiderFootResolver(
+                nameservers,
+                window=int(window),
+                rate=float(self.opts.get('_dnsratelimit', 0)),
+                timeout=float(self.opts.get('_dnstimeout', 2))
+            )
+        except ValueError as e:
+            self.error(f"Unable to resolve hosts in bulk ({e}), falling back to resolving one at a time")
+            for host in uncached:
+                yield host, self.resolveHost(host) or self.resolveHost6(host)
+            return
+
+        for host, ipv4, ipv6 in resolver.resolve(uncached):
+            if ipv4 is not None:
+                self.dnsCachePut('A', host, ipv4)
+            if ipv6 is not None:
+                self.dnsCachePut('AAAA', host, ipv6)
+            yield host, (ipv4 or list()) + (ipv6 or list())
+
+        self.debug(f"Resolved {len(uncached)} hosts with {resolver.queries} queries ({resolver.timeouts} timeouts)")
 
     def validateIP(self, host: str, ip: str) -> bool:
         """Verify a host resolves to a given IP.
@@ -1081,18 +1282,14 @@ class SpiderFoot:
         return ret
 
     def getSession(self) -> 'requests.sessions.Session':
-        """Return requests session object.
+        """Return the calling thread's persistent requests session object.
+
+        Connections made with the session are kept alive and reused.
 
         Returns:
             requests.sessions.Session: requests session
         """
-        session = requests.session()
-        if self.socksProxy:
-            session.proxies = {
-                'http': self.socksProxy,
-                'https': self.socksProxy,
-            }
-        return session
+        return self.sessionPool.session(self.socksProxy)
 
     def removeUrlCreds(self, url: str) -> str:
         """Remove potentially sensitive strings (such as "key=..." and "password=...") from a string.
@@ -1265,6 +1462,17 @@ class SpiderFoot:
             for k in list(headers.keys()):
                 header[k] = str(headers[k])
 
+        cacheKey = None
+        cacheEntry = None
+        if self.httpCache is not None and not postData and not headOnly:
+            cacheKey = self.httpCache.key(url, header, cookies, sizeLimit=sizeLimit, disableContentEncoding=disableContentEncoding)
+            cacheEntry = self.httpCache.get(cacheKey)
+            if cacheEntry is not None:
+                if self.httpCache.isFresh(cacheEntry):
+                    self.debug(f"Fetched {self.removeUrlCreds(url)} from the HTTP cache")
+                    return dict(cacheEntry['result'])
+                header.update(self.httpCache.conditionalHeaders(cacheEntry))
+
         request_log.append(f"proxy={self.socksProxy}")
         request_log.append(f"user-agent={header['User-Agent']}")
         request_log.append(f"timeout={timeout}")
@@ -1377,6 +1585,10 @@ class SpiderFoot:
 
             return result
 
+        if cacheEntry is not None and res.status_code == 304:
+            self.debug(f"Fetched {self.removeUrlCreds(url)} from the HTTP cache (not modified)")
+            return self.httpCache.revalidated(cacheKey, cacheEntry)
+
         try:
             result['headers'] = dict()
             result['realurl'] = res.url
@@ -1431,6 +1643,9 @@ class SpiderFoot:
             result['content'] = None
             result['status'] = str(e)
 
+        if cacheKey is not None and result['status'] is None:
+            self.httpCache.put(cacheKey, result)
+
         atime = time.time()
         t = str(atime - btime)
         self.info(f"Fetched {self.removeUrlCreds(url)} ({len(result['content'] or '')} bytes in {t}s)")
@@ -10,9 +10,9 @@
 # License:      MIT
 # -----------------------------------------------------------------
 import socket
+import threading
 import time
 import queue
-from time import sleep
 from copy import deepcopy
 from contextlib import suppress
 from collections import OrderedDict
@@ -20,7 +20,7 @@ from collections import OrderedDict
 import dns.resolver
 
 from sflib import SpiderFoot
-from spiderfoot import SpiderFootDb, SpiderFootEvent, SpiderFootPlugin, SpiderFootTarget, SpiderFootHelpers, SpiderFootThreadPool, SpiderFootCorrelator, logger
+from spiderfoot import SpiderFootDb, SpiderFootEvent, SpiderFootEventCounter, SpiderFootPlugin, SpiderFootTarget, SpiderFootHelpers, SpiderFootThreadPool, SpiderFootCorrelator, logger
 
 
 def startSpiderFootScanner(loggingQueue, *args, **kwargs):
@@ -46,8 +46,13 @@ class SpiderFootScanner():
     __moduleList = list()
     __target = None
     __moduleInstances = dict()
+    __eventRouting = dict()
+    __wildcardSubscribers = list()
     __modconfig = dict()
     __scanName = None
+    __correlationThread = None
+    __correlationStop = None
+    __eventsInFlight = None
 
     def __init__(self, scanName: str, scanId: str, targetValue: str, targetType: str, moduleList: list, globalOpts: dict, start: bool = True) -> None:
         """Initialize SpiderFootScanner object.
@@ -214,6 +219,8 @@ class SpiderFootScanner():
 
         # Used when module threading is enabled
         self.eventQueue = None
+        # Events queued for, or being handled by, any module
+        self.__eventsInFlight = SpiderFootEventCounter()
 
         if start:
             self.__startScan()
@@ -351,6 +358,7 @@ class SpiderFootScanner():
                 try:
                     mod.outgoingEventQueue = self.eventQueue
                     mod.incomingEventQueue = queue.Queue()
+                    mod.setEventCounter(self.__eventsInFlight)
                 except Exception as e:
                     self.__sf.error(f"Module {modName} event queue setup failed: {e}")
                     continue
@@ -403,6 +411,7 @@ class SpiderFootScanner():
                 raise AssertionError("ABORT-REQUESTED")
 
             # start threads
+            self.startCorrelationUpdates()
             self.waitForThreads()
             failed = False
 
@@ -419,25 +428,116 @@ class SpiderFootScanner():
             self.__setStatus("ERROR-FAILED", None, time.time() * 1000)
 
         finally:
+            # make sure the pool's worker threads exit, even if the scan never got going
+            self.__sharedThreadPool.shutdown(wait=False)
+            self.stopCorrelationUpdates()
+            if self.__sf.dnsCache is not None:
+                dnsCacheStats = self.__sf.dnsCache.stats()
+                self.__sf.info(f"DNS cache: {dnsCacheStats['hits']:,} hits, {dnsCacheStats['misses']:,} misses, "
+                               f"{dnsCacheStats['evictions']:,} evictions, {dnsCacheStats['size']:,} entries")
+            httpStats = self.__sf.sessionPool.stats()
+            self.__sf.info(f"HTTP connections: {httpStats['requests']:,} requests, {httpStats['opened']:,} connections opened, "
+                           f"{httpStats['reused']:,} reused")
+            self.__sf.sessionPool.close()
+            if self.__sf.httpCache is not None:
+                httpCacheStats = self.__sf.httpCache.stats()
+                self.__sf.info(f"HTTP cache: {httpCacheStats['hits']:,} hits ({httpCacheStats['revalidations']:,} revalidated), "
+                               f"{httpCacheStats['misses']:,} misses, {httpCacheStats['evictions']:,} evictions")
             if not failed:
                 self.__setStatus("FINISHED", None, time.time() * 1000)
                 self.runCorrelations()
                 self.__sf.status(f"Scan [{self.__scanId}] completed.")
             self.__dbh.close()
 
-    def runCorrelations(self) -> None:
-        """Run correlation rules."""
+    def correlationRuleset(self) -> dict:
+        """Correlation rules to run on the scan.
 
-        self.__sf.status(f"Running {len(self.__config['__correlationrules__'])} correlation rules on scan {self.__scanId}.")
+        Returns:
+            dict: raw YAML of each correlation rule, by rule ID
+        """
         ruleset = dict()
-        for rule in self.__config['__correlationrules__']:
+        for rule in self.__config['__correlationrules__'] or list():
             ruleset[rule['id']] = rule['rawYaml']
-        corr = SpiderFootCorrelator(self.__dbh, ruleset, self.__scanId)
+        return ruleset
+
+    def runCorrelations(self) -> None:
+        """Run correlation rules.
+
+        This also reconciles any correlations stored while the scan was
+        running with the final results.
+        """
+
+        self.__sf.status(f"Running {len(self.__config['__correlationrules__'])} correlation rules on scan {self.__scanId}.")
+        # the scan runs in a daemonic process, which can't start worker processes
+        corr = SpiderFootCorrelator(self.__dbh, self.correlationRuleset(), self.__scanId, 1)
         corr.run_correlations()
 
+    def startCorrelationUpdates(self) -> None:
+        """Start updating correlations in the background while the scan runs,
+        every _correlationinterval seconds, so that results show up before
+        the scan has finished."""
+        interval = self.__config.get('_correlationinterval', 0)
+        if not interval or not self.__config.get('__correlationrules__'):
+            return
+
+        self.__correlationStop = threading.Event()
+        self.__correlationThread = threading.Thread(target=self.updateCorrelations, args=(interval,), name=f"correlations-{self.__scanId}", daemon=True)
+        self.__correlationThread.start()
+
+    def stopCorrelationUpdates(self) -> None:
+        """Stop updating correlations in the background, waiting for an update in progress to finish."""
+        if self.__correlationThread is None:
+            return
+
+        self.__correlationStop.set()
+        self.__correlationThread.join()
+        self.__correlationThread = None
+
+    def updateCorrelations(self, interval: int) -> None:
+        """Background thread: run the correlation rules on the results stored
+        so far, whenever there are new results and at most every interval
+        seconds.
+
+        The rules are compiled once, and an update is only started once
+        the previous one has taken less than a tenth of the time since,
+        so updates of a large scan don't take up much of the scan's time.
+
+        Args:
+            interval (int): minimum number of seconds between updates
+        """
+        dbh = SpiderFootDb(self.__config)
+        try:
+            corr = SpiderFootCorrelator(dbh, self.correlationRuleset(), self.__scanId)
+            correlatedCount = 0
+            wait = interval
+            while not self.__correlationStop.wait(wait):
+                wait = interval
+                eventCount = dbh.scanResultEventCount(self.__scanId)
+                if eventCount == correlatedCount:
+                    continue
+
+                started = time.monotonic()
+                corr.update_correlations()
+                correlatedCount = eventCount
+                wait = max(interval, 9 * (time.monotonic() - started))
+                self.__sf.debug(f"Updated correlations of {eventCount:,} results in {time.monotonic() - started:.1f}s.")
+        except Exception as e:
+            self.__sf.error(f"Unable to update correlations while the scan is running: {e}")
+        finally:
+            dbh.close()
+
     def waitForThreads(self) -> None:
         """Wait for threads.
 
+        Events produced by modules are dispatched as they arrive. Modules
+        count the events queued for them in a counter shared by the scan
+        until they have handled them, and wake this loop up once no module
+        has events in flight, so the scan is known to be finished once that
+        counter is zero and no events are waiting here. Modules are then
+        given the chance to flush any remaining work with finish(), again
+        after every round of finish() calls which produced new events, up
+        to the '_maxfinishpasses' option.
+
         Raises:
             TypeError: queue tried to process a malformed event
             AssertionError: scan halted for some reason
@@ -446,12 +546,16 @@ class SpiderFootScanner():
             return
 
         counter = 0
+        maxFinishPasses = int(self.__config.get('_maxfinishpasses', 3))
+        finishPasses = 0
 
         try:
+            self.buildEventRouting()
+
             # start one thread for each module
             for mod in self.__moduleInstances.values():
                 mod.start()
-            final_passes = 3
+            eventsSinceFinished = True
 
             # watch for newly-generated events
             while True:
@@ -460,59 +564,112 @@ class SpiderFootScanner():
                 log_status = counter % 10 == 0
                 counter += 1
 
+                try:
+                    # time out periodically so an abort request is noticed while modules are busy
+                    sfEvent = self.eventQueue.get(timeout=1)
+                except queue.Empty:
+                    sfEvent = None
+                    log_status = True
+
                 if log_status:
                     scanstatus = self.__dbh.scanInstanceGet(self.__scanId)
                     if scanstatus and scanstatus[5] == "ABORT-REQUESTED":
                         raise AssertionError("ABORT-REQUESTED")
+                    for mod in self.__moduleInstances.values():
+                        if mod._stopScanning:
+                            raise AssertionError(f"{mod.__name__} requested stop")
 
-                try:
-                    sfEvent = self.eventQueue.get_nowait()
+                if isinstance(sfEvent, SpiderFootEvent):
                     self.__sf.debug(f"waitForThreads() got event, {sfEvent.eventType}, from eventQueue.")
-                except queue.Empty:
-                    # check if we're finished
-                    if self.threadsFinished(log_status):
-                        sleep(.1)
-                        # but are we really?
-                        if self.threadsFinished(log_status):
-                            if final_passes < 1:
-                                break
-                            # Trigger module.finished()
-                            for mod in self.__moduleInstances.values():
-                                if not mod.errorState and mod.incomingEventQueue is not None:
-                                    mod.incomingEventQueue.put('FINISHED')
-                            sleep(.1)
-                            while not self.threadsFinished(log_status):
-                                log_status = counter % 100 == 0
-                                counter += 1
-                                sleep(.01)
-                            final_passes -= 1
-
-                    else:
-                        # save on CPU
-                        sleep(.1)
-                    continue
+                    # modules share the same (read-only) event, along with its source events
+                    sfEvent.freeze()
+                    eventsSinceFinished = True
+
+                    # for every module interested in this event type
+                    queued = False
+                    for mod in self.__eventRouting.get(sfEvent.eventType, self.__wildcardSubscribers):
+                        # if it's been aborted
+                        if mod._stopScanning:
+                            # break out of the while loop
+                            raise AssertionError(f"{mod.__name__} requested stop")
+
+                        # send it the new event if applicable
+                        # (modules in errorState no longer accept events)
+                        if not mod.errorState and mod.incomingEventQueue is not None:
+                            queued = mod.queueEvent(sfEvent) or queued
+
+                    # a module will wake us up once it has handled the event,
+                    # but if no module took it, nothing else may wake us up
+                    if queued:
+                        if log_status:
+                            self.threadsFinished(log_status)
+                        continue
 
-                if not isinstance(sfEvent, SpiderFootEvent):
+                elif sfEvent is not None and sfEvent != 'IDLE':
                     raise TypeError(f"sfEvent is {type(sfEvent)}; expected SpiderFootEvent")
 
-                # for every module
-                for mod in self.__moduleInstances.values():
-                    # if it's been aborted
-                    if mod._stopScanning:
-                        # break out of the while loop
-                        raise AssertionError(f"{mod.__name__} requested stop")
+                # woken up because no module has events in flight, or timed out
+                if not self.threadsFinished(log_status):
+                    continue
 
-                    # send it the new event if applicable
-                    if not mod.errorState and mod.incomingEventQueue is not None:
-                        watchedEvents = mod.watchedEvents()
-                        if sfEvent.eventType in watchedEvents or "*" in watchedEvents:
-                            mod.incomingEventQueue.put(deepcopy(sfEvent))
+                # Give modules a chance to flush any remaining work with
+                # module.finish(), until that no longer yields new events.
+                if not eventsSinceFinished:
+                    break
+                if finishPasses >= maxFinishPasses:
+                    self.__sf.warning(f"Modules still produced events after {finishPasses} rounds of finishing; ending the scan.")
+                    break
+                finishPasses += 1
+                eventsSinceFinished = False
+                finishing = [mod for mod in self.__moduleInstances.values() if mod.queueEvent('FINISHED')]
+                if not finishing:
+                    break
 
         finally:
             # tell the modules to stop
             for mod in self.__moduleInstances.values():
                 mod._stopScanning = True
+                # wake up module threads waiting for events
+                with suppress(Exception):
+                    mod.incomingEventQueue.put(None)
             self.__sharedThreadPool.shutdown(wait=True)
+            # let module threads exit cleanly, e.g. so that storage modules
+            # can write out buffered events before the scan is marked finished
+            for mod in self.__moduleInstances.values():
+                if mod.thread is not None:
+                    mod.thread.join()
+
+    def buildEventRouting(self) -> None:
+        """Build the event type -> subscribed modules index used to dispatch events.
+
+        Each list holds the modules watching that event type plus the modules
+        watching all events ("*"), in module priority order. Event types no
+        module explicitly watches are routed to the "*" subscribers only.
+        """
+        self.__eventRouting = dict()
+        self.__wildcardSubscribers = list()
+
+        watchedEvents = dict()
+        for modName, mod in self.__moduleInstances.items():
+            watchedEvents[modName] = set(mod.watchedEvents())
+
+        for eventType in set().union(*watchedEvents.values()):
+            self.__eventRouting[eventType] = list()
+
+        for modName, mod in self.__moduleInstances.items():
+            if "*" in watchedEvents[modName]:
+                self.__wildcardSubscribers.append(mod)
+                for subscribers in self.__eventRouting.values():
+                    subscribers.append(mod)
+                continue
+
+            for eventType in watchedEvents[modName]:
+                self.__eventRouting[eventType].append(mod)
+
+        self.__eventRouting.pop("*", None)
+
+        self.__sf.debug(f"Routing {len(self.__eventRouting):,} event types to {len(self.__moduleInstances):,} modules "
+                        f"({len(self.__wildcardSubscribers):,} watching all events).")
 
     def threadsFinished(self, log_status: bool = False) -> bool:
         """Check if all threads are complete.
@@ -526,61 +683,19 @@ class SpiderFootScanner():
         if self.eventQueue is None:
             return True
 
-        modules_waiting = dict()
-        for m in self.__moduleInstances.values():
-            try:
-                if m.incomingEventQueue is not None:
-                    modules_waiting[m.__name__] = m.incomingEventQueue.qsize()
-            except Exception:
-                with suppress(Exception):
-                    m.errorState = True
-        modules_waiting = sorted(modules_waiting.items(), key=lambda x: x[-1], reverse=True)
-
-        modules_running = []
-        for m in self.__moduleInstances.values():
-            try:
-                if m.running:
-                    modules_running.append(m.__name__)
-            except Exception:
-                with suppress(Exception):
-                    m.errorState = True
-
-        modules_errored = []
-        for m in self.__moduleInstances.values():
-            try:
-                if m.errorState:
-                    modules_errored.append(m.__name__)
-            except Exception:
-                with suppress(Exception):
-                    m.errorState = True
-
-        queues_empty = [qsize == 0 for m, qsize in modules_waiting]
-
-        for mod in self.__moduleInstances.values():
-            if mod.errorState and mod.incomingEventQueue is not None:
-                self.__sf.debug(f"Clearing and unsetting incomingEventQueue for errored module {mod.__name__}.")
-                with suppress(Exception):
-                    while 1:
-                        mod.incomingEventQueue.get_nowait()
-                mod.incomingEventQueue = None
-
-        if not modules_running and not queues_empty:
-            self.__sf.debug("Clearing queues for stalled/aborted modules.")
-            for mod in self.__moduleInstances.values():
-                with suppress(Exception):
-                    while True:
-                        mod.incomingEventQueue.get_nowait()
+        # Only this thread queues events for modules, so once no module has
+        # events in flight, anything they produced is already on eventQueue.
+        finished = self.__eventsInFlight.count == 0 and self.eventQueue.empty()
 
         if log_status:
-            events_queued = ", ".join([f"{mod}: {qsize:,}" for mod, qsize in modules_waiting[:5] if qsize > 0])
+            modules_waiting = [(m.__name__, m.eventsInFlight) for m in self.__moduleInstances.values() if m.eventsInFlight > 0]
+            modules_waiting = sorted(modules_waiting, key=lambda x: x[-1], reverse=True)
+            events_queued = ", ".join([f"{mod}: {count:,}" for mod, count in modules_waiting[:5]])
             if not events_queued:
                 events_queued = 'None'
-            self.__sf.debug(f"Events queued: {sum([m[-1] for m in modules_waiting]):,} ({events_queued})")
-            if modules_running:
-                self.__sf.debug(f"Modules running: {len(modules_running):,} ({', '.join(modules_running)})")
+            self.__sf.debug(f"Events in flight: {self.__eventsInFlight.count:,} ({events_queued})")
+            modules_errored = [m.__name__ for m in self.__moduleInstances.values() if m.errorState]
             if modules_errored:
                 self.__sf.debug(f"Modules errored: {len(modules_errored):,} ({', '.join(modules_errored)})")
 
-        if all(queues_empty) and not modules_running:
-            return True
-        return False
+        return finished
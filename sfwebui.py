@@ -9,16 +9,19 @@
 # Copyright:    (c) Steve Micallef 2012
 # License:      MIT
 # -----------------------------------------------------------------
+import base64
 import csv
 import html
+import itertools
 import json
 import logging
 import multiprocessing as mp
 import random
 import string
+import tempfile
 import time
 from copy import deepcopy
-from io import BytesIO, StringIO
+from io import StringIO
 from operator import itemgetter
 
 import cherrypy
@@ -36,7 +39,9 @@ from sflib import SpiderFoot
 from sfscan import startSpiderFootScanner
 
 from spiderfoot import SpiderFootDb
+from spiderfoot import SpiderFootGraphSummary
 from spiderfoot import SpiderFootHelpers
+from spiderfoot import SpiderFootMemoryCache
 from spiderfoot import __version__
 from spiderfoot.logger import logListenerSetup, logWorkerSetup
 
@@ -51,6 +56,16 @@ class SpiderFootWebUi:
     config = dict()
     token = None
     docroot = ''
+    # size (in characters) of the chunks streamed for CSV and JSON exports
+    exportChunkSize = 65536
+    # maximum number of results in a page of scan results
+    resultsPageSize = 1000
+    # number of scan entity graphs kept in memory for scangraph, and for how long (in seconds)
+    graphCacheSize = 4
+    graphCacheTtl = 3600
+    # default number of clusters, and of entities in each expanded cluster, in a view of a scan entity graph
+    graphClusterLimit = 100
+    graphExpandLimit = 500
 
     def __init__(self: 'SpiderFootWebUi', web_config: dict, config: dict, loggingQueue: 'logging.handlers.QueueListener' = None) -> None:
         """Initialize web server.
@@ -75,6 +90,7 @@ class SpiderFootWebUi:
             raise ValueError("web_config is empty")
 
         self.docroot = web_config.get('root', '/').rstrip('/')
+        self.graphCache = SpiderFootMemoryCache(self.graphCacheSize)
 
         # 'config' supplied will be the defaults, let's supplement them
         # now with any configuration which may have previously been saved.
@@ -234,10 +250,24 @@ class SpiderFootWebUi:
         Returns:
             list: search results
         """
-        retdata = []
+        try:
+            return list(self.searchRows(id, eventType, value))
+        except Exception:
+            return []
 
+    def searchRows(self: 'SpiderFootWebUi', id: str = None, eventType: str = None, value: str = None):
+        """Search, fetching results from the database as they are needed.
+
+        Args:
+            id (str): scan ID
+            eventType (str): TBD
+            value (str): TBD
+
+        Yields:
+            list: search result
+        """
         if not id and not eventType and not value:
-            return retdata
+            return
 
         if not value:
             value = ''
@@ -260,23 +290,78 @@ class SpiderFootWebUi:
             'regex': regex or '',
         }
 
-        try:
-            data = dbh.search(criteria)
-        except Exception:
-            return retdata
-
-        for row in data:
+        for row in dbh.searchIter(criteria):
             lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
             escapeddata = html.escape(row[1])
             escapedsrc = html.escape(row[2])
-            retdata.append([lastseen, escapeddata, escapedsrc,
-                            row[3], row[5], row[6], row[7], row[8], row[10],
-                            row[11], row[4], row[13], row[14]])
+            yield [lastseen, escapeddata, escapedsrc,
+                   row[3], row[5], row[6], row[7], row[8], row[10],
+                   row[11], row[4], row[13], row[14]]
 
-        return retdata
+    def streamCsv(self: 'SpiderFootWebUi', columnNames: list, rows, dialect: str = "excel"):
+        """Write rows in CSV format, a chunk at a time.
+
+        Args:
+            columnNames (list): column names
+            rows (iterable): rows to write
+            dialect (str): CSV dialect
+
+        Returns:
+            generator: CSV file content, as chunks of bytes
+
+        Raises:
+            csv.Error: invalid CSV dialect
+        """
+        fileobj = StringIO()
+        # create the writer now so an invalid dialect is reported before the response starts
+        parser = csv.writer(fileobj, dialect=dialect)
+        parser.writerow(columnNames)
+
+        def generate():
+            for row in rows:
+                parser.writerow(row)
+                if fileobj.tell() >= self.exportChunkSize:
+                    yield fileobj.getvalue().encode('utf-8')
+                    fileobj.seek(0)
+                    fileobj.truncate()
+            yield fileobj.getvalue().encode('utf-8')
+
+        return generate()
+
+    def streamJson(self: 'SpiderFootWebUi', items, ndjson: bool = False):
+        """Write items as a JSON array or as newline-delimited JSON, a chunk at a time.
+
+        Args:
+            items (iterable): JSON serializable items
+            ndjson (bool): write one JSON document per line instead of an array
+
+        Yields:
+            bytes: JSON file content
+        """
+        chunk = list()
+        size = 0
+        if not ndjson:
+            chunk.append("[")
+
+        for i, item in enumerate(items):
+            doc = json.dumps(item)
+            if ndjson:
+                doc += "\n"
+            elif i:
+                doc = ", " + doc
+            chunk.append(doc)
+            size += len(doc)
+            if size >= self.exportChunkSize:
+                yield "".join(chunk).encode('utf-8')
+                chunk = list()
+                size = 0
+
+        if not ndjson:
+            chunk.append("]")
+        yield "".join(chunk).encode('utf-8')
 
     def buildExcel(self: 'SpiderFootWebUi', data: list, columnNames: list, sheetNameIndex: int = 0) -> str:
-        """Convert supplied raw data into GEXF (Graph Exchange XML Format) format (e.g. for Gephi).
+        """Convert supplied raw data into an Excel workbook.
 
         Args:
             data (list): Scan result as list
@@ -286,43 +371,68 @@ class SpiderFootWebUi:
         Returns:
             str: Excel workbook
         """
-        rowNums = dict()
-        workbook = openpyxl.Workbook()
-        defaultSheet = workbook.active
-        columnNames.pop(sheetNameIndex)
+        with self.buildExcelFile(data, columnNames, sheetNameIndex) as f:
+            return f.read()
+
+    def buildExcelFile(self: 'SpiderFootWebUi', rows, columnNames: list, sheetNameIndex: int = 0):
+        """Write rows to an Excel workbook in a temporary file, with one sheet
+        for each value of the sheet name column.
+
+        The workbook is written in openpyxl's write-only mode, so rows are
+        written to disk as they are added rather than held in memory.
+
+        Args:
+            rows (iterable): rows to write
+            columnNames (list): column names
+            sheetNameIndex (int): index of the column to use as the sheet name
+
+        Returns:
+            file: temporary file containing the Excel workbook, positioned at the start
+        """
+        sheets = dict()
+        workbook = openpyxl.Workbook(write_only=True)
+        headers = [c for i, c in enumerate(columnNames) if i != sheetNameIndex]
         allowed_sheet_chars = string.ascii_uppercase + string.digits + '_'
-        for row in data:
+        for row in rows:
+            row = list(row)
             sheetName = "".join([c for c in str(row.pop(sheetNameIndex)) if c.upper() in allowed_sheet_chars])
-            try:
-                sheet = workbook[sheetName]
-            except KeyError:
-                # Create sheet
-                workbook.create_sheet(sheetName)
-                sheet = workbook[sheetName]
-                # Write headers
-                for col_num, column_title in enumerate(columnNames, 1):
-                    cell = sheet.cell(row=1, column=col_num)
-                    cell.value = column_title
-                rowNums[sheetName] = 2
-
-            # Write row
-            for col_num, cell_value in enumerate(row, 1):
-                cell = sheet.cell(row=rowNums[sheetName], column=col_num)
-                cell.value = cell_value
-
-            rowNums[sheetName] += 1
-
-        if rowNums:
-            workbook.remove(defaultSheet)
+            sheet = sheets.get(sheetName)
+            if sheet is None:
+                sheet = workbook.create_sheet(sheetName)
+                sheet.append(headers)
+                sheets[sheetName] = sheet
+            sheet.append(row)
+
+        if not sheets:
+            workbook.create_sheet()
 
         # Sort sheets alphabetically
         workbook._sheets.sort(key=lambda ws: ws.title)
 
-        # Save workbook
-        with BytesIO() as f:
+        f = tempfile.TemporaryFile()
+        try:
             workbook.save(f)
-            f.seek(0)
-            return f.read()
+        except Exception:
+            f.close()
+            raise
+        f.seek(0)
+        return f
+
+    def streamFile(self: 'SpiderFootWebUi', fileobj):
+        """Read a file a chunk at a time, closing it afterwards.
+
+        Args:
+            fileobj (file): file opened in binary mode
+
+        Yields:
+            bytes: file content
+        """
+        with fileobj:
+            while True:
+                chunk = fileobj.read(self.exportChunkSize)
+                if not chunk:
+                    break
+                yield chunk
 
     #
     # USER INTERFACE PAGES
@@ -367,6 +477,7 @@ class SpiderFootWebUi:
         return fileobj.getvalue().encode('utf-8')
 
     @cherrypy.expose
+    @cherrypy.config(**{'response.stream': True})
     def scancorrelationsexport(self: 'SpiderFootWebUi', id: str, filetype: str = "csv", dialect: str = "excel") -> str:
         """Get scan correlation data in CSV or Excel format.
 
@@ -402,6 +513,8 @@ class SpiderFootWebUi:
                 rule_description = row[5]
                 rows.append([rule_name, correlation, rule_risk, rule_description])
 
+            xlsx = self.buildExcelFile(rows, headings, sheetNameIndex=0)
+
             if scan_name:
                 fname = f"{scan_name}-SpiderFoot-correlations.xlxs"
             else:
@@ -410,7 +523,7 @@ class SpiderFootWebUi:
             cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
             cherrypy.response.headers['Content-Type'] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return self.buildExcel(rows, headings, sheetNameIndex=0)
+            return self.streamFile(xlsx)
 
         if filetype.lower() == 'csv':
             fileobj = StringIO()
@@ -437,9 +550,13 @@ class SpiderFootWebUi:
         return self.error("Invalid export filetype.")
 
     @cherrypy.expose
+    @cherrypy.config(**{'response.stream': True})
     def scaneventresultexport(self: 'SpiderFootWebUi', id: str, type: str, filetype: str = "csv", dialect: str = "excel") -> str:
         """Get scan event result data in CSV or Excel format
 
+        CSV files are streamed as the results are read from the database.
+        Excel workbooks are written to a temporary file and streamed from there.
+
         Args:
             id (str): scan ID
             type (str): TBD
@@ -450,47 +567,44 @@ class SpiderFootWebUi:
             str: results in CSV or Excel format
         """
         dbh = SpiderFootDb(self.config)
-        data = dbh.scanResultEvent(id, type)
 
-        if filetype.lower() in ["xlsx", "excel"]:
-            rows = []
-            for row in data:
+        def exportRows():
+            for row in dbh.scanResultEventIter(id, type):
                 if row[4] == "ROOT":
                     continue
                 lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
                 datafield = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                rows.append([lastseen, str(row[4]), str(row[3]), str(row[2]), row[13], datafield])
+                yield [lastseen, str(row[4]), str(row[3]), str(row[2]), row[13], datafield]
+
+        if filetype.lower() in ["xlsx", "excel"]:
+            xlsx = self.buildExcelFile(exportRows(), ["Updated", "Type", "Module", "Source",
+                                       "F/P", "Data"], sheetNameIndex=1)
 
             fname = "SpiderFoot.xlsx"
             cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
             cherrypy.response.headers['Content-Type'] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return self.buildExcel(rows, ["Updated", "Type", "Module", "Source",
-                                   "F/P", "Data"], sheetNameIndex=1)
+            return self.streamFile(xlsx)
 
         if filetype.lower() == 'csv':
-            fileobj = StringIO()
-            parser = csv.writer(fileobj, dialect=dialect)
-            parser.writerow(["Updated", "Type", "Module", "Source", "F/P", "Data"])
-            for row in data:
-                if row[4] == "ROOT":
-                    continue
-                lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
-                datafield = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                parser.writerow([lastseen, str(row[4]), str(row[3]), str(row[2]), row[13], datafield])
+            data = self.streamCsv(["Updated", "Type", "Module", "Source", "F/P", "Data"], exportRows(), dialect)
 
             fname = "SpiderFoot.csv"
             cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
             cherrypy.response.headers['Content-Type'] = "application/csv"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return fileobj.getvalue().encode('utf-8')
+            return data
 
         return self.error("Invalid export filetype.")
 
     @cherrypy.expose
+    @cherrypy.config(**{'response.stream': True})
     def scaneventresultexportmulti(self: 'SpiderFootWebUi', ids: str, filetype: str = "csv", dialect: str = "excel") -> str:
         """Get scan event result data in CSV or Excel format for multiple scans
 
+        CSV files are streamed as the results are read from the database.
+        Excel workbooks are written to a temporary file and streamed from there.
+
         Args:
             ids (str): comma separated list of scan IDs
             filetype (str): type of file ("xlsx|excel" or "csv")
@@ -501,7 +615,6 @@ class SpiderFootWebUi:
         """
         dbh = SpiderFootDb(self.config)
         scaninfo = dict()
-        data = list()
         scan_name = ""
 
         for id in ids.split(','):
@@ -509,20 +622,30 @@ class SpiderFootWebUi:
             if scaninfo[id] is None:
                 continue
             scan_name = scaninfo[id][0]
-            data = data + dbh.scanResultEvent(id)
 
-        if not data:
+        def scanRows():
+            for id in scaninfo:
+                if scaninfo[id] is None:
+                    continue
+                yield from dbh.scanResultEventIter(id)
+
+        data = scanRows()
+        first = next(data, None)
+        if first is None:
             return None
 
-        if filetype.lower() in ["xlsx", "excel"]:
-            rows = []
-            for row in data:
+        def exportRows():
+            for row in itertools.chain([first], data):
                 if row[4] == "ROOT":
                     continue
                 lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
                 datafield = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                rows.append([scaninfo[row[12]][0], lastseen, str(row[4]), str(row[3]),
-                            str(row[2]), row[13], datafield])
+                yield [scaninfo[row[12]][0], lastseen, str(row[4]), str(row[3]),
+                       str(row[2]), row[13], datafield]
+
+        if filetype.lower() in ["xlsx", "excel"]:
+            xlsx = self.buildExcelFile(exportRows(), ["Scan Name", "Updated", "Type", "Module",
+                                       "Source", "F/P", "Data"], sheetNameIndex=2)
 
             if len(ids.split(',')) > 1 or scan_name == "":
                 fname = "SpiderFoot.xlsx"
@@ -532,20 +655,10 @@ class SpiderFootWebUi:
             cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
             cherrypy.response.headers['Content-Type'] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return self.buildExcel(rows, ["Scan Name", "Updated", "Type", "Module",
-                                   "Source", "F/P", "Data"], sheetNameIndex=2)
+            return self.streamFile(xlsx)
 
         if filetype.lower() == 'csv':
-            fileobj = StringIO()
-            parser = csv.writer(fileobj, dialect=dialect)
-            parser.writerow(["Scan Name", "Updated", "Type", "Module", "Source", "F/P", "Data"])
-            for row in data:
-                if row[4] == "ROOT":
-                    continue
-                lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
-                datafield = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                parser.writerow([scaninfo[row[12]][0], lastseen, str(row[4]), str(row[3]),
-                                str(row[2]), row[13], datafield])
+            csvdata = self.streamCsv(["Scan Name", "Updated", "Type", "Module", "Source", "F/P", "Data"], exportRows(), dialect)
 
             if len(ids.split(',')) > 1 or scan_name == "":
                 fname = "SpiderFoot.csv"
@@ -555,14 +668,18 @@ class SpiderFootWebUi:
             cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
             cherrypy.response.headers['Content-Type'] = "application/csv"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return fileobj.getvalue().encode('utf-8')
+            return csvdata
 
         return self.error("Invalid export filetype.")
 
     @cherrypy.expose
+    @cherrypy.config(**{'response.stream': True})
     def scansearchresultexport(self: 'SpiderFootWebUi', id: str, eventType: str = None, value: str = None, filetype: str = "csv", dialect: str = "excel") -> str:
         """Get search result data in CSV or Excel format
 
+        CSV files are streamed as the results are read from the database.
+        Excel workbooks are written to a temporary file and streamed from there.
+
         Args:
             id (str): scan ID
             eventType (str): TBD
@@ -573,52 +690,61 @@ class SpiderFootWebUi:
         Returns:
             str: results in CSV or Excel format
         """
-        data = self.searchBase(id, eventType, value)
+        data = self.searchRows(id, eventType, value)
 
-        if not data:
+        try:
+            first = next(data, None)
+        except Exception:
             return None
 
-        if filetype.lower() in ["xlsx", "excel"]:
-            rows = []
-            for row in data:
+        if first is None:
+            return None
+
+        def exportRows():
+            for row in itertools.chain([first], data):
                 if row[10] == "ROOT":
                     continue
                 datafield = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                rows.append([row[0], str(row[10]), str(row[3]), str(row[2]), row[11], datafield])
+                yield [row[0], str(row[10]), str(row[3]), str(row[2]), row[11], datafield]
+
+        if filetype.lower() in ["xlsx", "excel"]:
+            xlsx = self.buildExcelFile(exportRows(), ["Updated", "Type", "Module", "Source",
+                                       "F/P", "Data"], sheetNameIndex=1)
+
             cherrypy.response.headers['Content-Disposition'] = "attachment; filename=SpiderFoot.xlsx"
             cherrypy.response.headers['Content-Type'] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return self.buildExcel(rows, ["Updated", "Type", "Module", "Source",
-                                   "F/P", "Data"], sheetNameIndex=1)
+            return self.streamFile(xlsx)
 
         if filetype.lower() == 'csv':
-            fileobj = StringIO()
-            parser = csv.writer(fileobj, dialect=dialect)
-            parser.writerow(["Updated", "Type", "Module", "Source", "F/P", "Data"])
-            for row in data:
-                if row[10] == "ROOT":
-                    continue
-                datafield = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                parser.writerow([row[0], str(row[10]), str(row[3]), str(row[2]), row[11], datafield])
+            csvdata = self.streamCsv(["Updated", "Type", "Module", "Source", "F/P", "Data"], exportRows(), dialect)
             cherrypy.response.headers['Content-Disposition'] = "attachment; filename=SpiderFoot.csv"
             cherrypy.response.headers['Content-Type'] = "application/csv"
             cherrypy.response.headers['Pragma'] = "no-cache"
-            return fileobj.getvalue().encode('utf-8')
+            return csvdata
 
         return self.error("Invalid export filetype.")
 
     @cherrypy.expose
-    def scanexportjsonmulti(self: 'SpiderFootWebUi', ids: str) -> str:
+    @cherrypy.config(**{'response.stream': True})
+    def scanexportjsonmulti(self: 'SpiderFootWebUi', ids: str, filetype: str = "json") -> str:
         """Get scan event result data in JSON format for multiple scans.
 
+        Results are streamed as they are read from the database, either as
+        a JSON array or as newline-delimited JSON (one event per line).
+
         Args:
             ids (str): comma separated list of scan IDs
+            filetype (str): type of file ("json" or "ndjson")
 
         Returns:
             str: results in JSON format
         """
+        if filetype.lower() not in ["json", "ndjson"]:
+            return self.error("Invalid export filetype.")
+
         dbh = SpiderFootDb(self.config)
-        scaninfo = list()
+        scans = list()
         scan_name = ""
 
         for id in ids.split(','):
@@ -628,40 +754,48 @@ class SpiderFootWebUi:
                 continue
 
             scan_name = scan[0]
+            scans.append((id, scan))
+
+        def exportItems():
+            for id, scan in scans:
+                for row in dbh.scanResultEventIter(id):
+                    lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
+                    event_data = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
+                    source_data = str(row[2])
+                    source_module = str(row[3])
+                    event_type = row[4]
+                    false_positive = row[13]
+
+                    if event_type == "ROOT":
+                        continue
 
-            for row in dbh.scanResultEvent(id):
-                lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
-                event_data = str(row[1]).replace("<SFURL>", "").replace("</SFURL>", "")
-                source_data = str(row[2])
-                source_module = str(row[3])
-                event_type = row[4]
-                false_positive = row[13]
-
-                if event_type == "ROOT":
-                    continue
-
-                scaninfo.append({
-                    "data": event_data,
-                    "event_type": event_type,
-                    "module": source_module,
-                    "source_data": source_data,
-                    "false_positive": false_positive,
-                    "last_seen": lastseen,
-                    "scan_name": scan_name,
-                    "scan_target": scan[1]
-                })
-
+                    yield {
+                        "data": event_data,
+                        "event_type": event_type,
+                        "module": source_module,
+                        "source_data": source_data,
+                        "false_positive": false_positive,
+                        "last_seen": lastseen,
+                        "scan_name": scan[0],
+                        "scan_target": scan[1]
+                    }
+
+        ext = filetype.lower()
         if len(ids.split(',')) > 1 or scan_name == "":
-            fname = "SpiderFoot.json"
+            fname = f"SpiderFoot.{ext}"
         else:
-            fname = scan_name + "-SpiderFoot.json"
+            fname = f"{scan_name}-SpiderFoot.{ext}"
 
         cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
-        cherrypy.response.headers['Content-Type'] = "application/json; charset=utf-8"
+        if ext == "ndjson":
+            cherrypy.response.headers['Content-Type'] = "application/x-ndjson; charset=utf-8"
+        else:
+            cherrypy.response.headers['Content-Type'] = "application/json; charset=utf-8"
         cherrypy.response.headers['Pragma'] = "no-cache"
-        return json.dumps(scaninfo).encode('utf-8')
+        return self.streamJson(exportItems(), ndjson=(ext == "ndjson"))
 
     @cherrypy.expose
+    @cherrypy.config(**{'response.stream': True})
     def scanviz(self: 'SpiderFootWebUi', id: str, gexf: str = "0") -> str:
         """Export entities from scan results for visualising.
 
@@ -676,18 +810,21 @@ class SpiderFootWebUi:
             return None
 
         dbh = SpiderFootDb(self.config)
-        data = dbh.scanResultEvent(id, filterFp=True)
         scan = dbh.scanInstanceGet(id)
 
         if not scan:
             return None
 
+        data = dbh.scanResultEventIter(id, filterFp=True)
+
         scan_name = scan[0]
 
         root = scan[1]
 
         if gexf == "0":
-            return SpiderFootHelpers.buildGraphJson([root], data)
+            return SpiderFootHelpers.streamGraphJson([root], data)
+
+        graph = SpiderFootHelpers.streamGraphGexf([root], "SpiderFoot Export", data)
 
         if not scan_name:
             fname = "SpiderFoot.gexf"
@@ -697,9 +834,10 @@ class SpiderFootWebUi:
         cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
         cherrypy.response.headers['Content-Type'] = "application/gexf"
         cherrypy.response.headers['Pragma'] = "no-cache"
-        return SpiderFootHelpers.buildGraphGexf([root], "SpiderFoot Export", data)
+        return graph
 
     @cherrypy.expose
+    @cherrypy.config(**{'response.stream': True})
     def scanvizmulti(self: 'SpiderFootWebUi', ids: str, gexf: str = "1") -> str:
         """Export entities results from multiple scans in GEXF format.
 
@@ -711,7 +849,7 @@ class SpiderFootWebUi:
             str: GEXF data
         """
         dbh = SpiderFootDb(self.config)
-        data = list()
+        scans = list()
         roots = list()
         scan_name = ""
 
@@ -722,17 +860,21 @@ class SpiderFootWebUi:
             scan = dbh.scanInstanceGet(id)
             if not scan:
                 continue
-            data = data + dbh.scanResultEvent(id, filterFp=True)
+            scans.append(id)
             roots.append(scan[1])
             scan_name = scan[0]
 
-        if not data:
+        data = itertools.chain.from_iterable(dbh.scanResultEventIter(id, filterFp=True) for id in scans)
+        first = next(data, None)
+        if first is None:
             return None
 
         if gexf == "0":
             # Not implemented yet
             return None
 
+        graph = SpiderFootHelpers.streamGraphGexf(roots, "SpiderFoot Export", itertools.chain([first], data))
+
         if len(ids.split(',')) > 1 or scan_name == "":
             fname = "SpiderFoot.gexf"
         else:
@@ -741,7 +883,99 @@ class SpiderFootWebUi:
         cherrypy.response.headers['Content-Disposition'] = f"attachment; filename={fname}"
         cherrypy.response.headers['Content-Type'] = "application/gexf"
         cherrypy.response.headers['Pragma'] = "no-cache"
-        return SpiderFootHelpers.buildGraphGexf(roots, "SpiderFoot Export", data)
+        return graph
+
+    def scanGraphSummary(self: 'SpiderFootWebUi', dbh: SpiderFootDb, id: str) -> SpiderFootGraphSummary:
+        """Entity graph of a scan, from the cache if the scan's results
+        haven't changed since it was built.
+
+        Args:
+            dbh (SpiderFootDb): database handle
+            id (str): scan ID
+
+        Returns:
+            SpiderFootGraphSummary: entity graph, or None if the scan doesn't exist
+
+        Raises:
+            ValueError: the scan has no results
+        """
+        scan = dbh.scanInstanceGet(id)
+        if not scan:
+            return None
+
+        # results are added while a scan is running, and removed when marked as false positives
+        signature = (scan[5], dbh.scanResultEventCount(id, filterFp=True))
+        cached = self.graphCache.get(id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        sf = SpiderFoot(self.config)
+        tldData = sf.cacheGet("internet_tlds", self.config.get('_internettlds_cache', 72))
+        summary = SpiderFootGraphSummary(
+            [scan[1]],
+            dbh.scanResultEventIter(id, filterFp=True),
+            tldData.splitlines() if tldData else None
+        )
+        self.graphCache.put(id, (signature, summary), self.graphCacheTtl)
+        return summary
+
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    def scangraph(self: 'SpiderFootWebUi', id: str, groupBy: str = "type", expand: str = None, limit: str = None, clusters: str = None) -> dict:
+        """Return the entity graph of a scan as JSON, with entities
+        collapsed into clusters by event type, module or domain, so that
+        only the part of the graph being looked at is fetched.
+
+        Cluster nodes have the number of entities in them as their size, and
+        the number of edges between those entities. Only the largest
+        clusters are returned, and the rest are returned as a single node.
+        Entity nodes are only returned for expanded clusters, those with
+        the most edges first. Edges have the number of edges between the
+        entities they represent as their weight.
+
+        Args:
+            id (str): scan ID
+            groupBy (str): group entities by "type", "module" or "domain"
+            expand (str): comma-separated names of clusters to expand
+            limit (str): maximum number of entities to show for each expanded cluster
+            clusters (str): maximum number of clusters to show, other than expanded clusters
+
+        Returns:
+            dict: nodes, edges, and the number of clusters, entities and edges in the whole graph
+        """
+        if not id:
+            return self.jsonify_error('404', "Scan not found.")
+
+        if expand is None:
+            expand = list()
+        elif isinstance(expand, str):
+            expand = expand.split(',')
+
+        try:
+            limit = int(limit) if limit else self.graphExpandLimit
+            clusters = int(clusters) if clusters else self.graphClusterLimit
+        except ValueError:
+            return self.jsonify_error('400', "Invalid limit.")
+
+        if limit < 1 or clusters < 1:
+            return self.jsonify_error('400', "Invalid limit.")
+
+        if groupBy not in SpiderFootGraphSummary.groupings:
+            return self.jsonify_error('400', "Invalid grouping.")
+
+        dbh = SpiderFootDb(self.config)
+
+        try:
+            summary = self.scanGraphSummary(dbh, id)
+        except ValueError:
+            return self.jsonify_error('404', "Scan has no results.")
+        except Exception:
+            return self.jsonify_error('500', "Could not build the scan graph.")
+
+        if summary is None:
+            return self.jsonify_error('404', "Scan not found.")
+
+        return summary.view(groupBy, expand, limit, clusters)
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
@@ -1744,17 +1978,41 @@ class SpiderFootWebUi:
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
-    def scaneventresults(self: 'SpiderFootWebUi', id: str, eventType: str = None, filterfp: bool = False, correlationId: str = None) -> list:
-        """Return all event results for a scan as JSON.
+    def scaneventresults(
+        self: 'SpiderFootWebUi',
+        id: str,
+        eventType: str = None,
+        filterfp: bool = False,
+        correlationId: str = None,
+        limit: str = None,
+        cursor: str = None,
+        sortBy: str = "generated",
+        sortOrder: str = "asc",
+        module: str = None,
+        risk: str = None
+    ):
+        """Return event results for a scan as JSON.
+
+        All results are returned unless a page size (limit) or a cursor is
+        specified, in which case a page of results is returned along with
+        the cursor for the next page.
 
         Args:
             id (str): scan ID
             eventType (str): filter by event type
             filterfp (bool): remove false positives from search results
-            correlationId (str): filter by events associated with a correlation
+            correlationId (str): filter by events associated with a correlation (not paginated)
+            limit (str): number of results per page
+            cursor (str): cursor for the page, from the previous page
+            sortBy (str): sort paginated results by generated, data, type, module or risk
+            sortOrder (str): sort paginated results in "asc" or "desc" order
+            module (str): filter paginated results by the generating module
+            risk (str): filter paginated results by minimum risk
 
         Returns:
-            list: scan results
+            list: scan results, or a dict with a page of results ("rows"),
+                  the cursor for the next page ("next") and, for the first page,
+                  the estimated number of results ("total")
         """
         retdata = []
 
@@ -1763,55 +2021,177 @@ class SpiderFootWebUi:
         if not eventType:
             eventType = 'ALL'
 
+        if correlationId or (limit is None and cursor is None):
+            try:
+                data = dbh.scanResultEvent(id, eventType, filterfp, correlationId=correlationId)
+            except Exception:
+                return retdata
+
+            return [self.formatResultRow(row) for row in data]
+
         try:
-            data = dbh.scanResultEvent(id, eventType, filterfp, correlationId=correlationId)
+            limit = min(int(limit or self.resultsPageSize), self.resultsPageSize)
+            minRisk = int(risk) if risk else None
+            after = self.decodeCursor(cursor) if cursor else None
+            filterFp = str(filterfp).lower() in ["1", "true"]
+        except ValueError:
+            return self.jsonify_error('400', "Invalid pagination parameters.")
+
+        if sortOrder not in ["asc", "desc"]:
+            return self.jsonify_error('400', "Invalid sort order.")
+
+        try:
+            data = dbh.scanResultEventPage(id, eventType, module or None, minRisk, filterFp,
+                                           sortBy, sortOrder == "desc", after, limit)
+            total = None
+            if after is None:
+                total = dbh.scanResultEventCount(id, eventType, module or None, minRisk, filterFp)
+        except ValueError as e:
+            return self.jsonify_error('400', str(e))
         except Exception:
-            return retdata
+            return self.jsonify_error('500', "Could not retrieve scan results.")
 
-        for row in data:
-            lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
-            retdata.append([
-                lastseen,
-                html.escape(row[1]),
-                html.escape(row[2]),
-                row[3],
-                row[5],
-                row[6],
-                row[7],
-                row[8],
-                row[13],
-                row[14],
-                row[4]
-            ])
+        page = {
+            'rows': [self.formatResultRow(row) for row in data],
+            'next': None
+        }
+        if len(data) == limit:
+            page['next'] = self.encodeCursor(data[-1][-1])
+        if total is not None:
+            page['total'] = total
 
-        return retdata
+        return page
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
-    def scaneventresultsunique(self: 'SpiderFootWebUi', id: str, eventType: str, filterfp: bool = False) -> list:
+    def scaneventresultsunique(
+        self: 'SpiderFootWebUi',
+        id: str,
+        eventType: str,
+        filterfp: bool = False,
+        limit: str = None,
+        cursor: str = None,
+        sortBy: str = "count",
+        sortOrder: str = "asc"
+    ):
         """Return unique event results for a scan as JSON.
 
+        All results are returned unless a page size (limit) or a cursor is
+        specified, in which case a page of results is returned along with
+        the cursor for the next page.
+
         Args:
             id (str): filter search results by scan ID
             eventType (str): filter search results by event type
             filterfp (bool): remove false positives from search results
+            limit (str): number of results per page
+            cursor (str): cursor for the page, from the previous page
+            sortBy (str): sort paginated results by count, data or type
+            sortOrder (str): sort paginated results in "asc" or "desc" order
 
         Returns:
-            list: unique search results
+            list: unique search results, or a dict with a page of results ("rows")
+                  and the cursor for the next page ("next")
         """
         dbh = SpiderFootDb(self.config)
         retdata = []
 
+        if limit is None and cursor is None:
+            try:
+                data = dbh.scanResultEventUnique(id, eventType, filterfp)
+            except Exception:
+                return retdata
+
+            for row in data:
+                escaped = html.escape(row[0])
+                retdata.append([escaped, row[1], row[2]])
+
+            return retdata
+
+        try:
+            limit = min(int(limit or self.resultsPageSize), self.resultsPageSize)
+            after = self.decodeCursor(cursor) if cursor else None
+            filterFp = str(filterfp).lower() in ["1", "true"]
+        except ValueError:
+            return self.jsonify_error('400', "Invalid pagination parameters.")
+
+        if sortOrder not in ["asc", "desc"]:
+            return self.jsonify_error('400', "Invalid sort order.")
+
         try:
-            data = dbh.scanResultEventUnique(id, eventType, filterfp)
+            data = dbh.scanResultEventUniquePage(id, eventType or 'ALL', filterFp,
+                                                 sortBy, sortOrder == "desc", after, limit)
+        except ValueError as e:
+            return self.jsonify_error('400', str(e))
         except Exception:
-            return retdata
+            return self.jsonify_error('500', "Could not retrieve scan results.")
 
-        for row in data:
-            escaped = html.escape(row[0])
-            retdata.append([escaped, row[1], row[2]])
+        page = {
+            'rows': [[html.escape(row[0]), row[1], row[2]] for row in data],
+            'next': None
+        }
+        if len(data) == limit:
+            page['next'] = self.encodeCursor(data[-1][-1])
 
-        return retdata
+        return page
+
+    def formatResultRow(self: 'SpiderFootWebUi', row: list) -> list:
+        """Format a scan result for the scan results table.
+
+        Args:
+            row (list): scan result, as returned by SpiderFootDb.scanResultEvent()
+
+        Returns:
+            list: last seen time, escaped data, escaped source data, module, confidence,
+                  visibility, risk, hash, false positive, parent false positive and type
+        """
+        lastseen = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[0]))
+        return [
+            lastseen,
+            html.escape(row[1]),
+            html.escape(row[2]),
+            row[3],
+            row[5],
+            row[6],
+            row[7],
+            row[8],
+            row[13],
+            row[14],
+            row[4]
+        ]
+
+    def encodeCursor(self: 'SpiderFootWebUi', key: list) -> str:
+        """Encode the sort key of a result as a pagination cursor.
+
+        Args:
+            key (list): sort key
+
+        Returns:
+            str: cursor
+        """
+        return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+    def decodeCursor(self: 'SpiderFootWebUi', cursor: str) -> list:
+        """Decode a pagination cursor.
+
+        Args:
+            cursor (str): cursor
+
+        Returns:
+            list: sort key
+
+        Raises:
+            ValueError: cursor is invalid
+        """
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor") from None
+
+        if not isinstance(key, list):
+            raise ValueError("Invalid cursor")
+
+        return key
 
     @cherrypy.expose
     @cherrypy.tools.json_out()
@@ -1,8 +1,17 @@
 from .db import SpiderFootDb
 from .event import SpiderFootEvent
 from .threadpool import SpiderFootThreadPool
-from .plugin import SpiderFootPlugin
+from .plugin import SpiderFootPlugin, SpiderFootEventCounter
 from .target import SpiderFootTarget
 from .helpers import SpiderFootHelpers
+from .graphsummary import SpiderFootGraphSummary
+from .cache import SpiderFootMemoryCache
+from .cachestore import SpiderFootCacheStore
+from .iprangeindex import SpiderFootIpRangeIndex
+from .feedindex import SpiderFootFeedIndex
+from .httpcache import SpiderFootHttpCache
+from .sessionpool import SpiderFootSessionPool
+from .resolver import SpiderFootResolver
+from .portscanner import SpiderFootPortScanner
 from .correlation import SpiderFootCorrelator
 from spiderfoot.__version__ import __version__
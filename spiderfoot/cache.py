@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SpiderFootMemoryCache:
+    """Thread-safe, size-bounded in-memory cache with per-entry expiry.
+
+    When the cache is full, the least recently used entry is evicted.
+
+    Attributes:
+        maxSize (int): maximum number of entries
+        hits (int): number of lookups which found a live entry
+        misses (int): number of lookups which found no entry, or an expired one
+        evictions (int): number of live entries evicted to make room
+    """
+
+    def __init__(self, maxSize: int = 10000) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxSize (int): maximum number of entries
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if not isinstance(maxSize, int):
+            raise TypeError(f"maxSize is {type(maxSize)}; expected int()")
+
+        if maxSize < 1:
+            raise ValueError(f"maxSize is {maxSize}; expected 1 or more")
+
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        """Look up an entry.
+
+        Args:
+            key: key of the entry
+
+        Returns:
+            the cached value, or None if there is no live entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, ttl: float) -> None:
+        """Add or replace an entry.
+
+        Args:
+            key: key of the entry
+            value: value to cache (None can't be cached)
+            ttl (float): number of seconds until the entry expires
+
+        Raises:
+            ValueError: arg value was invalid
+        """
+        if value is None:
+            raise ValueError("value is None")
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Cache statistics.
+
+        Returns:
+            dict: hits, misses, evictions and current number of entries
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries)
+            }
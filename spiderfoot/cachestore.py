@@ -0,0 +1,231 @@
+import logging
+import sqlite3
+import threading
+import time
+
+
+class SpiderFootCacheStore:
+    """Cache of labelled data, stored in a single SQLite database file.
+
+    Every entry is written in its own transaction, so readers (including
+    other scanner processes sharing the file) see either the old data or
+    the new data, never a partial write. When the total size of the data
+    exceeds "maxSize" bytes, the least recently used entries are evicted.
+
+    Attributes:
+        path (str): database file
+        maxSize (int): maximum total size of the cached data, in bytes
+        hits (int): number of lookups which found fresh data
+        misses (int): number of lookups which found no data, or stale data
+        evictions (int): number of entries evicted to make room
+    """
+
+    # Entries aren't marked as used again if they were used this recently,
+    # so that repeated reads don't all turn into writes.
+    touchInterval = 60
+
+    def __init__(self, path: str, maxSize: int = 512 * 1024 * 1024) -> None:
+        """Open (creating if need be) a cache database.
+
+        Args:
+            path (str): database file
+            maxSize (int): maximum total size of the cached data, in bytes
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+            IOError: database could not be opened
+        """
+        if not isinstance(path, str):
+            raise TypeError(f"path is {type(path)}; expected str()")
+
+        if not isinstance(maxSize, int):
+            raise TypeError(f"maxSize is {type(maxSize)}; expected int()")
+
+        if maxSize < 1:
+            raise ValueError(f"maxSize is {maxSize}; expected 1 or more")
+
+        self.log = logging.getLogger(f"spiderfoot.{__name__}")
+        self.path = path
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._dbh = None
+        self._open()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_dbh']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._dbh = None
+        self._open()
+
+    def _open(self) -> None:
+        """Connect to the database and create the schema if need be.
+
+        Raises:
+            IOError: database could not be opened
+        """
+        try:
+            dbh = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            dbh.execute("PRAGMA busy_timeout = 30000")
+            if dbh.execute("PRAGMA journal_mode").fetchone()[0].lower() != 'wal':
+                dbh.execute("PRAGMA journal_mode = WAL")
+            dbh.execute("PRAGMA synchronous = NORMAL")
+            dbh.execute(
+                "CREATE TABLE IF NOT EXISTS tbl_cache ("
+                "label TEXT PRIMARY KEY, "
+                "size INT NOT NULL, "
+                "created REAL NOT NULL, "
+                "accessed REAL NOT NULL, "
+                # data goes last, so that reading the other columns doesn't
+                # have to page through it
+                "data TEXT NOT NULL)"
+            )
+            dbh.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON tbl_cache (accessed, size)")
+        except sqlite3.Error as e:
+            raise IOError(f"Unable to open cache database {self.path}: {e}") from None
+
+        self._dbh = dbh
+
+    def put(self, label: str, data: str) -> None:
+        """Store data, replacing any data already stored with the same label.
+
+        Args:
+            label (str): name of the cached data
+            data (str): data to cache
+
+        Raises:
+            TypeError: arg type was invalid
+            IOError: data could not be stored
+        """
+        if not isinstance(label, str):
+            raise TypeError(f"label is {type(label)}; expected str()")
+
+        if not isinstance(data, str):
+            raise TypeError(f"data is {type(data)}; expected str()")
+
+        size = len(data.encode('utf-8', errors='ignore'))
+        if size > self.maxSize:
+            self.log.debug(f"Not caching {label}: {size:,} bytes is larger than the cache")
+            return
+
+        now = time.time()
+        with self._lock:
+            try:
+                self._dbh.execute("BEGIN IMMEDIATE")
+                try:
+                    self._dbh.execute(
+                        "REPLACE INTO tbl_cache (label, size, created, accessed, data) VALUES (?, ?, ?, ?, ?)",
+                        (label, size, now, now, data)
+                    )
+                    self._evict()
+                except sqlite3.Error:
+                    self._dbh.execute("ROLLBACK")
+                    raise
+                self._dbh.execute("COMMIT")
+            except sqlite3.Error as e:
+                raise IOError(f"Unable to store {label} in the cache: {e}") from None
+
+    def get(self, label: str, maxAge: float = 0) -> str:
+        """Retrieve data.
+
+        Args:
+            label (str): name of the cached data
+            maxAge (float): number of seconds after which the data is too old to be used (0 = no limit)
+
+        Returns:
+            str: cached data, or None if there is no data or it is too old
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._dbh.execute(
+                    "SELECT data, created, accessed FROM tbl_cache WHERE label = ?", (label,)
+                ).fetchone()
+
+                if not row or not row[0] or (maxAge and row[1] <= now - maxAge):
+                    self.misses += 1
+                    return None
+
+                if row[2] < now - self.touchInterval:
+                    self._dbh.execute("UPDATE tbl_cache SET accessed = ? WHERE label = ?", (now, label))
+            except sqlite3.Error as e:
+                self.log.error(f"Unable to read {label} from the cache: {e}")
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return row[0]
+
+    def delete(self, label: str) -> None:
+        """Remove data.
+
+        Args:
+            label (str): name of the cached data
+
+        Raises:
+            IOError: data could not be removed
+        """
+        with self._lock:
+            try:
+                self._dbh.execute("DELETE FROM tbl_cache WHERE label = ?", (label,))
+            except sqlite3.Error as e:
+                raise IOError(f"Unable to remove {label} from the cache: {e}") from None
+
+    def stats(self) -> dict:
+        """Cache statistics.
+
+        Hits, misses and evictions are counted for this object only; the
+        number of entries and their size are for the whole database.
+
+        Returns:
+            dict: hits, misses, evictions, number of entries and total size in bytes
+        """
+        with self._lock:
+            try:
+                entries, size = self._dbh.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tbl_cache").fetchone()
+            except sqlite3.Error as e:
+                self.log.error(f"Unable to read cache statistics: {e}")
+                entries, size = 0, 0
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'size': size
+            }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._dbh is not None:
+                self._dbh.close()
+                self._dbh = None
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the data fits in self.maxSize.
+
+        Note: must be called with self._lock held, inside a transaction.
+        """
+        total = self._dbh.execute("SELECT COALESCE(SUM(size), 0) FROM tbl_cache").fetchone()[0]
+        if total <= self.maxSize:
+            return
+
+        evict = list()
+        for label, size in self._dbh.execute("SELECT label, size FROM tbl_cache ORDER BY accessed"):
+            if total <= self.maxSize:
+                break
+            evict.append((label,))
+            total -= size
+
+        self._dbh.executemany("DELETE FROM tbl_cache WHERE label = ?", evict)
+        self.evictions += len(evict)
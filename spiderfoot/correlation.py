@@ -1,9 +1,14 @@
+import heapq
 import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+from operator import itemgetter
 import re
-import netaddr
+import typing
 import yaml
-from spiderfoot import SpiderFootDb
+from spiderfoot import SpiderFootDb, SpiderFootIpRangeIndex
 
 
 class SpiderFootCorrelator:
@@ -18,7 +23,11 @@ class SpiderFootCorrelator:
     scanId = None
     types = None
     rules = list()
+    plans = list()
+    workers = 1
     type_entity_map = dict()
+    # sources, children and entities of events, shared by all rules during run_correlations()
+    enrichment = None
 
     # For syntax checking
     mandatory_components = ["meta", "collections", "headline"]
@@ -46,16 +55,18 @@ class SpiderFootCorrelator:
         "rawYaml": {}
     }
 
-    def __init__(self, dbh: SpiderFootDb, ruleset: dict, scanId: str = None) -> None:
+    def __init__(self, dbh: SpiderFootDb, ruleset: dict, scanId: str = None, workers: int = 1) -> None:
         """Initialize SpiderFoot correlator engine with scan ID and ruleset.
 
         Args:
             dbh (SpiderFootDb): database handle
             ruleset (dict): correlation rule set
             scanId (str): scan instance ID
+            workers (int): number of processes to run the rules in; 0 for one per CPU, or 1 to run them in this process
 
         Raises:
             TypeError: argument type was invalid
+            ValueError: argument value was invalid
             SyntaxError: correlation ruleset contains malformed or invalid rule
         """
         if not isinstance(ruleset, dict):
@@ -71,6 +82,14 @@ class SpiderFootCorrelator:
 
         self.scanId = scanId
 
+        if not isinstance(workers, int):
+            raise TypeError(f"workers is {type(workers)}; expected int()")
+
+        if workers < 0:
+            raise ValueError(f"workers is {workers}; expected 0 or more")
+
+        self.workers = workers or os.cpu_count() or 1
+
         self.types = self.dbh.eventTypes()
         for t in self.types:
             self.type_entity_map[t[1]] = t[3]
@@ -97,6 +116,8 @@ class SpiderFootCorrelator:
         if not self.check_ruleset_validity(self.rules):
             raise SyntaxError("Sanity check of correlation rules failed.")
 
+        self.plans = [self.compile_rule(rule) for rule in self.rules]
+
     def get_ruleset(self) -> list:
         """Correlation rule set.
 
@@ -106,10 +127,15 @@ class SpiderFootCorrelator:
         return self.rules
 
     def run_correlations(self) -> None:
-        """Run all correlation rules.
+        """Run all correlation rules, in worker processes if more than one
+        worker is configured, and store the results.
+
+        Results stored earlier, e.g. by update_correlations() while the
+        scan was running, are reconciled with the new results.
 
         Raises:
             ValueError: correlation rules cannot be run on specified scanId
+            IOError: database I/O failed
         """
         scan_instance = self.dbh.scanInstanceGet(self.scanId)
         if not scan_instance:
@@ -118,17 +144,271 @@ class SpiderFootCorrelator:
         if scan_instance[5] in ["RUNNING", "STARTING", "STARTED"]:
             raise ValueError(f"Scan {self.scanId} is {scan_instance[5]}. You cannot run correlations on running scans.")
 
-        for rule in self.rules:
-            self.log.debug(f"Processing rule: {rule['id']}")
-            results = self.process_rule(rule)
-            if not results:
+        self.store_correlations(self.find_correlations(self.workers))
+
+    def update_correlations(self) -> None:
+        """Run all correlation rules on the results stored so far by a
+        scan, which may still be running, and update the stored results.
+
+        Correlations which still hold are kept as they are, new ones are
+        added, and those which no longer hold (e.g. because an outlier
+        is no longer an outlier) are removed. The rules run in this
+        process, so as not to start worker processes during a scan.
+
+        Raises:
+            ValueError: correlation rules cannot be run on specified scanId
+            IOError: database I/O failed
+        """
+        if not self.dbh.scanInstanceGet(self.scanId):
+            raise ValueError(f"Invalid scan ID. Scan {self.scanId} does not exist.")
+
+        self.store_correlations(self.find_correlations(1))
+
+    def find_correlations(self, workers: int) -> list:
+        """Run all correlation rules, without storing their results.
+
+        Args:
+            workers (int): number of processes to run the rules in
+
+        Returns:
+            list: rule, title and event IDs of each correlation, in rule order
+        """
+        plans = [plan for plan in self.plans if plan['collections'] is not None]
+        for plan in self.plans:
+            if plan['collections'] is None:
+                self.log.error(f"Unable to run rule {plan['rule']['id']}: invalid collection.")
+
+        workers = min(workers, len(plans))
+        if workers > 1 and mp.current_process().daemon:
+            # e.g. a scan, which runs the correlations once it has finished
+            self.log.debug("Running correlation rules in this process, as a daemonic process cannot start workers.")
+            workers = 1
+
+        if workers > 1:
+            self.log.debug(f"Running {len(plans)} correlation rules in {workers} processes.")
+            results = dict()
+            dbOpts = {
+                '__database': self.dbh.databasePath,
+                '__dbprofile': self.dbh.storageProfile,
+                '__dbpragmas': self.dbh.storagePragmas
+            }
+            # Each worker runs its share of the rules over its own read-only
+            # connections. The scan has finished, and nothing is written
+            # until every worker is done, so they all see the same results.
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+                futures = list()
+                for i in range(workers):
+                    ruleset = {plan['rule']['id']: plan['rule']['rawYaml'] for plan in plans[i::workers]}
+                    futures.append(pool.submit(_evaluate_rules, dbOpts, ruleset, self.scanId))
+                for future in futures:
+                    results.update(future.result())
+        else:
+            results = self.evaluate_plans(plans)
+
+        # Store the correlations in rule order, whichever process found them
+        correlations = list()
+        for plan in plans:
+            rule = plan['rule']
+            found = results.get(rule['id'])
+            if not found:
                 self.log.debug(f"No results for rule {rule['id']}.")
                 continue
 
-            self.log.info(f"Rule {rule['id']} returned {len(results.keys())} results.")
+            self.log.info(f"Rule {rule['id']} returned {len(found)} results.")
+            for title, eventIds in found:
+                correlations.append((rule, title, eventIds))
+
+        return correlations
+
+    def evaluate_plans(self, plans: list) -> dict:
+        """Run compiled correlation rules, without storing their results.
+
+        The events the rules start from are fetched in one pass, rather
+        than once per rule, and the sources, children and entities of
+        events are shared by all the rules.
+
+        Args:
+            plans (list): correlation rules compiled by compile_rule()
+
+        Returns:
+            dict: title and event IDs of each correlation, by rule ID
+        """
+        shared = self.collect_shared_events(plans)
+        self.enrichment = {'source': dict(), 'child': dict(), 'entity': dict()}
+
+        results = dict()
+        try:
+            for plan in plans:
+                rule = plan['rule']
+                self.log.debug(f"Processing rule: {rule['id']}")
+                buckets = self.execute_plan(plan, shared)
+                if not buckets:
+                    continue
+
+                results[rule['id']] = [
+                    (self.build_correlation_title(rule, data), [e['id'] for e in data])
+                    for data in buckets.values()
+                ]
+        finally:
+            self.enrichment = None
+
+        return results
+
+    def store_correlations(self, correlations: list) -> None:
+        """Store correlation results in the backend database, in a single
+        transaction, in place of the results already stored for the scan.
+
+        Results which are already stored (same rule, title and events)
+        are left alone, so only new results are added and only those
+        which no longer hold are removed.
+
+        Args:
+            correlations (list): rule, title and event IDs of each correlation
+
+        Raises:
+            IOError: database I/O failed
+        """
+        stored = dict()
+        for correlationId, (ruleId, title, eventIds) in self.dbh.scanCorrelationResultEvents(self.scanId).items():
+            stored.setdefault((ruleId, title, frozenset(eventIds)), list()).append(correlationId)
+
+        created = list()
+        for rule, title, eventIds in correlations:
+            existing = stored.get((rule['id'], title, frozenset(eventIds)))
+            if existing:
+                existing.pop()
+                continue
+            self.log.info(f"New correlation [{rule['id']}]: {title}")
+            created.append((rule['id'], rule['meta']['name'], rule['meta']['description'], rule['meta']['risk'], rule['rawYaml'], title, eventIds))
+
+        deleteIds = [correlationId for correlationIds in stored.values() for correlationId in correlationIds]
+        if deleteIds:
+            self.log.info(f"Removing {len(deleteIds)} correlations which no longer hold.")
+
+        if not created and not deleteIds:
+            return
 
-            for result in results:
-                self.create_correlation(rule, results[result])
+        self.dbh.correlationResultCreateBatch(self.scanId, created, deleteIds)
+
+    def compile_rule(self, rule: dict) -> dict:
+        """Compile a correlation rule into an execution plan, so the work
+        which is the same for every scan (resolving event types, compiling
+        regular expressions, working out which related events are needed)
+        is only done once.
+
+        Args:
+            rule (dict): correlation rule
+
+        Returns:
+            dict: the rule, the related events to fetch, and for each
+                  collection the criteria of the events to fetch from the
+                  database and the filters to apply to them. The collections
+                  are None if a collection's criteria are invalid.
+
+        Raises:
+            TypeError: argument type was invalid
+        """
+        if not isinstance(rule, dict):
+            raise TypeError(f"rule is {type(rule)}; expected dict()")
+
+        fetchChildren, fetchSources, fetchEntities = self.analyze_rule_scope(rule)
+
+        collections = list()
+        for collection in rule.get('collections', list()):
+            # First match rule means we fetch from the database, every
+            # other step happens locally to avoid burdening the db.
+            matchrules = collection['collect']
+            criteria = self.build_db_criteria(matchrules[0])
+            if not criteria:
+                self.log.error(f"Error encountered parsing match rule: {matchrules[0]}.")
+                collections = None
+                break
+
+            collections.append({
+                # de-duplicated, keeping the order
+                'criteria': {k: list(dict.fromkeys(v)) for k, v in criteria.items()},
+                'filters': [self.compile_matchrule(matchrule) for matchrule in matchrules[1:]]
+            })
+
+        return {
+            'rule': rule,
+            'fetchChildren': fetchChildren,
+            'fetchSources': fetchSources,
+            'fetchEntities': fetchEntities,
+            'collections': collections
+        }
+
+    def compile_matchrule(self, matchrule: dict) -> dict:
+        """Compile a match rule which refines a collection.
+
+        Args:
+            matchrule (dict): match rule
+
+        Returns:
+            dict: field, method and compiled patterns
+        """
+        if isinstance(matchrule['value'], list):
+            patterns = [str(r) for r in matchrule['value']]
+        else:
+            patterns = [str(matchrule['value'])]
+
+        return {
+            'field': matchrule['field'],
+            'method': matchrule['method'],
+            'patterns': self.compile_patterns(patterns, matchrule['method'])
+        }
+
+    def compile_patterns(self, patterns: list, patterntype: str) -> list:
+        """Strip the "not " prefix from negated patterns, and compile
+        regular expressions.
+
+        Args:
+            patterns (list): patterns
+            patterntype (str): "exact" or "regex"
+
+        Returns:
+            list: whether each pattern is negated, and the pattern
+                  (compiled, for regular expressions)
+        """
+        compiled = list()
+        for pattern in patterns:
+            negated = pattern.startswith("not ")
+            if negated:
+                pattern = re.sub(r"^not\s+", "", pattern)
+            if patterntype == "regex":
+                pattern = re.compile(pattern, re.IGNORECASE)
+            compiled.append((negated, pattern))
+        return compiled
+
+    def collect_shared_events(self, plans: list) -> dict:
+        """Fetch the events matching the criteria of all the rules, in one
+        query for all the event types and one for all the modules
+        collected by, rather than a query for each collection of each rule.
+
+        Args:
+            plans (list): compiled correlation rules
+
+        Returns:
+            dict: ID, type, data and module of events, ordered by data, by
+                  criteria (eventType or srcModule) and value
+        """
+        wanted = {'eventType': dict(), 'srcModule': dict()}
+        for plan in plans:
+            for collection in plan['collections'] or list():
+                for criteria, values in collection['criteria'].items():
+                    if criteria in wanted:
+                        wanted[criteria].update(dict.fromkeys(values))
+
+        shared = dict()
+        for criteria, values in wanted.items():
+            if not values:
+                continue
+            column = 4 if criteria == 'eventType' else 3
+            self.log.debug(f"Fetching events for {len(values)} values of {criteria}")
+            for row in self.dbh.scanResultEventIter(self.scanId, **{criteria: list(values)}):
+                shared.setdefault((criteria, row[column]), list()).append((row[8], row[4], row[1], row[3]))
+
+        return shared
 
     def build_db_criteria(self, matchrule: dict) -> dict:
         """Build up the criteria to be used to query the database.
@@ -227,14 +507,19 @@ class SpiderFootCorrelator:
         if not isinstance(events, dict):
             raise TypeError(f"events is {type(events)}; expected dict()")
 
-        event_chunks = [list(events.keys())[x:(x + 5000)] for x in range(0, len(list(events.keys())), 5000)]
+        # Sources already fetched for another rule are reused
+        cache = self.enrichment['source'] if self.enrichment is not None else dict()
+        missing = [event_id for event_id in events if event_id not in cache]
+        for event_id in missing:
+            cache[event_id] = list()
 
-        for chunk in event_chunks:
+        for x in range(0, len(missing), 5000):
+            chunk = missing[x:x + 5000]
             # Get sources
             self.log.debug(f"Getting sources for {len(chunk)} events")
             source_data = self.dbh.scanElementSourcesDirect(self.scanId, chunk)
             for row in source_data:
-                events[row[8]]['source'].append({
+                cache[row[8]].append({
                     'type': row[15],
                     'data': row[2],
                     'module': row[16],
@@ -242,6 +527,9 @@ class SpiderFootCorrelator:
                     'entity_type': self.type_entity_map[row[15]]
                 })
 
+        for event_id, event in events.items():
+            event['source'].extend(dict(source) for source in cache[event_id])
+
     def enrich_event_children(self, events: dict) -> None:
         """Enrich event children.
 
@@ -254,20 +542,28 @@ class SpiderFootCorrelator:
         if not isinstance(events, dict):
             raise TypeError(f"events is {type(events)}; expected dict()")
 
-        event_chunks = [list(events.keys())[x:x + 5000] for x in range(0, len(list(events.keys())), 5000)]
+        # Children already fetched for another rule are reused
+        cache = self.enrichment['child'] if self.enrichment is not None else dict()
+        missing = [event_id for event_id in events if event_id not in cache]
+        for event_id in missing:
+            cache[event_id] = list()
 
-        for chunk in event_chunks:
+        for x in range(0, len(missing), 5000):
+            chunk = missing[x:x + 5000]
             # Get children
             self.log.debug(f"Getting children for {len(chunk)} events")
-            child_data = self.dbh.scanResultEvent(self.scanId, sourceId=chunk)
+            child_data = self.dbh.scanResultEventIter(self.scanId, sourceId=chunk)
             for row in child_data:
-                events[row[9]]['child'].append({
+                cache[row[9]].append({
                     'type': row[4],
                     'data': row[1],
                     'module': row[3],
                     'id': row[8]
                 })
 
+        for event_id, event in events.items():
+            event['child'].extend(dict(child) for child in cache[event_id])
+
     def enrich_event_entities(self, events: dict) -> None:
         """Given our starting set of ids, loop through the source
         of each until you have a match according to the criteria
@@ -282,6 +578,31 @@ class SpiderFootCorrelator:
         if not isinstance(events, dict):
             raise TypeError(f"events is {type(events)}; expected dict()")
 
+        # Entities already found for another rule are reused
+        if self.enrichment is not None:
+            cache = self.enrichment['entity']
+            pending = dict()
+            for event_id, event in events.items():
+                if event_id in cache:
+                    event['entity'].extend(dict(entity) for entity in cache[event_id])
+                else:
+                    pending[event_id] = event
+            self.find_event_entities(pending)
+            for event_id, event in pending.items():
+                cache[event_id] = [dict(entity) for entity in event['entity']]
+            return
+
+        self.find_event_entities(events)
+
+    def find_event_entities(self, events: dict) -> None:
+        """Find the nearest entity of each event, from its sources.
+
+        Args:
+            events (dict): events
+        """
+        # key is the element ID that we need to find an entity for by
+        # checking its source, and the value is the list of original IDs
+        # for which we are seeking an entity.
         entity_missing = dict()
         for event_id in events:
             if 'source' not in events[event_id]:
@@ -295,47 +616,34 @@ class SpiderFootCorrelator:
                 if source['entity_type'] in ['ENTITY', 'INTERNAL']:
                     events[row['id']]['entity'].append(source)
                 else:
-                    # key is the element ID that we need to find an entity for
-                    # by checking its source, and the value is the original ID
-                    # for which we are seeking an entity. As we traverse up the
-                    # discovery path the key will change but the value must always
-                    # point back to the same ID.
-                    entity_missing[source['id']] = row['id']
-
-        while len(entity_missing) > 0:
-            self.log.debug(f"{len(entity_missing.keys())} entities are missing, going deeper...")
-            new_missing = dict()
-            self.log.debug(f"Getting sources for {len(entity_missing.keys())} items")
-            if len(entity_missing.keys()) > 5000:
-                chunks = [list(entity_missing.keys())[x:x + 5000] for x in range(0, len(list(entity_missing.keys())), 5000)]
-                entity_data = list()
-                self.log.debug("Fetching data in chunks")
-                for chunk in chunks:
-                    self.log.debug(f"chunk size: {len(chunk)}")
-                    entity_data.extend(self.dbh.scanElementSourcesDirect(self.scanId, chunk))
-            else:
-                self.log.debug(f"fetching sources for {len(entity_missing)} items")
-                entity_data = self.dbh.scanElementSourcesDirect(self.scanId, list(entity_missing.keys()))
-
-            for entity_candidate in entity_data:
-                event_id = entity_missing[entity_candidate[8]]
-                if self.type_entity_map[entity_candidate[15]] not in ['ENTITY', 'INTERNAL']:
-                    # key of this dictionary is the id we need to now get a source for,
-                    # and the value is the original ID of the item missing an entity
-                    new_missing[entity_candidate[9]] = event_id
-                else:
-                    events[event_id]['entity'].append({
-                        'type': entity_candidate[15],
-                        'data': entity_candidate[2],
-                        'module': entity_candidate[16],
-                        'id': entity_candidate[9],
-                        'entity_type': self.type_entity_map[entity_candidate[15]]
-                    })
-
-            if len(new_missing) == 0:
-                break
+                    entity_missing.setdefault(source['id'], list()).append(row['id'])
 
-            entity_missing = deepcopy(new_missing)
+        if not entity_missing:
+            return
+
+        # Fetch the whole discovery path above these elements at once,
+        # then walk up it until we hit an entity.
+        self.log.debug(f"{len(entity_missing)} entities are missing, getting sources...")
+        lineage = dict()
+        for row in self.dbh.scanElementSourcesRecursive(self.scanId, list(entity_missing.keys())):
+            lineage[row[8]] = row
+
+        for element_id, event_ids in entity_missing.items():
+            visited = set()
+            while element_id in lineage and element_id not in visited:
+                visited.add(element_id)
+                entity_candidate = lineage[element_id]
+                if self.type_entity_map[entity_candidate[15]] in ['ENTITY', 'INTERNAL']:
+                    for event_id in event_ids:
+                        events[event_id]['entity'].append({
+                            'type': entity_candidate[15],
+                            'data': entity_candidate[2],
+                            'module': entity_candidate[16],
+                            'id': entity_candidate[9],
+                            'entity_type': self.type_entity_map[entity_candidate[15]]
+                        })
+                    break
+                element_id = entity_candidate[9]
 
     def collect_from_db(self, matchrule: dict, fetchChildren: bool, fetchSources: bool, fetchEntities: bool) -> list:
         """Collect event values from database.
@@ -350,8 +658,6 @@ class SpiderFootCorrelator:
             list: event values
         """
 
-        events = dict()
-
         self.log.debug(f"match rule: {matchrule}")
         # Parse the criteria from the match rule
         query_args = self.build_db_criteria(matchrule)
@@ -359,15 +665,50 @@ class SpiderFootCorrelator:
             self.log.error(f"Error encountered parsing match rule: {matchrule}.")
             return None
 
+        return self.collect_rows(self.query_events(query_args), fetchChildren, fetchSources, fetchEntities)
+
+    def query_events(self, criteria: dict, shared: dict = None) -> typing.Iterator[tuple]:
+        """Events matching the criteria of the first match rule of a collection.
+
+        Args:
+            criteria (dict): criteria for SpiderFootDb.scanResultEvent()
+            shared (dict): events fetched for all rules by collect_shared_events()
+
+        Returns:
+            iterator: ID, type, data and module of each event, ordered by data
+        """
+        if shared is not None and len(criteria) == 1:
+            key = next(iter(criteria))
+            if key in ('eventType', 'srcModule'):
+                # each list is ordered by data, so merging them keeps the order of a single query
+                return heapq.merge(*[shared.get((key, value), ()) for value in criteria[key]], key=itemgetter(2))
+
+        query_args = dict(criteria)
         query_args['instanceId'] = self.scanId
         self.log.debug(f"db query: {query_args}")
-        for row in self.dbh.scanResultEvent(**query_args):
-            events[row[8]] = {
-                'type': row[4],
-                'data': row[1],
-                'module': row[3],
-                'id': row[8],
-                'entity_type': self.type_entity_map[row[4]],
+        return ((row[8], row[4], row[1], row[3]) for row in self.dbh.scanResultEventIter(**query_args))
+
+    def collect_rows(self, rows: typing.Iterable[tuple], fetchChildren: bool, fetchSources: bool, fetchEntities: bool) -> list:
+        """Build events from database rows, with the related events a rule needs.
+
+        Args:
+            rows (typing.Iterable[tuple]): ID, type, data and module of each event
+            fetchChildren (bool): fetch the children of each event
+            fetchSources (bool): fetch the sources of each event
+            fetchEntities (bool): fetch the nearest entities of each event
+
+        Returns:
+            list: events
+        """
+        events = dict()
+
+        for eventId, eventType, data, module in rows:
+            events[eventId] = {
+                'type': eventType,
+                'data': data,
+                'module': module,
+                'id': eventId,
+                'entity_type': self.type_entity_map[eventType],
                 'source': [],
                 'child': [],
                 'entity': []
@@ -384,7 +725,7 @@ class SpiderFootCorrelator:
         if fetchEntities:
             self.enrich_event_entities(events)
 
-        self.log.debug(f"returning {len(events.values())} events from match_rule {matchrule}")
+        self.log.debug(f"returning {len(events)} events")
         return list(events.values())
 
     def event_extract(self, event: dict, field: str) -> list:
@@ -419,46 +760,51 @@ class SpiderFootCorrelator:
         Returns:
             bool: TBD
         """
+        return self.event_matches(event, field, self.compile_patterns(patterns, patterntype), patterntype)
+
+    def event_matches(self, event: dict, field: str, patterns: list, patterntype: str) -> bool:
+        """Check whether an event field matches compiled patterns.
+
+        The patterns are checked in order: the event is kept when the
+        first pattern matching it isn't negated, or when none match and
+        the last pattern is negated.
+
+        Args:
+            event (dict): event
+            field (str): field, or related events and field (e.g. "source.data")
+            patterns (list): patterns compiled by compile_patterns()
+            patterntype (str): "exact" or "regex"
+
+        Returns:
+            bool: event should be kept
+        """
 
         if "." in field:
             key, field = field.split(".")
-            return any(self.event_keep(subevent, field, patterns, patterntype) for subevent in event[key])
+            return any(self.event_matches(subevent, field, patterns, patterntype) for subevent in event[key])
+
+        if patterntype not in ("exact", "regex"):
+            return False
 
         value = event[field]
 
-        if patterntype == "exact":
-            ret = False
-            for pattern in patterns:
-                if pattern.startswith("not "):
-                    ret = True
-                    pattern = re.sub(r"^not\s+", "", pattern)
-                    if value == pattern:
-                        return False
-                else:
-                    ret = False
-                    if value == pattern:
-                        return True
-            if ret:
-                return True
-            return False
+        ret = False
+        for negated, pattern in patterns:
+            if patterntype == "exact":
+                matched = value == pattern
+            else:
+                matched = pattern.search(value) is not None
 
-        if patterntype == "regex":
-            ret = False
-            for pattern in patterns:
-                if pattern.startswith("not "):
-                    ret = True
-                    pattern = re.sub(r"^not\s+", "", pattern)
-                    if re.search(pattern, value, re.IGNORECASE):
-                        return False
-                else:
-                    ret = False
-                    if re.search(pattern, value, re.IGNORECASE):
-                        return True
-            if ret:
-                return True
-            return False
+            if negated:
+                ret = True
+                if matched:
+                    return False
+            else:
+                ret = False
+                if matched:
+                    return True
 
-        return False
+        return ret
 
     def refine_collection(self, matchrule: dict, events: list) -> None:
         """Cull events from the events list if they don't meet the match criteria.
@@ -467,23 +813,24 @@ class SpiderFootCorrelator:
             matchrule (dict): TBD
             events (list): TBD
         """
-        patterns = list()
+        self.filter_events(self.compile_matchrule(matchrule), events)
 
-        if isinstance(matchrule['value'], list):
-            for r in matchrule['value']:
-                patterns.append(str(r))
-        else:
-            patterns = [str(matchrule['value'])]
+    def filter_events(self, matchfilter: dict, events: list) -> None:
+        """Cull events from the events list if they don't match a compiled match rule.
 
-        field = matchrule['field']
-        self.log.debug(f"attempting to match {patterns} against the {field} field in {len(events)} events")
+        Args:
+            matchfilter (dict): match rule compiled by compile_matchrule()
+            events (list): events
+        """
+        field = matchfilter['field']
+        self.log.debug(f"attempting to match {len(matchfilter['patterns'])} patterns against the {field} field in {len(events)} events")
 
         # Go through each event, remove it if we shouldn't keep it
         # according to the match rule patterns.
-        for event in events[:]:
-            if not self.event_keep(event, field, patterns, matchrule['method']):
-                self.log.debug(f"removing {event} because of {field}")
-                events.remove(event)
+        events[:] = [
+            event for event in events
+            if self.event_matches(event, field, matchfilter['patterns'], matchfilter['method'])
+        ]
 
     def collect_events(self, collection: dict, fetchChildren: bool, fetchSources: bool, fetchEntities: bool, collectIndex: int) -> list:
         """Collect data for aggregation and analysis.
@@ -514,8 +861,21 @@ class SpiderFootCorrelator:
             # Remove events in-place based on subsequent match-rules
             self.refine_collection(matchrule, events)
 
-        # Stamp events with this collection ID for potential
-        # use in analysis later.
+        self.stamp_collection(events, collectIndex, fetchChildren, fetchSources, fetchEntities)
+
+        self.log.debug(f"returning collection ({len(events)})...")
+        return events
+
+    def stamp_collection(self, events: list, collectIndex: int, fetchChildren: bool, fetchSources: bool, fetchEntities: bool) -> None:
+        """Stamp events with their collection ID for potential use in analysis later.
+
+        Args:
+            events (list): events
+            collectIndex (int): collection ID
+            fetchChildren (bool): children were fetched
+            fetchSources (bool): sources were fetched
+            fetchEntities (bool): entities were fetched
+        """
         for e in events:
             e['_collection'] = collectIndex
             if fetchEntities:
@@ -528,9 +888,6 @@ class SpiderFootCorrelator:
                 for se in e['source']:
                     se['_collection'] = collectIndex
 
-        self.log.debug(f"returning collection ({len(events)})...")
-        return events
-
     def aggregate_events(self, rule: dict, events: list) -> dict:
         """Aggregate events according to the rule.
 
@@ -612,28 +969,25 @@ class SpiderFootCorrelator:
             rule (dict): correlation rule
             buckets (dict): TBD
         """
-        self.log.debug(f"called with buckets {buckets}")
+        self.log.debug(f"called with {len(buckets)} buckets")
 
-        def check_event(events: list, reference: list) -> bool:
+        def check_event(events: list, reference: list, referenceRanges: SpiderFootIpRangeIndex) -> bool:
             """Check event.
 
             Args:
                 events (list): TBD
                 reference (list): TBD
+                referenceRanges (SpiderFootIpRangeIndex): IP addresses and netblocks in reference
 
             Returns:
                 bool: TBD
             """
             for event_data in events:
                 if rule['match_method'] == 'subnet':
-                    for r in reference:
-                        try:
-                            self.log.debug(f"checking if {event_data} is in {r}")
-                            if netaddr.IPAddress(event_data) in netaddr.IPNetwork(r):
-                                self.log.debug(f"found subnet match: {event_data} in {r}")
-                                return True
-                        except Exception:
-                            pass
+                    self.log.debug(f"checking if {event_data} is in {len(referenceRanges)} reference ranges")
+                    if '/' not in event_data and referenceRanges.contains(event_data):
+                        self.log.debug(f"found subnet match: {event_data}")
+                        return True
 
                 if rule['match_method'] == 'exact' and event_data in reference:
                     self.log.debug(f"found exact match: {event_data} in {reference}")
@@ -658,6 +1012,17 @@ class SpiderFootCorrelator:
                 if event['_collection'] == 0:
                     reference.update(self.event_extract(event, rule['field']))
 
+        referenceRanges = SpiderFootIpRangeIndex()
+        if rule['match_method'] == 'subnet':
+            networks = list()
+            for r in reference:
+                try:
+                    SpiderFootIpRangeIndex.parse(r)
+                except (TypeError, ValueError):
+                    continue
+                networks.append(r)
+            referenceRanges.update(networks)
+
         for bucket in list(buckets.keys()):
             pluszerocount = 0
             for event in buckets[bucket][:]:
@@ -665,7 +1030,7 @@ class SpiderFootCorrelator:
                     continue
                 pluszerocount += 1
 
-                if not check_event(self.event_extract(event, rule['field']), reference):
+                if not check_event(self.event_extract(event, rule['field']), reference, referenceRanges):
                     buckets[bucket].remove(event)
                     pluszerocount -= 1
 
@@ -855,25 +1220,47 @@ class SpiderFootCorrelator:
         if not isinstance(rule, dict):
             raise TypeError(f"rule is {type(rule)}; expected dict()")
 
+        return self.execute_plan(self.compile_rule(rule))
+
+    def execute_plan(self, plan: dict, shared: dict = None) -> dict:
+        """Run a compiled correlation rule.
+
+        Args:
+            plan (dict): correlation rule compiled by compile_rule()
+            shared (dict): events fetched for all rules by collect_shared_events()
+
+        Returns:
+            dict: buckets of events, by the value of the aggregation field
+        """
+        rule = plan['rule']
+        fetchChildren = plan['fetchChildren']
+        fetchSources = plan['fetchSources']
+        fetchEntities = plan['fetchEntities']
+
+        if plan['collections'] is None:
+            self.log.error(f"Unable to run rule {rule['id']}: invalid collection.")
+            return None
+
         events = list()
         buckets = dict()
 
-        fetchChildren, fetchSources, fetchEntities = self.analyze_rule_scope(rule)
-
         # Go through collections and collect the data from the DB
-        for collectIndex, c in enumerate(rule.get('collections')):
-            events.extend(self.collect_events(c['collect'],
-                          fetchChildren,
-                          fetchSources,
-                          fetchEntities,
-                          collectIndex))
+        for collectIndex, collection in enumerate(plan['collections']):
+            collected = self.collect_rows(self.query_events(collection['criteria'], shared),
+                                          fetchChildren, fetchSources, fetchEntities)
+
+            # Remove events in-place based on subsequent match-rules
+            for matchfilter in collection['filters']:
+                self.filter_events(matchfilter, collected)
+
+            self.stamp_collection(collected, collectIndex, fetchChildren, fetchSources, fetchEntities)
+            events.extend(collected)
 
         if not events:
             self.log.debug("No events found after going through collections.")
             return None
 
         self.log.debug(f"{len(events)} proceeding to next stage: aggregation.")
-        self.log.debug(f"{events} ready to be processed.")
 
         # Perform aggregations. Aggregating breaks up the events
         # into buckets with the key being the field to aggregate by.
@@ -1073,3 +1460,18 @@ class SpiderFootCorrelator:
         if ok:
             return True
         return False
+
+
+def _evaluate_rules(dbOpts: dict, ruleset: dict, scanId: str) -> dict:
+    """Run correlation rules in a worker process.
+
+    Args:
+        dbOpts (dict): database options
+        ruleset (dict): correlation rule set
+        scanId (str): scan instance ID
+
+    Returns:
+        dict: title and event IDs of each correlation, by rule ID
+    """
+    correlator = SpiderFootCorrelator(SpiderFootDb(dbOpts), ruleset, scanId)
+    return correlator.evaluate_plans(correlator.plans)
@@ -10,8 +10,10 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 
+from contextlib import contextmanager
 from pathlib import Path
 import hashlib
+import os
 import random
 import re
 import sqlite3
@@ -26,6 +28,7 @@ class SpiderFootDb:
         conn: SQLite connect() connection
         dbh: SQLite cursor() database handle
         dbhLock (_thread.RLock): thread lock on database handle
+        readConnections (threading.local): per-thread read-only connections
     """
 
     dbh = None
@@ -34,6 +37,40 @@ class SpiderFootDb:
     # Prevent multithread access to sqlite database
     dbhLock = threading.RLock()
 
+    # Maximum number of IDs bound to a single query. Older SQLite builds
+    # allow no more than 999 variables per statement.
+    maxQueryIds = 500
+
+    # Read-only connections, one per thread and database file.
+    # Reads don't take dbhLock; in WAL mode each query sees a consistent
+    # snapshot of the database and doesn't block (or wait for) the writer.
+    readConnections = threading.local()
+
+    # SQLite connection tuning, selected with the '__dbprofile' option.
+    # Individual PRAGMAs can be overridden with the '__dbpragmas' option.
+    storageProfiles = {
+        # Readers don't block the writer (and vice versa) in WAL mode, and
+        # with synchronous=NORMAL a commit doesn't wait for an fsync. The
+        # database can't be corrupted by a crash, but the last transactions
+        # before a power loss may be rolled back.
+        'default': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'temp_store': 'MEMORY',
+            'cache_size': -32768,  # KiB
+            'mmap_size': 268435456,  # bytes
+            'busy_timeout': 30000,  # milliseconds
+        },
+        # fsync on every commit
+        'durable': {
+            'journal_mode': 'WAL',
+            'synchronous': 'FULL',
+            'busy_timeout': 30000,
+        },
+        # leave the connection untuned, as in earlier versions
+        'legacy': {},
+    }
+
     # Queries for creating the SpiderFoot database
     createSchemaQueries = [
         "PRAGMA journal_mode=WAL",
@@ -105,9 +142,29 @@ class SpiderFootDb:
         "CREATE INDEX idx_scan_results_srchash ON tbl_scan_results (scan_instance_id, source_event_hash)",
         "CREATE INDEX idx_scan_logs ON tbl_scan_log (scan_instance_id)",
         "CREATE INDEX idx_scan_correlation ON tbl_scan_correlation_results (scan_instance_id, id)",
-        "CREATE INDEX idx_scan_correlation_events ON tbl_scan_correlation_results_events (correlation_id)"
+        "CREATE INDEX idx_scan_correlation_events ON tbl_scan_correlation_results_events (correlation_id)",
+        "CREATE INDEX IF NOT EXISTS idx_scan_results_generated ON tbl_scan_results (scan_instance_id, generated)",
+        "CREATE INDEX IF NOT EXISTS idx_scan_results_type_generated ON tbl_scan_results (scan_instance_id, type, generated)",
+        "CREATE INDEX IF NOT EXISTS idx_scan_results_risk ON tbl_scan_results (scan_instance_id, risk)"
     ]
 
+    # Columns which paginated scan results can be sorted by
+    resultSortColumns = {
+        'generated': 'c.generated',
+        'data': "IFNULL(c.data, '')",
+        'type': 'c.type',
+        'module': 'c.module',
+        'risk': 'c.risk',
+    }
+
+    # Columns which paginated unique scan results can be sorted by
+    # (each ends with the unique key, so the sort order is total)
+    uniqueResultSortColumns = {
+        'count': ['COUNT(*)', 'type', "IFNULL(data, '')"],
+        'data': ["IFNULL(data, '')", 'type'],
+        'type': ['type', "IFNULL(data, '')"],
+    }
+
     eventDetails = [
         ['ROOT', 'Internal SpiderFoot Root event', 1, 'INTERNAL'],
         ['ACCOUNT_EXTERNAL_OWNED', 'Account on External Site', 0, 'ENTITY'],
@@ -327,31 +384,21 @@ class SpiderFootDb:
         self.conn = dbh
         self.dbh = dbh.cursor()
 
-        def __dbregex__(qry: str, data: str) -> bool:
-            """SQLite doesn't support regex queries, so we create
-            a custom function to do so.
-
-            Args:
-                qry (str): TBD
-                data (str): TBD
-
-            Returns:
-                bool: matches
-            """
+        self.databasePath = database_path
+        self.storageProfile = opts.get('__dbprofile', 'default')
+        self.storagePragmas = opts.get('__dbpragmas')
 
-            try:
-                rx = re.compile(qry, re.IGNORECASE | re.DOTALL)
-                ret = rx.match(data)
-            except Exception:
-                return False
-            return ret is not None
+        try:
+            self.applyStorageProfile(self.storageProfile, self.storagePragmas)
+        except sqlite3.Error as e:
+            raise IOError(f"Error tuning internal database {database_path}") from e
 
         # Now we actually check to ensure the database file has the schema set
         # up correctly.
         with self.dbhLock:
             try:
                 self.dbh.execute('SELECT COUNT(*) FROM tbl_scan_config')
-                self.conn.create_function("REGEXP", 2, __dbregex__)
+                self.conn.create_function("REGEXP", 2, self.__dbregex__)
             except sqlite3.Error:
                 init = True
                 try:
@@ -375,6 +422,15 @@ class SpiderFootDb:
                                   "your SpiderFoot database in order to proceed.") from None
 
             if init:
+                # Add any indexes which are newer than the database
+                try:
+                    for query in self.createSchemaQueries:
+                        if query.startswith("CREATE INDEX IF NOT EXISTS"):
+                            self.dbh.execute(query)
+                    self.conn.commit()
+                except sqlite3.Error as e:
+                    raise IOError("Could not create indexes in the SpiderFoot database") from e
+
                 for row in self.eventDetails:
                     event = row[0]
                     event_descr = row[1]
@@ -391,6 +447,145 @@ class SpiderFootDb:
                         continue
                 self.conn.commit()
 
+    @staticmethod
+    def __dbregex__(qry: str, data: str) -> bool:
+        """SQLite doesn't support regex queries, so we create
+        a custom function to do so.
+
+        Args:
+            qry (str): TBD
+            data (str): TBD
+
+        Returns:
+            bool: matches
+        """
+
+        try:
+            rx = re.compile(qry, re.IGNORECASE | re.DOTALL)
+            ret = rx.match(data)
+        except Exception:
+            return False
+        return ret is not None
+
+    def applyStorageProfile(self, profile: str, pragmas: dict = None, dbh=None) -> None:
+        """Apply a storage profile to a database connection.
+
+        Args:
+            profile (str): name of the profile in storageProfiles
+            pragmas (dict): PRAGMA values overriding those in the profile
+            dbh: SQLite cursor() for the connection to tune (default: this handle)
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if not isinstance(profile, str):
+            raise TypeError(f"profile is {type(profile)}; expected str()") from None
+
+        if profile not in self.storageProfiles:
+            raise ValueError(f"Unknown database storage profile: {profile}") from None
+
+        if pragmas is None:
+            pragmas = dict()
+
+        if not isinstance(pragmas, dict):
+            raise TypeError(f"pragmas is {type(pragmas)}; expected dict()") from None
+
+        settings = dict(self.storageProfiles[profile])
+        settings.update(pragmas)
+
+        # PRAGMA statements can't take bound parameters
+        for pragma, value in settings.items():
+            if not re.match(r'^[a-z_]+$', str(pragma)):
+                raise ValueError(f"Invalid PRAGMA name: {pragma}") from None
+            if not re.match(r'^-?\w+$', str(value)):
+                raise ValueError(f"Invalid value for PRAGMA {pragma}: {value}") from None
+
+        if dbh is None:
+            dbh = self.dbh
+
+        # set the busy timeout first, so that the other PRAGMAs wait for
+        # locks held by other connections rather than failing
+        if 'busy_timeout' in settings:
+            dbh.execute(f"PRAGMA busy_timeout={settings.pop('busy_timeout')}")
+
+        # the journal mode is persistent, and changing it needs an exclusive lock
+        if 'journal_mode' in settings:
+            journalMode = settings.pop('journal_mode')
+            dbh.execute("PRAGMA journal_mode")
+            if dbh.fetchone()[0].lower() != str(journalMode).lower():
+                dbh.execute(f"PRAGMA journal_mode={journalMode}")
+
+        for pragma, value in settings.items():
+            dbh.execute(f"PRAGMA {pragma}={value}")
+
+    @contextmanager
+    def readCursor(self):
+        """Cursor on this thread's read-only connection to the database.
+
+        Reads don't take the writer lock, so concurrent readers (e.g. web UI
+        requests) don't queue up behind each other or behind scan writes.
+
+        Yields:
+            sqlite3.Cursor: cursor, closed on exit
+
+        Raises:
+            IOError: database I/O failed
+        """
+        connections = getattr(self.readConnections, 'connections', None)
+        if connections is None:
+            connections = self.readConnections.connections = dict()
+
+        conn = connections.get(self.databasePath)
+        if conn is None:
+            try:
+                # autocommit, so that a read transaction (snapshot) is never left open
+                conn = sqlite3.connect(f"{Path(self.databasePath).resolve().as_uri()}?mode=ro", uri=True, isolation_level=None)
+                conn.text_factory = str
+                conn.create_function("REGEXP", 2, self.__dbregex__)
+                self.applyStorageProfile(self.storageProfile, self.storagePragmas, conn.cursor())
+            except sqlite3.Error as e:
+                raise IOError(f"Error connecting to internal database {self.databasePath}") from e
+            connections[self.databasePath] = conn
+
+        dbh = conn.cursor()
+        try:
+            yield dbh
+        finally:
+            # don't hold the read snapshot open
+            dbh.close()
+
+    def readRows(self, qry: str, qvars: list, errorMessage: str, batchSize: int = 1000):
+        """Run a query on this thread's read-only connection and yield the
+        rows a batch at a time, so that large result sets are never held
+        in memory all at once.
+
+        The read snapshot is held open until the generator is exhausted or
+        closed.
+
+        Args:
+            qry (str): SQL query
+            qvars (list): query parameters
+            errorMessage (str): message of the IOError raised if the query fails
+            batchSize (int): number of rows to fetch at a time
+
+        Yields:
+            tuple: row
+
+        Raises:
+            IOError: database I/O failed
+        """
+        with self.readCursor() as dbh:
+            try:
+                dbh.execute(qry, qvars)
+                while True:
+                    rows = dbh.fetchmany(batchSize)
+                    if not rows:
+                        return
+                    yield from rows
+            except sqlite3.Error as e:
+                raise IOError(errorMessage) from e
+
     #
     # Back-end database operations
     #
@@ -448,6 +643,23 @@ class SpiderFootDb:
     def search(self, criteria: dict, filterFp: bool = False) -> list:
         """Search database.
 
+        Args:
+            criteria (dict): search criteria (see searchIter())
+            filterFp (bool): filter out false positives
+
+        Returns:
+            list: search results
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+            IOError: database I/O failed
+        """
+        return list(self.searchIter(criteria, filterFp))
+
+    def searchIter(self, criteria: dict, filterFp: bool = False):
+        """Search database, yielding the results as they are read.
+
         Args:
             criteria (dict): search criteria such as:
                 - scan_id (search within a scan, if omitted search all)
@@ -458,7 +670,7 @@ class SpiderFootDb:
             filterFp (bool): filter out false positives
 
         Returns:
-            list: search results
+            generator: search results
 
         Raises:
             TypeError: arg type was invalid
@@ -521,12 +733,7 @@ class SpiderFootDb:
 
         qry += " ORDER BY c.data"
 
-        with self.dbhLock:
-            try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
-            except sqlite3.Error as e:
-                raise IOError("SQL error encountered when fetching search results") from e
+        return self.readRows(qry, qvars, "SQL error encountered when fetching search results")
 
     def eventTypes(self) -> list:
         """Get event types.
@@ -539,10 +746,10 @@ class SpiderFootDb:
         """
 
         qry = "SELECT event_descr, event, event_raw, event_type FROM tbl_event_types"
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry)
-                return self.dbh.fetchall()
+                dbh.execute(qry)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when retrieving event types") from e
 
@@ -738,10 +945,10 @@ class SpiderFootDb:
             FROM tbl_scan_instance WHERE guid = ?"
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchone()
+                dbh.execute(qry, qvars)
+                return dbh.fetchone()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when retrieving scan instance") from e
 
@@ -792,10 +999,10 @@ class SpiderFootDb:
 
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching result summary") from e
 
@@ -837,10 +1044,10 @@ class SpiderFootDb:
 
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching correlation summary") from e
 
@@ -869,13 +1076,45 @@ class SpiderFootDb:
 
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching correlation list") from e
 
+    def scanCorrelationResultEvents(self, instanceId: str) -> dict:
+        """Obtain the rule, title and events of each correlation from a scan.
+
+        Args:
+            instanceId (str): scan instance ID
+
+        Returns:
+            dict: rule ID, title and list of event hashes, by correlation ID
+
+        Raises:
+            TypeError: arg type was invalid
+            IOError: database I/O failed
+        """
+
+        if not isinstance(instanceId, str):
+            raise TypeError(f"instanceId is {type(instanceId)}; expected str()") from None
+
+        qry = "SELECT c.id, c.rule_id, c.title, e.event_hash FROM \
+            tbl_scan_correlation_results c LEFT JOIN tbl_scan_correlation_results_events e \
+            ON c.id = e.correlation_id \
+            WHERE c.scan_instance_id = ?"
+
+        qvars = [instanceId]
+
+        correlations = dict()
+        for row in self.readRows(qry, qvars, "SQL error encountered when fetching correlation events"):
+            if row[0] not in correlations:
+                correlations[row[0]] = (row[1], row[2], list())
+            if row[3] is not None:
+                correlations[row[0]][2].append(row[3])
+        return correlations
+
     def scanResultEvent(
         self,
         instanceId: str,
@@ -900,6 +1139,36 @@ class SpiderFootDb:
         Returns:
             list: scan results
 
+        Raises:
+            TypeError: arg type was invalid
+            IOError: database I/O failed
+        """
+        return list(self.scanResultEventIter(instanceId, eventType, srcModule, data, sourceId, correlationId, filterFp))
+
+    def scanResultEventIter(
+        self,
+        instanceId: str,
+        eventType: str = 'ALL',
+        srcModule: str = None,
+        data: list = None,
+        sourceId: list = None,
+        correlationId: str = None,
+        filterFp: bool = False
+    ):
+        """Obtain the data for a scan and event type, yielding the results as they are read.
+
+        Args:
+            instanceId (str): scan instance ID
+            eventType (str): filter by event type
+            srcModule (str): filter by the generating module
+            data (list): filter by the data
+            sourceId (list): filter by the ID of the source event
+            correlationId (str): filter by the ID of a correlation result
+            filterFp (bool): filter false positives
+
+        Returns:
+            generator: scan results
+
         Raises:
             TypeError: arg type was invalid
             IOError: database I/O failed
@@ -921,7 +1190,9 @@ class SpiderFootDb:
         if correlationId:
             qry += ", tbl_scan_correlation_results_events ce "
 
-        qry += "WHERE c.scan_instance_id = ? AND c.source_event_hash = s.hash AND \
+        # The unary + stops SQLite from applying a sourceId list to s.hash
+        # as well, which makes it look up every ID in the list for each result.
+        qry += "WHERE c.scan_instance_id = ? AND +c.source_event_hash = s.hash AND \
             s.scan_instance_id = c.scan_instance_id AND t.event = c.type"
 
         qvars = [instanceId]
@@ -967,13 +1238,179 @@ class SpiderFootDb:
 
         qry += " ORDER BY c.data"
 
-        with self.dbhLock:
+        return self.readRows(qry, qvars, "SQL error encountered when fetching result events")
+
+    def scanResultEventPage(
+        self,
+        instanceId: str,
+        eventType: str = 'ALL',
+        srcModule: str = None,
+        minRisk: int = None,
+        filterFp: bool = False,
+        sortBy: str = 'generated',
+        reverse: bool = False,
+        after: list = None,
+        limit: int = 100
+    ) -> list:
+        """Obtain a page of the data for a scan.
+
+        Pages are found by their position in the sort order (keyset
+        pagination) rather than an offset, so fetching any page only
+        reads the rows on that page.
+
+        Args:
+            instanceId (str): scan instance ID
+            eventType (str): filter by event type
+            srcModule (str): filter by the generating module
+            minRisk (int): filter by minimum risk
+            filterFp (bool): filter false positives
+            sortBy (str): column to sort by (generated, data, type, module or risk)
+            reverse (bool): sort in descending order
+            after (list): sort key of the last row of the previous page
+            limit (int): maximum number of results
+
+        Returns:
+            list: scan results, as for scanResultEvent(), each followed by
+                  the row's sort key to pass as 'after' for the next page
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+            IOError: database I/O failed
+        """
+
+        if not isinstance(instanceId, str):
+            raise TypeError(f"instanceId is {type(instanceId)}; expected str()") from None
+
+        if not isinstance(eventType, str):
+            raise TypeError(f"eventType is {type(eventType)}; expected str()") from None
+
+        if sortBy not in self.resultSortColumns:
+            raise ValueError(f"Invalid sort column: {sortBy}") from None
+
+        if not isinstance(limit, int):
+            raise TypeError(f"limit is {type(limit)}; expected int()") from None
+
+        if limit < 1:
+            raise ValueError(f"Invalid limit: {limit}") from None
+
+        if after is not None and (not isinstance(after, (list, tuple)) or len(after) != 2):
+            raise ValueError("after must be the sort key of a result") from None
+
+        sortColumn = self.resultSortColumns[sortBy]
+
+        qry = f"SELECT ROUND(c.generated) AS generated, c.data, \
+            s.data as 'source_data', \
+            c.module, c.type, c.confidence, c.visibility, c.risk, c.hash, \
+            c.source_event_hash, t.event_descr, t.event_type, s.scan_instance_id, \
+            c.false_positive as 'fp', s.false_positive as 'parent_fp', \
+            {sortColumn}, c.rowid \
+            FROM tbl_scan_results c, tbl_scan_results s, tbl_event_types t \
+            WHERE c.scan_instance_id = ? AND c.source_event_hash = s.hash AND \
+            s.scan_instance_id = c.scan_instance_id AND t.event = c.type"
+
+        qvars = [instanceId]
+
+        qry, qvars = self._resultFilters(qry, qvars, eventType, srcModule, minRisk, filterFp)
+
+        order = "DESC" if reverse else "ASC"
+
+        if after is not None:
+            qry += f" AND ({sortColumn}, c.rowid) {'<' if reverse else '>'} (?, ?)"
+            qvars.extend(after)
+
+        qry += f" ORDER BY {sortColumn} {order}, c.rowid {order} LIMIT ?"
+        qvars.append(limit)
+
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return [row[:15] + (list(row[15:]),) for row in dbh.fetchall()]
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching result events") from e
 
+    def scanResultEventCount(
+        self,
+        instanceId: str,
+        eventType: str = 'ALL',
+        srcModule: str = None,
+        minRisk: int = None,
+        filterFp: bool = False
+    ) -> int:
+        """Estimate the number of results for a scan.
+
+        Only the indexes of the results table are read, so results whose
+        source event is missing are still counted.
+
+        Args:
+            instanceId (str): scan instance ID
+            eventType (str): filter by event type
+            srcModule (str): filter by the generating module
+            minRisk (int): filter by minimum risk
+            filterFp (bool): filter false positives
+
+        Returns:
+            int: number of results
+
+        Raises:
+            TypeError: arg type was invalid
+            IOError: database I/O failed
+        """
+
+        if not isinstance(instanceId, str):
+            raise TypeError(f"instanceId is {type(instanceId)}; expected str()") from None
+
+        if not isinstance(eventType, str):
+            raise TypeError(f"eventType is {type(eventType)}; expected str()") from None
+
+        qry = "SELECT COUNT(*) FROM tbl_scan_results c WHERE c.scan_instance_id = ?"
+        qvars = [instanceId]
+
+        qry, qvars = self._resultFilters(qry, qvars, eventType, srcModule, minRisk, filterFp)
+
+        with self.readCursor() as dbh:
+            try:
+                dbh.execute(qry, qvars)
+                return dbh.fetchone()[0]
+            except sqlite3.Error as e:
+                raise IOError("SQL error encountered when counting result events") from e
+
+    def _resultFilters(self, qry: str, qvars: list, eventType: str, srcModule: str, minRisk: int, filterFp: bool) -> tuple:
+        """Add filters on scan results (aliased as 'c') to a query.
+
+        Args:
+            qry (str): query
+            qvars (list): query parameters
+            eventType (str): filter by event type
+            srcModule (str): filter by the generating module
+            minRisk (int): filter by minimum risk
+            filterFp (bool): filter false positives
+
+        Returns:
+            tuple: query and query parameters
+
+        Raises:
+            TypeError: arg type was invalid
+        """
+        if eventType != "ALL":
+            qry += " AND c.type = ?"
+            qvars.append(eventType)
+
+        if srcModule:
+            qry += " AND c.module = ?"
+            qvars.append(srcModule)
+
+        if minRisk is not None:
+            if not isinstance(minRisk, int):
+                raise TypeError(f"minRisk is {type(minRisk)}; expected int()") from None
+            qry += " AND c.risk >= ?"
+            qvars.append(minRisk)
+
+        if filterFp:
+            qry += " AND c.false_positive <> 1"
+
+        return qry, qvars
+
     def scanResultEventUnique(self, instanceId: str, eventType: str = 'ALL', filterFp: bool = False) -> list:
         """Obtain a unique list of elements.
 
@@ -1009,10 +1446,90 @@ class SpiderFootDb:
 
         qry += " GROUP BY type, data ORDER BY COUNT(*)"
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
+            except sqlite3.Error as e:
+                raise IOError("SQL error encountered when fetching unique result events") from e
+
+    def scanResultEventUniquePage(
+        self,
+        instanceId: str,
+        eventType: str = 'ALL',
+        filterFp: bool = False,
+        sortBy: str = 'count',
+        reverse: bool = False,
+        after: list = None,
+        limit: int = 100
+    ) -> list:
+        """Obtain a page of the unique list of elements.
+
+        Args:
+            instanceId (str): scan instance ID
+            eventType (str): filter by event type
+            filterFp (bool): filter false positives
+            sortBy (str): column to sort by (count, data or type)
+            reverse (bool): sort in descending order
+            after (list): sort key of the last row of the previous page
+            limit (int): maximum number of results
+
+        Returns:
+            list: unique scan results, as for scanResultEventUnique(), each
+                  followed by the row's sort key to pass as 'after' for the next page
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+            IOError: database I/O failed
+        """
+
+        if not isinstance(instanceId, str):
+            raise TypeError(f"instanceId is {type(instanceId)}; expected str()") from None
+
+        if not isinstance(eventType, str):
+            raise TypeError(f"eventType is {type(eventType)}; expected str()") from None
+
+        if sortBy not in self.uniqueResultSortColumns:
+            raise ValueError(f"Invalid sort column: {sortBy}") from None
+
+        if not isinstance(limit, int):
+            raise TypeError(f"limit is {type(limit)}; expected int()") from None
+
+        if limit < 1:
+            raise ValueError(f"Invalid limit: {limit}") from None
+
+        sortColumns = self.uniqueResultSortColumns[sortBy]
+
+        if after is not None and (not isinstance(after, (list, tuple)) or len(after) != len(sortColumns)):
+            raise ValueError("after must be the sort key of a result") from None
+
+        qry = f"SELECT data, type, COUNT(*), {', '.join(sortColumns)} FROM tbl_scan_results \
+            WHERE scan_instance_id = ?"
+        qvars = [instanceId]
+
+        if eventType != "ALL":
+            qry += " AND type = ?"
+            qvars.append(eventType)
+
+        if filterFp:
+            qry += " AND false_positive <> 1"
+
+        qry += " GROUP BY type, data"
+
+        order = "DESC" if reverse else "ASC"
+
+        if after is not None:
+            qry += f" HAVING ({', '.join(sortColumns)}) {'<' if reverse else '>'} ({', '.join(['?'] * len(sortColumns))})"
+            qvars.extend(after)
+
+        qry += f" ORDER BY {', '.join(f'{column} {order}' for column in sortColumns)} LIMIT ?"
+        qvars.append(limit)
+
+        with self.readCursor() as dbh:
+            try:
+                dbh.execute(qry, qvars)
+                return [row[:3] + (list(row[3:]),) for row in dbh.fetchall()]
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching unique result events") from e
 
@@ -1055,10 +1572,10 @@ class SpiderFootDb:
             qry += " LIMIT ?"
             qvars.append(str(limit))
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching scan logs") from e
 
@@ -1092,10 +1609,10 @@ class SpiderFootDb:
             qry += " LIMIT ?"
             qvars.append(str(limit))
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching scan errors") from e
 
@@ -1231,10 +1748,10 @@ class SpiderFootDb:
 
         retval = dict()
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry)
-                for [scope, opt, val] in self.dbh.fetchall():
+                dbh.execute(qry)
+                for [scope, opt, val] in dbh.fetchall():
                     if scope == "GLOBAL":
                         retval[opt] = val
                     else:
@@ -1325,10 +1842,10 @@ class SpiderFootDb:
 
         retval = dict()
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                for [component, opt, val] in self.dbh.fetchall():
+                dbh.execute(qry, qvars)
+                for [component, opt, val] in dbh.fetchall():
                     if component == "GLOBAL":
                         retval[opt] = val
                     else:
@@ -1344,6 +1861,16 @@ class SpiderFootDb:
             instanceId (str): scan instance ID
             sfEvent (SpiderFootEvent): event to be stored in the database
             truncateSize (int): truncate size for event data
+        """
+        self.scanEventStoreBatch(instanceId, [sfEvent], truncateSize)
+
+    def scanEventStoreBatch(self, instanceId: str, sfEvents: list, truncateSize: int = 0) -> None:
+        """Store a batch of events in the database, in a single transaction.
+
+        Args:
+            instanceId (str): scan instance ID
+            sfEvents (list): events (SpiderFootEvent) to be stored in the database
+            truncateSize (int): truncate size for event data
 
         Raises:
             TypeError: arg type was invalid
@@ -1358,65 +1885,78 @@ class SpiderFootDb:
         if not instanceId:
             raise ValueError("instanceId is empty") from None
 
-        if not isinstance(sfEvent, SpiderFootEvent):
-            raise TypeError(f"sfEvent is {type(sfEvent)}; expected SpiderFootEvent()") from None
+        if not isinstance(sfEvents, list):
+            raise TypeError(f"sfEvents is {type(sfEvents)}; expected list()") from None
+
+        inserts = []
+
+        for sfEvent in sfEvents:
+            if not isinstance(sfEvent, SpiderFootEvent):
+                raise TypeError(f"sfEvent is {type(sfEvent)}; expected SpiderFootEvent()") from None
+
+            if not isinstance(sfEvent.generated, float):
+                raise TypeError(f"sfEvent.generated is {type(sfEvent.generated)}; expected float()") from None
+
+            if not sfEvent.generated:
+                raise ValueError("sfEvent.generated is empty") from None
 
-        if not isinstance(sfEvent.generated, float):
-            raise TypeError(f"sfEvent.generated is {type(sfEvent.generated)}; expected float()") from None
+            if not isinstance(sfEvent.eventType, str):
+                raise TypeError(f"sfEvent.eventType is {type(sfEvent.eventType,)}; expected str()") from None
 
-        if not sfEvent.generated:
-            raise ValueError("sfEvent.generated is empty") from None
+            if not sfEvent.eventType:
+                raise ValueError("sfEvent.eventType is empty") from None
 
-        if not isinstance(sfEvent.eventType, str):
-            raise TypeError(f"sfEvent.eventType is {type(sfEvent.eventType,)}; expected str()") from None
+            if not isinstance(sfEvent.data, str):
+                raise TypeError(f"sfEvent.data is {type(sfEvent.data)}; expected str()") from None
 
-        if not sfEvent.eventType:
-            raise ValueError("sfEvent.eventType is empty") from None
+            if not sfEvent.data:
+                raise ValueError("sfEvent.data is empty") from None
 
-        if not isinstance(sfEvent.data, str):
-            raise TypeError(f"sfEvent.data is {type(sfEvent.data)}; expected str()") from None
+            if not isinstance(sfEvent.module, str):
+                raise TypeError(f"sfEvent.module is {type(sfEvent.module)}; expected str()") from None
 
-        if not sfEvent.data:
-            raise ValueError("sfEvent.data is empty") from None
+            if not sfEvent.module and sfEvent.eventType != "ROOT":
+                raise ValueError("sfEvent.module is empty") from None
 
-        if not isinstance(sfEvent.module, str):
-            raise TypeError(f"sfEvent.module is {type(sfEvent.module)}; expected str()") from None
+            if not isinstance(sfEvent.confidence, int):
+                raise TypeError(f"sfEvent.confidence is {type(sfEvent.confidence)}; expected int()") from None
 
-        if not sfEvent.module and sfEvent.eventType != "ROOT":
-            raise ValueError("sfEvent.module is empty") from None
+            if not 0 <= sfEvent.confidence <= 100:
+                raise ValueError(f"sfEvent.confidence value is {type(sfEvent.confidence)}; expected 0 - 100") from None
 
-        if not isinstance(sfEvent.confidence, int):
-            raise TypeError(f"sfEvent.confidence is {type(sfEvent.confidence)}; expected int()") from None
+            if not isinstance(sfEvent.visibility, int):
+                raise TypeError(f"sfEvent.visibility is {type(sfEvent.visibility)}; expected int()") from None
 
-        if not 0 <= sfEvent.confidence <= 100:
-            raise ValueError(f"sfEvent.confidence value is {type(sfEvent.confidence)}; expected 0 - 100") from None
+            if not 0 <= sfEvent.visibility <= 100:
+                raise ValueError(f"sfEvent.visibility value is {type(sfEvent.visibility)}; expected 0 - 100") from None
 
-        if not isinstance(sfEvent.visibility, int):
-            raise TypeError(f"sfEvent.visibility is {type(sfEvent.visibility)}; expected int()") from None
+            if not isinstance(sfEvent.risk, int):
+                raise TypeError(f"sfEvent.risk is {type(sfEvent.risk)}; expected int()") from None
 
-        if not 0 <= sfEvent.visibility <= 100:
-            raise ValueError(f"sfEvent.visibility value is {type(sfEvent.visibility)}; expected 0 - 100") from None
+            if not 0 <= sfEvent.risk <= 100:
+                raise ValueError(f"sfEvent.risk value is {type(sfEvent.risk)}; expected 0 - 100") from None
 
-        if not isinstance(sfEvent.risk, int):
-            raise TypeError(f"sfEvent.risk is {type(sfEvent.risk)}; expected int()") from None
+            if not isinstance(sfEvent.sourceEvent, SpiderFootEvent) and sfEvent.eventType != "ROOT":
+                raise TypeError(f"sfEvent.sourceEvent is {type(sfEvent.sourceEvent)}; expected str()") from None
 
-        if not 0 <= sfEvent.risk <= 100:
-            raise ValueError(f"sfEvent.risk value is {type(sfEvent.risk)}; expected 0 - 100") from None
+            if not isinstance(sfEvent.sourceEventHash, str):
+                raise TypeError(f"sfEvent.sourceEventHash is {type(sfEvent.sourceEventHash)}; expected str()") from None
 
-        if not isinstance(sfEvent.sourceEvent, SpiderFootEvent) and sfEvent.eventType != "ROOT":
-            raise TypeError(f"sfEvent.sourceEvent is {type(sfEvent.sourceEvent)}; expected str()") from None
+            if not sfEvent.sourceEventHash:
+                raise ValueError("sfEvent.sourceEventHash is empty") from None
 
-        if not isinstance(sfEvent.sourceEventHash, str):
-            raise TypeError(f"sfEvent.sourceEventHash is {type(sfEvent.sourceEventHash)}; expected str()") from None
+            storeData = sfEvent.data
 
-        if not sfEvent.sourceEventHash:
-            raise ValueError("sfEvent.sourceEventHash is empty") from None
+            # truncate if required
+            if isinstance(truncateSize, int) and truncateSize > 0:
+                storeData = storeData[0:truncateSize]
 
-        storeData = sfEvent.data
+            inserts.append((instanceId, sfEvent.hash, sfEvent.eventType, sfEvent.generated,
+                            sfEvent.confidence, sfEvent.visibility, sfEvent.risk,
+                            sfEvent.module, storeData, sfEvent.sourceEventHash))
 
-        # truncate if required
-        if isinstance(truncateSize, int) and truncateSize > 0:
-            storeData = storeData[0:truncateSize]
+        if not inserts:
+            return
 
         # retrieve scan results
         qry = "INSERT INTO tbl_scan_results \
@@ -1424,15 +1964,13 @@ class SpiderFootDb:
             visibility, risk, module, data, source_event_hash) \
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
 
-        qvals = [instanceId, sfEvent.hash, sfEvent.eventType, sfEvent.generated,
-                 sfEvent.confidence, sfEvent.visibility, sfEvent.risk,
-                 sfEvent.module, storeData, sfEvent.sourceEventHash]
-
         with self.dbhLock:
             try:
-                self.dbh.execute(qry, qvals)
+                self.dbh.executemany(qry, inserts)
                 self.conn.commit()
             except sqlite3.Error as e:
+                # don't leave part of the batch to be committed with a later one
+                self.conn.rollback()
                 raise IOError(f"SQL error encountered when storing event data ({self.dbh})") from e
 
     def scanInstanceList(self) -> list:
@@ -1459,10 +1997,10 @@ class SpiderFootDb:
             SELECT distinct scan_instance_id FROM tbl_scan_results WHERE type <> 'ROOT') \
             ORDER BY started DESC"
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry)
-                return self.dbh.fetchall()
+                dbh.execute(qry)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when fetching scan list") from e
 
@@ -1488,10 +2026,10 @@ class SpiderFootDb:
                 WHERE scan_instance_id = ? GROUP BY hourmin, type"
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError(f"SQL error encountered when fetching history for scan {instanceId}") from e
 
@@ -1539,10 +2077,10 @@ class SpiderFootDb:
             t.event = c.type AND c.hash in ('%s')" % "','".join(hashIds)
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when getting source element IDs") from e
 
@@ -1583,15 +2121,15 @@ class SpiderFootDb:
             c.source_event_hash, t.event_descr, t.event_type, s.scan_instance_id, \
             c.false_positive as 'fp', s.false_positive as 'parent_fp' \
             FROM tbl_scan_results c, tbl_scan_results s, tbl_event_types t \
-            WHERE c.scan_instance_id = ? AND c.source_event_hash = s.hash AND \
+            WHERE c.scan_instance_id = ? AND +c.source_event_hash = s.hash AND \
             s.scan_instance_id = c.scan_instance_id AND \
-            t.event = c.type AND s.hash in ('%s')" % "','".join(hashIds)
+            t.event = c.type AND c.source_event_hash in ('%s')" % "','".join(hashIds)
         qvars = [instanceId]
 
-        with self.dbhLock:
+        with self.readCursor() as dbh:
             try:
-                self.dbh.execute(qry, qvars)
-                return self.dbh.fetchall()
+                dbh.execute(qry, qvars)
+                return dbh.fetchall()
             except sqlite3.Error as e:
                 raise IOError("SQL error encountered when getting child element IDs") from e
 
@@ -1608,6 +2146,7 @@ class SpiderFootDb:
         Raises:
             TypeError: arg type was invalid
             ValueError: arg value was invalid
+            IOError: database I/O failed
         """
 
         if not isinstance(instanceId, str):
@@ -1619,53 +2158,102 @@ class SpiderFootDb:
         if not childData:
             raise ValueError("childData is empty")
 
-        # Get the first round of source IDs for the leafs
-        keepGoing = True
-        nextIds = list()
         datamap = dict()
-        pc = dict()
+        # parent ID -> child IDs, as an insertion-ordered set
+        children = dict()
+        parentIds = dict()
 
         for row in childData:
             # these must be unique values!
             parentId = row[9]
             childId = row[8]
             datamap[childId] = row
-
-            if parentId in pc:
-                if childId not in pc[parentId]:
-                    pc[parentId].append(childId)
-            else:
-                pc[parentId] = [childId]
+            children.setdefault(parentId, dict())[childId] = None
 
             # parents of the leaf set
-            if parentId not in nextIds:
-                nextIds.append(parentId)
-
-        while keepGoing:
-            parentSet = self.scanElementSourcesDirect(instanceId, nextIds)
-            nextIds = list()
-            keepGoing = False
-
-            for row in parentSet:
-                parentId = row[9]
-                childId = row[8]
-                datamap[childId] = row
-
-                if parentId in pc:
-                    if childId not in pc[parentId]:
-                        pc[parentId].append(childId)
-                else:
-                    pc[parentId] = [childId]
-                if parentId not in nextIds:
-                    nextIds.append(parentId)
+            parentIds[parentId] = None
+
+        # all the way up to ROOT
+        for row in self.scanElementSourcesRecursive(instanceId, list(parentIds)):
+            parentId = row[9]
+            childId = row[8]
+            datamap[childId] = row
+
+            # ROOT is its own source
+            if parentId == childId:
+                continue
 
-                # Prevent us from looping at root
-                if parentId != "ROOT":
-                    keepGoing = True
+            children.setdefault(parentId, dict())[childId] = None
 
-        datamap[parentId] = row
+        pc = {parentId: list(childIds) for parentId, childIds in children.items()}
         return [datamap, pc]
 
+    def scanElementSourcesRecursive(self, instanceId: str, elementIdList: list) -> list:
+        """Get the source IDs, types and data for a set of IDs and all of
+        their upstream sources, up to and including the ROOT event.
+
+        Args:
+            instanceId (str): scan instance ID
+            elementIdList (list): IDs of the elements to start from
+
+        Returns:
+            list: one row per element, aligned with scanElementSourcesDirect
+
+        Raises:
+            TypeError: arg type was invalid
+            IOError: database I/O failed
+        """
+
+        if not isinstance(instanceId, str):
+            raise TypeError(f"instanceId is {type(instanceId)}; expected str()") from None
+
+        if not isinstance(elementIdList, list):
+            raise TypeError(f"elementIdList is {type(elementIdList)}; expected list()") from None
+
+        hashIds = list(dict.fromkeys(hashId for hashId in elementIdList if hashId and hashId.isalnum()))
+
+        rows = list()
+        seen = set()
+
+        for i in range(0, len(hashIds), self.maxQueryIds):
+            chunk = hashIds[i:i + self.maxQueryIds]
+
+            # the output of this needs to be aligned with scanResultEvent,
+            # as other functions call both expecting the same output.
+            qry = "WITH RECURSIVE lineage(hash) AS ( \
+                SELECT hash FROM tbl_scan_results \
+                WHERE scan_instance_id = ? AND hash IN (" + ','.join(['?'] * len(chunk)) + ") \
+                UNION \
+                SELECT r.source_event_hash FROM tbl_scan_results r, lineage l \
+                WHERE r.scan_instance_id = ? AND r.hash = l.hash \
+            ) \
+            SELECT ROUND(c.generated) AS generated, c.data, \
+            s.data as 'source_data', \
+            c.module, c.type, c.confidence, c.visibility, c.risk, c.hash, \
+            c.source_event_hash, t.event_descr, t.event_type, s.scan_instance_id, \
+            c.false_positive as 'fp', s.false_positive as 'parent_fp', \
+            s.type, s.module, st.event_type as 'source_entity_type' \
+            FROM tbl_scan_results c, tbl_scan_results s, tbl_event_types t, \
+            tbl_event_types st \
+            WHERE c.scan_instance_id = ? AND c.source_event_hash = s.hash AND \
+            s.scan_instance_id = c.scan_instance_id AND st.event = s.type AND \
+            t.event = c.type AND c.hash IN (SELECT hash FROM lineage)"
+            qvars = [instanceId] + chunk + [instanceId, instanceId]
+
+            with self.readCursor() as dbh:
+                try:
+                    dbh.execute(qry, qvars)
+                    for row in dbh.fetchall():
+                        # sources shared by several chunks are only returned once
+                        if row[8] in seen:
+                            continue
+                        seen.add(row[8])
+                        rows.append(row)
+                except sqlite3.Error as e:
+                    raise IOError("SQL error encountered when getting source element IDs") from e
+
+        return rows
+
     def scanElementChildrenAll(self, instanceId: str, parentIds: list) -> list:
         """Get the full set of downstream IDs which are children of the supplied set of IDs.
 
@@ -1678,6 +2266,7 @@ class SpiderFootDb:
 
         Raises:
             TypeError: arg type was invalid
+            IOError: database I/O failed
 
         Note: This function is not the same as the scanElementParent* functions.
               This function returns only ids.
@@ -1689,30 +2278,32 @@ class SpiderFootDb:
         if not isinstance(parentIds, list):
             raise TypeError(f"parentIds is {type(parentIds)}; expected list()")
 
-        datamap = list()
-        keepGoing = True
-        nextIds = list()
+        hashIds = list(dict.fromkeys(hashId for hashId in parentIds if hashId and hashId.isalnum()))
 
-        nextSet = self.scanElementChildrenDirect(instanceId, parentIds)
-        for row in nextSet:
-            datamap.append(row[8])
+        datamap = dict()
 
-        for row in nextSet:
-            if row[8] not in nextIds:
-                nextIds.append(row[8])
+        for i in range(0, len(hashIds), self.maxQueryIds):
+            chunk = hashIds[i:i + self.maxQueryIds]
 
-        while keepGoing:
-            nextSet = self.scanElementChildrenDirect(instanceId, nextIds)
-            if nextSet is None or len(nextSet) == 0:
-                keepGoing = False
-                break
+            qry = "WITH RECURSIVE descendants(hash) AS ( \
+                SELECT hash FROM tbl_scan_results \
+                WHERE scan_instance_id = ? AND source_event_hash IN (" + ','.join(['?'] * len(chunk)) + ") \
+                UNION \
+                SELECT r.hash FROM tbl_scan_results r, descendants d \
+                WHERE r.scan_instance_id = ? AND r.source_event_hash = d.hash \
+            ) \
+            SELECT hash FROM descendants"
+            qvars = [instanceId] + chunk + [instanceId]
 
-            for row in nextSet:
-                datamap.append(row[8])
-                nextIds = list()
-                nextIds.append(row[8])
+            with self.readCursor() as dbh:
+                try:
+                    dbh.execute(qry, qvars)
+                    for row in dbh.fetchall():
+                        datamap[row[0]] = None
+                except sqlite3.Error as e:
+                    raise IOError("SQL error encountered when getting child element IDs") from e
 
-        return datamap
+        return list(datamap)
 
     def correlationResultCreate(
         self,
@@ -1769,34 +2360,101 @@ class SpiderFootDb:
         if not isinstance(eventHashes, list):
             raise TypeError(f"eventHashes is {type(eventHashes)}; expected list()")
 
-        uniqueId = str(hashlib.md5(str(time.time() + random.SystemRandom().randint(0, 99999999)).encode('utf-8')).hexdigest())  # noqa: DUO130
+        return self.correlationResultCreateBatch(instanceId, [
+            (ruleId, ruleName, ruleDescr, ruleRisk, ruleYaml, correlationTitle, eventHashes)
+        ])[0]
+
+    def correlationResultCreateBatch(self, instanceId: str, correlations: list, deleteIds: list = None) -> list:
+        """Create correlation results in the database, in a single transaction.
+
+        Args:
+            instanceId (str): scan instance ID
+            correlations (list): rule ID, rule name, rule description, rule risk level,
+                                 rule raw YAML, correlation title and the events mapped
+                                 to the correlation result, for each correlation result
+            deleteIds (list): IDs of correlation results of the scan to delete in the same transaction
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+            IOError: database I/O failed
+
+        Returns:
+            list: Correlation IDs created
+        """
+
+        if not isinstance(instanceId, str):
+            raise TypeError(f"instanceId is {type(instanceId)}; expected str()")
+
+        if not isinstance(correlations, list):
+            raise TypeError(f"correlations is {type(correlations)}; expected list()")
+
+        if deleteIds is None:
+            deleteIds = list()
+
+        if not isinstance(deleteIds, list):
+            raise TypeError(f"deleteIds is {type(deleteIds)}; expected list()")
+
+        results = list()
+        events = list()
+        uniqueIds = set()
+        for correlation in correlations:
+            if not isinstance(correlation, (list, tuple)):
+                raise TypeError(f"correlation is {type(correlation)}; expected tuple()")
+
+            if len(correlation) != 7:
+                raise ValueError(f"correlation has {len(correlation)} fields; expected 7")
+
+            ruleId, ruleName, ruleDescr, ruleRisk, ruleYaml, correlationTitle, eventHashes = correlation
+
+            for name, value in (('ruleId', ruleId), ('ruleName', ruleName), ('ruleDescr', ruleDescr),
+                                ('ruleRisk', ruleRisk), ('ruleYaml', ruleYaml), ('correlationTitle', correlationTitle)):
+                if not isinstance(value, str):
+                    raise TypeError(f"{name} is {type(value)}; expected str()")
+
+            if not isinstance(eventHashes, list):
+                raise TypeError(f"eventHashes is {type(eventHashes)}; expected list()")
+
+            # IDs are made up in quick succession, so make sure none are repeated
+            uniqueId = None
+            while uniqueId is None or uniqueId in uniqueIds:
+                uniqueId = str(hashlib.md5(str(time.time() + random.SystemRandom().randint(0, 99999999)).encode('utf-8')).hexdigest())  # noqa: DUO130
+            uniqueIds.add(uniqueId)
+
+            results.append((uniqueId, instanceId, correlationTitle, ruleName, ruleDescr, ruleRisk, ruleId, ruleYaml))
+            events.extend((uniqueId, eventHash) for eventHash in eventHashes)
 
         qry = "INSERT INTO tbl_scan_correlation_results \
             (id, scan_instance_id, title, rule_name, rule_descr, rule_risk, rule_id, rule_logic) \
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
 
+        # Map events to the correlation result
+        eventQry = "INSERT INTO tbl_scan_correlation_results_events \
+            (correlation_id, event_hash) \
+            VALUES (?, ?)"
+
+        deleteQry = "DELETE FROM tbl_scan_correlation_results WHERE scan_instance_id = ? AND id = ?"
+        deleteEventsQry = "DELETE FROM tbl_scan_correlation_results_events WHERE correlation_id = ? \
+            AND correlation_id IN (SELECT id FROM tbl_scan_correlation_results WHERE scan_instance_id = ?)"
+
         with self.dbhLock:
             try:
-                self.dbh.execute(qry, (
-                    uniqueId, instanceId, correlationTitle, ruleName, ruleDescr, ruleRisk, ruleId, ruleYaml
-                ))
+                self.dbh.executemany(deleteEventsQry, [(deleteId, instanceId) for deleteId in deleteIds])
+                self.dbh.executemany(deleteQry, [(instanceId, deleteId) for deleteId in deleteIds])
+                self.dbh.executemany(qry, results)
+                self.dbh.executemany(eventQry, events)
                 self.conn.commit()
             except sqlite3.Error as e:
+                self.conn.rollback()
                 raise IOError("Unable to create correlation result in database") from e
 
-        # Map events to the correlation result
-        qry = "INSERT INTO tbl_scan_correlation_results_events \
-            (correlation_id, event_hash) \
-            VALUES (?, ?)"
+        return [result[0] for result in results]
+
+
+def _resetReadConnections() -> None:
+    """Don't let forked processes (e.g. scans) use their parent's read connections."""
+    SpiderFootDb.readConnections = threading.local()
 
-        with self.dbhLock:
-            for eventHash in eventHashes:
-                try:
-                    self.dbh.execute(qry, (
-                        uniqueId, eventHash
-                    ))
-                    self.conn.commit()
-                except sqlite3.Error as e:
-                    raise IOError("Unable to create correlation result in database") from e
 
-        return uniqueId
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_resetReadConnections)
@@ -1,7 +1,24 @@
 import hashlib
-import random
+import itertools
+import os
+import sys
 import time
 
+# Unique event IDs are made from a per-process random prefix and a counter,
+# rather than asking the OS for random data for every event.
+_idPrefix = os.urandom(8).hex()
+_idCounter = itertools.count()
+
+
+def _resetIdPrefix() -> None:
+    """Give forked processes (e.g. scans) their own event ID prefix."""
+    global _idPrefix
+    _idPrefix = os.urandom(8).hex()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_resetIdPrefix)
+
 
 class SpiderFootEvent():
     """SpiderFootEvent object representing identified data and associated meta data.
@@ -19,21 +36,26 @@ class SpiderFootEvent():
         hash (str): Unique SHA256 hash of the event, or "ROOT"
         moduleDataSource (str): Module data source
         actualSource (str): Source data of parent event
-        __id (str): Unique ID of the event, generated using eventType, generated, module, and a random integer
+        frozen (bool): Whether the event is read-only
+        __id (int): Sequence number of the event, unique within this process. Hashed with eventType, generated, module and a per-process random prefix
     """
 
-    _generated = None
-    _eventType = None
-    _confidence = None
-    _visibility = None
-    _risk = None
-    _module = None
-    _data = None
-    _sourceEvent = None
-    _sourceEventHash = None
-    _moduleDataSource = None
-    _actualSource = None
-    __id = None
+    # Events are created in very large numbers, so avoid a __dict__ per event.
+    __slots__ = (
+        '_generated',
+        '_eventType',
+        '_confidence',
+        '_visibility',
+        '_risk',
+        '_module',
+        '_data',
+        '_sourceEvent',
+        '_moduleDataSource',
+        '_actualSource',
+        '_frozen',
+        '_hash',
+        '__id',
+    )
 
     def __init__(self, eventType: str, data: str, module: str, sourceEvent: 'SpiderFootEvent') -> None:
         """Initialize SpiderFoot event object.
@@ -43,16 +65,49 @@ class SpiderFootEvent():
             data (str): Event data, e.g. a URL, port number, webpage content, etc.
             module (str): Module from which the event originated
             sourceEvent (SpiderFootEvent): SpiderFootEvent event that triggered this event
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
         """
+        # This is the same validation as the property setters below, inlined
+        # (and in the same order) as this is a hot path.
+        if not isinstance(data, str):
+            raise TypeError(f"data is {type(data)}; expected str()")
+        if not data:
+            raise ValueError(f"data is empty: '{str(data)}'")
+
+        if not isinstance(eventType, str):
+            raise TypeError(f"eventType is {type(eventType)}; expected str()")
+        if not eventType:
+            raise ValueError("eventType is empty")
+
+        if not isinstance(module, str):
+            raise TypeError(f"module is {type(module )}; expected str()")
+        if not module and eventType != "ROOT":
+            raise ValueError("module is empty")
+
+        if eventType == "ROOT":
+            # "ROOT" is a special "hash" reserved for elements with no parent,
+            # such as targets provided via the web UI or CLI.
+            sourceEvent = None
+        elif not isinstance(sourceEvent, SpiderFootEvent):
+            raise TypeError(f"sourceEvent is {type(sourceEvent)}; expected SpiderFootEvent()")
+
         self._generated = time.time()
-        self.data = data
-        self.eventType = eventType
-        self.module = module
-        self.confidence = 100
-        self.visibility = 100
-        self.risk = 0
-        self.sourceEvent = sourceEvent
-        self.__id = f"{self.eventType}{self.generated}{self.module}{random.SystemRandom().randint(0, 99999999)}"
+        self._data = data
+        self._eventType = sys.intern(eventType)
+        self._module = sys.intern(module)
+        self._confidence = 100
+        self._visibility = 100
+        self._risk = 0
+        self._sourceEvent = sourceEvent
+        self._moduleDataSource = None
+        self._actualSource = None
+        self._frozen = False
+        # the hash is only computed when it is first asked for
+        self._hash = None
+        self.__id = next(_idCounter)
 
     @property
     def generated(self) -> float:
@@ -113,7 +168,9 @@ class SpiderFootEvent():
 
     @property
     def sourceEventHash(self) -> str:
-        return self._sourceEventHash
+        if self._sourceEvent is None:
+            return "ROOT"
+        return self._sourceEvent.hash
 
     @property
     def actualSource(self) -> str:
@@ -130,11 +187,13 @@ class SpiderFootEvent():
         Returns:
             str: unique SHA256 hash of the event, or "ROOT"
         """
-        if self.eventType == "ROOT":
+        if self._eventType == "ROOT":
             return "ROOT"
 
-        digestStr = self.__id.encode('raw_unicode_escape')
-        return hashlib.sha256(digestStr).hexdigest()
+        if self._hash is None:
+            digestStr = f"{self._eventType}{self._generated}{self._module}{_idPrefix}{self.__id}".encode('raw_unicode_escape')
+            self._hash = hashlib.sha256(digestStr).hexdigest()
+        return self._hash
 
     @eventType.setter
     def eventType(self, eventType: str) -> None:
@@ -146,14 +205,18 @@ class SpiderFootEvent():
         Raises:
             TypeError: confidence type was invalid
             ValueError: confidence value was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set eventType")
+
         if not isinstance(eventType, str):
             raise TypeError(f"eventType is {type(eventType)}; expected str()")
 
         if not eventType:
             raise ValueError("eventType is empty")
 
-        self._eventType = eventType
+        self._eventType = sys.intern(eventType)
 
     @confidence.setter
     def confidence(self, confidence: int) -> None:
@@ -165,7 +228,11 @@ class SpiderFootEvent():
         Raises:
             TypeError: confidence type was invalid
             ValueError: confidence value was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set confidence")
+
         if not isinstance(confidence, int):
             raise TypeError(f"confidence is {type(confidence)}; expected int()")
 
@@ -184,7 +251,11 @@ class SpiderFootEvent():
         Raises:
             TypeError: visibility type was invalid
             ValueError: visibility value was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set visibility")
+
         if not isinstance(visibility, int):
             raise TypeError(f"visibility is {type(visibility)}; expected int()")
 
@@ -203,7 +274,11 @@ class SpiderFootEvent():
         Raises:
             TypeError: risk type was invalid
             ValueError: risk value was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set risk")
+
         if not isinstance(risk, int):
             raise TypeError(f"risk is {type(risk)}; expected int()")
 
@@ -222,14 +297,18 @@ class SpiderFootEvent():
         Raises:
             TypeError: module type was invalid
             ValueError: module value was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set module")
+
         if not isinstance(module, str):
             raise TypeError(f"module is {type(module )}; expected str()")
 
         if not module and self.eventType != "ROOT":
             raise ValueError("module is empty")
 
-        self._module = module
+        self._module = sys.intern(module)
 
     @data.setter
     def data(self, data: str) -> None:
@@ -241,7 +320,11 @@ class SpiderFootEvent():
         Raises:
             TypeError: data type was invalid
             ValueError: data value was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set data")
+
         if not isinstance(data, str):
             raise TypeError(f"data is {type(data)}; expected str()")
 
@@ -259,28 +342,53 @@ class SpiderFootEvent():
 
         Raises:
             TypeError: sourceEvent type was invalid
+            AttributeError: event is frozen
         """
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set sourceEvent")
+
         # "ROOT" is a special "hash" reserved for elements with no parent,
         # such as targets provided via the web UI or CLI.
         if self.eventType == "ROOT":
             self._sourceEvent = None
-            self._sourceEventHash = "ROOT"
             return
 
         if not isinstance(sourceEvent, SpiderFootEvent):
             raise TypeError(f"sourceEvent is {type(sourceEvent)}; expected SpiderFootEvent()")
 
         self._sourceEvent = sourceEvent
-        self._sourceEventHash = self.sourceEvent.hash
 
     @actualSource.setter
     def actualSource(self, actualSource: str) -> None:
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set actualSource")
+
         self._actualSource = actualSource
 
     @moduleDataSource.setter
     def moduleDataSource(self, moduleDataSource: str) -> None:
+        if self._frozen:
+            raise AttributeError("event is frozen; cannot set moduleDataSource")
+
         self._moduleDataSource = moduleDataSource
 
+    @property
+    def frozen(self) -> bool:
+        """Whether the event is read-only.
+
+        Returns:
+            bool: True if the event has been frozen
+        """
+        return self._frozen
+
+    def freeze(self) -> None:
+        """Make the event read-only.
+
+        Events are frozen once they have been handed to other modules, so
+        that one instance can be shared between all of them without copying.
+        """
+        self._frozen = True
+
     def asDict(self) -> dict:
         """Event object as dictionary.
 
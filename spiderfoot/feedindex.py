@@ -0,0 +1,423 @@
+import bisect
+import hashlib
+import ipaddress
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+
+from .iprangeindex import SpiderFootIpRangeIndex
+
+
+class _Records:
+    """Sequence of fixed-size records in a buffer, for bisect."""
+
+    def __init__(self, buf: memoryview, size: int) -> None:
+        self.buf = buf
+        self.size = size
+
+    def __len__(self) -> int:
+        return len(self.buf) // self.size
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.buf[i * self.size:(i + 1) * self.size].tobytes()
+
+
+class SpiderFootFeedIndex:
+    """Read-only index of the IP addresses, netblocks and host names in a
+    threat feed or block list, stored in a compact file which is memory-mapped.
+
+    A feed is parsed once into sorted arrays of IPv4 addresses, IPv6
+    addresses, host name hashes and merged netblock ranges (see
+    SpiderFootIpRangeIndex), so that lookups are binary searches instead
+    of scans of the feed. The index file is shared by every scan
+    and scanner process; the operating system keeps a single copy of it
+    in memory.
+
+    Host names are stored as 64-bit hashes, so (with a negligible
+    probability) a host name which isn't in the feed may be reported as
+    being in it.
+
+    Attributes:
+        path (str): index file
+        ipv4Count (int): number of IPv4 addresses
+        ipv6Count (int): number of IPv6 addresses
+        domainCount (int): number of host names
+        rangeCount (int): number of netblock ranges, after merging
+    """
+
+    # File format: magic (with byte order), counts, then each array, all
+    # in native byte order and aligned to 8 bytes.
+    magic = b'SFFEED2' + (b'<' if sys.byteorder == 'little' else b'>')
+    _header = struct.Struct('=8sQQQQQ')
+
+    # Per-process registry of open indexes, so that every scan in the
+    # process shares one mapping of each file.
+    _shared = dict()
+    _sharedLock = threading.Lock()
+    _buildLocks = dict()
+
+    def __init__(self, path: str) -> None:
+        """Open an index file.
+
+        Args:
+            path (str): index file
+
+        Raises:
+            TypeError: arg type was invalid
+            IOError: index file could not be read, or is not a valid index
+        """
+        if not isinstance(path, str):
+            raise TypeError(f"path is {type(path)}; expected str()")
+
+        self.path = path
+        self._load()
+
+    def __getstate__(self) -> dict:
+        return {'path': self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._load()
+
+    def _load(self) -> None:
+        """Map the index file and set up views of its arrays.
+
+        Raises:
+            IOError: index file could not be read, or is not a valid index
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise IOError(f"Unable to open feed index {self.path}: {e}") from None
+
+        buf = memoryview(self._mmap)
+        try:
+            magic, self.ipv4Count, self.ipv6Count, self.domainCount, ipv4Ranges, ipv6Ranges = self._header.unpack_from(buf)
+        except struct.error:
+            magic = None
+
+        offset = self._header.size
+        sizes = None
+        if magic == self.magic:
+            self.rangeCount = ipv4Ranges + ipv6Ranges
+            sizes = (
+                4 * self.ipv4Count, 16 * self.ipv6Count, 8 * self.domainCount,
+                4 * ipv4Ranges, 4 * ipv4Ranges, 16 * ipv6Ranges, 16 * ipv6Ranges
+            )
+        if sizes is None or offset + sum(self._align(s) for s in sizes) != len(buf):
+            buf.release()
+            self._mmap.close()
+            raise IOError(f"{self.path} is not a valid feed index")
+
+        views = list()
+        for size in sizes:
+            views.append(buf[offset:offset + size])
+            offset += self._align(size)
+
+        self._ipv4 = views[0].cast('I')
+        self._ipv6 = _Records(views[1], 16)
+        self._domains = views[2].cast('Q')
+        self._ranges = {
+            4: (views[3].cast('I'), views[4].cast('I')),
+            6: (_Records(views[5], 16), _Records(views[6], 16))
+        }
+
+    @staticmethod
+    def _align(size: int) -> int:
+        return (size + 7) & ~7
+
+    @staticmethod
+    def _domainHash(domain: str) -> int:
+        domain = domain.strip().lower().rstrip('.')
+        return int.from_bytes(hashlib.blake2b(domain.encode('utf-8', errors='replace'), digest_size=8).digest(), sys.byteorder)
+
+    @staticmethod
+    def _contains(values, value) -> bool:
+        i = bisect.bisect_left(values, value)
+        return i < len(values) and values[i] == value
+
+    @classmethod
+    def build(cls, path: str, entries) -> 'SpiderFootFeedIndex':
+        """Parse feed entries and write them to an index file.
+
+        The file is written to a temporary file which is then renamed, so
+        scans already using an older index of the feed are unaffected.
+
+        Args:
+            path (str): index file
+            entries (iterable): IP addresses, netblocks (CIDR notation) and host names in the feed
+
+        Returns:
+            SpiderFootFeedIndex: index
+
+        Raises:
+            TypeError: arg type was invalid
+            IOError: index file could not be written
+        """
+        if not isinstance(path, str):
+            raise TypeError(f"path is {type(path)}; expected str()")
+
+        ipv4 = set()
+        ipv6 = set()
+        domains = set()
+        ranges = {4: list(), 6: list()}
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+
+            if '/' in entry:
+                try:
+                    version, first, last = SpiderFootIpRangeIndex.parse(entry)
+                except ValueError:
+                    continue
+                ranges[version].append((first, last))
+                continue
+
+            if ':' in entry or entry[0].isdigit():
+                try:
+                    ip = ipaddress.ip_address(entry)
+                except ValueError:
+                    pass
+                else:
+                    if ip.version == 4:
+                        ipv4.add(int(ip))
+                    else:
+                        ipv6.add(ip.packed)
+                    continue
+
+            domains.add(cls._domainHash(entry))
+
+        ipv4Starts, ipv4Ends = SpiderFootIpRangeIndex.merge(ranges[4])
+        ipv6Starts, ipv6Ends = SpiderFootIpRangeIndex.merge(ranges[6])
+
+        sections = [
+            array('I', sorted(ipv4)).tobytes(),
+            b''.join(sorted(ipv6)),
+            array('Q', sorted(domains)).tobytes(),
+            array('I', ipv4Starts).tobytes(),
+            array('I', ipv4Ends).tobytes(),
+            b''.join(i.to_bytes(16, 'big') for i in ipv6Starts),
+            b''.join(i.to_bytes(16, 'big') for i in ipv6Ends)
+        ]
+
+        tmpPath = None
+        try:
+            dirName = os.path.dirname(path) or '.'
+            os.makedirs(dirName, exist_ok=True)
+            fd, tmpPath = tempfile.mkstemp(dir=dirName, prefix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(cls._header.pack(cls.magic, len(ipv4), len(ipv6), len(domains), len(ipv4Starts), len(ipv6Starts)))
+                for section in sections:
+                    f.write(section)
+                    f.write(b'\0' * (cls._align(len(section)) - len(section)))
+            os.replace(tmpPath, path)
+        except OSError as e:
+            if tmpPath:
+                try:
+                    os.unlink(tmpPath)
+                except OSError:
+                    pass
+            raise IOError(f"Unable to write feed index {path}: {e}") from None
+
+        return cls(path)
+
+    @classmethod
+    def shared(cls, path: str, maxAge: float, loader) -> 'SpiderFootFeedIndex':
+        """Index of a feed, shared by every scan.
+
+        If the index file is missing or older than maxAge seconds, loader is
+        called to retrieve and parse the feed, and the index is rebuilt.
+        Only one thread in the process rebuilds a given index at a time.
+
+        Args:
+            path (str): index file
+            maxAge (float): number of seconds after which the index is too old to be used (0 = no limit)
+            loader (callable): returns the IP addresses, netblocks and host names in the feed, or None if the feed could not be retrieved
+
+        Returns:
+            SpiderFootFeedIndex: index, or None if the feed could not be retrieved or indexed
+
+        Raises:
+            TypeError: arg type was invalid
+        """
+        if not isinstance(path, str):
+            raise TypeError(f"path is {type(path)}; expected str()")
+
+        if not callable(loader):
+            raise TypeError(f"loader is {type(loader)}; expected callable")
+
+        index = cls._openShared(path, maxAge)
+        if index is not None:
+            return index
+
+        with cls._sharedLock:
+            buildLock = cls._buildLocks.setdefault(path, threading.Lock())
+
+        with buildLock:
+            # another thread may have rebuilt the index while we waited
+            index = cls._openShared(path, maxAge)
+            if index is not None:
+                return index
+
+            entries = loader()
+            if entries is None:
+                return None
+
+            try:
+                index = cls.build(path, entries)
+            except IOError as e:
+                logging.getLogger(f"spiderfoot.{__name__}").error(str(e))
+                return None
+
+            with cls._sharedLock:
+                cls._shared[path] = (cls._fileId(os.stat(path)), index)
+
+            return index
+
+    @staticmethod
+    def _fileId(st: os.stat_result) -> tuple:
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def _openShared(cls, path: str, maxAge: float) -> 'SpiderFootFeedIndex':
+        """Open an index file, reusing the mapping already open in this process if the file hasn't changed.
+
+        Args:
+            path (str): index file
+            maxAge (float): number of seconds after which the index is too old to be used (0 = no limit)
+
+        Returns:
+            SpiderFootFeedIndex: index, or None if it is missing, too old or invalid
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        if maxAge and st.st_mtime <= time.time() - maxAge:
+            return None
+
+        fileId = cls._fileId(st)
+        with cls._sharedLock:
+            shared = cls._shared.get(path)
+            if shared is not None and shared[0] == fileId:
+                return shared[1]
+
+        try:
+            index = cls(path)
+        except IOError:
+            return None
+
+        with cls._sharedLock:
+            cls._shared[path] = (fileId, index)
+
+        return index
+
+    def __len__(self) -> int:
+        return self.ipv4Count + self.ipv6Count + self.domainCount + self.rangeCount
+
+    def containsIp(self, ip: str) -> bool:
+        """Check whether an IP address is in the feed, or within a netblock in the feed.
+
+        Args:
+            ip (str): IPv4 or IPv6 address
+
+        Returns:
+            bool: IP address is in the feed
+        """
+        try:
+            ip = ipaddress.ip_address(str(ip).strip())
+        except ValueError:
+            return False
+
+        if ip.version == 4:
+            value = int(ip)
+            if self._contains(self._ipv4, value):
+                return True
+        else:
+            value = ip.packed
+            if self._contains(self._ipv6, value):
+                return True
+
+        starts, ends = self._ranges[ip.version]
+        return SpiderFootIpRangeIndex.findContaining(starts, ends, value, value)
+
+    def containsDomain(self, domain: str) -> bool:
+        """Check whether a host name is in the feed.
+
+        Args:
+            domain (str): host name
+
+        Returns:
+            bool: host name is in the feed
+        """
+        if not domain:
+            return False
+
+        return self._contains(self._domains, self._domainHash(domain))
+
+    def intersects(self, netblock: str) -> bool:
+        """Check whether any IP address or netblock in the feed is within, or overlaps, a netblock.
+
+        Args:
+            netblock (str): IPv4 or IPv6 netblock, in CIDR notation
+
+        Returns:
+            bool: netblock overlaps the feed
+        """
+        try:
+            version, first, last = SpiderFootIpRangeIndex.parse(str(netblock))
+        except ValueError:
+            return False
+
+        if version == 4:
+            values = self._ipv4
+        else:
+            values = self._ipv6
+            first, last = first.to_bytes(16, 'big'), last.to_bytes(16, 'big')
+
+        i = bisect.bisect_left(values, first)
+        if i < len(values) and values[i] <= last:
+            return True
+
+        starts, ends = self._ranges[version]
+        return SpiderFootIpRangeIndex.findOverlapping(starts, ends, first, last)
+
+    def ipsInNetblock(self, netblock: str) -> list:
+        """IP addresses in the feed which are within a netblock.
+
+        Netblocks in the feed aren't included; see intersects().
+
+        Args:
+            netblock (str): IPv4 or IPv6 netblock, in CIDR notation
+
+        Returns:
+            list: IP addresses within the netblock
+        """
+        try:
+            net = ipaddress.ip_network(str(netblock).strip(), strict=False)
+        except ValueError:
+            return list()
+
+        if net.version == 4:
+            values = self._ipv4
+            first, last = int(net.network_address), int(net.broadcast_address)
+        else:
+            values = self._ipv6
+            first, last = net.network_address.packed, net.broadcast_address.packed
+
+        start = bisect.bisect_left(values, first)
+        end = bisect.bisect_right(values, last, start)
+
+        if net.version == 4:
+            return [str(ipaddress.IPv4Address(values[i])) for i in range(start, end)]
+
+        return [str(ipaddress.IPv6Address(values[i])) for i in range(start, end)]
@@ -0,0 +1,368 @@
+import ipaddress
+import urllib.parse
+from array import array
+from collections import Counter
+
+from publicsuffixlist import PublicSuffixList
+
+from .helpers import SpiderFootHelpers
+from .iprangeindex import SpiderFootIpRangeIndex
+
+
+class SpiderFootGraphSummary:
+    """Entity graph of a scan, for viewing at different levels of detail.
+
+    The graph is the same as the one exported by scanviz (see
+    SpiderFootHelpers.buildGraphData()), but rather than every entity
+    being a node, entities are collapsed into clusters, grouped by event
+    type, by the module which found them or by domain. Any of the clusters
+    can be expanded to show (the most connected of) their entities, while
+    the rest of the graph stays collapsed, so a view of even a very large
+    scan only has as many nodes as there are clusters plus the entities
+    asked for.
+
+    The graph is built once, and each grouping is computed the first time
+    it is used, after which a view only needs to look at the edges of the
+    expanded entities.
+
+    Attributes:
+        nodeCount (int): number of entities in the graph
+        edgeCount (int): number of (undirected) edges between entities
+    """
+
+    groupings = ('type', 'module', 'domain')
+
+    def __init__(self, roots: list, data, tldList: list = None) -> None:
+        """Build the entity graph of a scan.
+
+        Args:
+            roots (list): scan targets, which are flagged in views
+            data: scan results (as returned by SpiderFootDb.scanResultEvent()), as a list or iterator
+            tldList (list): public suffix list, used to group by domain. If not set, the list bundled with the publicsuffixlist package is used.
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if not isinstance(roots, (list, set, tuple)):
+            raise TypeError(f"roots is {type(roots)}; expected list()")
+
+        # event type and module of the first result for each entity
+        info = dict()
+        typeDescr = dict()
+
+        def record(rows):
+            for row in rows:
+                yield row
+                # only read after buildGraphData() has checked the row
+                if row[1] not in info and (row[11] == "ENTITY" or row[11] == "INTERNAL"):
+                    info[row[1]] = (row[4], row[3])
+                    typeDescr.setdefault(row[4], row[10])
+
+        mapping = SpiderFootHelpers.buildGraphData(record(data))
+
+        nodeIndex = dict()
+        self._values = list()
+        self._src = array('L')
+        self._dst = array('L')
+
+        for (dst, src) in mapping:
+            if dst == "ROOT" or src == "ROOT":
+                continue
+            # edges are undirected, so only keep one of a pair of reciprocal edges
+            if src < dst and (src, dst) in mapping:
+                continue
+            for value in (src, dst):
+                if value not in nodeIndex:
+                    nodeIndex[value] = len(self._values)
+                    self._values.append(value)
+            self._src.append(nodeIndex[src])
+            self._dst.append(nodeIndex[dst])
+        del mapping
+
+        self.nodeCount = len(self._values)
+        self.edgeCount = len(self._src)
+        self._types = [info[value][0] for value in self._values]
+        self._modules = [info[value][1] for value in self._values]
+        self._typeDescr = typeDescr
+        self._roots = set(nodeIndex[root] for root in roots if root in nodeIndex)
+        self._tldList = tldList
+
+        # adjacency lists, as offsets into a single array of neighbours
+        degree = array('L', [0]) * (self.nodeCount + 1)
+        for i in self._src:
+            degree[i] += 1
+        for i in self._dst:
+            degree[i] += 1
+        self._offsets = array('L', [0]) * (self.nodeCount + 1)
+        for i in range(self.nodeCount):
+            self._offsets[i + 1] = self._offsets[i] + degree[i]
+        fill = array('L', self._offsets)
+        self._neighbours = array('L', [0]) * (2 * self.edgeCount)
+        for a, b in zip(self._src, self._dst):
+            self._neighbours[fill[a]] = b
+            fill[a] += 1
+            self._neighbours[fill[b]] = a
+            fill[b] += 1
+
+        self._groups = dict()
+        self._views = dict()
+
+    def neighbours(self, node: int) -> array:
+        """Neighbours of an entity.
+
+        Args:
+            node (int): index of the entity
+
+        Returns:
+            array: indexes of the neighbouring entities
+        """
+        return self._neighbours[self._offsets[node]:self._offsets[node + 1]]
+
+    def degree(self, node: int) -> int:
+        """Number of edges of an entity.
+
+        Args:
+            node (int): index of the entity
+
+        Returns:
+            int: number of edges
+        """
+        return self._offsets[node + 1] - self._offsets[node]
+
+    def domain(self, value: str, psl: PublicSuffixList) -> str:
+        """Domain of an entity, for grouping by domain.
+
+        Host names, e-mail addresses and URLs are grouped by their
+        registered domain, and IP addresses by their /24 (IPv4) or /64
+        (IPv6) network. Anything else has no domain.
+
+        Args:
+            value (str): entity
+            psl (PublicSuffixList): public suffix list
+
+        Returns:
+            str: domain, or an empty string if the entity has no domain
+        """
+        host = value.strip()
+        if "://" in host:
+            host = urllib.parse.urlparse(host).hostname or ""
+        elif "@" in host:
+            host = host.rsplit("@", 1)[1]
+        host = host.lower().rstrip(".")
+
+        if not host or " " in host:
+            return ""
+
+        # no top level domain ends with a digit, so skip parsing most host names as IP addresses
+        if ":" in host or host[-1].isdigit():
+            try:
+                version, first, _ = SpiderFootIpRangeIndex.parse(host)
+            except ValueError:
+                pass
+            else:
+                if version == 4:
+                    return f"{ipaddress.IPv4Address(first >> 8 << 8)}/24"
+                return f"{ipaddress.IPv6Address(first >> 64 << 64)}/64"
+
+        if "." not in host:
+            return ""
+
+        return psl.privatesuffix(host) or ""
+
+    def group(self, groupBy: str) -> tuple:
+        """Cluster the entities by event type, module or domain.
+
+        Args:
+            groupBy (str): "type", "module" or "domain"
+
+        Returns:
+            tuple: cluster of each entity, cluster names, number of entities
+                   in each cluster, and number of edges between (or within)
+                   each pair of clusters
+
+        Raises:
+            ValueError: arg value was invalid
+        """
+        if groupBy not in self.groupings:
+            raise ValueError(f"Invalid grouping: {groupBy}")
+
+        if groupBy in self._groups:
+            return self._groups[groupBy]
+
+        if groupBy == "type":
+            keys = self._types
+        elif groupBy == "module":
+            keys = self._modules
+        else:
+            psl = PublicSuffixList(self._tldList, only_icann=True, accept_unknown=False)
+            keys = [self.domain(value, psl) for value in self._values]
+
+        clusterIndex = dict()
+        clusterOf = array('L')
+        for key in keys:
+            if key not in clusterIndex:
+                clusterIndex[key] = len(clusterIndex)
+            clusterOf.append(clusterIndex[key])
+
+        sizes = Counter(clusterOf)
+        edges = Counter()
+        for a, b in zip(self._src, self._dst):
+            ca, cb = clusterOf[a], clusterOf[b]
+            edges[(ca, cb) if ca <= cb else (cb, ca)] += 1
+
+        self._groups[groupBy] = (clusterOf, list(clusterIndex), sizes, edges)
+        return self._groups[groupBy]
+
+    def view(self, groupBy: str = "type", expand: list = None, limit: int = 500, clusterLimit: int = 100) -> dict:
+        """Graph with the entities collapsed into clusters, except for
+        those in the expanded clusters.
+
+        Only the largest clusters (and any expanded clusters) are shown
+        individually; the rest are shown as a single node. At most limit
+        entities of each expanded cluster are shown, those with the most
+        edges first, and the rest stay in the cluster.
+
+        Args:
+            groupBy (str): group entities by "type", "module" or "domain"
+            expand (list): names of clusters to expand
+            limit (int): maximum number of entities to show for each expanded cluster
+            clusterLimit (int): maximum number of clusters to show, other than expanded clusters
+
+        Returns:
+            dict: nodes, edges (with the number of edges between entities
+                  they represent as the weight), and the number of clusters,
+                  entities and edges in the whole graph
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if expand is None:
+            expand = list()
+
+        if isinstance(expand, str) or not isinstance(expand, (list, set, tuple)):
+            raise TypeError(f"expand is {type(expand)}; expected list()")
+
+        if not isinstance(limit, int):
+            raise TypeError(f"limit is {type(limit)}; expected int()")
+
+        if limit < 1:
+            raise ValueError(f"limit is {limit}; expected 1 or more")
+
+        if not isinstance(clusterLimit, int):
+            raise TypeError(f"clusterLimit is {type(clusterLimit)}; expected int()")
+
+        if clusterLimit < 1:
+            raise ValueError(f"clusterLimit is {clusterLimit}; expected 1 or more")
+
+        clusterOf, names, sizes, clusterEdges = self.group(groupBy)
+
+        nameIndex = {name: i for i, name in enumerate(names)}
+        expanded = set(nameIndex[name] for name in expand if name in nameIndex)
+
+        ranked = sorted(sizes, key=lambda cluster: (-sizes[cluster], names[cluster]))
+        shown = frozenset(ranked[:clusterLimit]) | expanded
+        clusterIds = [f"cluster:{name}" if cluster in shown else "other" for cluster, name in enumerate(names)]
+
+        # edges between the clusters shown, which only change when different clusters are shown
+        cached = self._views.get(groupBy)
+        if cached is None or cached[0] != shown:
+            edges = Counter()
+            internal = Counter()
+            for (ca, cb), count in clusterEdges.items():
+                a, b = clusterIds[ca], clusterIds[cb]
+                if a == b:
+                    internal[a] += count
+                else:
+                    edges[(a, b) if a < b else (b, a)] += count
+            cached = self._views[groupBy] = (shown, edges, internal)
+        edges = Counter(cached[1])
+        internal = Counter(cached[2])
+
+        members = {cluster: list() for cluster in expanded}
+        if expanded:
+            for node, cluster in enumerate(clusterOf):
+                if cluster in expanded:
+                    members[cluster].append(node)
+
+        visible = set()
+        remaining = Counter(sizes)
+        for cluster, nodes in members.items():
+            nodes.sort(key=lambda node: (-self.degree(node), self._values[node]))
+            visible.update(nodes[:limit])
+            remaining[cluster] -= len(nodes[:limit])
+
+        # move the edges of visible entities from their clusters to the entities
+        for node in visible:
+            nodeId = f"node:{self._values[node]}"
+            for other in self.neighbours(node):
+                if other in visible and other < node:
+                    continue
+                a, b = clusterIds[clusterOf[node]], clusterIds[clusterOf[other]]
+                if a == b:
+                    internal[a] -= 1
+                else:
+                    key = (a, b) if a < b else (b, a)
+                    edges[key] -= 1
+                    if not edges[key]:
+                        del edges[key]
+                target = f"node:{self._values[other]}" if other in visible else b
+                edges[(nodeId, target)] += 1
+
+        roots = set(clusterIds[clusterOf[node]] for node in self._roots if node not in visible)
+
+        nodes = list()
+        for cluster in ranked:
+            if cluster not in shown or not remaining[cluster]:
+                continue
+            name = names[cluster]
+            if groupBy == "type":
+                label = self._typeDescr.get(name) or name
+            else:
+                label = name or "(none)"
+            nodes.append({
+                'id': clusterIds[cluster],
+                'label': label,
+                'cluster': name,
+                'size': remaining[cluster],
+                'edges': internal[clusterIds[cluster]],
+                'expanded': cluster in expanded,
+                'root': clusterIds[cluster] in roots
+            })
+
+        others = [cluster for cluster in ranked if cluster not in shown]
+        if others:
+            nodes.append({
+                'id': "other",
+                'label': f"{len(others)} other clusters",
+                'cluster': None,
+                'size': sum(sizes[cluster] for cluster in others),
+                'edges': internal["other"],
+                'expanded': False,
+                'root': "other" in roots
+            })
+
+        for node in sorted(visible):
+            nodes.append({
+                'id': f"node:{self._values[node]}",
+                'label': self._values[node],
+                'cluster': names[clusterOf[node]],
+                'type': self._types[node],
+                'module': self._modules[node],
+                'size': 1,
+                'edges': self.degree(node),
+                'root': node in self._roots
+            })
+
+        return {
+            'groupBy': groupBy,
+            'nodes': nodes,
+            'edges': [
+                {'source': source, 'target': target, 'weight': weight}
+                for (source, target), weight in edges.items()
+            ],
+            'clusterCount': len(names),
+            'nodeCount': self.nodeCount,
+            'edgeCount': self.edgeCount
+        }
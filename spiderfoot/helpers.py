@@ -7,36 +7,18 @@ import random
 import re
 import ssl
 import sys
+import time
 import typing
 import urllib.parse
 import uuid
 from pathlib import Path
 from importlib import resources
 
-import networkx as nx
 from bs4 import BeautifulSoup, SoupStrainer
-from networkx.readwrite.gexf import GEXFWriter
 import phonenumbers
 
 
 if sys.version_info >= (3, 8):  # PEP 589 support (TypedDict)
-    class _GraphNode(typing.TypedDict):
-        id: str  # noqa: A003
-        label: str
-        x: int
-        y: int
-        size: str
-        color: str
-
-    class _GraphEdge(typing.TypedDict):
-        id: str  # noqa: A003
-        source: str
-        target: str
-
-    class _Graph(typing.TypedDict, total=False):
-        nodes: typing.List[_GraphNode]
-        edges: typing.List[_GraphEdge]
-
     class Tree(typing.TypedDict):
         name: str
         children: typing.Optional[typing.List["Tree"]]
@@ -45,14 +27,6 @@ if sys.version_info >= (3, 8):  # PEP 589 support (TypedDict)
         source: str
         original: str
 else:
-    _GraphNode = typing.Dict[str, typing.Union[str, int]]
-
-    _GraphEdge = typing.Dict[str, str]
-
-    _GraphObject = typing.Union[_GraphNode, _GraphEdge]
-
-    _Graph = typing.Dict[str, typing.List[_GraphObject]]
-
     _Tree_name = str
 
     _Tree_children = typing.Optional[typing.List["Tree"]]
@@ -437,48 +411,71 @@ class SpiderFootHelpers():
         Returns:
             str: GEXF formatted XML
         """
-        if not flt:
-            flt = []
+        return b"".join(SpiderFootHelpers.streamGraphGexf(root, title, data, flt))
 
+    @staticmethod
+    def streamGraphGexf(root: str, title: str, data: typing.List[str], flt: typing.Optional[typing.List[str]] = None) -> typing.Iterator[bytes]:
+        """Convert supplied raw data into GEXF (Graph Exchange XML Format) format,
+        a chunk at a time, without building the graph in memory.
+
+        Args:
+            root (str): TBD
+            title (str): unused
+            data (list[str]): Scan result as list or iterator
+            flt (list[str]): List of event types to include. If not set everything is included.
+
+        Returns:
+            generator: GEXF formatted XML, as chunks of bytes
+        """
         mapping = SpiderFootHelpers.buildGraphData(data, flt)
-        graph = nx.Graph()
 
-        nodelist: typing.Dict[str, int] = dict()
-        ncounter = 0
-        for pair in mapping:
-            (dst, src) = pair
+        def node(value: str) -> str:
+            red = 255 if value in root else 0
+            label = html.escape(value)
+            return (
+                f'      <node id="{label}" label="{label}">\n'
+                f'        <viz:color r="{red}" g="0" b="0" a="0" />\n'
+                '      </node>\n'
+            )
+
+        def generate() -> typing.Iterator[str]:
+            yield (
+                '<gexf xmlns:viz="http://www.gexf.net/1.2draft/viz" xmlns="http://www.gexf.net/1.2draft" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xsi:schemaLocation="http://www.gexf.net/1.2draft http://www.gexf.net/1.2draft/gexf.xsd" version="1.2">\n'
+                f'  <meta lastmodifieddate="{time.strftime("%Y-%m-%d")}">\n'
+                '    <creator>SpiderFoot</creator>\n'
+                '  </meta>\n'
+                '  <graph defaultedgetype="undirected" mode="static" name="">\n'
+                '    <nodes>\n'
+            )
+
+            nodes: typing.Set[str] = set()
+            for pair in mapping:
+                # Leave out this special case
+                if "ROOT" in pair:
+                    continue
+                for value in pair:
+                    if value not in nodes:
+                        nodes.add(value)
+                        yield node(value)
+            del nodes
 
-            # Leave out this special case
-            if dst == "ROOT" or src == "ROOT":
-                continue
+            yield '    </nodes>\n    <edges>\n'
 
-            color = {
-                'r': 0,
-                'g': 0,
-                'b': 0,
-                'a': 0
-            }
-
-            if dst not in nodelist:
-                ncounter = ncounter + 1
-                if dst in root:
-                    color['r'] = 255
-                graph.add_node(dst)
-                graph.nodes[dst]['viz'] = {'color': color}
-                nodelist[dst] = ncounter
-
-            if src not in nodelist:
-                ncounter = ncounter + 1
-                if src in root:
-                    color['r'] = 255
-                graph.add_node(src)
-                graph.nodes[src]['viz'] = {'color': color}
-                nodelist[src] = ncounter
-
-            graph.add_edge(src, dst)
-
-        gexf = GEXFWriter(graph=graph)
-        return str(gexf).encode('utf-8')
+            edgeId = 0
+            for (dst, src) in mapping:
+                if dst == "ROOT" or src == "ROOT":
+                    continue
+                # The graph is undirected, so only write one of a pair of reciprocal edges
+                if src < dst and (src, dst) in mapping:
+                    continue
+                yield f'      <edge source="{html.escape(src)}" target="{html.escape(dst)}" id="{edgeId}" />\n'
+                edgeId += 1
+
+            yield '    </edges>\n  </graph>\n</gexf>\n'
+
+        return SpiderFootHelpers.chunkText(generate())
 
     @staticmethod
     def buildGraphJson(root: str, data: typing.List[str], flt: typing.Optional[typing.List[str]] = None) -> str:
@@ -492,76 +489,87 @@ class SpiderFootHelpers():
         Returns:
             str: TBD
         """
-        if not flt:
-            flt = []
+        return b"".join(SpiderFootHelpers.streamGraphJson(root, data, flt)).decode('utf-8')
 
-        mapping = SpiderFootHelpers.buildGraphData(data, flt)
-        ret: _Graph = {}
-        ret['nodes'] = list()
-        ret['edges'] = list()
-
-        nodelist: typing.Dict[str, int] = dict()
-        ecounter = 0
-        ncounter = 0
-        for pair in mapping:
-            (dst, src) = pair
-            col = "#000"
-
-            # Leave out this special case
-            if dst == "ROOT" or src == "ROOT":
-                continue
-
-            if dst not in nodelist:
-                ncounter = ncounter + 1
-
-                if dst in root:
-                    col = "#f00"
-
-                ret['nodes'].append({
-                    'id': str(ncounter),
-                    'label': str(dst),
-                    'x': random.SystemRandom().randint(1, 1000),
-                    'y': random.SystemRandom().randint(1, 1000),
-                    'size': "1",
-                    'color': col
-                })
+    @staticmethod
+    def streamGraphJson(root: str, data: typing.List[str], flt: typing.Optional[typing.List[str]] = None) -> typing.Iterator[bytes]:
+        """Convert supplied raw data into JSON format for SigmaJS, a chunk at
+        a time, without building the graph in memory.
 
-                nodelist[dst] = ncounter
+        Args:
+            root (str): TBD
+            data (list[str]): Scan result as list or iterator
+            flt (list[str]): List of event types to include. If not set everything is included.
 
-            if src not in nodelist:
-                ncounter = ncounter + 1
+        Returns:
+            generator: JSON, as chunks of bytes
+        """
+        mapping = SpiderFootHelpers.buildGraphData(data, flt)
 
-                if src in root:
-                    col = "#f00"
+        def generate() -> typing.Iterator[str]:
+            rand = random.SystemRandom()
+            nodelist: typing.Dict[str, int] = dict()
 
-                ret['nodes'].append({
-                    'id': str(ncounter),
-                    'label': str(src),
-                    'x': random.SystemRandom().randint(1, 1000),
-                    'y': random.SystemRandom().randint(1, 1000),
-                    'size': "1",
-                    'color': col
-                })
+            yield '{"nodes": ['
+            for pair in mapping:
+                # Leave out this special case
+                if "ROOT" in pair:
+                    continue
+                for value in pair:
+                    if value in nodelist:
+                        continue
+                    nodelist[value] = len(nodelist) + 1
+                    # formatted directly, as json.dumps() of each node is much slower
+                    yield (
+                        f'{", " if len(nodelist) > 1 else ""}{{"id": "{nodelist[value]}", "label": {json.dumps(str(value))}, '
+                        f'"x": {rand.randint(1, 1000)}, "y": {rand.randint(1, 1000)}, "size": "1", '
+                        f'"color": "{"#f00" if value in root else "#000"}"}}'
+                    )
+
+            yield '], "edges": ['
+            ecounter = 0
+            for (dst, src) in mapping:
+                if dst == "ROOT" or src == "ROOT":
+                    continue
+                ecounter += 1
+                yield f'{", " if ecounter > 1 else ""}{{"id": "{ecounter}", "source": "{nodelist[src]}", "target": "{nodelist[dst]}"}}'
+            yield ']}'
 
-                nodelist[src] = ncounter
+        return SpiderFootHelpers.chunkText(generate())
 
-            ecounter = ecounter + 1
+    @staticmethod
+    def chunkText(parts: typing.Iterable[str], size: int = 65536) -> typing.Iterator[bytes]:
+        """Join strings into UTF-8 encoded chunks of roughly a given size.
 
-            ret['edges'].append({
-                'id': str(ecounter),
-                'source': str(nodelist[src]),
-                'target': str(nodelist[dst])
-            })
+        Args:
+            parts (typing.Iterable[str]): strings
+            size (int): minimum size of each chunk (except the last), in characters
 
-        return json.dumps(ret)
+        Yields:
+            bytes: chunk
+        """
+        chunk: typing.List[str] = list()
+        length = 0
+        for part in parts:
+            chunk.append(part)
+            length += len(part)
+            if length >= size:
+                yield "".join(chunk).encode('utf-8')
+                chunk = list()
+                length = 0
+        if chunk:
+            yield "".join(chunk).encode('utf-8')
 
     @staticmethod
     def buildGraphData(data: typing.List[str], flt: typing.Optional[typing.List[str]] = None) -> typing.Set[typing.Tuple[str, str]]:
         """Return a format-agnostic collection of tuples to use as the
         basis for building graphs in various formats.
 
+        Each entity is linked to its nearest entity ancestors, skipping
+        over any non-entity data elements in between.
+
         Args:
-            data (list[str]): Scan result as list
+            data (list[str]): Scan result as list or iterator
             flt (list[str]): List of event types to include. If not set everything is included.
 
         Returns:
@@ -574,32 +582,12 @@ class SpiderFootHelpers():
         if not flt:
             flt = []
 
-        if not isinstance(data, list):
+        if isinstance(data, (str, bytes, dict)) or not isinstance(data, typing.Iterable):
             raise TypeError(f"data is {type(data)}; expected list()")
 
-        if not data:
-            raise ValueError("data is empty")
-
-        def get_next_parent_entities(item: str, pids: typing.Optional[typing.List[str]] = None) -> typing.List[str]:
-            if not pids:
-                pids = []
-
-            ret: typing.List[str] = list()
-
-            for [parent, entity_id] in parents[item]:
-                if entity_id in pids:
-                    continue
-                if parent in entities:
-                    ret.append(parent)
-                else:
-                    pids.append(entity_id)
-                    for p in get_next_parent_entities(parent, pids):
-                        ret.append(p)
-            return ret
-
         mapping: typing.Set[typing.Tuple[str, str]] = set()
-        entities: typing.Dict[str, bool] = dict()
-        parents: typing.Dict[str, typing.List[typing.List[str]]] = dict()
+        entities: typing.Set[str] = set()
+        parents: typing.Dict[str, typing.List[str]] = dict()
 
         for row in data:
             if len(row) != 15:
@@ -609,29 +597,123 @@ class SpiderFootHelpers():
                 # List of all valid entity values
                 if len(flt) > 0:
                     if row[4] in flt or row[11] == "INTERNAL":
-                        entities[row[1]] = True
+                        entities.add(row[1])
                 else:
-                    entities[row[1]] = True
+                    entities.add(row[1])
 
             if row[1] not in parents:
                 parents[row[1]] = list()
-            parents[row[1]].append([row[2], row[8]])
+            parents[row[1]].append(row[2])
+
+        if not parents:
+            raise ValueError("data is empty")
+
+        nearest = SpiderFootHelpers.nearestEntities(parents, entities)
 
         for entity in entities:
-            for [parent, _id] in parents[entity]:
+            for parent in parents[entity]:
                 if parent in entities:
                     if entity != parent:
                         # Add entity parent
                         mapping.add((entity, parent))
                 else:
-                    # Check parent for entityship.
-                    next_parents = get_next_parent_entities(parent)
-                    for next_parent in next_parents:
+                    # Add the parent's nearest entity ancestors
+                    for next_parent in nearest(parent):
                         if entity != next_parent:
-                            # Add next entity parent
                             mapping.add((entity, next_parent))
         return mapping
 
+    @staticmethod
+    def nearestEntities(parents: typing.Dict[str, typing.List[str]], entities: typing.Set[str]) -> typing.Callable[[str], typing.FrozenSet[str]]:
+        """Build a function returning the nearest entity ancestors of a
+        non-entity data element.
+
+        The nearest entity ancestors of an element are its entity parents,
+        plus the nearest entity ancestors of its non-entity parents. Each
+        element's ancestors are only computed once, and elements in a cycle
+        (which share the same ancestors) are found with an iterative
+        version of Tarjan's strongly connected components algorithm, so
+        deep chains of elements don't hit the recursion limit.
+
+        Args:
+            parents (dict[str, list[str]]): parent data elements of each data element
+            entities (set[str]): data elements which are entities
+
+        Returns:
+            callable: function returning the nearest entity ancestors of a data element
+        """
+        empty: typing.FrozenSet[str] = frozenset()
+        memo: typing.Dict[str, typing.FrozenSet[str]] = dict()
+
+        def nearest(start: str) -> typing.FrozenSet[str]:
+            if start in memo:
+                return memo[start]
+
+            # depth first search state of elements not yet resolved
+            index: typing.Dict[str, int] = dict()
+            low: typing.Dict[str, int] = dict()
+            found: typing.Dict[str, list] = dict()
+            stack: typing.List[str] = list()
+
+            def visit(item: str) -> typing.Tuple[str, typing.Iterator[str]]:
+                index[item] = low[item] = len(index)
+                found[item] = list()
+                stack.append(item)
+                return item, iter(parents.get(item, ()))
+
+            work = [visit(start)]
+            while work:
+                item, remaining = work[-1]
+                for parent in remaining:
+                    if parent in entities:
+                        found[item].append(parent)
+                    elif parent in memo:
+                        found[item].append(memo[parent])
+                    elif parent not in index:
+                        work.append(visit(parent))
+                        break
+                    elif parent in found:
+                        # parent is on the stack, so in the same cycle as item
+                        low[item] = min(low[item], index[parent])
+                else:
+                    work.pop()
+
+                    if low[item] == index[item]:
+                        # item is the first element visited of a cycle (or is not in one)
+                        members = list()
+                        while True:
+                            member = stack.pop()
+                            members.append(member)
+                            if member == item:
+                                break
+
+                        parts = [part for member in members for part in found.pop(member)]
+                        if len(parts) == 1 and isinstance(parts[0], frozenset):
+                            # share the ancestors of a lone parent rather than copying them
+                            result = parts[0]
+                        elif parts:
+                            result = frozenset(
+                                ancestor
+                                for part in parts
+                                for ancestor in (part if isinstance(part, frozenset) else (part,))
+                            )
+                        else:
+                            result = empty
+
+                        for member in members:
+                            memo[member] = result
+
+                    if work:
+                        caller = work[-1][0]
+                        if item in memo:
+                            found[caller].append(memo[item])
+                        else:
+                            low[caller] = min(low[caller], low[item])
+
+            return memo[start]
+
+        return nearest
+
     @staticmethod
     def dataParentChildToTree(data: typing.Dict[str, typing.Optional[typing.List[str]]]) -> typing.Union[Tree, EmptyTree]:
         """Converts a dictionary of k -> array to a nested
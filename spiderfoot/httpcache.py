@@ -0,0 +1,331 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from .cache import SpiderFootMemoryCache
+
+
+class SpiderFootHttpCache:
+    """Two-tier cache of HTTP responses, kept in memory and on disk.
+
+    Entries are fresh for "ttl" seconds after they were fetched. Once
+    stale, an entry with an ETag or Last-Modified header can be
+    revalidated with a conditional request instead of being fetched again.
+
+    The memory tier lasts as long as the cache object, so for one scan.
+    The disk tier is shared by every scan and scanner process. When either
+    tier is full, its least recently used entries are evicted.
+    """
+
+    # Status codes which are cacheable by default (RFC 7231 section 6.1)
+    cacheableCodes = frozenset(['200', '203', '204', '300', '301', '404', '405', '410', '414', '501'])
+
+    # Responses larger than this aren't kept in memory
+    maxMemoryEntrySize = 1024 * 1024
+
+    def __init__(self, cacheDir: str, ttl: int = 3600, maxEntries: int = 500, maxDiskSize: int = 100 * 1024 * 1024) -> None:
+        """Initialize the cache.
+
+        Args:
+            cacheDir (str): directory for the disk tier (None to keep responses in memory only)
+            ttl (int): number of seconds a response is fresh for
+            maxEntries (int): maximum number of responses to keep in memory
+            maxDiskSize (int): maximum number of bytes of responses to keep on disk
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if cacheDir is not None and not isinstance(cacheDir, str):
+            raise TypeError(f"cacheDir is {type(cacheDir)}; expected str()")
+
+        if not isinstance(ttl, int):
+            raise TypeError(f"ttl is {type(ttl)}; expected int()")
+
+        if ttl < 0:
+            raise ValueError(f"ttl is {ttl}; expected 0 or more")
+
+        if not isinstance(maxDiskSize, int):
+            raise TypeError(f"maxDiskSize is {type(maxDiskSize)}; expected int()")
+
+        self.log = logging.getLogger(f"spiderfoot.{__name__}")
+        self.ttl = ttl
+        self.maxDiskSize = maxDiskSize
+        self.memory = SpiderFootMemoryCache(maxEntries)
+        self.cacheDir = cacheDir
+        self.diskSize = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.diskEvictions = 0
+        self._lock = threading.Lock()
+
+        if self.cacheDir is not None:
+            os.makedirs(self.cacheDir, exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, headers: dict = None, cookies=None, **options) -> str:
+        """Cache key for a GET request.
+
+        The User-Agent header isn't part of the key, so that choosing a
+        random user agent for each request doesn't defeat the cache.
+
+        Args:
+            url (str): URL
+            headers (dict): request headers
+            cookies: request cookies
+            **options: anything else which changes the response returned for the request
+
+        Returns:
+            str: cache key
+        """
+        headers = {str(k).lower(): str(v) for k, v in (headers or dict()).items() if str(k).lower() != 'user-agent'}
+        if isinstance(cookies, dict):
+            cookies = sorted(cookies.items())
+        keyData = json.dumps(['GET', url, sorted(headers.items()), cookies, sorted(options.items())], default=str)
+        return hashlib.sha256(keyData.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> dict:
+        """Look up a response.
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            dict: cache entry with the response ("result"), the time it was
+                fetched ("stored") and its validators ("etag" and "lastModified"),
+                or None if the response isn't cached
+        """
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self._diskGet(key)
+            if entry is not None:
+                self._memoryPut(key, entry)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return entry
+
+    def isFresh(self, entry: dict) -> bool:
+        """Whether a cache entry can be used without revalidating it.
+
+        Args:
+            entry (dict): cache entry
+
+        Returns:
+            bool: entry is fresh
+        """
+        return entry['stored'] + self.ttl > time.time()
+
+    @staticmethod
+    def conditionalHeaders(entry: dict) -> dict:
+        """Headers for revalidating a stale cache entry.
+
+        Args:
+            entry (dict): cache entry
+
+        Returns:
+            dict: If-None-Match and If-Modified-Since headers (empty if the entry has no validators)
+        """
+        headers = dict()
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('lastModified'):
+            headers['If-Modified-Since'] = entry['lastModified']
+        return headers
+
+    def put(self, key: str, result: dict) -> bool:
+        """Store a response, if it is cacheable.
+
+        Args:
+            key (str): cache key
+            result (dict): response returned by fetchUrl()
+
+        Returns:
+            bool: response was stored
+        """
+        if result.get('code') not in self.cacheableCodes:
+            return False
+
+        headers = result.get('headers') or dict()
+        cacheControl = headers.get('cache-control', '').lower()
+        if 'no-store' in cacheControl or 'private' in cacheControl:
+            return False
+
+        entry = {
+            'stored': time.time(),
+            'etag': headers.get('etag'),
+            'lastModified': headers.get('last-modified'),
+            'result': dict(result)
+        }
+        self._memoryPut(key, entry)
+        self._diskPut(key, entry)
+        return True
+
+    def revalidated(self, key: str, entry: dict) -> dict:
+        """Mark a stale entry as fresh again, after the server said it hasn't changed.
+
+        Args:
+            key (str): cache key
+            entry (dict): cache entry
+
+        Returns:
+            dict: cached response
+        """
+        entry = dict(entry)
+        entry['stored'] = time.time()
+        self._memoryPut(key, entry)
+        self._diskPut(key, entry)
+        with self._lock:
+            self.revalidations += 1
+        return dict(entry['result'])
+
+    def stats(self) -> dict:
+        """Cache statistics.
+
+        Returns:
+            dict: hits, misses, revalidations, evictions from either tier, and number of entries in memory
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'evictions': self.memory.evictions + self.diskEvictions,
+                'size': len(self.memory)
+            }
+
+    def _memoryPut(self, key: str, entry: dict) -> None:
+        content = entry['result'].get('content') or ''
+        if len(content) > self.maxMemoryEntrySize:
+            return
+        # staleness is judged by the entry's "stored" time, not by the memory tier
+        self.memory.put(key, entry, float('inf'))
+
+    def _diskPath(self, key: str) -> str:
+        return os.path.join(self.cacheDir, key)
+
+    def _diskGet(self, key: str) -> dict:
+        """Read an entry from the disk tier.
+
+        Args:
+            key (str): cache key
+
+        Returns:
+            dict: cache entry, or None
+        """
+        if self.cacheDir is None:
+            return None
+
+        path = self._diskPath(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # reading an entry makes it the most recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        if entry['result'].pop('contentEncoding', None) == 'base64':
+            entry['result']['content'] = base64.b64decode(entry['result']['content'])
+
+        return entry
+
+    def _diskPut(self, key: str, entry: dict) -> None:
+        """Write an entry to the disk tier.
+
+        Entries are written to a temporary file which is then renamed, so
+        readers in other processes never see a partially written entry.
+
+        Args:
+            key (str): cache key
+            entry (dict): cache entry
+        """
+        if self.cacheDir is None:
+            return
+
+        entry = dict(entry)
+        entry['result'] = dict(entry['result'])
+        if isinstance(entry['result'].get('content'), bytes):
+            entry['result']['content'] = base64.b64encode(entry['result']['content']).decode('ascii')
+            entry['result']['contentEncoding'] = 'base64'
+
+        data = json.dumps(entry).encode('utf-8')
+        if len(data) > self.maxDiskSize:
+            return
+
+        try:
+            fd, tmpPath = tempfile.mkstemp(dir=self.cacheDir, prefix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmpPath, self._diskPath(key))
+        except OSError as e:
+            self.log.debug(f"Unable to write HTTP cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self.diskSize is None:
+                self.diskSize = self._diskUsage()[0]
+            else:
+                self.diskSize += len(data)
+            if self.diskSize <= self.maxDiskSize:
+                return
+            self._evict()
+
+    def _diskUsage(self) -> tuple:
+        """Note: must be called with self._lock held.
+
+        Returns:
+            tuple: total size of entries on disk, and a list of (mtime, size, path) for each entry
+        """
+        entries = list()
+        total = 0
+        with os.scandir(self.cacheDir) as it:
+            for f in it:
+                if f.name.startswith('.') or not f.is_file():
+                    continue
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, f.path))
+                total += st.st_size
+        return total, entries
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries on disk until they use
+        no more than 90% of the maximum size.
+
+        Note: must be called with self._lock held.
+        """
+        total, entries = self._diskUsage()
+        target = self.maxDiskSize * 0.9
+        for mtime, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.diskEvictions += 1
+        self.diskSize = total
+
@@ -0,0 +1,223 @@
+import bisect
+import ipaddress
+import socket
+
+
+class SpiderFootIpRangeIndex:
+    """Index of IPv4 and IPv6 address ranges, for checking whether an IP
+    address or netblock is within (or overlaps) any of a set of netblocks.
+
+    Netblocks are stored as sorted, non-overlapping intervals of integers,
+    one list of interval starts and one of interval ends for each IP
+    version, so each lookup is a binary search rather than a check of
+    every netblock in turn. Overlapping and adjacent netblocks are merged.
+
+    Lookups are safe while other threads add netblocks, but netblocks
+    should only be added by one thread at a time.
+    """
+
+    def __init__(self, networks: list = None) -> None:
+        """Initialize the index.
+
+        Args:
+            networks (list): IP addresses and netblocks (CIDR notation) to add
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        self._ranges = {
+            4: (list(), list()),
+            6: (list(), list())
+        }
+
+        if networks is not None:
+            self.update(networks)
+
+    @staticmethod
+    def parse(value: str) -> tuple:
+        """Convert an IP address or netblock to an integer interval.
+
+        Args:
+            value (str): IP address or netblock (CIDR notation)
+
+        Returns:
+            tuple: IP version, first address and last address
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if not isinstance(value, str):
+            raise TypeError(f"value is {type(value)}; expected str()")
+
+        # inet_pton() is much faster than the ipaddress module, which is
+        # only used for the forms inet_pton() doesn't handle (such as netmasks)
+        addr, sep, prefix = value.strip().partition('/')
+        try:
+            if ':' in addr:
+                version, bits = 6, 128
+                packed = socket.inet_pton(socket.AF_INET6, addr)
+            else:
+                version, bits = 4, 32
+                packed = socket.inet_pton(socket.AF_INET, addr)
+            prefixLength = bits
+            if sep:
+                if not prefix.isdigit():
+                    raise ValueError(prefix)
+                prefixLength = int(prefix)
+        except (OSError, ValueError):
+            try:
+                net = ipaddress.ip_network(value.strip(), strict=False)
+            except ValueError:
+                raise ValueError(f"{value} is not a valid IP address or netblock") from None
+            return net.version, int(net.network_address), int(net.broadcast_address)
+
+        if prefixLength > bits:
+            raise ValueError(f"{value} is not a valid IP address or netblock")
+
+        hostMask = (1 << (bits - prefixLength)) - 1
+        first = int.from_bytes(packed, 'big') & ~hostMask
+        return version, first, first | hostMask
+
+    @staticmethod
+    def merge(intervals: list) -> tuple:
+        """Sort and merge overlapping or adjacent intervals.
+
+        Args:
+            intervals (list): (first, last) tuples
+
+        Returns:
+            tuple: list of interval starts and list of interval ends
+        """
+        starts = list()
+        ends = list()
+        for first, last in sorted(intervals):
+            if ends and first <= ends[-1] + 1:
+                if last > ends[-1]:
+                    ends[-1] = last
+                continue
+            starts.append(first)
+            ends.append(last)
+        return starts, ends
+
+    @staticmethod
+    def findContaining(starts, ends, first, last) -> bool:
+        """Check whether an interval is entirely within one of a set of merged intervals.
+
+        Args:
+            starts: sorted interval starts
+            ends: interval ends
+            first: first value of the interval to look up
+            last: last value of the interval to look up
+
+        Returns:
+            bool: interval is within one of the intervals
+        """
+        i = bisect.bisect_right(starts, first) - 1
+        return i >= 0 and ends[i] >= last
+
+    @staticmethod
+    def findOverlapping(starts, ends, first, last) -> bool:
+        """Check whether an interval overlaps any of a set of merged intervals.
+
+        Args:
+            starts: sorted interval starts
+            ends: interval ends
+            first: first value of the interval to look up
+            last: last value of the interval to look up
+
+        Returns:
+            bool: interval overlaps one of the intervals
+        """
+        i = bisect.bisect_right(starts, last) - 1
+        return i >= 0 and ends[i] >= first
+
+    def update(self, networks: list) -> None:
+        """Add IP addresses and netblocks.
+
+        Args:
+            networks (list): IP addresses and netblocks (CIDR notation)
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if isinstance(networks, str):
+            raise TypeError(f"networks is {type(networks)}; expected list()")
+
+        intervals = {4: list(), 6: list()}
+        for network in networks:
+            version, first, last = self.parse(network)
+            intervals[version].append((first, last))
+
+        for version in (4, 6):
+            if not intervals[version]:
+                continue
+            starts, ends = self._ranges[version]
+            intervals[version].extend(zip(starts, ends))
+            # replace the lists in one step, so concurrent lookups see either the old or the new ranges
+            self._ranges[version] = self.merge(intervals[version])
+
+    def add(self, network: str) -> None:
+        """Add an IP address or netblock.
+
+        Args:
+            network (str): IP address or netblock (CIDR notation)
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        self.update([network])
+
+    def contains(self, value: str) -> bool:
+        """Check whether an IP address or netblock is entirely within the indexed ranges.
+
+        Args:
+            value (str): IP address or netblock (CIDR notation)
+
+        Returns:
+            bool: value is within the indexed ranges
+        """
+        try:
+            version, first, last = self.parse(value)
+        except (TypeError, ValueError):
+            return False
+
+        starts, ends = self._ranges[version]
+        return self.findContaining(starts, ends, first, last)
+
+    def overlaps(self, value: str) -> bool:
+        """Check whether any part of an IP address or netblock is within the indexed ranges.
+
+        Args:
+            value (str): IP address or netblock (CIDR notation)
+
+        Returns:
+            bool: value overlaps the indexed ranges
+        """
+        try:
+            version, first, last = self.parse(value)
+        except (TypeError, ValueError):
+            return False
+
+        starts, ends = self._ranges[version]
+        return self.findOverlapping(starts, ends, first, last)
+
+    def ranges(self, version: int) -> tuple:
+        """Merged ranges for an IP version.
+
+        Args:
+            version (int): IP version (4 or 6)
+
+        Returns:
+            tuple: sorted list of range starts and list of range ends, as integers
+        """
+        return self._ranges[version]
+
+    def __len__(self) -> int:
+        return len(self._ranges[4][0]) + len(self._ranges[6][0])
+
+    def __contains__(self, value: str) -> bool:
+        return self.contains(value)
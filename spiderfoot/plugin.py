@@ -5,7 +5,6 @@ import os
 import queue
 import sys
 import threading
-from time import sleep
 import traceback
 
 from .threadpool import SpiderFootThreadPool
@@ -75,6 +74,41 @@ class SpiderFootPluginLogger(logging.Logger):
 # end of logging overrides
 
 
+class SpiderFootEventCounter():
+    """Number of events in flight across all the modules of a scan.
+
+    Modules add to it as events are queued for them and take away from it
+    once they have handled them, so the scanner can tell the scan is idle
+    without looking at every module.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, count: int = 1) -> None:
+        """Count events as in flight.
+
+        Args:
+            count (int): number of events
+        """
+        with self._lock:
+            self.count += count
+
+    def done(self, count: int = 1) -> bool:
+        """Stop counting events as in flight.
+
+        Args:
+            count (int): number of events
+
+        Returns:
+            bool: no events are in flight any more
+        """
+        with self._lock:
+            self.count -= count
+            return self.count == 0
+
+
 class SpiderFootPlugin():
     """SpiderFootPlugin module object
 
@@ -139,6 +173,22 @@ class SpiderFootPlugin():
         self._log = None
         # Shared thread pool for all modules
         self.sharedThreadPool = None
+        # Number of events queued for, or being handled by, this module
+        self._eventsInFlight = 0
+        self._eventsInFlightLock = threading.Lock()
+        # Number of events in flight across all modules of the scan
+        self._scanEventCounter = None
+
+    def __getstate__(self) -> dict:
+        # module instances are deep copied (and pickled) along with the scan config
+        state = self.__dict__.copy()
+        del state['_eventsInFlightLock']
+        state['_scanEventCounter'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._eventsInFlightLock = threading.Lock()
 
     @property
     def log(self):
@@ -363,6 +413,9 @@ class SpiderFootPlugin():
                 break
             prevEvent = prevEvent.sourceEvent
 
+        # the event is shared as-is by every module it is handed to
+        sfEvent.freeze()
+
         # output to queue if applicable
         if self.outgoingEventQueue is not None:
             self.outgoingEventQueue.put(sfEvent)
@@ -507,17 +560,16 @@ class SpiderFootPlugin():
                 return
 
             while not self.checkForStop():
-                try:
-                    sfEvent = self.incomingEventQueue.get_nowait()
-                except queue.Empty:
-                    sleep(.3)
+                sfEvent = self.incomingEventQueue.get()
+                # None is only used to wake us up so that checkForStop() is re-evaluated
+                if sfEvent is None:
                     continue
                 if sfEvent == 'FINISHED':
                     self.sf.debug(f"{self.__name__}.threadWorker() got \"FINISHED\" from incomingEventQueue.")
-                    self.poolExecute(self.finish)
+                    self.poolExecute(self._processQueuedEvent, self.finish)
                 else:
                     self.sf.debug(f"{self.__name__}.threadWorker() got event, {sfEvent.eventType}, from incomingEventQueue.")
-                    self.poolExecute(self.handleEvent, sfEvent)
+                    self.poolExecute(self._processQueuedEvent, self.handleEvent, sfEvent)
         except KeyboardInterrupt:
             self.sf.debug(f"Interrupted module {self.__name__}.")
             self._stopScanning = True
@@ -528,15 +580,96 @@ class SpiderFootPlugin():
             # set errorState
             self.sf.debug(f"Setting errorState for module {self.__name__}.")
             self.errorState = True
+        finally:
             # clear incoming queue
-            if self.incomingEventQueue:
-                self.sf.debug(f"Emptying incomingEventQueue for module {self.__name__}.")
-                with suppress(queue.Empty):
-                    while 1:
-                        self.incomingEventQueue.get_nowait()
-                # set queue to None to prevent its use
-                # if there are leftover objects in the queue, the scan will hang.
-                self.incomingEventQueue = None
+            # set queue to None to prevent its use
+            # if there are leftover objects in the queue, the scan will hang.
+            self.discardQueuedEvents()
+
+    def setEventCounter(self, counter: SpiderFootEventCounter) -> None:
+        """Count the events in flight for this module in a counter shared
+        by all the modules of the scan. The scanner is then woken up once
+        no module has events in flight, rather than whenever this module
+        becomes idle.
+
+        Args:
+            counter (SpiderFootEventCounter): events in flight across the scan
+        """
+        self._scanEventCounter = counter
+
+    def queueEvent(self, sfEvent) -> bool:
+        """Queue an event (or "FINISHED") for this module's thread and
+        count it as in flight until the module has finished with it.
+
+        Args:
+            sfEvent (SpiderFootEvent): event
+
+        Returns:
+            bool: False if the module is no longer accepting events
+        """
+        with self._eventsInFlightLock:
+            if self.errorState or self.incomingEventQueue is None:
+                return False
+            self._eventsInFlight += 1
+            if self._scanEventCounter is not None:
+                self._scanEventCounter.add()
+            self.incomingEventQueue.put(sfEvent)
+        return True
+
+    @property
+    def eventsInFlight(self) -> int:
+        """Number of events queued for, or being handled by, this module.
+
+        Returns:
+            int: events in flight
+        """
+        return self._eventsInFlight
+
+    def discardQueuedEvents(self) -> None:
+        """Empty and unset the incoming event queue, so that the module no
+        longer accepts events, and stop counting the discarded events as in flight."""
+        with self._eventsInFlightLock:
+            if self.incomingEventQueue is None:
+                return
+            self.sf.debug(f"Emptying incomingEventQueue for module {self.__name__}.")
+            discarded = 0
+            with suppress(queue.Empty):
+                while 1:
+                    # None wakes the thread up and was never counted as in flight
+                    if self.incomingEventQueue.get_nowait() is not None:
+                        discarded += 1
+            self.incomingEventQueue = None
+        self._eventsDone(discarded)
+
+    def _eventsDone(self, count: int = 1) -> None:
+        """Stop counting events as in flight. When the scan (or, without a
+        shared counter, the module) becomes idle, wake up the scanner so it
+        can check whether the scan has finished.
+
+        Args:
+            count (int): number of events the module has finished with
+        """
+        if not count:
+            return
+        with self._eventsInFlightLock:
+            self._eventsInFlight -= count
+            idle = self._eventsInFlight == 0
+        if self._scanEventCounter is not None:
+            idle = self._scanEventCounter.done(count)
+        if idle and self.outgoingEventQueue is not None:
+            self.outgoingEventQueue.put('IDLE')
+
+    def _processQueuedEvent(self, callback, *args) -> None:
+        """Run a callback for an event taken from the incoming event queue.
+
+        Args:
+            callback: handleEvent or finish
+            args: args (passed through to callback)
+        """
+        try:
+            callback(*args)
+        finally:
+            self._eventsDone()
 
     def poolExecute(self, callback, *args, **kwargs) -> None:
         """Execute a callback with the given args.
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import queue
+import threading
+from contextlib import suppress
+
+from .resolver import _RateLimiter
+
+
+class SpiderFootPortScanner:
+    """Non-blocking TCP connect scanner.
+
+    Connections are made from a single asyncio event loop instead of a
+    thread per port, so thousands of connects can be in flight at once.
+    Open ports are streamed back as soon as they are found, along with
+    whatever banner the service sent.
+
+    Example:
+        scanner = SpiderFootPortScanner(concurrency=500, timeout=5)
+        for host, port, banner in scanner.scan([("192.0.2.1", 22), ("192.0.2.1", 80)]):
+            ...
+    """
+
+    def __init__(self, concurrency: int = 1000, timeout: float = 15, hostRate: float = 0) -> None:
+        """Initialize the port scanner.
+
+        Args:
+            concurrency (int): maximum number of connections in flight at once
+            timeout (float): number of seconds to wait for a connection, and then for a banner
+            hostRate (float): maximum number of connection attempts per second to each host (0 = unlimited)
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if not isinstance(concurrency, int):
+            raise TypeError(f"concurrency is {type(concurrency)}; expected int()")
+
+        if concurrency < 1:
+            raise ValueError(f"concurrency is {concurrency}; expected 1 or more")
+
+        if timeout <= 0:
+            raise ValueError(f"timeout is {timeout}; expected more than 0")
+
+        if hostRate < 0:
+            raise ValueError(f"hostRate is {hostRate}; expected 0 or more")
+
+        self.log = logging.getLogger(f"spiderfoot.{__name__}")
+        self.concurrency = min(concurrency, self.maxConcurrency())
+        self.timeout = timeout
+        self.hostRate = hostRate
+        self.attempts = 0
+        self.open = 0
+
+    @staticmethod
+    def maxConcurrency() -> int:
+        """Number of connections the process can safely hold open at once.
+
+        Returns:
+            int: half the process's file descriptor limit
+        """
+        try:
+            import resource
+        except ImportError:
+            # Windows
+            return 512
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY:
+            return 65536
+
+        return max(1, soft // 2)
+
+    def scan(self, targets):
+        """Try to connect to each target, yielding open ports as soon as they are found.
+
+        Args:
+            targets (iterable): (host, port) pairs to try
+
+        Yields:
+            tuple: (host, port, banner) where banner is the bytes the
+                service sent after connecting, or b'' if it sent none
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def run() -> None:
+            try:
+                asyncio.run(self._scanAll(targets, results, stop))
+            except Exception as e:
+                self.log.error(f"Port scanner failed: {e}")
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(name="SpiderFootPortScanner", target=run, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                result = results.get()
+                if result is done:
+                    break
+                yield result
+        finally:
+            # the caller stopped early; abandon the remaining connections
+            stop.set()
+            thread.join()
+
+    async def _scanAll(self, targets, results: queue.Queue, stop: threading.Event) -> None:
+        """Try every target, keeping at most self.concurrency connections in flight.
+
+        Args:
+            targets (iterable): (host, port) pairs to try
+            results (queue.Queue): queue to put (host, port, banner) results on
+            stop (threading.Event): set to abandon the remaining targets
+        """
+        window = asyncio.Semaphore(self.concurrency)
+        limiters = dict()
+        pending = set()
+
+        async def probe(host: str, port: int) -> None:
+            try:
+                if host not in limiters:
+                    limiters[host] = _RateLimiter(self.hostRate)
+                await limiters[host].wait()
+                banner = await self._probe(host, port)
+                if banner is not None:
+                    results.put((host, port, banner))
+            finally:
+                window.release()
+
+        for host, port in targets:
+            if stop.is_set():
+                break
+
+            await window.acquire()
+            task = asyncio.ensure_future(probe(host, int(port)))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if stop.is_set():
+            for task in pending:
+                task.cancel()
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _probe(self, host: str, port: int) -> bytes:
+        """Connect to a port and read its banner.
+
+        Args:
+            host (str): host
+            port (int): port
+
+        Returns:
+            bytes: banner (b'' if there was none), or None if the port isn't open
+        """
+        self.attempts += 1
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        self.open += 1
+        try:
+            return await asyncio.wait_for(reader.read(4096), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return b''
+        finally:
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+import dns.asyncresolver
+import dns.exception
+import dns.name
+import dns.resolver
+
+
+class SpiderFootResolver:
+    """Non-blocking DNS engine for resolving large batches of hostnames.
+
+    Lookups are made from a single asyncio event loop instead of a thread
+    per name. At most "window" lookups are in flight at once, and queries
+    are spread round-robin across the nameservers, each of which can be
+    rate limited. Results are streamed back as soon as they are available.
+
+    Example:
+        resolver = SpiderFootResolver(window=100)
+        for host, ipv4, ipv6 in resolver.resolve(["www.example.com", "mail.example.com"]):
+            ...
+    """
+
+    def __init__(self, nameservers: list = None, window: int = 100, rate: float = 0, timeout: float = 2.0, port: int = 53) -> None:
+        """Initialize the resolver.
+
+        Args:
+            nameservers (list): nameservers to query (default: system nameservers)
+            window (int): maximum number of lookups in flight at once
+            rate (float): maximum number of queries per second to each nameserver (0 = unlimited)
+            timeout (float): number of seconds to wait for each query
+            port (int): nameserver port
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        if nameservers is None:
+            try:
+                nameservers = dns.resolver.get_default_resolver().nameservers
+            except dns.resolver.NoResolverConfiguration:
+                nameservers = list()
+
+        if not isinstance(nameservers, list):
+            raise TypeError(f"nameservers is {type(nameservers)}; expected list()")
+
+        if not nameservers:
+            raise ValueError("nameservers is empty")
+
+        if not isinstance(window, int):
+            raise TypeError(f"window is {type(window)}; expected int()")
+
+        if window < 1:
+            raise ValueError(f"window is {window}; expected 1 or more")
+
+        if rate < 0:
+            raise ValueError(f"rate is {rate}; expected 0 or more")
+
+        if timeout <= 0:
+            raise ValueError(f"timeout is {timeout}; expected more than 0")
+
+        self.log = logging.getLogger(f"spiderfoot.{__name__}")
+        self.nameservers = [str(ns) for ns in nameservers]
+        self.window = window
+        self.rate = rate
+        self.timeout = timeout
+        self.port = int(port)
+        self.queries = 0
+        self.timeouts = 0
+
+    def resolve(self, hosts, ipv6: bool = True):
+        """Resolve hostnames, yielding each result as soon as it is available.
+
+        A hostname's AAAA records are only queried if it exists but has no
+        A records. Results are not yielded in the order hosts were supplied.
+
+        Args:
+            hosts (iterable): hostnames to resolve
+            ipv6 (bool): query AAAA records for hostnames without A records
+
+        Yields:
+            tuple: (host, ipv4, ipv6) where ipv4 and ipv6 are lists of addresses,
+                or None if that record type wasn't looked up or the lookup timed out
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def run() -> None:
+            try:
+                asyncio.run(self._resolveAll(hosts, ipv6, results, stop))
+            except Exception as e:
+                self.log.error(f"DNS resolver failed: {e}")
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(name="SpiderFootResolver", target=run, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                result = results.get()
+                if result is done:
+                    break
+                yield result
+        finally:
+            # the caller stopped early; abandon the remaining lookups
+            stop.set()
+            thread.join()
+
+    async def _resolveAll(self, hosts, ipv6: bool, results: queue.Queue, stop: threading.Event) -> None:
+        """Resolve every hostname, keeping at most self.window lookups in flight.
+
+        Args:
+            hosts (iterable): hostnames to resolve
+            ipv6 (bool): query AAAA records for hostnames without A records
+            results (queue.Queue): queue to put (host, ipv4, ipv6) results on
+            stop (threading.Event): set to abandon the remaining lookups
+        """
+        resolvers = list()
+        for ns in self.nameservers:
+            res = dns.asyncresolver.Resolver(configure=False)
+            res.nameservers = [ns]
+            res.port = self.port
+            res.timeout = self.timeout
+            res.lifetime = self.timeout
+            resolvers.append((res, _RateLimiter(self.rate)))
+
+        window = asyncio.Semaphore(self.window)
+        pending = set()
+        nextResolver = 0
+
+        async def lookup(host: str, first: int) -> None:
+            try:
+                try:
+                    qname = dns.name.from_text(host)
+                except dns.exception.DNSException as e:
+                    self.log.debug(f"Unable to resolve {host}: {e}")
+                    results.put((host, list(), list()))
+                    return
+
+                ipv4 = await self._query(resolvers, first, qname, 'A')
+                if ipv4 is _NXDOMAIN:
+                    results.put((host, list(), list()))
+                    return
+
+                ipv6addrs = None
+                if ipv4 == [] and ipv6:
+                    ipv6addrs = await self._query(resolvers, first, qname, 'AAAA')
+                    if ipv6addrs is _NXDOMAIN:
+                        ipv6addrs = list()
+                results.put((host, ipv4, ipv6addrs))
+            finally:
+                window.release()
+
+        for host in hosts:
+            if stop.is_set():
+                break
+            await window.acquire()
+            task = asyncio.ensure_future(lookup(host, nextResolver))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            nextResolver = (nextResolver + 1) % len(resolvers)
+
+        if stop.is_set():
+            for task in pending:
+                task.cancel()
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _query(self, resolvers: list, first: int, qname: dns.name.Name, recordType: str) -> list:
+        """Look up one record type for a hostname, failing over to the next
+        nameserver if a nameserver doesn't respond.
+
+        Args:
+            resolvers (list): (resolver, rate limiter) pairs, one per nameserver
+            first (int): index of the nameserver to try first
+            qname (dns.name.Name): hostname
+            recordType (str): record type (A or AAAA)
+
+        Returns:
+            list: addresses, _NXDOMAIN if the hostname doesn't exist, or None if no nameserver responded
+        """
+        for i in range(len(resolvers)):
+            res, limiter = resolvers[(first + i) % len(resolvers)]
+            await limiter.wait()
+            self.queries += 1
+            try:
+                answer = await res.resolve(qname, recordType, search=False)
+                return list({str(rr) for rr in answer})
+            except dns.resolver.NXDOMAIN:
+                return _NXDOMAIN
+            except dns.resolver.NoAnswer:
+                return list()
+            except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+                self.timeouts += 1
+                self.log.debug(f"No response resolving {recordType} for {qname} from {res.nameservers[0]}: {e}")
+            except dns.exception.DNSException as e:
+                self.log.debug(f"Unable to resolve {recordType} for {qname}: {e}")
+                return list()
+
+        return None
+
+
+class _NXDomain(list):
+    """Empty result for a hostname which doesn't exist."""
+
+
+_NXDOMAIN = _NXDomain()
+
+
+class _RateLimiter:
+    """Spaces out queries to a nameserver to at most "rate" per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate else 0
+        self.nextSlot = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self.nextSlot)
+        self.nextSlot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -0,0 +1,196 @@
+import http.cookiejar
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SpiderFootSessionPool:
+    """Persistent HTTP sessions, one per thread.
+
+    Each thread gets its own requests session, so connections to a host
+    are kept alive and reused across requests instead of paying for a new
+    TCP and TLS handshake every time. Sessions don't keep cookies set by
+    servers, so one request can't affect the next.
+
+    Attributes:
+        requests (int): number of HTTP requests sent, including redirects
+        connectionsOpened (int): number of new connections opened
+    """
+
+    def __init__(self, poolHosts: int = 50, poolSize: int = 4, retries: int = 1) -> None:
+        """Initialize the session pool.
+
+        Args:
+            poolHosts (int): number of hosts to keep connections to, per thread
+            poolSize (int): number of connections to keep to each host, per thread
+            retries (int): number of times to retry a HEAD or GET request after a connection error
+
+        Raises:
+            TypeError: arg type was invalid
+            ValueError: arg value was invalid
+        """
+        for name, value in (('poolHosts', poolHosts), ('poolSize', poolSize), ('retries', retries)):
+            if not isinstance(value, int):
+                raise TypeError(f"{name} is {type(value)}; expected int()")
+
+        if poolHosts < 1 or poolSize < 1:
+            raise ValueError("poolHosts and poolSize must be 1 or more")
+
+        if retries < 0:
+            raise ValueError(f"retries is {retries}; expected 0 or more")
+
+        self.poolHosts = poolHosts
+        self.poolSize = poolSize
+        self.retries = retries
+        self.requests = 0
+        self.connectionsOpened = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = list()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_local']
+        del state['_lock']
+        state['_sessions'] = list()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def session(self, proxy: str = None) -> requests.sessions.Session:
+        """Return the calling thread's session, creating it if need be.
+
+        Args:
+            proxy (str): proxy URL for all requests made with the session
+
+        Returns:
+            requests.sessions.Session: requests session
+        """
+        session = getattr(self._local, 'session', None)
+        if session is not None and self._local.proxy == proxy:
+            return session
+
+        if session is not None:
+            session.close()
+
+        session = requests.session()
+        session.cookies.set_policy(_RejectCookies())
+        if proxy:
+            session.proxies = {
+                'http': proxy,
+                'https': proxy,
+            }
+
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries,
+            status=0,
+            allowed_methods=frozenset(['HEAD', 'GET']),
+            backoff_factor=0.5,
+            raise_on_status=False,
+            respect_retry_after_header=False
+        )
+        adapter = _CountingAdapter(self, pool_connections=self.poolHosts, pool_maxsize=self.poolSize, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        self._local.session = session
+        self._local.proxy = proxy
+        with self._lock:
+            self._sessions.append(session)
+
+        return session
+
+    def countRequest(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def countConnection(self) -> None:
+        with self._lock:
+            self.connectionsOpened += 1
+
+    def stats(self) -> dict:
+        """Connection statistics.
+
+        Returns:
+            dict: number of sessions, requests, connections opened and connections reused
+        """
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'requests': self.requests,
+                'opened': self.connectionsOpened,
+                'reused': max(0, self.requests - self.connectionsOpened)
+            }
+
+    def close(self) -> None:
+        """Close every session, and the connections they hold open."""
+        with self._lock:
+            sessions = self._sessions
+            self._sessions = list()
+
+        for session in sessions:
+            session.close()
+
+        self._local = threading.local()
+
+
+class _RejectCookies(http.cookiejar.DefaultCookiePolicy):
+    """Cookie policy which doesn't let servers set cookies on a session.
+
+    Cookies passed with a request, and cookies set during its redirects,
+    are still sent.
+    """
+
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTP adapter which counts requests sent and connections opened."""
+
+    def __init__(self, sessionPool: SpiderFootSessionPool, **kwargs) -> None:
+        self.sessionPool = sessionPool
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self._countConnections(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._countConnections(manager)
+        return manager
+
+    def send(self, request, *args, **kwargs):
+        self.sessionPool.countRequest()
+        return super().send(request, *args, **kwargs)
+
+    def _countConnections(self, manager) -> None:
+        """Make the connection pools created by a pool manager count the
+        connections they open.
+
+        Args:
+            manager (urllib3.PoolManager): pool manager
+        """
+        if getattr(manager, '_spiderfootCounting', False):
+            return
+
+        sessionPool = self.sessionPool
+        poolClasses = dict()
+        for scheme, poolClass in manager.pool_classes_by_scheme.items():
+            class CountingPool(poolClass):
+                def _new_conn(self):
+                    sessionPool.countConnection()
+                    return super()._new_conn()
+
+            poolClasses[scheme] = CountingPool
+
+        manager.pool_classes_by_scheme = poolClasses
+        manager._spiderfootCounting = True
@@ -3,6 +3,8 @@ import typing
 
 import netaddr
 
+from .iprangeindex import SpiderFootIpRangeIndex
+
 
 if sys.version_info >= (3, 8):  # PEP 589 support (TypedDict)
     TargetAlias = typing.TypedDict("TargetAlias", {"type": str, "value": str})
@@ -26,6 +28,8 @@ class SpiderFootTarget():
     _targetType: str
     _targetValue: str
     _targetAliases: typing.List[TargetAlias]
+    _addressRanges: SpiderFootIpRangeIndex = None
+    _addressRangesKey: tuple = None
 
     def __init__(self, targetValue: str, typeName: str) -> None:
         """Initialize SpiderFoot target.
@@ -154,6 +158,34 @@ class SpiderFootTarget():
 
         return e
 
+    def _getAddressRanges(self) -> SpiderFootIpRangeIndex:
+        """Get an index of the IP addresses and netblocks of the target and its aliases.
+
+        The index is rebuilt only when the target or its aliases change.
+
+        Returns:
+            SpiderFootIpRangeIndex: IP addresses and netblocks
+        """
+        key = (self.targetType, self.targetValue, id(self.targetAliases), len(self.targetAliases))
+        if self._addressRangesKey == key:
+            return self._addressRanges
+
+        networks = self.getAddresses()
+        if self.targetType in ["IP_ADDRESS", "IPV6_ADDRESS", "NETBLOCK_OWNER", "NETBLOCKV6_OWNER"]:
+            networks.append(self.targetValue)
+
+        valid = list()
+        for network in networks:
+            try:
+                SpiderFootIpRangeIndex.parse(network)
+            except (TypeError, ValueError):
+                continue
+            valid.append(network)
+
+        self._addressRanges = SpiderFootIpRangeIndex(valid)
+        self._addressRangesKey = key
+        return self._addressRanges
+
     def matches(self, value: str, includeParents: bool = False, includeChildren: bool = True) -> bool:
         """Check whether the supplied value is "tightly" related to the original target.
 
@@ -197,17 +229,7 @@ class SpiderFootTarget():
 
         # For IP addreses, check if it is an alias of the target or within the target's subnet.
         if netaddr.valid_ipv4(value) or netaddr.valid_ipv6(value):
-            if value in self.getAddresses():
-                return True
-
-            if self.targetType in ["IP_ADDRESS", "IPV6_ADDRESS", "NETBLOCK_OWNER", "NETBLOCKV6_OWNER"]:
-                try:
-                    if netaddr.IPAddress(value) in netaddr.IPNetwork(self.targetValue):
-                        return True
-                except netaddr.AddrFormatError:
-                    return False
-
-            return False
+            return self._getAddressRanges().contains(value)
 
         # For everything else, check if the value is within or equal to target names
         for name in self.getNames():
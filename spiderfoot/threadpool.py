@@ -1,7 +1,6 @@
-import queue
 import logging
 import threading
-from time import sleep
+from collections import deque
 from contextlib import suppress
 
 
@@ -9,6 +8,10 @@ class SpiderFootThreadPool:
     """
     Each thread in the pool is spawned only once, and reused for best performance.
 
+    Idle workers block on a condition variable until work is submitted, and
+    work is handed out round-robin across task names so that one busy module
+    cannot starve the others.
+
     Example 1: using map()
         with SpiderFootThreadPool(self.opts["_maxthreads"]) as pool:
             # callback("a", "arg1"), callback("b", "arg1"), ...
@@ -36,7 +39,7 @@ class SpiderFootThreadPool:
 
         Args:
             threads (int): Max number of threads
-            qsize (int): Queue size
+            qsize (int): Maximum number of queued (not yet running) calls per task
             name (str): Name
         """
         self.log = logging.getLogger(f"spiderfoot.{__name__}")
@@ -45,12 +48,28 @@ class SpiderFootThreadPool:
         self.pool = [None] * self.threads
         self.name = str(name)
         self.inputThread = None
+        # taskName -> deque of (callback, args, kwargs, saveResult)
         self.inputQueues = dict()
+        # taskName -> deque of saved results
         self.outputQueues = dict()
+        # taskName -> number of calls currently executing
+        self.runningTasks = dict()
+        # taskName -> number of map() feeder threads still submitting
+        self.feedingTasks = dict()
         self._stop = False
         self._lock = threading.Lock()
+        # task names with queued calls, in round-robin order
+        self._readyQueue = deque()
+        # signalled when a call is queued (or the pool is stopped)
+        self._workAvailable = threading.Condition(self._lock)
+        # signalled when a call completes or a feeder finishes
+        self._taskDone = threading.Condition(self._lock)
+        # taskName -> condition signalled when that task's state changes
+        self._taskConditions = dict()
 
     def start(self) -> None:
+        if any(self.pool):
+            return
         self.log.debug(f'Starting thread pool "{self.name}" with {self.threads:,} threads')
         for i in range(self.threads):
             t = ThreadPoolWorker(pool=self, name=f"{self.name}_worker_{i + 1}")
@@ -67,7 +86,40 @@ class SpiderFootThreadPool:
         for t in self.pool:
             with suppress(Exception):
                 t.stop = val
-        self._stop = val
+        with self._lock:
+            self._stop = val
+            self._notifyAll()
+
+    def _notifyAll(self) -> None:
+        """Wake up every thread waiting on the pool.
+
+        Note: must be called with self._lock held.
+        """
+        self._workAvailable.notify_all()
+        self._taskDone.notify_all()
+        for condition in self._taskConditions.values():
+            condition.notify_all()
+
+    def _taskCondition(self, taskName: str) -> threading.Condition:
+        """Condition variable for the specified task, created on first use.
+
+        Note: must be called with self._lock held.
+
+        Args:
+            taskName (str): Name of task
+
+        Returns:
+            threading.Condition: condition sharing the pool lock
+        """
+        try:
+            return self._taskConditions[taskName]
+        except KeyError:
+            self._taskConditions[taskName] = threading.Condition(self._lock)
+            self.inputQueues.setdefault(taskName, deque())
+            self.outputQueues.setdefault(taskName, deque())
+            self.runningTasks.setdefault(taskName, 0)
+            self.feedingTasks.setdefault(taskName, 0)
+            return self._taskConditions[taskName]
 
     def shutdown(self, wait: bool = True) -> dict:
         """Shut down the pool.
@@ -78,59 +130,50 @@ class SpiderFootThreadPool:
         Returns:
             results (dict): (unordered) results in the format: {"taskName": [returnvalue1, returnvalue2, ...]}
         """
-        results = dict()
         self.log.debug(f'Shutting down thread pool "{self.name}" with wait={wait}')
         if wait:
-            while not self.finished and not self.stop:
-                with self._lock:
-                    outputQueues = list(self.outputQueues)
-                for taskName in outputQueues:
-                    moduleResults = list(self.results(taskName))
-                    try:
-                        results[taskName] += moduleResults
-                    except KeyError:
-                        results[taskName] = moduleResults
-                sleep(.1)
+            with self._lock:
+                while not self._finished():
+                    self._taskDone.wait()
         self.stop = True
-        # make sure input queues are empty
-        with self._lock:
-            inputQueues = list(self.inputQueues.values())
-        for q in inputQueues:
-            with suppress(Exception):
-                while 1:
-                    q.get_nowait()
-            with suppress(Exception):
-                q.close()
-        # make sure output queues are empty
+        results = dict()
         with self._lock:
-            outputQueues = list(self.outputQueues.items())
-        for taskName, q in outputQueues:
-            moduleResults = list(self.results(taskName))
-            try:
-                results[taskName] += moduleResults
-            except KeyError:
-                results[taskName] = moduleResults
-            with suppress(Exception):
-                q.close()
+            # make sure input queues are empty
+            for q in self.inputQueues.values():
+                q.clear()
+            self._readyQueue.clear()
+            for taskName, q in self.outputQueues.items():
+                results[taskName] = list(q)
+                q.clear()
         return results
 
     def submit(self, callback, *args, **kwargs) -> None:
         """Submit a function call to the pool.
-        The "taskName" and "maxThreads" arguments are optional.
+        The "taskName", "maxThreads" and "saveResult" arguments are optional.
+
+        Blocks while the task already has "maxThreads" calls queued or running.
 
         Args:
             callback (function): callback function
             *args: Passed through to callback
-            **kwargs: Passed through to callback, except for taskName and maxThreads
+            **kwargs: Passed through to callback, except for taskName, maxThreads and saveResult
         """
-        taskName = kwargs.get('taskName', 'default')
+        taskName = kwargs.pop('taskName', 'default')
         maxThreads = kwargs.pop('maxThreads', 100)
-        # block if this module's thread limit has been reached
-        while self.countQueuedTasks(taskName) >= maxThreads:
-            sleep(.01)
-            continue
-        self.log.debug(f"Submitting function \"{callback.__name__}\" from module \"{taskName}\" to thread pool \"{self.name}\"")
-        self.inputQueue(taskName).put((callback, args, kwargs))
+        saveResult = kwargs.pop('saveResult', False)
+        with self._lock:
+            condition = self._taskCondition(taskName)
+            inputQueue = self.inputQueues[taskName]
+            # block if this module's thread limit has been reached
+            while not self._stop and (len(inputQueue) >= self.qsize or len(inputQueue) + self.runningTasks[taskName] >= maxThreads):
+                condition.wait()
+            if self._stop:
+                return
+            self.log.debug(f"Submitting function \"{callback.__name__}\" from module \"{taskName}\" to thread pool \"{self.name}\"")
+            if not inputQueue:
+                self._readyQueue.append(taskName)
+            inputQueue.append((callback, args, kwargs, saveResult))
+            self._workAvailable.notify()
 
     def countQueuedTasks(self, taskName: str) -> int:
         """For the specified task, returns the number of queued function calls
@@ -142,29 +185,8 @@ class SpiderFootThreadPool:
         Returns:
             int: the number of queued function calls plus the number of functions which are currently executing
         """
-        queuedTasks = 0
-        with suppress(Exception):
-            queuedTasks += self.inputQueues[taskName].qsize()
-        runningTasks = 0
-        for t in self.pool:
-            with suppress(Exception):
-                if t.taskName == taskName:
-                    runningTasks += 1
-        return queuedTasks + runningTasks
-
-    def inputQueue(self, taskName: str = "default") -> str:
-        try:
-            return self.inputQueues[taskName]
-        except KeyError:
-            self.inputQueues[taskName] = queue.Queue(self.qsize)
-            return self.inputQueues[taskName]
-
-    def outputQueue(self, taskName: str = "default") -> str:
-        try:
-            return self.outputQueues[taskName]
-        except KeyError:
-            self.outputQueues[taskName] = queue.Queue(self.qsize)
-            return self.outputQueues[taskName]
+        with self._lock:
+            return len(self.inputQueues.get(taskName, ())) + self.runningTasks.get(taskName, 0)
 
     def map(self, callback, iterable, *args, **kwargs) -> None:  # noqa: A003
         """map.
@@ -179,44 +201,108 @@ class SpiderFootThreadPool:
             return values from completed callback function
         """
         taskName = kwargs.get("taskName", "default")
+        with self._lock:
+            self._taskCondition(taskName)
+            self.feedingTasks[taskName] += 1
         self.inputThread = threading.Thread(target=self.feedQueue, args=(callback, iterable, args, kwargs))
         self.inputThread.start()
         self.start()
-        sleep(.1)
         yield from self.results(taskName, wait=True)
 
     def results(self, taskName: str = "default", wait: bool = False) -> None:
+        """Yield saved results for the specified task as soon as they are produced.
+
+        Args:
+            taskName (str): Name of task
+            wait (bool): Keep waiting until the task has no more queued or running calls
+
+        Yields:
+            return values from completed callback functions
+        """
         while 1:
-            result = False
-            with suppress(Exception):
-                while 1:
-                    yield self.outputQueue(taskName).get_nowait()
-                    result = True
-            if self.countQueuedTasks(taskName) == 0 or not wait:
-                break
-            if not result:
-                # sleep briefly to save CPU
-                sleep(.1)
+            with self._lock:
+                condition = self._taskCondition(taskName)
+                outputQueue = self.outputQueues[taskName]
+                while wait and not outputQueue and not self._taskFinished(taskName):
+                    condition.wait()
+                if not outputQueue:
+                    return
+                result = outputQueue.popleft()
+            yield result
 
     def feedQueue(self, callback, iterable, args, kwargs) -> None:
-        for i in iterable:
-            if self.stop:
-                break
-            self.submit(callback, i, *args, **kwargs)
+        taskName = kwargs.get("taskName", "default")
+        try:
+            for i in iterable:
+                if self.stop:
+                    break
+                self.submit(callback, i, *args, **kwargs)
+        finally:
+            with self._lock:
+                self.feedingTasks[taskName] -= 1
+                self._taskConditions[taskName].notify_all()
+                self._taskDone.notify_all()
+
+    def _taskFinished(self, taskName: str) -> bool:
+        """Note: must be called with self._lock held."""
+        if self._stop:
+            return True
+        return not (self.inputQueues[taskName] or self.runningTasks[taskName] or self.feedingTasks[taskName])
+
+    def _finished(self) -> bool:
+        """Note: must be called with self._lock held."""
+        if self._stop:
+            return True
+        return all(self._taskFinished(taskName) for taskName in self._taskConditions)
 
     @property
     def finished(self):
-        if self.stop:
-            return True
+        with self._lock:
+            return self._finished()
 
-        finishedThreads = [not t.busy for t in self.pool if t is not None]
-        try:
-            inputThreadAlive = self.inputThread.is_alive()
-        except AttributeError:
-            inputThreadAlive = False
+    def _nextTask(self, worker) -> tuple:
+        """Block until a call is available, then claim it.
+
+        Args:
+            worker (ThreadPoolWorker): worker claiming the call
+
+        Returns:
+            tuple: (taskName, callback, args, kwargs, saveResult), or None if the pool was stopped
+        """
+        with self._lock:
+            while not self._readyQueue and not self._stop and not worker.stop:
+                self._workAvailable.wait()
+            if self._stop or worker.stop:
+                return None
+            taskName = self._readyQueue.popleft()
+            inputQueue = self.inputQueues[taskName]
+            callback, args, kwargs, saveResult = inputQueue.popleft()
+            # go to the back of the line so other tasks get a turn
+            if inputQueue:
+                self._readyQueue.append(taskName)
+            self.runningTasks[taskName] += 1
+            worker.busy = True
+            worker.taskName = taskName
+            self._taskConditions[taskName].notify_all()
+            return taskName, callback, args, kwargs, saveResult
+
+    def _taskComplete(self, worker, taskName: str, result, saveResult: bool) -> None:
+        """Record the completion of a call claimed by _nextTask().
 
-        inputQueuesEmpty = [q.empty() for q in self.inputQueues.values()]
-        return not inputThreadAlive and all(inputQueuesEmpty) and all(finishedThreads)
+        Args:
+            worker (ThreadPoolWorker): worker which ran the call
+            taskName (str): Name of task
+            result: return value of the call
+            saveResult (bool): whether to save the return value
+        """
+        with self._lock:
+            if saveResult:
+                self.outputQueues[taskName].append(result)
+            self.runningTasks[taskName] -= 1
+            worker.busy = False
+            worker.taskName = ""
+            self._taskConditions[taskName].notify_all()
+            self._taskDone.notify_all()
 
     def __enter__(self):
         return self
@@ -238,33 +324,17 @@ class ThreadPoolWorker(threading.Thread):
         super().__init__(name=name)
 
     def run(self) -> None:
-        # Round-robin through each module's input queue
         while not self.stop:
-            ran = False
-            with self.pool._lock:
-                inputQueues = list(self.pool.inputQueues.values())
-            for q in inputQueues:
-                if self.stop:
-                    break
-                try:
-                    self.busy = True
-                    callback, args, kwargs = q.get_nowait()
-                    self.taskName = kwargs.pop("taskName", "default")
-                    saveResult = kwargs.pop("saveResult", False)
-                    try:
-                        result = callback(*args, **kwargs)
-                        ran = True
-                    except Exception:  # noqa: B902
-                        import traceback
-                        self.log.error(f'Error in thread worker {self.name}: {traceback.format_exc()}')
-                        break
-                    if saveResult:
-                        self.pool.outputQueue(self.taskName).put(result)
-                except queue.Empty:
-                    self.busy = False
-                finally:
-                    self.busy = False
-                    self.taskName = ""
-            # sleep briefly to save CPU
-            if not ran:
-                sleep(.05)
+            task = self.pool._nextTask(self)
+            if task is None:
+                break
+            taskName, callback, args, kwargs, saveResult = task
+            result = None
+            try:
+                result = callback(*args, **kwargs)
+            except Exception:  # noqa: B902
+                import traceback
+                self.log.error(f'Error in thread worker {self.name}: {traceback.format_exc()}')
+                saveResult = False
+            finally:
+                self.pool._taskComplete(self, taskName, result, saveResult)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Measure SpiderFootEvent construction time and memory use.
+
+Creates events sharing one parent event and reports the time taken to
+construct each event and the memory each one uses.
+
+Must be run from SpiderFoot root directory; ie:
+    python3 test/benchmark/bench_event.py [--events 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.getcwd())
+
+from spiderfoot import SpiderFootEvent  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SpiderFootEvent construction benchmark")
+    parser.add_argument("--events", type=int, default=1000000, help="number of events to create")
+    args = parser.parse_args()
+
+    root = SpiderFootEvent("ROOT", "spiderfoot.net", "", None)
+    parent = SpiderFootEvent("INTERNET_NAME", "spiderfoot.net", "sfp_dnsresolve", root)
+    names = [f"host{i}.spiderfoot.net" for i in range(args.events)]
+
+    start = time.perf_counter()
+    events = [SpiderFootEvent("INTERNET_NAME", name, "sfp_dnsresolve", parent) for name in names]
+    elapsed = time.perf_counter() - start
+    del events
+
+    tracemalloc.start()
+    events = [SpiderFootEvent("INTERNET_NAME", name, "sfp_dnsresolve", parent) for name in names]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"events:    {len(events):,}")
+    print(f"construct: {elapsed / len(events) * 1e6:.2f} us/event")
+    print(f"memory:    {used / len(events):.0f} bytes/event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Measure the time and peak memory of an Excel export of a large scan.
+
+Stores a scan with the requested number of events in a temporary
+database, then exports it through SpiderFootWebUi.scaneventresultexport()
+and reads the whole response, as the web server would.
+
+The 'legacy' database profile is used by default, so that memory mapped
+database pages don't count towards the process RSS.
+
+Must be run from SpiderFoot root directory; ie:
+    python3 test/benchmark/bench_excel_export.py [--events 505000]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from sfwebui import SpiderFootWebUi  # noqa: E402
+from spiderfoot import SpiderFootDb, SpiderFootEvent, SpiderFootHelpers  # noqa: E402
+
+
+def peakRss() -> int:
+    """Peak resident set size of this process, in bytes (Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def storeScan(opts: dict, scanId: str, events: int) -> None:
+    dbh = SpiderFootDb(opts)
+    dbh.scanInstanceCreate(scanId, "benchmark", "spiderfoot.net")
+
+    root = SpiderFootEvent("ROOT", "spiderfoot.net", "", None)
+    dbh.scanEventStore(scanId, root)
+    eventTypes = ["INTERNET_NAME", "IP_ADDRESS", "EMAILADDR", "LINKED_URL_INTERNAL", "RAW_RIR_DATA"]
+    batch = []
+    for i in range(events):
+        batch.append(SpiderFootEvent(eventTypes[i % len(eventTypes)], f"data {i} for host{i}.spiderfoot.net", "sfp_benchmark", root))
+        if len(batch) == 5000:
+            dbh.scanEventStoreBatch(scanId, batch)
+            batch = []
+    if batch:
+        dbh.scanEventStoreBatch(scanId, batch)
+    dbh.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Excel export benchmark")
+    parser.add_argument("--events", type=int, default=505000, help="number of events in the scan")
+    parser.add_argument("--dbprofile", default="legacy", help="database storage profile")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        opts = {
+            '__database': os.path.join(tmpdir, "spiderfoot.db"),
+            '__dbprofile': args.dbprofile,
+            '__modules__': dict(),
+            '__correlationrules__': list(),
+            '_debug': False,
+            '__logging': False,
+        }
+        scanId = SpiderFootHelpers.genScanInstanceId()
+        storeScan(opts, scanId, args.events)
+
+        sfwebui = SpiderFootWebUi({'root': '/'}, opts)
+        rssBefore = peakRss()
+        start = time.perf_counter()
+        size = 0
+        for chunk in sfwebui.scaneventresultexport(scanId, "ALL", "excel"):
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+
+    print(f"events:    {args.events:,}")
+    print(f"workbook:  {size / 1024 / 1024:.1f} MB")
+    print(f"time:      {elapsed:.1f}s")
+    print(f"peak RSS:  +{(peakRss() - rssBefore) / 1024 / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
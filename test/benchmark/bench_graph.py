@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Measure scan graph generation on large scan results.
+
+Two synthetic scan results are used:
+
+- chain: a chain of spidered URLs (non-entity data) under the target,
+  each with an email address (an entity) found on it, so the nearest
+  entity ancestor of each email address is the target.
+- mapping: entities linked to randomly chosen entity parents, giving a
+  graph with the requested number of edges.
+
+The time to build the graph data for the chain, and the time and peak
+memory to stream a GEXF or JSON graph of the mapping, are reported. Peak
+memory can only grow, so run each format in a separate process.
+
+Must be run from SpiderFoot root directory; ie:
+    python3 test/benchmark/bench_graph.py [--format gexf|json] [--chain 16000] [--entities 300000] [--edges 1000000]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from spiderfoot import SpiderFootHelpers  # noqa: E402
+
+
+def row(data: str, source: str, eventType: str) -> list:
+    """Scan result row, in the format returned by SpiderFootDb.scanResultEvent()."""
+    return [0, data, source, "sfp_benchmark", "BENCHMARK", 100, 100, 0, "hash", "source hash", "descr", eventType, "scan", 0, 0]
+
+
+def chainRows(length: int) -> list:
+    rows = [row("spiderfoot.net", "spiderfoot.net", "INTERNAL"), row("url 0", "spiderfoot.net", "SUBENTITY")]
+    for i in range(1, length // 2):
+        rows.append(row(f"url {i}", f"url {i - 1}", "SUBENTITY"))
+        rows.append(row(f"user{i}@spiderfoot.net", f"url {i}", "ENTITY"))
+    return rows
+
+
+def mappingRows(count: int, edges: int) -> list:
+    rnd = random.Random(0)
+    rows = [row("spiderfoot.net", "spiderfoot.net", "INTERNAL")]
+    for i in range(1, count):
+        rows.append(row(f"host{i}.spiderfoot.net", "spiderfoot.net", "ENTITY"))
+    for _ in range(max(0, edges - count)):
+        child, parent = rnd.randrange(1, count), rnd.randrange(1, count)
+        rows.append(row(f"host{child}.spiderfoot.net", f"host{parent}.spiderfoot.net", "ENTITY"))
+    return rows
+
+
+def peakRss() -> int:
+    """Peak resident set size of this process, in bytes (Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def timeStream(name: str, chunks) -> None:
+    rssBefore = peakRss()
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in chunks)
+    elapsed = time.perf_counter() - start
+    print(f"  {name}: {elapsed:.2f}s, {size / 1024 / 1024:.1f} MB, peak RSS +{(peakRss() - rssBefore) / 1024 / 1024:.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan graph benchmark")
+    parser.add_argument("--format", choices=["gexf", "json"], default="gexf", help="graph format to stream")
+    parser.add_argument("--chain", type=int, default=16000, help="rows in the spidered URL chain")
+    parser.add_argument("--entities", type=int, default=300000, help="entities in the mapping")
+    parser.add_argument("--edges", type=int, default=1000000, help="edges in the entity mapping")
+    args = parser.parse_args()
+
+    rows = chainRows(args.chain)
+    start = time.perf_counter()
+    graphData = SpiderFootHelpers.buildGraphData(rows)
+    print(f"chain of {len(rows):,} rows: buildGraphData {time.perf_counter() - start:.2f}s, {len(graphData):,} edges")
+    del rows, graphData
+
+    rows = mappingRows(args.entities, args.edges)
+    print(f"mapping of {len(rows):,} rows:")
+    if args.format == "gexf":
+        timeStream("GEXF", SpiderFootHelpers.streamGraphGexf(["spiderfoot.net"], "benchmark", rows))
+    else:
+        timeStream("JSON", SpiderFootHelpers.streamGraphJson(["spiderfoot.net"], rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 import pytest
+import threading
 import unittest
 
 from modules.sfp__stor_db import sfp__stor_db
 from sflib import SpiderFoot
+from spiderfoot import SpiderFootDb, SpiderFootEvent
 
 
 @pytest.mark.usefixtures
@@ -25,3 +27,114 @@ class TestModuleStor_db(unittest.TestCase):
     def test_producedEvents_should_return_list(self):
         module = sfp__stor_db()
         self.assertIsInstance(module.producedEvents(), list)
+
+    def test_handleEvent_with_writer_should_store_events_in_batches(self):
+        sf = SpiderFoot(self.default_options)
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        scan_id = "example write-behind instance id"
+        sfdb.scanInstanceCreate(scan_id, "example scan name", "spiderfoot.net")
+
+        module = sfp__stor_db()
+        opts = dict(self.default_options)
+        opts['batchsize'] = 2
+        module.setup(sf, opts)
+        module.setScanId(scan_id)
+        module.setDbh(sfdb)
+
+        module.writer = threading.Thread(target=module.writeBatches)
+        module.writer.start()
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        module.handleEvent(root_event)
+        for i in range(4):
+            module.handleEvent(SpiderFootEvent('INTERNET_NAME', f"{i}.spiderfoot.net", 'example module', root_event))
+
+        module.flush()
+        self.assertEqual(4, len(sfdb.scanResultEvent(scan_id, 'INTERNET_NAME')))
+
+        module.writerStopped = True
+        with module.batchCondition:
+            module.batchCondition.notify_all()
+        module.writer.join(timeout=5)
+        self.assertFalse(module.writer.is_alive())
+
+        sfdb.scanInstanceDelete(scan_id)
+
+    def test_handleEvent_with_writer_should_keep_storing_events_after_a_batch_fails(self):
+        sf = SpiderFoot(self.default_options)
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        scan_id = "example failed batch instance id"
+        sfdb.scanInstanceCreate(scan_id, "example scan name", "spiderfoot.net")
+
+        module = sfp__stor_db()
+        opts = dict(self.default_options)
+        opts['batchsize'] = 2
+        module.setup(sf, opts)
+        module.setScanId(scan_id)
+        module.setDbh(sfdb)
+
+        storeEvents = module.storeEvents
+
+        def storeEventsFailingOnBadEvent(dbh, sfEvents):
+            if any(sfEvent.data == "bad.spiderfoot.net" for sfEvent in sfEvents):
+                raise IOError("example storage error")
+            storeEvents(dbh, sfEvents)
+
+        module.storeEvents = storeEventsFailingOnBadEvent
+
+        module.writer = threading.Thread(target=module.writeBatches)
+        module.writer.start()
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        module.handleEvent(root_event)
+        for name in ["0.spiderfoot.net", "bad.spiderfoot.net", "1.spiderfoot.net", "2.spiderfoot.net"]:
+            module.handleEvent(SpiderFootEvent('INTERNET_NAME', name, 'example module', root_event))
+        module.flush()
+
+        for i in range(3, 6):
+            module.handleEvent(SpiderFootEvent('INTERNET_NAME', f"{i}.spiderfoot.net", 'example module', root_event))
+        module.flush()
+
+        module.writerStopped = True
+        with module.batchCondition:
+            module.batchCondition.notify_all()
+        module.writer.join(timeout=5)
+
+        stored = sorted(row[1] for row in sfdb.scanResultEvent(scan_id, 'INTERNET_NAME'))
+        self.assertEqual([f"{i}.spiderfoot.net" for i in range(6)], stored)
+        self.assertFalse(module.errorState)
+
+        sfdb.scanInstanceDelete(scan_id)
+
+    def test_handleEvent_with_dead_writer_should_store_events_directly(self):
+        sf = SpiderFoot(self.default_options)
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        scan_id = "example dead writer instance id"
+        sfdb.scanInstanceCreate(scan_id, "example scan name", "spiderfoot.net")
+
+        module = sfp__stor_db()
+        opts = dict(self.default_options)
+        opts['batchsize'] = 2
+        module.setup(sf, opts)
+        module.setScanId(scan_id)
+        module.setDbh(sfdb)
+
+        # a write-behind thread which exits without writing anything
+        module.writer = threading.Thread(target=lambda: None)
+        module.writer.start()
+        module.writer.join()
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        # left behind by the write-behind thread
+        module.batch = [root_event, SpiderFootEvent('INTERNET_NAME', "0.spiderfoot.net", 'example module', root_event)]
+        for i in range(1, 4):
+            module.handleEvent(SpiderFootEvent('INTERNET_NAME', f"{i}.spiderfoot.net", 'example module', root_event))
+
+        stored = sorted(row[1] for row in sfdb.scanResultEvent(scan_id, 'INTERNET_NAME'))
+        self.assertEqual([f"{i}.spiderfoot.net" for i in range(4)], stored)
+        self.assertEqual([], module.batch)
+
+        sfdb.scanInstanceDelete(scan_id)
@@ -0,0 +1,102 @@
+# test_spiderfootcachestore.py
+import copy
+import os
+import tempfile
+import time
+
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootCacheStore
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootCacheStore(unittest.TestCase):
+    """
+    Test SpiderFootCacheStore
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_init_argument_of_invalid_type_should_raise_TypeError(self):
+        with self.assertRaises(TypeError):
+            SpiderFootCacheStore(None)
+        with self.assertRaises(TypeError):
+            SpiderFootCacheStore(self.path, maxSize="1")
+
+    def test_init_argument_maxSize_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootCacheStore(self.path, maxSize=0)
+
+    def test_init_argument_path_unwritable_should_raise_IOError(self):
+        with self.assertRaises(IOError):
+            SpiderFootCacheStore(os.path.join(self.tmpdir.name, 'missing', 'cache.db'))
+
+    def test_get_should_return_stored_data(self):
+        store = SpiderFootCacheStore(self.path)
+        self.assertIsNone(store.get('example label'))
+
+        store.put('example label', 'example data')
+        store.put('example label', 'example data 2')
+
+        self.assertEqual('example data 2', store.get('example label'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'size': 14}, store.stats())
+
+    def test_get_should_not_return_data_older_than_maxAge(self):
+        store = SpiderFootCacheStore(self.path)
+        store.put('example label', 'example data')
+
+        time.sleep(0.01)
+
+        self.assertIsNone(store.get('example label', maxAge=0.001))
+        self.assertEqual('example data', store.get('example label', maxAge=3600))
+        self.assertEqual('example data', store.get('example label'))
+
+    def test_put_argument_of_invalid_type_should_raise_TypeError(self):
+        store = SpiderFootCacheStore(self.path)
+
+        invalid_types = [None, bytes(), list(), dict()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    store.put('example label', invalid_type)
+                with self.assertRaises(TypeError):
+                    store.put(invalid_type, 'example data')
+
+    def test_put_should_evict_least_recently_used_data(self):
+        store = SpiderFootCacheStore(self.path, maxSize=25)
+        store.touchInterval = 0
+        store.put('a', 'x' * 10)
+        store.put('b', 'x' * 10)
+        # reading "a" makes "b" the least recently used
+        store.get('a')
+        store.put('c', 'x' * 10)
+
+        self.assertIsNone(store.get('b'))
+        self.assertIsNotNone(store.get('a'))
+        self.assertIsNotNone(store.get('c'))
+        self.assertEqual(1, store.stats()['evictions'])
+
+    def test_put_should_be_visible_to_other_stores_sharing_the_file(self):
+        store = SpiderFootCacheStore(self.path)
+        otherStore = SpiderFootCacheStore(self.path)
+
+        store.put('example label', 'example data')
+        self.assertEqual('example data', otherStore.get('example label'))
+
+        otherStore.delete('example label')
+        self.assertIsNone(store.get('example label'))
+
+    def test_deepcopy_should_open_a_new_connection(self):
+        store = SpiderFootCacheStore(self.path)
+        store.put('example label', 'example data')
+
+        storeCopy = copy.deepcopy(store)
+        store.close()
+
+        self.assertEqual('example data', storeCopy.get('example label'))
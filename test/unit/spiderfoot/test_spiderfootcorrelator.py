@@ -1,7 +1,8 @@
 # test_spiderfootcorrelator.py
+import os
 import unittest
 
-from spiderfoot import SpiderFootCorrelator, SpiderFootDb
+from spiderfoot import SpiderFootCorrelator, SpiderFootDb, SpiderFootEvent, SpiderFootHelpers
 
 
 class TestSpiderFootCorrelator(unittest.TestCase):
@@ -30,6 +31,21 @@ class TestSpiderFootCorrelator(unittest.TestCase):
         with self.assertRaises(SyntaxError):
             SpiderFootCorrelator(sfdb, ruleset)
 
+    def test_init_argument_workers_invalid_type_should_raise_TypeError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        invalid_types = [None, str(), list(), dict()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    SpiderFootCorrelator(sfdb, {}, None, invalid_type)
+
+    def test_init_argument_workers_invalid_value_should_raise_ValueError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        with self.assertRaises(ValueError):
+            SpiderFootCorrelator(sfdb, {}, None, -1)
+
     def test_run_correlations_invalid_scan_instance_should_raise_ValueError(self):
         sfdb = SpiderFootDb(self.default_options, False)
 
@@ -37,6 +53,69 @@ class TestSpiderFootCorrelator(unittest.TestCase):
         with self.assertRaises(ValueError):
             correlator.run_correlations()
 
+    def test_update_correlations_invalid_scan_instance_should_raise_ValueError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        correlator = SpiderFootCorrelator(sfdb, {}, 'example scan id')
+        with self.assertRaises(ValueError):
+            correlator.update_correlations()
+
+    def test_store_correlations_should_reconcile_stored_correlations(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+        instance_id = "example store correlations instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        correlator = SpiderFootCorrelator(sfdb, {}, instance_id)
+        rule = {"id": "sample", "meta": {"name": "Sample", "description": "Sample rule", "risk": "INFO"}, "rawYaml": "sample"}
+
+        correlator.store_correlations([(rule, "kept", ["hash 1", "hash 2"]), (rule, "removed", ["hash 3"])])
+        stored = sfdb.scanCorrelationResultEvents(instance_id)
+        keptId = [correlationId for correlationId, (ruleId, title, eventIds) in stored.items() if title == "kept"][0]
+
+        correlator.store_correlations([(rule, "kept", ["hash 2", "hash 1"]), (rule, "added", ["hash 3", "hash 4"])])
+        stored = sfdb.scanCorrelationResultEvents(instance_id)
+        self.assertEqual({"kept", "added"}, set(title for ruleId, title, eventIds in stored.values()))
+        self.assertIn(keptId, stored)
+
+        correlator.store_correlations([])
+        self.assertEqual({}, sfdb.scanCorrelationResultEvents(instance_id))
+
+        sfdb.scanInstanceDelete(instance_id)
+
+    def test_run_correlations_with_workers_should_store_same_correlations_as_one_process(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+        instance_id = "example run correlations with workers instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        root_event = SpiderFootEvent("ROOT", "spiderfoot.net", "", None)
+        events = [root_event]
+        for name in ["dev.spiderfoot.net", "test.spiderfoot.net", "www.spiderfoot.net", "staging.spiderfoot.net"]:
+            events.append(SpiderFootEvent("INTERNET_NAME", name, "sfp_dnsbrute", root_event))
+        events.append(SpiderFootEvent("IP_ADDRESS", "10.0.0.1", "sfp_dnsresolve", events[1]))
+        events.append(SpiderFootEvent("EMAILADDR", "info@spiderfoot.net", "sfp_spider", root_event))
+        sfdb.scanEventStoreBatch(instance_id, events)
+
+        correlations_dir = os.path.dirname(os.path.abspath(__file__)) + '/../../../correlations/'
+        ruleset = SpiderFootHelpers.loadCorrelationRulesRaw(correlations_dir, ['template.yaml'])
+
+        def stored_correlations():
+            return sorted(
+                (ruleId, title, sorted(eventIds))
+                for ruleId, title, eventIds in sfdb.scanCorrelationResultEvents(instance_id).values()
+            )
+
+        SpiderFootCorrelator(sfdb, ruleset, instance_id, 1).run_correlations()
+        expected = stored_correlations()
+        self.assertTrue(expected)
+
+        correlator = SpiderFootCorrelator(sfdb, ruleset, instance_id, 2)
+        correlator.store_correlations([])
+        correlator.run_correlations()
+        self.assertEqual(expected, stored_correlations())
+
+        correlator.store_correlations([])
+        sfdb.scanInstanceDelete(instance_id)
+
     def test_build_db_criteria_argument_matchrule_invalid_type_should_raise_TypeError(self):
         sfdb = SpiderFootDb(self.default_options, False)
         correlator = SpiderFootCorrelator(sfdb, {})
@@ -172,3 +251,58 @@ class TestSpiderFootCorrelator(unittest.TestCase):
             "collections": []
         }
         self.assertFalse(correlator.check_rule_validity(rule))
+
+    def test_compile_rule_argument_rule_invalid_type_should_raise_TypeError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+        correlator = SpiderFootCorrelator(sfdb, {})
+
+        invalid_types = [None, str(), list(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    correlator.compile_rule(invalid_type)
+
+    def test_compile_rule_should_return_plan(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+        correlator = SpiderFootCorrelator(sfdb, {})
+
+        rule = {
+            "id": "sample",
+            "collections": [{
+                "collect": [
+                    {"method": "exact", "field": "type", "value": ["INTERNET_NAME", "INTERNET_NAME"]},
+                    {"method": "regex", "field": "source.data", "value": "not ^www\\."}
+                ]
+            }],
+            "aggregation": {"field": "data"}
+        }
+        plan = correlator.compile_rule(rule)
+
+        self.assertIs(rule, plan['rule'])
+        self.assertTrue(plan['fetchSources'])
+        self.assertFalse(plan['fetchChildren'])
+        self.assertEqual(1, len(plan['collections']))
+        self.assertEqual({'eventType': ["INTERNET_NAME"]}, plan['collections'][0]['criteria'])
+
+        matchfilter = plan['collections'][0]['filters'][0]
+        self.assertEqual("source.data", matchfilter['field'])
+        self.assertTrue(matchfilter['patterns'][0][0])
+        self.assertEqual("^www\\.", matchfilter['patterns'][0][1].pattern)
+
+    def test_filter_events_should_keep_matching_events(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+        correlator = SpiderFootCorrelator(sfdb, {})
+
+        events = [
+            {'data': "www.example.com", 'source': [{'data': "example.com"}]},
+            {'data': "mail.example.com", 'source': [{'data': "www.example.com"}]},
+            {'data': "WWW.EXAMPLE.NET", 'source': [{'data': "example.net"}]},
+        ]
+
+        matchfilter = correlator.compile_matchrule({"method": "regex", "field": "data", "value": ["not ^mail\\.", "^www\\."]})
+        correlator.filter_events(matchfilter, events)
+        self.assertEqual(["www.example.com", "WWW.EXAMPLE.NET"], [e['data'] for e in events])
+
+        matchfilter = correlator.compile_matchrule({"method": "exact", "field": "source.data", "value": "not example.net"})
+        correlator.filter_events(matchfilter, events)
+        self.assertEqual(["www.example.com"], [e['data'] for e in events])
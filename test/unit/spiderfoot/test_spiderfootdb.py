@@ -1,5 +1,6 @@
 # test_spiderfootdb.py
 import pytest
+import sqlite3
 import unittest
 
 from spiderfoot import SpiderFootDb, SpiderFootEvent
@@ -44,6 +45,74 @@ class TestSpiderFootDb(unittest.TestCase):
         sfdb = SpiderFootDb(self.default_options, False)
         self.assertIsInstance(sfdb, SpiderFootDb)
 
+    def test_init_argument_opts_with_unknown___dbprofile_value_should_raise_ValueError(self):
+        """
+        Test __init__(self, opts, init=False)
+        """
+        opts = dict(self.default_options)
+        opts['__dbprofile'] = 'example unknown profile'
+        with self.assertRaises(ValueError):
+            SpiderFootDb(opts)
+
+    def test_applyStorageProfile_should_apply_pragmas(self):
+        """
+        Test applyStorageProfile(self, profile, pragmas=None)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        sfdb.applyStorageProfile('default', {'cache_size': -1024})
+
+        sfdb.dbh.execute("PRAGMA journal_mode")
+        self.assertEqual('wal', sfdb.dbh.fetchone()[0])
+        sfdb.dbh.execute("PRAGMA synchronous")
+        self.assertEqual(1, sfdb.dbh.fetchone()[0])  # NORMAL
+        sfdb.dbh.execute("PRAGMA cache_size")
+        self.assertEqual(-1024, sfdb.dbh.fetchone()[0])
+
+    def test_applyStorageProfile_argument_pragmas_with_invalid_value_should_raise_ValueError(self):
+        """
+        Test applyStorageProfile(self, profile, pragmas=None)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        invalid_pragmas = [{'synchronous=OFF; DROP TABLE tbl_scan_results; --': 1}, {'synchronous': 'OFF; DROP TABLE tbl_scan_results'}]
+        for invalid_pragma in invalid_pragmas:
+            with self.subTest(invalid_pragma=invalid_pragma):
+                with self.assertRaises(ValueError):
+                    sfdb.applyStorageProfile('default', invalid_pragma)
+
+    def test_readCursor_should_return_read_only_cursor(self):
+        """
+        Test readCursor(self)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        with sfdb.readCursor() as dbh:
+            dbh.execute("SELECT COUNT(*) FROM tbl_event_types")
+            self.assertGreater(dbh.fetchone()[0], 0)
+
+            with self.assertRaises(sqlite3.OperationalError):
+                dbh.execute("DELETE FROM tbl_event_types")
+
+    def test_readCursor_should_return_committed_writes(self):
+        """
+        Test readCursor(self)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example read cursor instance id"
+        with sfdb.readCursor() as dbh:
+            dbh.execute("SELECT COUNT(*) FROM tbl_scan_instance WHERE guid = ?", [instance_id])
+            self.assertEqual(0, dbh.fetchone()[0])
+
+        SpiderFootDb(self.default_options, False).scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        with sfdb.readCursor() as dbh:
+            dbh.execute("SELECT COUNT(*) FROM tbl_scan_instance WHERE guid = ?", [instance_id])
+            self.assertEqual(1, dbh.fetchone()[0])
+
+        sfdb.scanInstanceDelete(instance_id)
+
     @unittest.skip("todo")
     def test_create_should_create_database_schema(self):
         """
@@ -457,6 +526,91 @@ class TestSpiderFootDb(unittest.TestCase):
                 with self.assertRaises(TypeError):
                     sfdb.scanResultEventUnique(instance_id, invalid_type, None)
 
+    def test_scanResultEventPage_should_return_pages_of_results(self):
+        """
+        Test scanResultEventPage(self, instanceId, eventType='ALL', srcModule=None, minRisk=None,
+                                 filterFp=False, sortBy='generated', reverse=False, after=None, limit=100)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example page instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        events = [root_event]
+        for i in range(5):
+            event = SpiderFootEvent('INTERNET_NAME', f"{i}.spiderfoot.net", 'example module', root_event)
+            event.risk = i * 10
+            events.append(event)
+        sfdb.scanEventStoreBatch(instance_id, events)
+
+        pages = list()
+        after = None
+        while True:
+            page = sfdb.scanResultEventPage(instance_id, 'INTERNET_NAME', sortBy='data', after=after, limit=2)
+            if not page:
+                break
+            pages.append([row[1] for row in page])
+            after = page[-1][-1]
+
+        self.assertEqual([
+            ['0.spiderfoot.net', '1.spiderfoot.net'],
+            ['2.spiderfoot.net', '3.spiderfoot.net'],
+            ['4.spiderfoot.net']
+        ], pages)
+
+        page = sfdb.scanResultEventPage(instance_id, 'INTERNET_NAME', minRisk=30, sortBy='risk', reverse=True)
+        self.assertEqual(['4.spiderfoot.net', '3.spiderfoot.net'], [row[1] for row in page])
+        self.assertEqual(2, sfdb.scanResultEventCount(instance_id, 'INTERNET_NAME', minRisk=30))
+
+        self.assertEqual(5, sfdb.scanResultEventCount(instance_id, 'INTERNET_NAME'))
+        self.assertEqual(0, sfdb.scanResultEventCount(instance_id, 'INTERNET_NAME', srcModule='other module'))
+
+        sfdb.scanInstanceDelete(instance_id)
+
+    def test_scanResultEventPage_argument_sortBy_invalid_value_should_raise_ValueError(self):
+        """
+        Test scanResultEventPage(self, instanceId, eventType='ALL', srcModule=None, minRisk=None,
+                                 filterFp=False, sortBy='generated', reverse=False, after=None, limit=100)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example instance id"
+        with self.assertRaises(ValueError):
+            sfdb.scanResultEventPage(instance_id, sortBy="invalid column")
+        with self.assertRaises(ValueError):
+            sfdb.scanResultEventPage(instance_id, limit=0)
+        with self.assertRaises(ValueError):
+            sfdb.scanResultEventPage(instance_id, after=[1])
+
+    def test_scanResultEventUniquePage_should_return_pages_of_unique_results(self):
+        """
+        Test scanResultEventUniquePage(self, instanceId, eventType='ALL', filterFp=False,
+                                       sortBy='count', reverse=False, after=None, limit=100)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example unique page instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        events = [root_event]
+        for i in range(3):
+            for _ in range(i + 1):
+                events.append(SpiderFootEvent('INTERNET_NAME', f"{i}.spiderfoot.net", 'example module', root_event))
+        sfdb.scanEventStoreBatch(instance_id, events)
+
+        page = sfdb.scanResultEventUniquePage(instance_id, 'INTERNET_NAME', reverse=True, limit=2)
+        self.assertEqual([('2.spiderfoot.net', 3), ('1.spiderfoot.net', 2)], [(row[0], row[2]) for row in page])
+
+        page = sfdb.scanResultEventUniquePage(instance_id, 'INTERNET_NAME', reverse=True, after=page[-1][-1], limit=2)
+        self.assertEqual([('0.spiderfoot.net', 1)], [(row[0], row[2]) for row in page])
+
+        with self.assertRaises(ValueError):
+            sfdb.scanResultEventUniquePage(instance_id, sortBy="invalid column")
+
+        sfdb.scanInstanceDelete(instance_id)
+
     def test_scanLogs_should_return_a_list(self):
         """
         Test scanLogs(self, instanceId, limit=None, fromRowId=None, reverse=False)
@@ -1052,6 +1206,39 @@ class TestSpiderFootDb(unittest.TestCase):
                     event.sourceEvent = invalid_type
                     sfdb.scanEventStore(instance_id, event)
 
+    def test_scanEventStoreBatch_should_store_scan_events(self):
+        """
+        Test scanEventStoreBatch(self, instanceId, sfEvents, truncateSize=0)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example batch instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        events = [root_event]
+        for i in range(5):
+            events.append(SpiderFootEvent('INTERNET_NAME', f"{i}.spiderfoot.net", 'example module', root_event))
+        sfdb.scanEventStoreBatch(instance_id, events)
+
+        results = sfdb.scanResultEvent(instance_id, 'INTERNET_NAME')
+        self.assertEqual(5, len(results))
+
+        sfdb.scanInstanceDelete(instance_id)
+
+    def test_scanEventStoreBatch_argument_sfEvents_of_invalid_type_should_raise_TypeError(self):
+        """
+        Test scanEventStoreBatch(self, instanceId, sfEvents, truncateSize=0)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example instance id"
+        invalid_types = [None, "", dict(), int(), [None]]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.scanEventStoreBatch(instance_id, invalid_type)
+
     def test_scanInstanceList_should_return_a_list(self):
         """
         Test scanInstanceList(self)
@@ -1249,6 +1436,66 @@ class TestSpiderFootDb(unittest.TestCase):
                 with self.assertRaises(TypeError):
                     sfdb.scanElementChildrenAll(instance_id, invalid_type)
 
+    def test_scanElementChildrenAll_should_return_all_descendants(self):
+        """
+        Test scanElementChildrenAll(self, instanceId, parentIds)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example lineage instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        host_event = SpiderFootEvent('INTERNET_NAME', 'www.spiderfoot.net', 'example module', root_event)
+        events = [root_event, host_event]
+        for i in range(3):
+            url_event = SpiderFootEvent('LINKED_URL_INTERNAL', f"https://www.spiderfoot.net/{i}", 'example module', host_event)
+            events.append(url_event)
+            events.append(SpiderFootEvent('RAW_RIR_DATA', f"example data {i}", 'example module', url_event))
+        sfdb.scanEventStoreBatch(instance_id, events)
+
+        children = sfdb.scanElementChildrenAll(instance_id, [host_event.hash])
+        self.assertCountEqual([e.hash for e in events[2:]], children)
+
+        sfdb.scanInstanceDelete(instance_id)
+
+    def test_scanElementSourcesRecursive_should_return_sources_up_to_root(self):
+        """
+        Test scanElementSourcesRecursive(self, instanceId, elementIdList)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example lineage instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        root_event = SpiderFootEvent('ROOT', 'spiderfoot.net', '', '')
+        host_event = SpiderFootEvent('INTERNET_NAME', 'www.spiderfoot.net', 'example module', root_event)
+        url_event = SpiderFootEvent('LINKED_URL_INTERNAL', 'https://www.spiderfoot.net/', 'example module', host_event)
+        raw_event = SpiderFootEvent('RAW_RIR_DATA', 'example data', 'example module', url_event)
+        sfdb.scanEventStoreBatch(instance_id, [root_event, host_event, url_event, raw_event])
+
+        sources = sfdb.scanElementSourcesRecursive(instance_id, [url_event.hash])
+        self.assertCountEqual([url_event.hash, host_event.hash, 'ROOT'], [row[8] for row in sources])
+
+        [datamap, pc] = sfdb.scanElementSourcesAll(instance_id, sfdb.scanResultEvent(instance_id, 'RAW_RIR_DATA'))
+        self.assertEqual({'ROOT': [host_event.hash], host_event.hash: [url_event.hash], url_event.hash: [raw_event.hash]}, pc)
+        self.assertEqual(4, len(datamap))
+
+        sfdb.scanInstanceDelete(instance_id)
+
+    def test_scanElementSourcesRecursive_argument_elementIdList_of_invalid_type_should_raise_TypeError(self):
+        """
+        Test scanElementSourcesRecursive(self, instanceId, elementIdList)
+        """
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        instance_id = "example instance id"
+        invalid_types = [None, "", dict(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.scanElementSourcesRecursive(instance_id, invalid_type)
+
     def test_correlationResultCreate_arguments_of_invalid_type_should_raise_TypeError(self):
         sfdb = SpiderFootDb(self.default_options, False)
 
@@ -1281,3 +1528,67 @@ class TestSpiderFootDb(unittest.TestCase):
             with self.subTest(invalid_type=invalid_type):
                 with self.assertRaises(TypeError):
                     sfdb.correlationResultCreate("", "", "", "", "", "", invalid_type, [])
+
+    def test_correlationResultCreateBatch_should_create_correlation_results(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+        instance_id = "example batch correlation instance id"
+        sfdb.scanInstanceCreate(instance_id, "example scan name", "spiderfoot.net")
+
+        correlations = [
+            ("rule_a", "Rule A", "Description A", "HIGH", "yaml a", "Title A", ["hash 1", "hash 2"]),
+            ("rule_b", "Rule B", "Description B", "LOW", "yaml b", "Title B", ["hash 3"]),
+        ]
+        ids = sfdb.correlationResultCreateBatch(instance_id, correlations)
+
+        self.assertEqual(2, len(set(ids)))
+        sfdb.dbh.execute("SELECT id, rule_id, title FROM tbl_scan_correlation_results WHERE id IN (?, ?) ORDER BY rule_id", ids)
+        self.assertEqual([(ids[0], "rule_a", "Title A"), (ids[1], "rule_b", "Title B")], sfdb.dbh.fetchall())
+        sfdb.dbh.execute("SELECT correlation_id, event_hash FROM tbl_scan_correlation_results_events WHERE correlation_id IN (?, ?) ORDER BY event_hash", ids)
+        self.assertEqual([(ids[0], "hash 1"), (ids[0], "hash 2"), (ids[1], "hash 3")], sfdb.dbh.fetchall())
+
+        sfdb.scanInstanceDelete(instance_id)
+
+    def test_correlationResultCreateBatch_arguments_of_invalid_type_should_raise_TypeError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        invalid_types = [None, dict(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.correlationResultCreateBatch(invalid_type, [])
+
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.correlationResultCreateBatch("", invalid_type)
+
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.correlationResultCreateBatch("", [invalid_type])
+
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.correlationResultCreateBatch("", [("", "", "", "", "", invalid_type, [])])
+
+    def test_correlationResultCreateBatch_argument_deleteIds_of_invalid_type_should_raise_TypeError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        invalid_types = [str(), dict(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.correlationResultCreateBatch("", [], invalid_type)
+
+    def test_scanCorrelationResultEvents_argument_instanceId_of_invalid_type_should_raise_TypeError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        invalid_types = [None, list(), dict(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    sfdb.scanCorrelationResultEvents(invalid_type)
+
+    def test_correlationResultCreateBatch_argument_correlations_with_missing_fields_should_raise_ValueError(self):
+        sfdb = SpiderFootDb(self.default_options, False)
+
+        with self.assertRaises(ValueError):
+            sfdb.correlationResultCreateBatch("", [("", "", "", "", "", "")])
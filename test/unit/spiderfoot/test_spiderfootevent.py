@@ -361,3 +361,56 @@ class TestSpiderFootEvent(unittest.TestCase):
         evt_hash = evt.hash
 
         self.assertIsInstance(evt_hash, str)
+
+    def test_freeze_should_make_event_read_only(self):
+        event_type = 'ROOT'
+        event_data = 'example event data'
+        module = ''
+        source_event = ''
+        source_event = SpiderFootEvent(event_type, event_data, module, source_event)
+
+        event_type = 'example non-root event type'
+        module = 'example module'
+        evt = SpiderFootEvent(event_type, event_data, module, source_event)
+        self.assertFalse(evt.frozen)
+
+        evt.moduleDataSource = 'example data source'
+        evt.freeze()
+        self.assertTrue(evt.frozen)
+
+        attributes = {
+            'eventType': 'another event type',
+            'data': 'other event data',
+            'module': 'another module',
+            'confidence': 50,
+            'visibility': 50,
+            'risk': 50,
+            'sourceEvent': source_event,
+            'actualSource': 'another actual source',
+            'moduleDataSource': 'another data source',
+        }
+        for attribute, value in attributes.items():
+            with self.subTest(attribute=attribute):
+                with self.assertRaises(AttributeError):
+                    setattr(evt, attribute, value)
+
+        self.assertEqual(evt.data, event_data)
+        self.assertEqual(evt.moduleDataSource, 'example data source')
+
+    def test_hash_attribute_should_be_stable_and_unique(self):
+        event_type = 'ROOT'
+        event_data = 'example event data'
+        module = ''
+        source_event = SpiderFootEvent(event_type, event_data, module, None)
+
+        event_type = 'example non-root event type'
+        module = 'example module'
+        evt = SpiderFootEvent(event_type, event_data, module, source_event)
+        child = SpiderFootEvent(event_type, event_data, module, evt)
+
+        self.assertEqual(evt.hash, evt.hash)
+        self.assertEqual(len(evt.hash), 64)
+        self.assertNotEqual(evt.hash, child.hash)
+        self.assertEqual(child.sourceEventHash, evt.hash)
+        self.assertEqual(evt.sourceEventHash, 'ROOT')
+        self.assertEqual(source_event.sourceEventHash, 'ROOT')
@@ -0,0 +1,145 @@
+# test_spiderfootfeedindex.py
+import copy
+import os
+import tempfile
+import time
+
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootFeedIndex
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootFeedIndex(unittest.TestCase):
+    """
+    Test SpiderFootFeedIndex
+    """
+
+    entries = [
+        '1.1.1.1',
+        '10.0.0.5',
+        '10.0.0.200',
+        ' 2001:db8::1 ',
+        'Malicious.Example.com',
+        '1password.example.net',
+        '',
+    ]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'feeds', 'example.idx')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_init_argument_path_of_invalid_type_should_raise_TypeError(self):
+        with self.assertRaises(TypeError):
+            SpiderFootFeedIndex(None)
+
+    def test_init_argument_path_invalid_file_should_raise_IOError(self):
+        with self.assertRaises(IOError):
+            SpiderFootFeedIndex(self.path)
+
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as f:
+            f.write(b'not an index')
+
+        with self.assertRaises(IOError):
+            SpiderFootFeedIndex(self.path)
+
+    def test_build_should_index_ips_and_domains(self):
+        index = SpiderFootFeedIndex.build(self.path, self.entries)
+
+        self.assertEqual(6, len(index))
+        self.assertEqual((3, 1, 2), (index.ipv4Count, index.ipv6Count, index.domainCount))
+
+        self.assertTrue(index.containsIp('10.0.0.5'))
+        self.assertTrue(index.containsIp('2001:0db8:0000::1'))
+        self.assertFalse(index.containsIp('10.0.0.6'))
+        self.assertFalse(index.containsIp('not an ip'))
+
+        self.assertTrue(index.containsDomain('malicious.example.com'))
+        self.assertTrue(index.containsDomain('MALICIOUS.EXAMPLE.COM.'))
+        self.assertTrue(index.containsDomain('1password.example.net'))
+        self.assertFalse(index.containsDomain('example.com'))
+        self.assertFalse(index.containsDomain(''))
+
+    def test_ipsInNetblock_should_return_ips_within_netblock(self):
+        index = SpiderFootFeedIndex.build(self.path, self.entries)
+
+        self.assertEqual(['10.0.0.5', '10.0.0.200'], index.ipsInNetblock('10.0.0.0/24'))
+        self.assertEqual(['10.0.0.5'], index.ipsInNetblock('10.0.0.0/25'))
+        self.assertEqual(['2001:db8::1'], index.ipsInNetblock('2001:db8::/32'))
+        self.assertEqual([], index.ipsInNetblock('192.168.0.0/16'))
+        self.assertEqual([], index.ipsInNetblock('not a netblock'))
+
+    def test_build_should_index_netblocks(self):
+        index = SpiderFootFeedIndex.build(self.path, ['192.168.0.0/24', '192.168.1.0/24', '2001:db8:1::/48', '10.0.0.5', 'invalid/24'])
+
+        self.assertEqual(2, index.rangeCount)
+        self.assertTrue(index.containsIp('192.168.1.99'))
+        self.assertTrue(index.containsIp('2001:db8:1::99'))
+        self.assertFalse(index.containsIp('192.168.2.1'))
+
+        self.assertTrue(index.intersects('192.168.0.0/16'))
+        self.assertTrue(index.intersects('192.168.1.128/25'))
+        self.assertTrue(index.intersects('2001:db8::/32'))
+        self.assertTrue(index.intersects('10.0.0.0/24'))
+        self.assertFalse(index.intersects('10.0.1.0/24'))
+        self.assertFalse(index.intersects('2001:db8:2::/48'))
+        self.assertEqual([], index.ipsInNetblock('192.168.0.0/16'))
+
+    def test_empty_index_should_contain_nothing(self):
+        index = SpiderFootFeedIndex.build(self.path, [])
+
+        self.assertEqual(0, len(index))
+        self.assertFalse(index.containsIp('1.1.1.1'))
+        self.assertFalse(index.containsDomain('example.com'))
+        self.assertEqual([], index.ipsInNetblock('0.0.0.0/0'))
+        self.assertFalse(index.intersects('0.0.0.0/0'))
+
+    def test_shared_should_only_call_loader_when_index_is_missing_or_too_old(self):
+        calls = list()
+
+        def loader():
+            calls.append(True)
+            return self.entries
+
+        index = SpiderFootFeedIndex.shared(self.path, 3600, loader)
+        self.assertTrue(index.containsIp('1.1.1.1'))
+
+        self.assertIs(index, SpiderFootFeedIndex.shared(self.path, 3600, loader))
+        self.assertEqual(1, len(calls))
+
+        old = time.time() - 7200
+        os.utime(self.path, (old, old))
+        SpiderFootFeedIndex.shared(self.path, 3600, loader)
+        self.assertEqual(2, len(calls))
+
+        os.utime(self.path, (old, old))
+        SpiderFootFeedIndex.shared(self.path, 0, loader)
+        self.assertEqual(2, len(calls))
+
+    def test_shared_should_return_None_if_loader_fails(self):
+        self.assertIsNone(SpiderFootFeedIndex.shared(self.path, 3600, lambda: None))
+
+    def test_shared_argument_loader_not_callable_should_raise_TypeError(self):
+        with self.assertRaises(TypeError):
+            SpiderFootFeedIndex.shared(self.path, 3600, self.entries)
+
+    def test_rebuilt_index_should_not_affect_index_already_open(self):
+        index = SpiderFootFeedIndex.build(self.path, ['1.1.1.1'])
+        newIndex = SpiderFootFeedIndex.build(self.path, ['2.2.2.2'])
+
+        self.assertTrue(index.containsIp('1.1.1.1'))
+        self.assertFalse(newIndex.containsIp('1.1.1.1'))
+        self.assertTrue(newIndex.containsIp('2.2.2.2'))
+
+    def test_deepcopy_should_map_the_file_again(self):
+        index = SpiderFootFeedIndex.build(self.path, self.entries)
+
+        indexCopy = copy.deepcopy(index)
+
+        self.assertTrue(indexCopy.containsIp('1.1.1.1'))
+        self.assertTrue(indexCopy.containsDomain('malicious.example.com'))
@@ -0,0 +1,130 @@
+# test_spiderfootgraphsummary.py
+import pytest
+import unittest
+
+from publicsuffixlist import PublicSuffixList
+
+from spiderfoot import SpiderFootGraphSummary
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootGraphSummary(unittest.TestCase):
+    """
+    Test SpiderFootGraphSummary
+    """
+
+    def row(self, data, source, eventType, module="sfp_example", category="ENTITY"):
+        return (0, data, source, module, eventType, 100, 100, 0, 'hash', 'source hash', f"{eventType} description", category, 'example scan', 0, 0)
+
+    def example_data(self):
+        return [
+            self.row("example.com", "ROOT", "ROOT", module="", category="INTERNAL"),
+            self.row("www.example.com", "example.com", "INTERNET_NAME", module="sfp_dns"),
+            self.row("mail.example.com", "example.com", "INTERNET_NAME", module="sfp_dns"),
+            self.row("1.2.3.4", "www.example.com", "IP_ADDRESS", module="sfp_dns"),
+            self.row("1.2.3.5", "mail.example.com", "IP_ADDRESS", module="sfp_dns"),
+            self.row("https://www.example.com/contact", "www.example.com", "LINKED_URL_INTERNAL", module="sfp_spider", category="DESCRIPTOR"),
+            self.row("admin@example.com", "https://www.example.com/contact", "EMAILADDR", module="sfp_email"),
+            self.row("admin@example.net", "https://www.example.com/contact", "EMAILADDR", module="sfp_email"),
+        ]
+
+    def test_init_argument_roots_of_invalid_type_should_raise_TypeError(self):
+        with self.assertRaises(TypeError):
+            SpiderFootGraphSummary("example.com", self.example_data())
+
+    def test_init_argument_data_with_no_rows_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootGraphSummary(["example.com"], [])
+
+    def test_init_should_build_entity_graph(self):
+        summary = SpiderFootGraphSummary(["example.com"], iter(self.example_data()))
+
+        self.assertEqual(7, summary.nodeCount)
+        self.assertEqual(6, summary.edgeCount)
+
+    def test_view_should_collapse_entities_into_clusters(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+        view = summary.view("type")
+
+        nodes = {node['id']: node for node in view['nodes']}
+        self.assertEqual({"cluster:ROOT", "cluster:INTERNET_NAME", "cluster:IP_ADDRESS", "cluster:EMAILADDR"}, set(nodes))
+        self.assertEqual(2, nodes["cluster:INTERNET_NAME"]['size'])
+        self.assertEqual("EMAILADDR description", nodes["cluster:EMAILADDR"]['label'])
+        self.assertTrue(nodes["cluster:ROOT"]['root'])
+        self.assertFalse(nodes["cluster:IP_ADDRESS"]['root'])
+
+        edges = {tuple(sorted((edge['source'], edge['target']))): edge['weight'] for edge in view['edges']}
+        self.assertEqual(2, edges[("cluster:INTERNET_NAME", "cluster:ROOT")])
+        self.assertEqual(2, edges[("cluster:EMAILADDR", "cluster:INTERNET_NAME")])
+        self.assertEqual(2, edges[("cluster:INTERNET_NAME", "cluster:IP_ADDRESS")])
+        self.assertEqual(4, view['clusterCount'])
+        self.assertEqual(7, view['nodeCount'])
+        self.assertEqual(6, view['edgeCount'])
+
+    def test_view_should_expand_clusters(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+        view = summary.view("type", ["INTERNET_NAME"])
+
+        nodes = {node['id']: node for node in view['nodes']}
+        self.assertNotIn("cluster:INTERNET_NAME", nodes)
+        self.assertIn("node:www.example.com", nodes)
+        self.assertEqual("sfp_dns", nodes["node:www.example.com"]['module'])
+        self.assertEqual(4, nodes["node:www.example.com"]['edges'])
+
+        edges = {tuple(sorted((edge['source'], edge['target']))): edge['weight'] for edge in view['edges']}
+        self.assertEqual(1, edges[("cluster:ROOT", "node:www.example.com")])
+        self.assertEqual(2, edges[("cluster:EMAILADDR", "node:www.example.com")])
+        self.assertEqual(1, edges[("cluster:IP_ADDRESS", "node:mail.example.com")])
+        self.assertEqual(6, sum(edges.values()))
+
+    def test_view_should_limit_expanded_entities(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+        view = summary.view("type", ["INTERNET_NAME"], limit=1)
+
+        nodes = {node['id']: node for node in view['nodes']}
+        # the entity with the most edges is shown, and the other stays in the cluster
+        self.assertIn("node:www.example.com", nodes)
+        self.assertNotIn("node:mail.example.com", nodes)
+        self.assertEqual(1, nodes["cluster:INTERNET_NAME"]['size'])
+        self.assertEqual(6, sum(edge['weight'] for edge in view['edges']))
+
+    def test_view_should_limit_clusters(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+        view = summary.view("type", clusterLimit=2)
+
+        nodes = {node['id']: node for node in view['nodes']}
+        self.assertEqual({"cluster:EMAILADDR", "cluster:INTERNET_NAME", "other"}, set(nodes))
+        self.assertEqual(3, nodes["other"]['size'])
+        self.assertEqual(0, nodes["other"]['edges'])
+        self.assertTrue(nodes["other"]['root'])
+        self.assertEqual(6, sum(edge['weight'] for edge in view['edges']))
+
+    def test_view_should_group_by_domain(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+        view = summary.view("domain")
+
+        nodes = {node['id']: node for node in view['nodes']}
+        self.assertEqual({"cluster:example.com", "cluster:example.net", "cluster:1.2.3.0/24"}, set(nodes))
+        self.assertEqual(4, nodes["cluster:example.com"]['size'])
+        self.assertEqual(3, nodes["cluster:example.com"]['edges'])
+
+    def test_view_invalid_arguments_should_raise(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+
+        with self.assertRaises(ValueError):
+            summary.view("invalid grouping")
+        with self.assertRaises(ValueError):
+            summary.view("type", limit=0)
+        with self.assertRaises(TypeError):
+            summary.view("type", "INTERNET_NAME")
+
+    def test_domain_should_return_registered_domain_or_network(self):
+        summary = SpiderFootGraphSummary(["example.com"], self.example_data())
+        psl = PublicSuffixList(None, only_icann=True, accept_unknown=False)
+
+        self.assertEqual("example.co.uk", summary.domain("https://www.Example.co.uk/path", psl))
+        self.assertEqual("example.com", summary.domain("user@mail.example.com", psl))
+        self.assertEqual("1.2.3.0/24", summary.domain("1.2.3.4", psl))
+        self.assertEqual("2001:db8::/64", summary.domain("2001:db8::1", psl))
+        self.assertEqual("", summary.domain("John Smith", psl))
+        self.assertEqual("", summary.domain("localhost", psl))
@@ -5,6 +5,11 @@ import unittest
 from spiderfoot import SpiderFootHelpers
 
 
+def row(data, source, event_type):
+    """Scan result row, in the format returned by SpiderFootDb.scanResultEvent()."""
+    return [0, data, source, "module", "TYPE", 100, 100, 0, "hash", "source hash", "descr", event_type, "scan", 0, 0]
+
+
 @pytest.mark.usefixtures
 class TestSpiderFootHelpers(unittest.TestCase):
 
@@ -123,6 +128,55 @@ class TestSpiderFootHelpers(unittest.TestCase):
 
         self.assertEqual('TBD', 'TBD')
 
+    def test_buildGraphData_should_link_entities_to_nearest_entity_ancestors(self):
+        rows = [
+            row("spiderfoot.net", "spiderfoot.net", "INTERNAL"),
+            row("1.1.1.1", "spiderfoot.net", "ENTITY"),
+            row("raw data", "1.1.1.1", "DATA"),
+            row("more raw data", "raw data", "DATA"),
+            # cycle of non-entity data
+            row("raw data", "more raw data", "DATA"),
+            row("www.spiderfoot.net", "more raw data", "ENTITY"),
+            row("www.spiderfoot.net", "spiderfoot.net", "ENTITY"),
+            row("unknown source", "source not in results", "DATA"),
+            row("mail.spiderfoot.net", "unknown source", "ENTITY"),
+        ]
+
+        graph_data = SpiderFootHelpers.buildGraphData(iter(rows))
+        self.assertEqual({
+            ("1.1.1.1", "spiderfoot.net"),
+            ("www.spiderfoot.net", "1.1.1.1"),
+            ("www.spiderfoot.net", "spiderfoot.net"),
+        }, graph_data)
+
+    def test_buildGraphData_should_handle_long_chains_of_non_entity_data(self):
+        rows = [row("spiderfoot.net", "spiderfoot.net", "INTERNAL"), row("url 0", "spiderfoot.net", "SUBENTITY")]
+        for i in range(1, 5000):
+            rows.append(row(f"url {i}", f"url {i - 1}", "SUBENTITY"))
+            rows.append(row(f"user{i}@spiderfoot.net", f"url {i}", "ENTITY"))
+
+        graph_data = SpiderFootHelpers.buildGraphData(rows)
+        self.assertEqual(4999, len(graph_data))
+        self.assertIn(("user4999@spiderfoot.net", "spiderfoot.net"), graph_data)
+
+    def test_streamGraphGexf_should_yield_bytes(self):
+        rows = [
+            row("spiderfoot.net", "spiderfoot.net", "INTERNAL"),
+            row("1.1.1.1", "spiderfoot.net", "ENTITY"),
+            row("spiderfoot.net", "1.1.1.1", "INTERNAL"),
+            row("<&>", "1.1.1.1", "ENTITY"),
+        ]
+
+        chunks = list(SpiderFootHelpers.streamGraphGexf(["spiderfoot.net"], "title", rows))
+        for chunk in chunks:
+            self.assertIsInstance(chunk, bytes)
+
+        gexf = b"".join(chunks).decode('utf-8')
+        self.assertEqual(3, gexf.count("<node "))
+        # reciprocal edges of the undirected graph are written once
+        self.assertEqual(2, gexf.count("<edge "))
+        self.assertIn('id="&lt;&amp;&gt;"', gexf)
+
     def test_buildGraphGexf_should_return_bytes(self):
         gexf = SpiderFootHelpers.buildGraphGexf('test root', 'test title', [["test", "test", "test", "test", "test", "test", "test", "test", "test", "test", "test", "ENTITY", "test", "test", "test"]])
         self.assertIsInstance(gexf, bytes)
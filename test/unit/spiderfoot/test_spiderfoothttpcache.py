@@ -0,0 +1,106 @@
+# test_spiderfoothttpcache.py
+import os
+import tempfile
+import time
+
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootHttpCache
+
+
+def response(content="example content", code='200', headers=None):
+    return {
+        'code': code,
+        'status': None,
+        'content': content,
+        'headers': headers or dict(),
+        'realurl': 'https://example.com/'
+    }
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootHttpCache(unittest.TestCase):
+    """
+    Test SpiderFootHttpCache
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cacheDir = os.path.join(self.tmpdir.name, 'http')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_init_argument_of_invalid_type_should_raise_TypeError(self):
+        with self.assertRaises(TypeError):
+            SpiderFootHttpCache(list())
+        with self.assertRaises(TypeError):
+            SpiderFootHttpCache(None, ttl="1")
+        with self.assertRaises(TypeError):
+            SpiderFootHttpCache(None, maxDiskSize=None)
+
+    def test_init_argument_ttl_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootHttpCache(None, ttl=-1)
+
+    def test_key_should_ignore_user_agent(self):
+        key = SpiderFootHttpCache.key('https://example.com/', {'User-Agent': 'a', 'Accept': 'text/html'})
+
+        self.assertEqual(key, SpiderFootHttpCache.key('https://example.com/', {'User-Agent': 'b', 'Accept': 'text/html'}))
+        self.assertNotEqual(key, SpiderFootHttpCache.key('https://example.com/', {'Accept': 'application/json'}))
+        self.assertNotEqual(key, SpiderFootHttpCache.key('https://example.com/', {'Accept': 'text/html'}, sizeLimit=1))
+
+    def test_get_should_return_stored_response(self):
+        cache = SpiderFootHttpCache(None)
+        key = cache.key('https://example.com/')
+        self.assertIsNone(cache.get(key))
+
+        self.assertTrue(cache.put(key, response(headers={'etag': '"abc"'})))
+        entry = cache.get(key)
+
+        self.assertEqual(response(headers={'etag': '"abc"'}), entry['result'])
+        self.assertTrue(cache.isFresh(entry))
+        self.assertEqual({'If-None-Match': '"abc"'}, cache.conditionalHeaders(entry))
+        self.assertEqual(1, cache.stats()['hits'])
+        self.assertEqual(1, cache.stats()['misses'])
+
+    def test_put_should_not_store_uncacheable_responses(self):
+        cache = SpiderFootHttpCache(None)
+
+        self.assertFalse(cache.put('a', response(code='500')))
+        self.assertFalse(cache.put('b', response(headers={'cache-control': 'no-store'})))
+        self.assertFalse(cache.put('c', response(code=None)))
+        self.assertEqual(0, cache.stats()['size'])
+
+    def test_get_should_return_responses_stored_on_disk_by_another_cache(self):
+        key = SpiderFootHttpCache.key('https://example.com/')
+        SpiderFootHttpCache(self.cacheDir).put(key, response(content=b"\x00binary"))
+
+        entry = SpiderFootHttpCache(self.cacheDir).get(key)
+
+        self.assertEqual(b"\x00binary", entry['result']['content'])
+
+    def test_revalidated_should_make_stale_entry_fresh(self):
+        cache = SpiderFootHttpCache(self.cacheDir, ttl=0)
+        cache.put('a', response(headers={'last-modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}))
+        entry = cache.get('a')
+        self.assertFalse(cache.isFresh(entry))
+
+        result = cache.revalidated('a', entry)
+
+        self.assertEqual(response(headers={'last-modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}), result)
+        self.assertGreater(cache.get('a')['stored'], entry['stored'])
+        self.assertEqual(1, cache.stats()['revalidations'])
+
+    def test_put_should_evict_least_recently_used_entries_from_disk(self):
+        cache = SpiderFootHttpCache(self.cacheDir, maxDiskSize=3000)
+        for i in range(5):
+            cache.put(f"key{i}", response(content="x" * 1000))
+            # make sure each entry has a distinct modification time
+            os.utime(os.path.join(self.cacheDir, f"key{i}"), (time.time() - 10 + i, time.time() - 10 + i))
+
+        onDisk = sorted(os.listdir(self.cacheDir))
+
+        self.assertEqual(['key3', 'key4'], onDisk)
+        self.assertEqual(3, cache.stats()['evictions'])
@@ -0,0 +1,81 @@
+# test_spiderfootiprangeindex.py
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootIpRangeIndex
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootIpRangeIndex(unittest.TestCase):
+    """
+    Test SpiderFootIpRangeIndex
+    """
+
+    def test_init_argument_networks_of_invalid_type_should_raise_TypeError(self):
+        invalid_types = ["10.0.0.0/8", [None], [list()]]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    SpiderFootIpRangeIndex(invalid_type)
+
+    def test_init_argument_networks_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootIpRangeIndex(["10.0.0.0/33"])
+        with self.assertRaises(ValueError):
+            SpiderFootIpRangeIndex(["example.com"])
+
+    def test_parse_should_return_version_and_interval(self):
+        self.assertEqual((4, 167772160, 167772415), SpiderFootIpRangeIndex.parse("10.0.0.0/24"))
+        self.assertEqual((4, 167772160, 167772415), SpiderFootIpRangeIndex.parse("10.0.0.99/24"))
+        self.assertEqual((4, 167772161, 167772161), SpiderFootIpRangeIndex.parse("10.0.0.1"))
+        self.assertEqual((6, 1, 1), SpiderFootIpRangeIndex.parse("::1"))
+
+    def test_merge_should_merge_overlapping_and_adjacent_intervals(self):
+        starts, ends = SpiderFootIpRangeIndex.merge([(20, 30), (1, 5), (6, 10), (25, 40), (50, 50)])
+
+        self.assertEqual([1, 20, 50], starts)
+        self.assertEqual([10, 40, 50], ends)
+
+    def test_contains_should_return_true_for_ips_and_netblocks_within_ranges(self):
+        index = SpiderFootIpRangeIndex(["10.0.0.0/24", "10.0.1.0/24", "192.168.1.1", "2001:db8::/32"])
+
+        self.assertEqual(3, len(index))
+
+        self.assertTrue(index.contains("10.0.0.1"))
+        self.assertTrue(index.contains("10.0.1.255"))
+        self.assertTrue(index.contains("192.168.1.1"))
+        self.assertTrue(index.contains("2001:db8::1"))
+        self.assertTrue("10.0.0.5" in index)
+
+        # adjacent netblocks were merged
+        self.assertTrue(index.contains("10.0.0.0/23"))
+        self.assertTrue(index.contains("10.0.0.128/25"))
+
+        self.assertFalse(index.contains("10.0.2.0"))
+        self.assertFalse(index.contains("192.168.1.2"))
+        self.assertFalse(index.contains("10.0.0.0/22"))
+        self.assertFalse(index.contains("2001:db9::1"))
+        self.assertFalse(index.contains("::ffff:10.0.0.1"))
+        self.assertFalse(index.contains("example.com"))
+        self.assertFalse(index.contains(None))
+
+    def test_overlaps_should_return_true_for_netblocks_overlapping_ranges(self):
+        index = SpiderFootIpRangeIndex(["10.0.0.128/25", "2001:db8::1"])
+
+        self.assertTrue(index.overlaps("10.0.0.0/24"))
+        self.assertTrue(index.overlaps("10.0.0.200"))
+        self.assertTrue(index.overlaps("2001:db8::/64"))
+        self.assertFalse(index.overlaps("10.0.0.0/25"))
+        self.assertFalse(index.overlaps("2001:db8:1::/64"))
+        self.assertFalse(index.overlaps("not a netblock"))
+
+    def test_add_should_add_range(self):
+        index = SpiderFootIpRangeIndex()
+        self.assertFalse(index.contains("10.0.0.1"))
+
+        index.add("10.0.0.0/8")
+        index.add("10.1.0.0/16")
+
+        self.assertTrue(index.contains("10.0.0.1"))
+        self.assertEqual(([167772160], [184549375]), index.ranges(4))
+        self.assertEqual(([], []), index.ranges(6))
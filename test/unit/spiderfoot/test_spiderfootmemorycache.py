@@ -0,0 +1,66 @@
+# test_spiderfootmemorycache.py
+import copy
+
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootMemoryCache
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootMemoryCache(unittest.TestCase):
+    """
+    Test SpiderFootMemoryCache
+    """
+
+    def test_init_argument_maxSize_of_invalid_type_should_raise_TypeError(self):
+        invalid_types = [None, "", list(), dict()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    SpiderFootMemoryCache(invalid_type)
+
+    def test_init_argument_maxSize_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootMemoryCache(0)
+
+    def test_get_should_return_cached_value(self):
+        cache = SpiderFootMemoryCache()
+        cache.put("example key", ["example value"], 60)
+
+        self.assertEqual(["example value"], cache.get("example key"))
+        self.assertIsNone(cache.get("example missing key"))
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1}, cache.stats())
+
+    def test_get_should_not_return_expired_value(self):
+        cache = SpiderFootMemoryCache()
+        cache.put("example key", "example value", 0)
+
+        self.assertIsNone(cache.get("example key"))
+        self.assertEqual(0, len(cache))
+
+    def test_put_should_evict_least_recently_used_entry(self):
+        cache = SpiderFootMemoryCache(2)
+        cache.put("a", 1, 60)
+        cache.put("b", 2, 60)
+        cache.get("a")
+        cache.put("c", 3, 60)
+
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual(1, cache.evictions)
+
+    def test_put_argument_value_none_should_raise_ValueError(self):
+        cache = SpiderFootMemoryCache()
+        with self.assertRaises(ValueError):
+            cache.put("example key", None, 60)
+
+    def test_deepcopy_should_copy_entries(self):
+        cache = SpiderFootMemoryCache()
+        cache.put("example key", "example value", 60)
+
+        cache_copy = copy.deepcopy(cache)
+        self.assertEqual("example value", cache_copy.get("example key"))
+        cache_copy.put("example key", "example new value", 60)
+        self.assertEqual("example value", cache.get("example key"))
@@ -1,9 +1,11 @@
 # test_spiderfootplugin.py
+import queue
+
 import pytest
 import unittest
 
 from sflib import SpiderFoot
-from spiderfoot import SpiderFootDb, SpiderFootEvent, SpiderFootPlugin, SpiderFootTarget
+from spiderfoot import SpiderFootDb, SpiderFootEvent, SpiderFootEventCounter, SpiderFootPlugin, SpiderFootTarget
 
 
 @pytest.mark.usefixtures
@@ -329,6 +331,94 @@ class TestSpiderFootPlugin(unittest.TestCase):
             returnValue = sfp.checkForStop()
             self.assertEqual(returnValue, expectedReturnValue, status)
 
+    def test_queueEvent_should_count_events_in_flight_until_handled(self):
+        """
+        Test queueEvent(self, sfEvent)
+        """
+        sfp = SpiderFootPlugin()
+        sfp.incomingEventQueue = queue.Queue()
+        sfp.outgoingEventQueue = queue.Queue()
+
+        self.assertTrue(sfp.queueEvent('FINISHED'))
+        self.assertTrue(sfp.queueEvent('FINISHED'))
+        self.assertEqual(sfp.eventsInFlight, 2)
+
+        sfp._processQueuedEvent(sfp.finish)
+        self.assertEqual(sfp.eventsInFlight, 1)
+        self.assertTrue(sfp.outgoingEventQueue.empty())
+
+        sfp._processQueuedEvent(sfp.finish)
+        self.assertEqual(sfp.eventsInFlight, 0)
+        self.assertEqual(sfp.outgoingEventQueue.get_nowait(), 'IDLE')
+
+    def test_queueEvent_with_shared_event_counter_should_wake_scanner_once_no_module_is_busy(self):
+        """
+        Test queueEvent(self, sfEvent)
+        """
+        counter = SpiderFootEventCounter()
+        scanQueue = queue.Queue()
+        modules = [SpiderFootPlugin(), SpiderFootPlugin()]
+        for sfp in modules:
+            sfp.incomingEventQueue = queue.Queue()
+            sfp.outgoingEventQueue = scanQueue
+            sfp.setEventCounter(counter)
+            self.assertTrue(sfp.queueEvent('FINISHED'))
+        self.assertEqual(counter.count, 2)
+
+        modules[0]._processQueuedEvent(modules[0].finish)
+        self.assertEqual(modules[0].eventsInFlight, 0)
+        self.assertTrue(scanQueue.empty())
+
+        modules[1]._processQueuedEvent(modules[1].finish)
+        self.assertEqual(counter.count, 0)
+        self.assertEqual(scanQueue.get_nowait(), 'IDLE')
+
+    def test_queueEvent_errored_module_should_not_accept_events(self):
+        """
+        Test queueEvent(self, sfEvent)
+        """
+        sfp = SpiderFootPlugin()
+        sfp.incomingEventQueue = queue.Queue()
+        sfp.errorState = True
+
+        self.assertFalse(sfp.queueEvent('FINISHED'))
+        self.assertEqual(sfp.eventsInFlight, 0)
+
+    def test_discardQueuedEvents_should_stop_counting_discarded_events(self):
+        """
+        Test discardQueuedEvents(self)
+        """
+        sfp = SpiderFootPlugin()
+        sfp.sf = SpiderFoot(self.default_options)
+        sfp.incomingEventQueue = queue.Queue()
+        sfp.outgoingEventQueue = queue.Queue()
+        sfp.queueEvent('FINISHED')
+        sfp.queueEvent('FINISHED')
+
+        sfp.discardQueuedEvents()
+        self.assertIsNone(sfp.incomingEventQueue)
+        self.assertEqual(sfp.eventsInFlight, 0)
+        self.assertEqual(sfp.outgoingEventQueue.get_nowait(), 'IDLE')
+        self.assertFalse(sfp.queueEvent('FINISHED'))
+
+    def test_discardQueuedEvents_should_not_count_wake_ups_as_discarded_events(self):
+        """
+        Test discardQueuedEvents(self)
+        """
+        counter = SpiderFootEventCounter()
+        sfp = SpiderFootPlugin()
+        sfp.sf = SpiderFoot(self.default_options)
+        sfp.incomingEventQueue = queue.Queue()
+        sfp.outgoingEventQueue = queue.Queue()
+        sfp.setEventCounter(counter)
+        sfp.queueEvent('FINISHED')
+        # as put by the scanner to wake up module threads at the end of a scan
+        sfp.incomingEventQueue.put(None)
+
+        sfp.discardQueuedEvents()
+        self.assertEqual(sfp.eventsInFlight, 0)
+        self.assertEqual(counter.count, 0)
+
     def test_watchedEvents_should_return_a_list(self):
         """
         Test watchedEvents(self)
@@ -0,0 +1,100 @@
+# test_spiderfootportscanner.py
+import socket
+import threading
+import time
+
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootPortScanner
+
+
+class FakeService:
+    """TCP listener which sends a banner to each connection and closes it."""
+
+    def __init__(self, banner):
+        self.banner = banner
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(100)
+        self.port = self.sock.getsockname()[1]
+        self.connections = list()
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return
+            self.connections.append(time.monotonic())
+            if self.banner:
+                conn.sendall(self.banner)
+            conn.close()
+
+    def close(self):
+        self.sock.close()
+
+
+def closedPort():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootPortScanner(unittest.TestCase):
+    """
+    Test SpiderFootPortScanner
+    """
+
+    def test_init_argument_concurrency_of_invalid_type_should_raise_TypeError(self):
+        invalid_types = [None, "", list(), dict()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    SpiderFootPortScanner(invalid_type)
+
+    def test_init_argument_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootPortScanner(0)
+        with self.assertRaises(ValueError):
+            SpiderFootPortScanner(timeout=0)
+        with self.assertRaises(ValueError):
+            SpiderFootPortScanner(hostRate=-1)
+
+    def test_scan_should_yield_open_ports_with_banners(self):
+        withBanner = FakeService(b"SSH-2.0-example\r\n")
+        withoutBanner = FakeService(b"")
+        try:
+            targets = [
+                ('127.0.0.1', withBanner.port),
+                ('127.0.0.1', withoutBanner.port),
+                ('127.0.0.1', closedPort()),
+            ]
+            scanner = SpiderFootPortScanner(concurrency=2, timeout=2)
+            results = sorted(scanner.scan(targets))
+        finally:
+            withBanner.close()
+            withoutBanner.close()
+
+        self.assertEqual(sorted([
+            ('127.0.0.1', withBanner.port, b"SSH-2.0-example\r\n"),
+            ('127.0.0.1', withoutBanner.port, b""),
+        ]), results)
+        self.assertEqual(3, scanner.attempts)
+        self.assertEqual(2, scanner.open)
+
+    def test_scan_should_pace_connections_to_each_host(self):
+        service = FakeService(b"banner")
+        try:
+            scanner = SpiderFootPortScanner(timeout=2, hostRate=20)
+            results = list(scanner.scan([('127.0.0.1', service.port)] * 5))
+        finally:
+            service.close()
+
+        self.assertEqual(5, len(results))
+        self.assertGreaterEqual(service.connections[-1] - service.connections[0], 0.15)
@@ -0,0 +1,132 @@
+# test_spiderfootresolver.py
+import socket
+import threading
+import time
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootResolver
+
+
+class FakeNameserver:
+    """Minimal UDP nameserver answering from a fixed set of records."""
+
+    records = {
+        'ipv4.example.com.': ('A', '192.0.2.1'),
+        'ipv6.example.com.': ('AAAA', '2001:db8::1'),
+    }
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.queries = list()
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            query = dns.message.from_wire(data)
+            question = query.question[0]
+            name = question.name.to_text()
+            rdtype = dns.rdatatype.to_text(question.rdtype)
+            self.queries.append((name, rdtype, time.monotonic()))
+            response = dns.message.make_response(query)
+            if name not in self.records:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            elif self.records[name][0] == rdtype:
+                response.answer.append(dns.rrset.from_text(name, 60, 'IN', rdtype, self.records[name][1]))
+            self.sock.sendto(response.to_wire(), addr)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootResolver(unittest.TestCase):
+    """
+    Test SpiderFootResolver
+    """
+
+    def setUp(self):
+        self.nameserver = FakeNameserver()
+
+    def tearDown(self):
+        self.nameserver.close()
+
+    def resolver(self, **kwargs):
+        return SpiderFootResolver(['127.0.0.1'], port=self.nameserver.port, **kwargs)
+
+    def test_init_argument_nameservers_of_invalid_type_should_raise_TypeError(self):
+        invalid_types = ["", dict(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    SpiderFootResolver(invalid_type)
+
+    def test_init_argument_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootResolver(list())
+        with self.assertRaises(ValueError):
+            SpiderFootResolver(['127.0.0.1'], window=0)
+        with self.assertRaises(ValueError):
+            SpiderFootResolver(['127.0.0.1'], rate=-1)
+        with self.assertRaises(ValueError):
+            SpiderFootResolver(['127.0.0.1'], timeout=0)
+
+    def test_resolve_should_yield_addresses_of_each_host(self):
+        hosts = ['ipv4.example.com', 'ipv6.example.com', 'missing.example.com', 'invalid..example.com']
+        results = {host: (ipv4, ipv6) for host, ipv4, ipv6 in self.resolver(window=2).resolve(hosts)}
+
+        self.assertEqual({
+            'ipv4.example.com': (['192.0.2.1'], None),
+            'ipv6.example.com': ([], ['2001:db8::1']),
+            'missing.example.com': ([], []),
+            'invalid..example.com': ([], []),
+        }, results)
+
+        # AAAA is only looked up for names which exist without an A record
+        queries = sorted((name, rdtype) for name, rdtype, t in self.nameserver.queries)
+        self.assertEqual([
+            ('ipv4.example.com.', 'A'),
+            ('ipv6.example.com.', 'A'),
+            ('ipv6.example.com.', 'AAAA'),
+            ('missing.example.com.', 'A'),
+        ], queries)
+
+    def test_resolve_should_yield_none_for_unresponsive_nameservers(self):
+        self.nameserver.running = False
+        self.nameserver.thread.join()
+
+        results = list(self.resolver(timeout=0.2).resolve(['ipv4.example.com']))
+
+        self.assertEqual([('ipv4.example.com', None, None)], results)
+
+    def test_resolve_should_rate_limit_queries_to_each_nameserver(self):
+        hosts = [f"host{i}.example.com" for i in range(5)]
+        list(self.resolver(rate=20).resolve(hosts))
+
+        times = sorted(t for name, rdtype, t in self.nameserver.queries)
+        self.assertEqual(5, len(times))
+        self.assertGreaterEqual(times[-1] - times[0], 0.15)
+
+    def test_resolve_should_stop_when_caller_stops_early(self):
+        hosts = [f"host{i}.example.com" for i in range(1000)]
+        results = self.resolver(window=1).resolve(hosts)
+        next(results)
+        results.close()
+
+        self.assertLess(len(self.nameserver.queries), 1000)
@@ -0,0 +1,101 @@
+# test_spiderfootsessionpool.py
+import copy
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import unittest
+
+from spiderfoot import SpiderFootSessionPool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 65536
+    cookiesReceived = list()
+
+    def do_GET(self):
+        KeepAliveHandler.cookiesReceived.append(self.headers.get('Cookie'))
+        body = b"example content"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=example")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.usefixtures
+class TestSpiderFootSessionPool(unittest.TestCase):
+    """
+    Test SpiderFootSessionPool
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_init_argument_of_invalid_type_should_raise_TypeError(self):
+        invalid_types = [None, "", list(), dict()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    SpiderFootSessionPool(poolHosts=invalid_type)
+                with self.assertRaises(TypeError):
+                    SpiderFootSessionPool(retries=invalid_type)
+
+    def test_init_argument_with_invalid_value_should_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            SpiderFootSessionPool(poolSize=0)
+        with self.assertRaises(ValueError):
+            SpiderFootSessionPool(retries=-1)
+
+    def test_session_should_return_one_session_per_thread(self):
+        pool = SpiderFootSessionPool()
+        session = pool.session()
+        self.assertIs(session, pool.session())
+
+        sessions = list()
+        thread = threading.Thread(target=lambda: sessions.append(pool.session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(session, sessions[0])
+
+        # a different proxy gets a new session
+        self.assertIsNot(session, pool.session("socks5h://127.0.0.1:9050"))
+        self.assertEqual(3, pool.stats()['sessions'])
+
+    def test_session_should_reuse_connections(self):
+        pool = SpiderFootSessionPool()
+        for i in range(5):
+            res = pool.session().get(self.url, timeout=5)
+            self.assertEqual(b"example content", res.content)
+
+        self.assertEqual({'sessions': 1, 'requests': 5, 'opened': 1, 'reused': 4}, pool.stats())
+        pool.close()
+        self.assertEqual(0, pool.stats()['sessions'])
+
+    def test_session_should_not_keep_cookies_set_by_servers(self):
+        KeepAliveHandler.cookiesReceived.clear()
+        pool = SpiderFootSessionPool()
+        pool.session().get(self.url, timeout=5)
+        pool.session().get(self.url, timeout=5)
+        pool.session().get(self.url, cookies={'example': 'cookie'}, timeout=5)
+
+        self.assertEqual([None, None, 'example=cookie'], KeepAliveHandler.cookiesReceived)
+
+    def test_deepcopy_should_not_share_sessions(self):
+        pool = SpiderFootSessionPool()
+        session = pool.session()
+        poolCopy = copy.deepcopy(pool)
+
+        self.assertIsNot(session, poolCopy.session())
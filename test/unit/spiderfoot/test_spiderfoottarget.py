@@ -223,6 +223,17 @@ class TestSpiderFootTarget(unittest.TestCase):
         matches = target.matches('127.0.0.2')
         self.assertTrue(matches)
 
+    def test_matches_argument_value_matching_ip_address_alias_added_after_earlier_match_should_return_True(self):
+        target_value = 'spiderfoot.net'
+        target_type = 'INTERNET_NAME'
+        target = SpiderFootTarget(target_value, target_type)
+
+        self.assertFalse(target.matches('2001:db8::1'))
+
+        target.setAlias('2001:db8::1', 'IPV6_ADDRESS')
+
+        self.assertTrue(target.matches('2001:db8::1'))
+
     def test_matches_argument_value_matching_ipv6_address_should_return_True(self):
         target_value = '::1'
         target_type = 'IPV6_ADDRESS'
@@ -1,4 +1,7 @@
 # test_spiderfootplugin.py
+import threading
+import time
+
 import pytest
 import unittest
 
@@ -82,3 +85,62 @@ class TestSpiderFootThreadPool(unittest.TestCase):
         )
         self.assertEqual(map_results, expectedOutput)
         self.assertEqual(submit_results, expectedOutput2)
+
+    def test_submit_should_not_exceed_maxThreads_per_task(self):
+        """
+        Test submit(self, callback, *args, **kwargs) with maxThreads
+        """
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def callback(x):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(.01)
+            with lock:
+                running["now"] -= 1
+            return x
+
+        with SpiderFootThreadPool(10) as pool:
+            pool.start()
+            for i in range(20):
+                pool.submit(callback, i, taskName="limited", maxThreads=2, saveResult=True)
+            results = pool.shutdown()["limited"]
+
+        self.assertEqual(sorted(results), list(range(20)))
+        self.assertLessEqual(running["peak"], 2)
+
+    def test_worker_exception_should_not_hang_pool(self):
+        """
+        Test that a failing callback is counted as complete
+        """
+        def callback(x):
+            if x == "b":
+                raise ValueError("example error")
+            return x
+
+        with SpiderFootThreadPool(2) as pool:
+            results = sorted(pool.map(callback, ["a", "b", "c"], saveResult=True))
+            self.assertEqual(pool.countQueuedTasks("default"), 0)
+
+        self.assertEqual(results, ["a", "c"])
+
+    def test_tasks_should_be_scheduled_round_robin(self):
+        """
+        Test that queued calls are handed out fairly across task names
+        """
+        order = []
+
+        def callback(x):
+            order.append(x)
+
+        pool = SpiderFootThreadPool(1, qsize=10)
+        for i in range(3):
+            pool.submit(callback, f"a{i}", taskName="a")
+        for i in range(3):
+            pool.submit(callback, f"b{i}", taskName="b")
+        pool.start()
+        pool.shutdown()
+
+        self.assertEqual(order, ["a0", "b0", "a1", "b1", "a2", "b2"])
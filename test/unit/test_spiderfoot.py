@@ -1,4 +1,10 @@
 # test_spiderfoot.py
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
 import pytest
 import unittest
 
@@ -105,6 +111,12 @@ class TestSpiderFoot(unittest.TestCase):
         sf.status(None)
         self.assertEqual('TBD', 'TBD')
 
+    def test_warning(self):
+        sf = SpiderFoot(self.default_options)
+
+        sf.warning(None)
+        self.assertEqual('TBD', 'TBD')
+
     def test_info(self):
         sf = SpiderFoot(self.default_options)
 
@@ -136,6 +148,20 @@ class TestSpiderFoot(unittest.TestCase):
         self.assertIsInstance(cache_get, str)
         self.assertEqual(data, cache_get)
 
+    def test_cache_get_should_move_legacy_cache_files_into_the_cache_store(self):
+        with tempfile.TemporaryDirectory() as cacheDir, mock.patch.dict(os.environ, {'SPIDERFOOT_CACHE': cacheDir}):
+            sf = SpiderFoot(dict())
+
+            # sha224 of 'test-cache-label', as used by earlier versions
+            legacyFile = os.path.join(cacheDir, "e0039538260a31995f08273910d481c8c1c18edb55b602ae0178469d")
+            with open(legacyFile, "w") as f:
+                f.write('test-cache-data')
+
+            self.assertEqual('test-cache-data', sf.cacheGet('test-cache-label', 24))
+            self.assertFalse(os.path.exists(legacyFile))
+            self.assertEqual('test-cache-data', sf.cacheStore.get('test-cache-label'))
+            sf.cacheStore.close()
+
     def test_config_serialize_invalid_opts_should_raise(self):
         sf = SpiderFoot(dict())
 
@@ -178,6 +204,26 @@ class TestSpiderFoot(unittest.TestCase):
         cache_get = sf.cacheGet('', None)
         self.assertEqual(None, cache_get)
 
+    def test_feed_index_should_be_built_once_and_shared(self):
+        with tempfile.TemporaryDirectory() as cacheDir, mock.patch.dict(os.environ, {'SPIDERFOOT_CACHE': cacheDir}):
+            loader = mock.Mock(return_value=['1.1.1.1', 'malicious.example.com'])
+
+            index = SpiderFoot(dict()).feedIndex('test-feed', 24, loader)
+            otherIndex = SpiderFoot(dict()).feedIndex('test-feed', 24, loader)
+
+            self.assertTrue(index.containsIp('1.1.1.1'))
+            self.assertTrue(otherIndex.containsDomain('malicious.example.com'))
+            self.assertTrue(os.path.exists(os.path.join(cacheDir, 'feeds', 'test-feed.idx')))
+            loader.assert_called_once()
+
+    def test_feed_index_invalid_label_should_raise(self):
+        sf = SpiderFoot(dict())
+
+        with self.assertRaises(TypeError):
+            sf.feedIndex(None, 24, list)
+        with self.assertRaises(ValueError):
+            sf.feedIndex('../test-feed', 24, list)
+
     def test_modulesProducing_argument_events_should_return_a_list(self):
         sf = SpiderFoot(self.default_options)
 
@@ -496,6 +542,39 @@ class TestSpiderFoot(unittest.TestCase):
         self.assertFalse(addrs)
         self.assertIsInstance(addrs, list)
 
+    def test_resolve_host_should_cache_resolutions(self):
+        sf = SpiderFoot(self.default_options)
+
+        addrs = sf.resolveHost('localhost')
+        self.assertEqual(addrs, sf.resolveHost('LOCALHOST'))
+        self.assertEqual(1, sf.dnsCache.hits)
+        self.assertEqual(1, sf.dnsCache.misses)
+
+        # failed resolutions are cached too
+        sf.dnsCachePut('A', 'example.invalid', list())
+        self.assertEqual([], sf.resolveHost('example.invalid'))
+        self.assertEqual(2, sf.dnsCache.hits)
+
+    def test_resolve_host_with_dns_cache_disabled_should_not_cache_resolutions(self):
+        opts = dict(self.default_options)
+        opts['_dnscachettl'] = 0
+        sf = SpiderFoot(opts)
+
+        sf.resolveHost('localhost')
+        sf.resolveHost('localhost')
+        self.assertEqual(0, len(sf.dnsCache))
+        self.assertEqual(0, sf.dnsCache.hits)
+
+    def test_init_with_dns_cache_size_zero_should_disable_dns_cache(self):
+        opts = dict(self.default_options)
+        opts['_dnscachesize'] = 0
+        sf = SpiderFoot(opts)
+        self.assertIsNone(sf.dnsCache)
+
+        sf.dnsCachePut('A', 'example.invalid', ['192.0.2.1'])
+        self.assertIsNone(sf.dnsCacheGet('A', 'example.invalid'))
+        self.assertEqual([], sf.resolveHost('example.invalid'))
+
     def test_resolve_ip_should_return_list(self):
         sf = SpiderFoot(self.default_options)
 
@@ -536,6 +615,32 @@ class TestSpiderFoot(unittest.TestCase):
         self.assertFalse(addrs)
         self.assertIsInstance(addrs, list)
 
+    def test_resolve_hosts_bulk_should_yield_each_host(self):
+        sf = SpiderFoot(self.default_options)
+
+        results = dict(sf.resolveHostsBulk(['one.one.one.one', 'example.invalid']))
+        self.assertIn('1.1.1.1', results['one.one.one.one'])
+        self.assertEqual([], results['example.invalid'])
+
+    def test_resolve_hosts_bulk_should_use_cached_resolutions(self):
+        sf = SpiderFoot(self.default_options)
+
+        sf.dnsCachePut('A', 'ipv4.example.invalid', ['192.0.2.1'])
+        sf.dnsCachePut('A', 'ipv6.example.invalid', list())
+        sf.dnsCachePut('AAAA', 'ipv6.example.invalid', ['2001:db8::1'])
+
+        results = dict(sf.resolveHostsBulk(['ipv4.example.invalid', 'ipv6.example.invalid']))
+        self.assertEqual({'ipv4.example.invalid': ['192.0.2.1'], 'ipv6.example.invalid': ['2001:db8::1']}, results)
+
+    def test_resolve_hosts_bulk_argument_hosts_of_invalid_type_should_raise_TypeError(self):
+        sf = SpiderFoot(self.default_options)
+
+        invalid_types = [None, "", dict(), int()]
+        for invalid_type in invalid_types:
+            with self.subTest(invalid_type=invalid_type):
+                with self.assertRaises(TypeError):
+                    list(sf.resolveHostsBulk(invalid_type))
+
     def test_validate_ip_should_return_bool(self):
         sf = SpiderFoot(self.default_options)
 
@@ -687,6 +792,57 @@ class TestSpiderFoot(unittest.TestCase):
         self.assertEqual(res['code'], "301")
         self.assertEqual(res['content'], None)
 
+    def test_fetchUrl_with_http_cache_enabled_should_serve_repeat_fetches_from_cache(self):
+        requests = list()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                requests.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = b"example content"
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+        opts = dict(self.default_options)
+        opts['_httpcache'] = True
+        opts['_httpcachettl'] = 0
+
+        try:
+            with tempfile.TemporaryDirectory() as cacheDir, mock.patch.dict(os.environ, {'SPIDERFOOT_CACHE': cacheDir}):
+                sf = SpiderFoot(opts)
+                first = sf.fetchUrl(url)
+                # stale, so revalidated with the ETag
+                second = sf.fetchUrl(url)
+
+                opts['_httpcachettl'] = 3600
+                # a new scan is served from the disk cache without a request
+                third = SpiderFoot(opts).fetchUrl(url)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual("example content", first['content'])
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertEqual([None, '"v1"'], requests)
+        self.assertEqual(1, sf.httpCache.stats()['revalidations'])
+
     def test_fetchUrl_argument_url_invalid_type_should_return_none(self):
         sf = SpiderFoot(self.default_options)
 
@@ -1,9 +1,69 @@
 # test_spiderfootscanner.py
+import os
 import pytest
+import queue
+import threading
 import unittest
 import uuid
+from collections import OrderedDict
 
 from sfscan import SpiderFootScanner
+from spiderfoot import SpiderFootEvent, SpiderFootHelpers, SpiderFootPlugin
+
+
+class StubPlugin(SpiderFootPlugin):
+    """Module watching the given event types, which records the events it handles."""
+
+    def __init__(self, name, watched):
+        super().__init__()
+        self.__name__ = name
+        self.watched = watched
+        self.handled = list()
+
+    def setup(self, sfc, userOpts=dict()):
+        self.sf = sfc
+        self.opts = dict(userOpts)
+
+    def watchedEvents(self):
+        return self.watched
+
+    def handleEvent(self, sfEvent):
+        self.handled.append(sfEvent.data)
+
+
+class StubFanOutPlugin(StubPlugin):
+    """Module producing many events for each host name, and one more when the scan finishes."""
+
+    flushed = False
+
+    def handleEvent(self, sfEvent):
+        super().handleEvent(sfEvent)
+        if sfEvent.eventType == "INTERNET_NAME":
+            for i in range(20):
+                self.notifyListeners(SpiderFootEvent("LINKED_URL_INTERNAL", f"https://{sfEvent.data}/{i}", self.__name__, sfEvent))
+
+    def finish(self):
+        if not self.flushed:
+            self.flushed = True
+            self.notifyListeners(SpiderFootEvent("RAW_RIR_DATA", "flushed on finish", self.__name__, self.rootEvent))
+
+
+class StubRestlessPlugin(StubPlugin):
+    """Module producing another event every time the scan finishes."""
+
+    finished = 0
+
+    def finish(self):
+        self.finished += 1
+        self.notifyListeners(SpiderFootEvent("RAW_RIR_DATA", f"flushed on finish {self.finished}", self.__name__, self.rootEvent))
+
+
+class StubFailingPlugin(StubPlugin):
+    """Module which fails on the first event it handles."""
+
+    def handleEvent(self, sfEvent):
+        super().handleEvent(sfEvent)
+        self.errorState = True
 
 
 @pytest.mark.usefixtures
@@ -12,6 +72,25 @@ class TestSpiderFootScanner(unittest.TestCase):
     Test SpiderFootScanStatus
     """
 
+    def stub_scanner(self, modules):
+        """Scanner, not started, with stub modules set up to run."""
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfscan = SpiderFootScanner("example scan name", str(uuid.uuid4()), "spiderfoot.net", "INTERNET_NAME", ['sfp__stor_db'], opts, start=False)
+
+        sfscan.eventQueue = queue.Queue()
+        sfscan._SpiderFootScanner__sharedThreadPool.start()
+        self.addCleanup(sfscan._SpiderFootScanner__sharedThreadPool.shutdown, wait=False)
+        for mod in modules:
+            mod.setup(sfscan._SpiderFootScanner__sf, opts)
+            mod.setScanId(sfscan.scanId)
+            mod.setSharedThreadPool(sfscan._SpiderFootScanner__sharedThreadPool)
+            mod.outgoingEventQueue = sfscan.eventQueue
+            mod.incomingEventQueue = queue.Queue()
+            mod.setEventCounter(sfscan._SpiderFootScanner__eventsInFlight)
+        sfscan._SpiderFootScanner__moduleInstances = OrderedDict((mod.__name__, mod) for mod in modules)
+        return sfscan
+
     def test_init_argument_start_false_should_create_a_scan_without_starting_the_scan(self):
         """
         Test __init__(self, scanName, scanId, scanTarget, targetType, moduleList, globalOpts, start=True)
@@ -35,6 +114,93 @@ class TestSpiderFootScanner(unittest.TestCase):
         self.assertIsInstance(sfscan, SpiderFootScanner)
         self.assertEqual(sfscan.status, "ERROR-FAILED")
 
+    def test_startCorrelationUpdates_should_update_correlations_until_stopped(self):
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        rules = SpiderFootHelpers.loadCorrelationRulesRaw(f"{os.path.dirname(os.path.abspath(__file__))}/../../correlations/", ['template.yaml'])
+        opts['__correlationrules__'] = [{'id': ruleId, 'rawYaml': rawYaml} for ruleId, rawYaml in rules.items()]
+        opts['_correlationinterval'] = 60
+        scan_id = str(uuid.uuid4())
+        module_list = ['sfp__stor_db']
+
+        sfscan = SpiderFootScanner("example scan name", scan_id, "spiderfoot.net", "INTERNET_NAME", module_list, opts, start=False)
+        sfscan.startCorrelationUpdates()
+        self.assertIn(f"correlations-{scan_id}", [thread.name for thread in threading.enumerate()])
+
+        sfscan.stopCorrelationUpdates()
+        self.assertNotIn(f"correlations-{scan_id}", [thread.name for thread in threading.enumerate()])
+
+    def test_waitForThreads_should_dispatch_events_until_modules_are_idle(self):
+        fanOut = StubFanOutPlugin("sfp_stub_fanout", ["INTERNET_NAME"])
+        failing = StubFailingPlugin("sfp_stub_failing", ["LINKED_URL_INTERNAL"])
+        storage = StubPlugin("sfp_stub_storage", ["*"])
+        sfscan = self.stub_scanner([fanOut, failing, storage])
+
+        rootEvent = SpiderFootEvent("ROOT", "spiderfoot.net", "", None)
+        fanOut.rootEvent = rootEvent
+        sfscan.eventQueue.put(rootEvent)
+        sfscan.eventQueue.put(SpiderFootEvent("INTERNET_NAME", "spiderfoot.net", "SpiderFoot UI", rootEvent))
+
+        sfscan.waitForThreads()
+
+        self.assertEqual(["spiderfoot.net"], fanOut.handled)
+        # the failing module is sent no more events once it has failed
+        self.assertTrue(failing.errorState)
+        self.assertLessEqual(len(failing.handled), 20)
+        # every event was dispatched, including the one produced when the scan finished
+        self.assertEqual(23, len(storage.handled))
+        self.assertIn("flushed on finish", storage.handled)
+        self.assertEqual(0, sfscan._SpiderFootScanner__eventsInFlight.count)
+
+    def test_waitForThreads_should_stop_finishing_modules_after_maxfinishpasses(self):
+        restless = StubRestlessPlugin("sfp_stub_restless", ["INTERNET_NAME"])
+        storage = StubPlugin("sfp_stub_storage", ["*"])
+        sfscan = self.stub_scanner([restless, storage])
+        sfscan._SpiderFootScanner__config['_maxfinishpasses'] = 2
+
+        rootEvent = SpiderFootEvent("ROOT", "spiderfoot.net", "", None)
+        restless.rootEvent = rootEvent
+        sfscan.eventQueue.put(SpiderFootEvent("INTERNET_NAME", "spiderfoot.net", "SpiderFoot UI", rootEvent))
+
+        sfscan.waitForThreads()
+
+        self.assertEqual(2, restless.finished)
+        self.assertEqual(["spiderfoot.net", "flushed on finish 1", "flushed on finish 2"], storage.handled)
+
+    def test_buildEventRouting_should_route_event_types_to_watching_modules_in_module_order(self):
+        hosts = StubPlugin("sfp_stub_hosts", ["INTERNET_NAME"])
+        storage = StubPlugin("sfp_stub_storage", ["*"])
+        addresses = StubPlugin("sfp_stub_addresses", ["INTERNET_NAME", "IP_ADDRESS"])
+        everything = StubPlugin("sfp_stub_everything", ["*"])
+        sfscan = self.stub_scanner([hosts, storage, addresses, everything])
+
+        sfscan.buildEventRouting()
+        routing = sfscan._SpiderFootScanner__eventRouting
+        wildcardSubscribers = sfscan._SpiderFootScanner__wildcardSubscribers
+
+        self.assertEqual([hosts, storage, addresses, everything], routing["INTERNET_NAME"])
+        self.assertEqual([storage, addresses, everything], routing["IP_ADDRESS"])
+        self.assertNotIn("*", routing)
+        self.assertNotIn("EMAILADDR", routing)
+        self.assertEqual([storage, everything], wildcardSubscribers)
+
+    def test_waitForThreads_should_skip_modules_in_errorState(self):
+        hosts = StubPlugin("sfp_stub_hosts", ["INTERNET_NAME"])
+        failed = StubPlugin("sfp_stub_failed", ["INTERNET_NAME"])
+        storage = StubPlugin("sfp_stub_storage", ["*"])
+        sfscan = self.stub_scanner([hosts, failed, storage])
+        failed.errorState = True
+
+        rootEvent = SpiderFootEvent("ROOT", "spiderfoot.net", "", None)
+        sfscan.eventQueue.put(SpiderFootEvent("INTERNET_NAME", "spiderfoot.net", "SpiderFoot UI", rootEvent))
+        sfscan.eventQueue.put(SpiderFootEvent("EMAILADDR", "info@spiderfoot.net", "SpiderFoot UI", rootEvent))
+        sfscan.waitForThreads()
+
+        self.assertEqual(["spiderfoot.net"], hosts.handled)
+        self.assertEqual([], failed.handled)
+        # event types nobody watches only go to the wildcard subscribers
+        self.assertEqual(["spiderfoot.net", "info@spiderfoot.net"], storage.handled)
+
     def test_init_argument_scanName_of_invalid_type_should_raise_TypeError(self):
         """
         Test __init__(self, scanName, scanId, scanTarget, targetType, moduleList, globalOpts, start=True)
@@ -1,4 +1,9 @@
 # test_spiderfootwebui.py
+import csv
+import json
+import tempfile
+
+import openpyxl
 import pytest
 import unittest
 
@@ -119,6 +124,107 @@ class TestSpiderFootWebUi(unittest.TestCase):
         search_results = sfwebui.searchBase(None, None, "//")
         self.assertIsInstance(search_results, list)
 
+    def test_stream_csv_should_yield_bytes(self):
+        """
+        Test streamCsv(self, columnNames, rows, dialect="excel")
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+        sfwebui.exportChunkSize = 10
+
+        rows = (["row", str(i)] for i in range(5))
+        chunks = list(sfwebui.streamCsv(["Name", "Value"], rows))
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertIsInstance(chunk, bytes)
+        self.assertEqual(b"".join(chunks), b"Name,Value\r\n" + b"".join(b"row,%d\r\n" % i for i in range(5)))
+
+    def test_stream_csv_invalid_dialect_should_raise(self):
+        """
+        Test streamCsv(self, columnNames, rows, dialect="excel")
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        with self.assertRaises(csv.Error):
+            sfwebui.streamCsv(["Name"], [], "invalid dialect")
+
+    def test_stream_json_should_yield_bytes(self):
+        """
+        Test streamJson(self, items, ndjson=False)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+        sfwebui.exportChunkSize = 10
+        items = [{"data": str(i)} for i in range(5)]
+
+        chunks = list(sfwebui.streamJson(iter(items)))
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertIsInstance(chunk, bytes)
+        self.assertEqual(b"".join(chunks), json.dumps(items).encode('utf-8'))
+
+        self.assertEqual(b"".join(sfwebui.streamJson(iter([]))), b"[]")
+
+        chunks = list(sfwebui.streamJson(iter(items), ndjson=True))
+        self.assertEqual([json.loads(line) for line in b"".join(chunks).splitlines()], items)
+
+    def test_build_excel_file_should_write_a_sheet_per_sheet_name(self):
+        """
+        Test buildExcelFile(self, rows, columnNames, sheetNameIndex=0)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        rows = iter([
+            ["2022-01-01", "IP_ADDRESS", "1.1.1.1"],
+            ["2022-01-02", "DOMAIN_NAME", "spiderfoot.net"],
+            ["2022-01-03", "IP_ADDRESS", "2.2.2.2"],
+        ])
+        columnNames = ["Updated", "Type", "Data"]
+
+        with sfwebui.buildExcelFile(rows, columnNames, sheetNameIndex=1) as f:
+            workbook = openpyxl.load_workbook(f, read_only=True)
+            self.assertEqual(["DOMAIN_NAME", "IP_ADDRESS"], workbook.sheetnames)
+            self.assertEqual(
+                [("Updated", "Data"), ("2022-01-01", "1.1.1.1"), ("2022-01-03", "2.2.2.2")],
+                list(workbook["IP_ADDRESS"].values)
+            )
+            workbook.close()
+
+        self.assertEqual(["Updated", "Type", "Data"], columnNames)
+
+    def test_build_excel_should_return_bytes(self):
+        """
+        Test buildExcel(self, data, columnNames, sheetNameIndex=0)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        xlsx = sfwebui.buildExcel([], ["Type", "Data"], sheetNameIndex=0)
+        self.assertIsInstance(xlsx, bytes)
+
+    def test_stream_file_should_yield_file_content_and_close_file(self):
+        """
+        Test streamFile(self, fileobj)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+        sfwebui.exportChunkSize = 4
+
+        f = tempfile.TemporaryFile()
+        f.write(b"example data")
+        f.seek(0)
+
+        self.assertEqual([b"exam", b"ple ", b"data"], list(sfwebui.streamFile(f)))
+        self.assertTrue(f.closed)
+
     @unittest.skip("todo")
     def test_scan_correlations_export(self):
         opts = self.default_options
@@ -224,6 +330,34 @@ class TestSpiderFootWebUi(unittest.TestCase):
         scan_viz_multi = sfwebui.scanvizmulti(None, None)
         self.assertIsInstance(scan_viz_multi, str)
 
+    def test_scangraph_invalid_scan_should_return_error(self):
+        """
+        Test scangraph(self, id, groupBy="type", expand=None, limit=None, clusters=None)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        for scan_id in [None, '', 'example scan instance']:
+            with self.subTest(scan_id=scan_id):
+                scan_graph = sfwebui.scangraph(scan_id)
+                self.assertIsInstance(scan_graph, dict)
+                self.assertIn('error', scan_graph)
+
+    def test_scangraph_invalid_parameters_should_return_error(self):
+        """
+        Test scangraph(self, id, groupBy="type", expand=None, limit=None, clusters=None)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        for params in [{'groupBy': 'invalid grouping'}, {'limit': 'ten'}, {'limit': '0'}, {'clusters': '-1'}]:
+            with self.subTest(params=params):
+                scan_graph = sfwebui.scangraph('example scan instance', **params)
+                self.assertIn('error', scan_graph)
+                self.assertEqual('400', scan_graph['error']['http_status'])
+
     def test_scanopts_should_return_dict(self):
         opts = self.default_options
         opts['__modules__'] = dict()
@@ -598,6 +732,50 @@ class TestSpiderFootWebUi(unittest.TestCase):
         scan_results = sfwebui.scaneventresultsunique('', '', '')
         self.assertIsInstance(scan_results, list)
 
+    def test_scaneventresults_with_limit_should_return_a_page(self):
+        """
+        Test scaneventresults(self, id, eventType, filterfp=False, limit=None, cursor=None)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+        page = sfwebui.scaneventresults('', limit='10')
+        self.assertIsInstance(page, dict)
+        self.assertEqual([], page['rows'])
+        self.assertIsNone(page['next'])
+        self.assertEqual(0, page['total'])
+
+        page = sfwebui.scaneventresultsunique('', '', limit='10', sortBy='data')
+        self.assertIsInstance(page, dict)
+        self.assertEqual([], page['rows'])
+
+    def test_scaneventresults_invalid_pagination_should_return_error(self):
+        """
+        Test scaneventresults(self, id, eventType, filterfp=False, limit=None, cursor=None)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        for params in [{'cursor': 'invalid cursor'}, {'limit': 'ten'}, {'limit': '10', 'sortBy': 'invalid column'}, {'limit': '10', 'sortOrder': 'up'}]:
+            with self.subTest(params=params):
+                page = sfwebui.scaneventresults('', **params)
+                self.assertIn('error', page)
+
+    def test_decode_cursor_should_return_encoded_sort_key(self):
+        """
+        Test decodeCursor(self, cursor)
+        """
+        opts = self.default_options
+        opts['__modules__'] = dict()
+        sfwebui = SpiderFootWebUi(self.web_default_options, opts)
+
+        key = [1650000000.123456, "example data", 5]
+        self.assertEqual(key, sfwebui.decodeCursor(sfwebui.encodeCursor(key)))
+
+        with self.assertRaises(ValueError):
+            sfwebui.decodeCursor(sfwebui.encodeCursor("not a list"))
+
     def test_search_should_return_a_list(self):
         """
         Test search(self, id=None, eventType=None, value=None)